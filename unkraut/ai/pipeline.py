@@ -0,0 +1,388 @@
+# ai/pipeline.py
+"""
+Erkennung -> Entfernung für Unkraut-2025
+Kamerabild -> Erkennung -> Tracking -> Pixel zu Welt -> IK -> Trajektorie -> Werkzeug,
+serverseitig als Stufen auf eigenen Threads mit begrenzten Queues. Volle Queues
+verwerfen das älteste Element - es zählt immer der neueste Stand. Bestätigte
+Unkräuter gehen an die Job-Warteschlange des Arms (hardware/arm_jobs.py), die
+die Reihenfolge plant; jede neue Beobachtung frischt Position und Alter des Jobs auf.
+
+Jedes Element trägt Zeitstempel pro Stufe (time.time(), Aufnahmezeit = Frame-Zeitstempel
+der Kamera). Daraus kommen Latenz-Perzentile pro Stufe und Ende-zu-Ende bis zum
+Einschalten des Werkzeugs. Ziele, die das Latenzbudget überschreiten, werden verworfen;
+das Tracking liefert sie mit dem nächsten frischen Bild erneut.
+Ein Notaus (hardware/motion_authority.py) stoppt die Pipeline; sie startet nicht von selbst neu.
+"""
+import math
+import time
+import queue
+import threading
+from collections import deque
+
+import cv2
+import numpy as np
+
+from hardware.coordinates import arm_to_world
+from hardware.motion_authority import motion_authority
+
+LATENCY_BUDGET_S = 1.0        # Letzte Beobachtung -> Übergabe an den Arm
+TRACK_RADIUS_M = 0.03         # Erkennungen innerhalb dieses Radius gehören zum selben Unkraut
+TRACK_MIN_HITS = 2            # Bestätigung über mehrere Bilder - einzelne Fehlerkennungen fallen raus
+TRACK_TIMEOUT_S = 5.0
+LATENCY_WINDOW = 500          # Messwerte pro Intervall für die Perzentile
+
+# Intervall -> (von, bis) Zeitstempel
+LATENCY_INTERVALS = {
+    'detect': ('captured', 'detected'),
+    'localize': ('detected', 'localized'),
+    'queue_wait': ('localized', 'dispatched'),
+    'actuation': ('dispatched', 'actuated'),
+    'end_to_end': ('captured', 'actuated')
+}
+
+
+class PipelineItem:
+    """Ein Frame oder Ziel auf dem Weg durch die Stufen"""
+
+    def __init__(self, frame_id, captured, payload=None):
+        self.frame_id = frame_id
+        self.stamps = {'captured': captured}
+        self.payload = payload
+
+    def stamp(self, stage):
+        self.stamps[stage] = time.time()
+
+    def age(self):
+        return time.time() - self.stamps['captured']
+
+
+class WeedTracker:
+    """Ordnet Erkennungen im Weltrahmen bestehenden Unkräutern zu"""
+
+    def __init__(self, radius=TRACK_RADIUS_M, min_hits=TRACK_MIN_HITS, timeout=TRACK_TIMEOUT_S):
+        self.radius = radius
+        self.min_hits = min_hits
+        self.timeout = timeout
+        self.tracks = {}
+        self._next_id = 1
+        self.lock = threading.Lock()
+
+    def update(self, observations, timestamp):
+        """observations: [(wx, wy, confidence)] -> neu bestätigte und wartende Tracks (Auffrischung)"""
+        ready = []
+        with self.lock:
+            for wx, wy, confidence in observations:
+                track = self._nearest(wx, wy)
+                if track is None:
+                    track = {'id': self._next_id, 'x': wx, 'y': wy, 'hits': 0,
+                             'confidence': confidence, 'state': 'tentative'}
+                    self.tracks[track['id']] = track
+                    self._next_id += 1
+                else:
+                    # Position über alle Treffer mitteln
+                    hits = track['hits']
+                    track['x'] = (track['x'] * hits + wx) / (hits + 1)
+                    track['y'] = (track['y'] * hits + wy) / (hits + 1)
+                    track['confidence'] = max(track['confidence'], confidence)
+                track['hits'] += 1
+                track['last_seen'] = timestamp
+
+                if track['state'] == 'tentative' and track['hits'] >= self.min_hits:
+                    track['state'] = 'confirmed'
+                if track['state'] == 'confirmed':
+                    track['state'] = 'queued'
+                if track['state'] == 'queued':
+                    ready.append(dict(track))
+
+            # Alte Tracks vergessen - außer sie sind gerade beim Arm
+            for track_id, track in list(self.tracks.items()):
+                if timestamp - track['last_seen'] > self.timeout and track['state'] not in ('queued', 'removing'):
+                    del self.tracks[track_id]
+        return ready
+
+    def _nearest(self, wx, wy):
+        best, best_distance = None, self.radius
+        for track in self.tracks.values():
+            distance = math.hypot(track['x'] - wx, track['y'] - wy)
+            if distance <= best_distance:
+                best, best_distance = track, distance
+        return best
+
+    def set_state(self, track_id, state):
+        with self.lock:
+            if track_id in self.tracks:
+                self.tracks[track_id]['state'] = state
+
+    def get_status(self):
+        with self.lock:
+            states = {}
+            for track in self.tracks.values():
+                states[track['state']] = states.get(track['state'], 0) + 1
+            return {'tracks': len(self.tracks), 'states': states}
+
+
+class WeedPipeline:
+    """Stufen-Pipeline vom Kamerabild bis zum Werkzeug mit Latenzmessung"""
+
+    def __init__(self, camera=None, detector=None, calibration=None, odometry=None, arm=None,
+                 latency_budget=LATENCY_BUDGET_S, queue_size=4, skip_mock=True, authority=None):
+        self.camera = camera
+        self.detector = detector
+        self.calibration = calibration
+        self.odometry = odometry
+        self.arm = arm
+        self.latency_budget = latency_budget
+        self.skip_mock = skip_mock          # Zufalls-Fallback des Detektors nicht anfahren
+        self.authority = authority
+
+        self.frames = queue.Queue(maxsize=2)
+        self.localize_queue = queue.Queue(maxsize=queue_size)
+        self.tracker = WeedTracker()
+        self.scheduler = None               # Job-Warteschlange des Arms, ab start()
+
+        self.running = False
+        self.threads = []
+        self.stats_lock = threading.Lock()
+        self.counters = {'frames': 0, 'detections': 0, 'targets': 0, 'removed': 0, 'failed': 0}
+        self.drops = {'frame_overflow': 0, 'queue_overflow': 0, 'stale': 0, 'mock': 0,
+                      'uncalibrated': 0, 'unreachable': 0, 'cleared': 0}
+        self.latencies = {name: deque(maxlen=LATENCY_WINDOW) for name in LATENCY_INTERVALS}
+
+    # ===== START / STOP =====
+    def _resolve(self):
+        """Fehlende Komponenten aus Registry und KI-Modul holen"""
+        from hardware.registry import hardware_registry
+        if self.detector is None:
+            from ai.weed_detection import weed_detector
+            self.detector = weed_detector
+        if self.calibration is None:
+            self.calibration = hardware_registry.get('camera_calibration')
+        if self.arm is None:
+            self.arm = hardware_registry.get('robot_arm')
+        if self.odometry is None:
+            try:
+                self.odometry = hardware_registry.get('odometry_estimator')
+            except Exception as e:
+                print(f"⚠️ Pipeline ohne Odometrie (Fahrzeug gilt als stehend): {e}")
+        if self.camera is None:
+            self.camera = hardware_registry.get('camera_manager')
+
+    def start(self):
+        if self.running:
+            return False
+        self._resolve()
+        if self.authority is None:
+            self.authority = getattr(self.arm, 'authority', None) or motion_authority
+        if self.authority.stopped:
+            print("🚨 Unkraut-Pipeline nicht gestartet - Notaus aktiv")
+            return False
+        self.scheduler = self.arm.jobs
+        self.scheduler.pose_source = self._current_pose
+        self.scheduler.max_age = self.latency_budget
+        self.scheduler.listener = self
+        self.running = True
+        self.threads = [
+            threading.Thread(target=self._run_stage, args=(self.frames, self._detect), name='pipeline-detect', daemon=True),
+            threading.Thread(target=self._run_stage, args=(self.localize_queue, self._localize), name='pipeline-localize', daemon=True)
+        ]
+        for thread in self.threads:
+            thread.start()
+        self.scheduler.start()
+        if self.camera is not None:
+            self.camera.add_frame_listener(self._on_frame)
+        self.authority.add_listener(self._on_emergency_stop)
+        print("🌿 Unkraut-Pipeline gestartet")
+        return True
+
+    def stop(self):
+        if not self.running:
+            return False
+        self.running = False
+        self.authority.remove_listener(self._on_emergency_stop)
+        if self.camera is not None:
+            self.camera.remove_frame_listener(self._on_frame)
+        for stage_queue in (self.frames, self.localize_queue):
+            self._offer(stage_queue, None)      # Worker aufwecken
+        for thread in self.threads:
+            thread.join(timeout=2.0)
+        self.threads = []
+        self.scheduler.stop()
+        self.scheduler.listener = None
+        print("🛑 Unkraut-Pipeline gestoppt")
+        return True
+
+    def _on_emergency_stop(self, reason):
+        # Arm und Jobs hat der Notaus schon angehalten - Threads im Hintergrund beenden, nicht im Notaus-Pfad warten
+        threading.Thread(target=self.stop, name='pipeline-estop', daemon=True).start()
+
+    def cleanup(self):
+        self.stop()
+
+    # ===== QUEUES =====
+    def _count(self, counter, key, amount=1):
+        with self.stats_lock:
+            counter[key] += amount
+
+    def _offer(self, stage_queue, item):
+        """Einreihen ohne zu blockieren - volle Queue verliert ihr ältestes Element"""
+        dropped = None
+        while True:
+            try:
+                stage_queue.put_nowait(item)
+                return dropped
+            except queue.Full:
+                try:
+                    oldest = stage_queue.get_nowait()
+                except queue.Empty:
+                    continue
+                if oldest is not None:
+                    dropped = oldest
+
+    def _run_stage(self, stage_queue, handler):
+        while self.running:
+            item = stage_queue.get()
+            if item is None or not self.running:
+                continue
+            if item.age() > self.latency_budget:
+                self._count(self.drops, 'stale')
+                continue
+            try:
+                handler(item)
+            except Exception as e:
+                print(f"❌ Pipeline-Stufe {handler.__name__} fehlgeschlagen: {e}")
+
+    def _record(self, stamps, names):
+        with self.stats_lock:
+            for name in names:
+                start, end = LATENCY_INTERVALS[name]
+                if start in stamps and end in stamps:
+                    self.latencies[name].append(stamps[end] - stamps[start])
+
+    # ===== STUFEN =====
+    def _on_frame(self, frame_id, jpeg_data, timestamp):
+        """Frame-Listener der Kamera - nur einreihen, nicht rechnen"""
+        self.submit_frame(jpeg_data, timestamp, frame_id)
+
+    def submit_frame(self, frame, timestamp=None, frame_id=None):
+        """JPEG-Bytes oder BGR-Bild in die Pipeline geben"""
+        if not self.running:
+            return False
+        self._count(self.counters, 'frames')
+        item = PipelineItem(frame_id, timestamp if timestamp is not None else time.time(), frame)
+        if self._offer(self.frames, item) is not None:
+            self._count(self.drops, 'frame_overflow')
+        return True
+
+    def _detect(self, item):
+        frame = item.payload
+        if isinstance(frame, (bytes, bytearray)):
+            frame = cv2.imdecode(np.frombuffer(frame, np.uint8), cv2.IMREAD_COLOR)
+            if frame is None:
+                return
+        result = self.detector.detect_in_image(frame)
+        item.stamp('detected')
+        self._record(item.stamps, ('detect',))
+
+        detections = result.get('detections', [])
+        if self.skip_mock and result.get('method') == 'opencv_mock':
+            self._count(self.drops, 'mock', len(detections))
+            return
+        if not detections:
+            return
+        self._count(self.counters, 'detections', len(detections))
+        item.payload = {'detections': detections, 'size': (frame.shape[1], frame.shape[0])}
+        if self._offer(self.localize_queue, item) is not None:
+            self._count(self.drops, 'queue_overflow')
+
+    def _current_pose(self, timestamp=None):
+        if self.odometry is None:
+            return {'x': 0.0, 'y': 0.0, 'heading': 0.0}
+        pose = self.odometry.pose_at(timestamp) if timestamp is not None else self.odometry.get_pose()
+        return pose or {'x': 0.0, 'y': 0.0, 'heading': 0.0}
+
+    def _localize(self, item):
+        if not self.calibration.ground_calibrated:
+            self._count(self.drops, 'uncalibrated', len(item.payload['detections']))
+            return
+
+        detections = item.payload['detections']
+        centers = [(d['center']['x'], d['center']['y']) for d in detections]
+        ground = self.calibration.pixels_to_ground(centers, item.payload['size'])
+
+        # Pose zum Aufnahmezeitpunkt - das Fahrzeug ist seitdem weitergefahren
+        pose = self._current_pose(item.stamps['captured'])
+        observations = [arm_to_world(pose, x, y) + (d.get('confidence', 0.0),)
+                        for (x, y), d in zip(ground, detections)]
+        ready = self.tracker.update(observations, item.stamps['captured'])
+        item.stamp('localized')
+        self._record(item.stamps, ('localize',))
+
+        for track in ready:
+            target = PipelineItem(item.frame_id, item.stamps['captured'], {'track': track})
+            target.stamps.update(item.stamps)
+            if self.scheduler.submit(track['id'], track['x'], track['y'], item.stamps['captured'], target):
+                self._count(self.counters, 'targets')
+
+    # ===== JOB-LISTENER (hardware/arm_jobs.py) =====
+    def on_dispatch(self, job):
+        job['context'].stamp('dispatched')
+        self.tracker.set_state(job['id'], 'removing')
+
+    def on_step(self, job, step):
+        if step == 'tool_on':
+            job['context'].stamp('actuated')
+
+    def on_finish(self, job, success):
+        self._record(job['context'].stamps, ('queue_wait', 'actuation', 'end_to_end'))
+        self.tracker.set_state(job['id'], 'removed' if success else 'failed')
+        self._count(self.counters, 'removed' if success else 'failed')
+
+    def on_drop(self, job, reason):
+        self._count(self.drops, reason)
+        # Nächstes frisches Bild darf das Unkraut wieder als Ziel liefern
+        self.tracker.set_state(job['id'], 'confirmed')
+
+    # ===== STATUS =====
+    def get_latency_stats(self):
+        """Perzentile in Millisekunden pro Intervall"""
+        stats = {}
+        with self.stats_lock:
+            samples = {name: list(values) for name, values in self.latencies.items()}
+        for name, values in samples.items():
+            if not values:
+                stats[name] = {'count': 0}
+                continue
+            p50, p90, p99 = np.percentile(values, [50, 90, 99]) * 1000
+            stats[name] = {'count': len(values), 'p50_ms': round(float(p50), 1),
+                           'p90_ms': round(float(p90), 1), 'p99_ms': round(float(p99), 1),
+                           'max_ms': round(max(values) * 1000, 1)}
+        return stats
+
+    def get_status(self):
+        with self.stats_lock:
+            counters = dict(self.counters)
+            drops = dict(self.drops)
+        return {
+            'running': self.running,
+            'latency_budget_s': self.latency_budget,
+            'queues': {'frames': self.frames.qsize(), 'localize': self.localize_queue.qsize()},
+            'jobs': self.scheduler.get_status() if self.scheduler else None,
+            'counters': counters,
+            'drops': drops,
+            'tracking': self.tracker.get_status(),
+            'latency': self.get_latency_stats()
+        }
+
+
+# Globale Instanz - erst beim ersten Zugriff erzeugt, startet erst mit start()
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+def __getattr__(name):
+    if name == 'weed_pipeline':
+        global _pipeline
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = WeedPipeline()
+        return _pipeline
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
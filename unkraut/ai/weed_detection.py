@@ -15,6 +15,7 @@ class WeedDetector:
         self.model_loaded = False
         self.model = None
         self.detection_count = 0
+        self.last_result = None         # Kurzfassung der letzten Erkennung (Telemetrie)
         self.debug_mode = False
         
         # Optimierte Einstellungen
@@ -71,6 +72,29 @@ class WeedDetector:
         except Exception as e:
             return {'error': f'Detection failed: {str(e)}'}
     
+    def detect_in_file(self, filepath):
+        """Gespeichertes Bild analysieren und Ergebnis im Speicher-Index vermerken"""
+        image = cv2.imread(filepath)
+        if image is None:
+            return {'error': f'Bild nicht lesbar: {filepath}'}
+        
+        result = self.detect_in_image(image)
+        self.record_result(filepath, result)
+        return result
+    
+    def record_result(self, filepath, result):
+        """Erkennungs-Anzahl an den Speicher-Manager melden (Ausdünnen/Quota)"""
+        if 'error' in result:
+            return
+        
+        # Mock-Treffer sind keine echten Erkennungen
+        count = 0 if result.get('method') == 'opencv_mock' else result.get('count', 0)
+        try:
+            from app.utils.storage_manager import storage_manager
+            storage_manager.mark_detection(filepath, count)
+        except ImportError:
+            pass
+    
     def detect_in_image(self, image):
         """Haupterkennungsfunktion mit selektiver Erkennung"""
         start_time = time.time()
@@ -115,6 +139,8 @@ class WeedDetector:
                 'profile': self.green_profiles[self.current_profile]['name']
             }
             
+            self.last_result = {key: result[key] for key in ('count', 'confidence', 'processing_time', 'timestamp', 'detection_id', 'method')}
+            
             self.log(f"✅ Erkennung #{self.detection_count}: {len(detections)} Objekte ({method})")
             return result
             
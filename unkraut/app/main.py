@@ -27,6 +27,22 @@ def create_app():
     for directory in directories:
         os.makedirs(directory, exist_ok=True)
     
+    # Speicher-Manager: Quotas und Aufbewahrung im Hintergrund
+    try:
+        from .utils.storage_manager import storage_manager
+        storage_manager.start()
+    except Exception as e:
+        print(f"⚠️  Speicher-Manager nicht gestartet: {e}")
+    
+    # Hardware im Hintergrund vorwärmen - der Server antwortet sofort,
+    # Kamera/Arm/Motoren/Sensoren entstehen parallel oder beim ersten Zugriff
+    if os.environ.get('UNKRAUT_HARDWARE_WARMUP', '1') != '0':
+        try:
+            from hardware.registry import hardware_registry
+            hardware_registry.warm_up()
+        except Exception as e:
+            print(f"⚠️  Hardware-Warm-up nicht gestartet: {e}")
+    
     # Routes importieren und registrieren
     try:
         from .routes import (
@@ -68,6 +84,13 @@ def create_app():
         print(f"⚠️  System-Routes nicht gefunden: {e}")
         print("💡 Erstelle app/routes/system_routes.py für Shutdown-Funktionalität")
     
+    # WebSocket-Telemetrie und Steuerkanal (optional - ohne Flask-SocketIO bleibt das Polling)
+    try:
+        from .utils.telemetry import telemetry
+        telemetry.init_app(app)
+    except ImportError as e:
+        print(f"⚠️  Telemetrie-Kanal nicht verfügbar: {e}")
+    
     # Error Handler
     @app.errorhandler(404)
     def not_found(error):
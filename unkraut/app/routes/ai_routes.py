@@ -2,11 +2,35 @@
 """
 KI-Dashboard Routes
 """
-from flask import Blueprint, render_template
+from flask import Blueprint, render_template, jsonify
 
 bp = Blueprint('ai', __name__)
 
 @bp.route('/ai')
 def ai_dashboard():
     """KI-Dashboard Seite"""
-    return render_template('ai.html')
\ No newline at end of file
+    return render_template('ai.html')
+
+@bp.route('/api/ai/pipeline/status')
+def pipeline_status():
+    """Status der Erkennungs-Pipeline inkl. Latenz-Perzentilen"""
+    try:
+        from ai.pipeline import weed_pipeline
+        return jsonify(weed_pipeline.get_status())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/api/ai/pipeline/<action>', methods=['POST'])
+def pipeline_control(action):
+    """Automatische Unkraut-Entfernung starten oder stoppen"""
+    if action not in ('start', 'stop'):
+        return jsonify({'error': f'Unbekannte Aktion: {action}'}), 404
+    try:
+        from hardware.motion_authority import motion_authority
+        if action == 'start' and motion_authority.stopped:
+            return jsonify({'error': 'Notaus aktiv - erst zurücksetzen'}), 503
+        from ai.pipeline import weed_pipeline
+        changed = weed_pipeline.start() if action == 'start' else weed_pipeline.stop()
+        return jsonify({'status': 'ok', 'changed': changed, 'pipeline': weed_pipeline.get_status()})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -10,11 +10,13 @@ import threading
 import time
 import traceback
 import os
-import zipfile
-import tempfile  # ← DIESER IMPORT FEHLTE!
 import json
+import math
 import re
 
+from app.utils.stream_quality import stream_quality
+from app.utils.zip_export import stream_zip, select_images, select_session, parse_date_param
+
 
 # Einmalige Pfad-Berechnung
 def get_project_root():
@@ -33,6 +35,7 @@ def get_project_root():
 
 PROJECT_ROOT = get_project_root()
 IMAGES_DIR = os.path.join(PROJECT_ROOT, 'data', 'images')
+SESSIONS_DIR = os.path.join(PROJECT_ROOT, 'data', 'sessions')
 
 
 bp = Blueprint('api', __name__)
@@ -133,6 +136,14 @@ def get_hardware_module(module_type):
             from hardware.sensors import sensor_manager
             _hardware_cache[module_type] = sensor_manager
             debug_log(f"✅ sensor_manager geladen", "SUCCESS", "HARDWARE")
+        elif module_type == 'recorder':
+            from hardware.recorder import video_recorder
+            _hardware_cache[module_type] = video_recorder
+            debug_log(f"✅ video_recorder geladen", "SUCCESS", "HARDWARE")
+        elif module_type == 'calibration':
+            from hardware.camera_calibration import camera_calibration
+            _hardware_cache[module_type] = camera_calibration
+            debug_log(f"✅ camera_calibration geladen", "SUCCESS", "HARDWARE")
         else:
             debug_log(f"❌ Unbekannter Hardware-Typ: {module_type}", "ERROR", "HARDWARE")
             return None
@@ -226,7 +237,7 @@ def debug_status():
 # ===== KAMERA API MIT DEBUG =====
 @bp.route('/api/camera/stream')
 def video_stream():
-    """Kamera Video-Stream mit Debug-Logging"""
+    """Kamera Video-Stream mit Debug-Logging - Qualität passt sich pro Client an (?quality=auto|full|...|minimal)"""
     debug_log("📹 Stream-Anfrage erhalten", "CAMERA", "STREAM")
     
     try:
@@ -234,29 +245,28 @@ def video_stream():
         if not camera_manager:
             debug_log("❌ Kamera-Hardware nicht verfügbar - Dummy-Stream", "ERROR", "STREAM")
             return create_dummy_stream()
-            
+        
+        if not stream_quality.has_capacity():
+            debug_log("⚠️ Stream-Limit erreicht - Anfrage abgelehnt", "ERROR", "STREAM")
+            return jsonify({'error': 'Zu viele Stream-Clients', 'max_clients': stream_quality.max_clients}), 503, {'Retry-After': '5'}
+        
+        remote_addr = request.remote_addr
+        pinned_level = stream_quality.parse_level(request.args.get('quality'))
+        
+        def log_chunk(client, chunk):
+            if client.frames_sent % 30 == 0:  # Nicht jedes Frame loggen
+                debug_log(f"📹 Frame #{client.frames_sent} ({len(chunk)} bytes, Stufe {client.level})", "CAMERA", "STREAM")
+        
         def generate():
             debug_log("📹 Stream-Generator gestartet", "CAMERA", "STREAM")
-            frame_count = 0
             
             try:
                 if not camera_manager.is_streaming:
                     debug_log("🔄 Starte Kamera-Stream...", "CAMERA", "STREAM")
                     camera_manager.start_stream()
                 
-                while True:
-                    frame = camera_manager.get_frame()
-                    if frame:
-                        frame_count += 1
-                        if frame_count % 30 == 0:  # Alle Sekunde loggen
-                            debug_log(f"📹 Frame #{frame_count} ({len(frame)} bytes)", "CAMERA", "STREAM")
-                        
-                        yield (b'--frame\r\n'
-                               b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
-                    else:
-                        debug_log("⚠️ Kein Frame verfügbar", "ERROR", "STREAM")
-                        
-                    time.sleep(0.033)  # ~30 FPS
+                # Client wird erst hier angemeldet und im finally des Generators abgemeldet
+                yield from stream_quality.open_stream(camera_manager, remote_addr, pinned_level, log_chunk)
                     
             except Exception as e:
                 debug_log(f"❌ Stream-Generator Fehler: {e}", "ERROR", "STREAM")
@@ -267,6 +277,11 @@ def video_stream():
 
         return create_dummy_stream()
 
+@bp.route('/api/camera/stream/clients')
+def stream_clients():
+    """Aktive Stream-Clients mit Qualitätsstufe und Durchsatz"""
+    return jsonify(stream_quality.get_status())
+
 def create_dummy_stream():
     """Dummy-Stream wenn Kamera nicht verfügbar"""
     import cv2
@@ -386,6 +401,138 @@ def capture_image():
             'message': 'Unerwarteter Fehler bei Foto-Aufnahme'
         }), 500
 
+@bp.route('/api/camera/status')
+def camera_status():
+    """Kamera-Info inkl. Supervisor-Metriken (Neustarts, Ausfallzeit)"""
+    camera_manager = get_hardware_module('camera')
+    if not camera_manager:
+        return jsonify({'error': 'Kamera nicht verfügbar'}), 503
+    return jsonify(camera_manager.get_camera_info())
+
+@bp.route('/api/camera/restart', methods=['POST'])
+@log_request_details("KAMERA_NEUSTART")
+def restart_camera():
+    """Kamera-Neustart anfordern - kehrt sofort zurück, Supervisor startet im Hintergrund neu"""
+    camera_manager = get_hardware_module('camera')
+    if not camera_manager:
+        return jsonify({'error': 'Kamera nicht verfügbar'}), 503
+    
+    data = request.get_json(silent=True) or {}
+    camera_manager.restart_stream(redetect=bool(data.get('redetect', False)))
+    return jsonify({
+        'status': 'restart_requested',
+        'supervisor': camera_manager.get_supervisor_stats()
+    })
+
+# ===== VIDEO-AUFZEICHNUNG =====
+@bp.route('/api/camera/record/start', methods=['POST'])
+@log_request_details("AUFZEICHNUNG_START")
+def start_recording():
+    """Aufzeichnung nach data/videos starten (mode: mjpeg | h264)"""
+    recorder = get_hardware_module('recorder')
+    if not recorder:
+        return jsonify({'error': 'Recorder nicht verfügbar'}), 503
+    
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'JSON-Objekt erwartet'}), 400
+    
+    # recorder.start() rechnet mit int() - Text oder true würde dort zum 500
+    for key in ('segment_seconds', 'max_segments'):
+        value = data.get(key)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))
+                                  or not math.isfinite(value)):
+            return jsonify({'error': f'{key} muss eine Zahl sein'}), 400
+    
+    result = recorder.start(
+        mode=data.get('mode', 'mjpeg'),
+        segment_seconds=data.get('segment_seconds'),
+        max_segments=data.get('max_segments')
+    )
+    
+    if 'error' in result:
+        return jsonify(result), 400
+    return jsonify(result)
+
+@bp.route('/api/camera/record/stop', methods=['POST'])
+@log_request_details("AUFZEICHNUNG_STOP")
+def stop_recording():
+    """Aufzeichnung beenden"""
+    recorder = get_hardware_module('recorder')
+    if not recorder:
+        return jsonify({'error': 'Recorder nicht verfügbar'}), 503
+    return jsonify(recorder.stop())
+
+@bp.route('/api/camera/record/status')
+def recording_status():
+    """Aufzeichnungs-Status und vorhandene Aufzeichnungen"""
+    recorder = get_hardware_module('recorder')
+    if not recorder:
+        return jsonify({'error': 'Recorder nicht verfügbar'}), 503
+    
+    status = recorder.get_status()
+    status['recordings'] = recorder.list_recordings()
+    return jsonify(status)
+
+# ===== KAMERAKALIBRIERUNG =====
+def _current_camera_image():
+    """Aktuelles Kamerabild als BGR-Array - None ohne Frame"""
+    import cv2
+    import numpy as np
+    
+    camera_manager = get_hardware_module('camera')
+    frame = camera_manager.get_frame() if camera_manager else None
+    if not frame:
+        return None
+    return cv2.imdecode(np.frombuffer(frame, np.uint8), cv2.IMREAD_COLOR)
+
+@bp.route('/api/camera/calibration')
+def calibration_status():
+    """Stand der Kamerakalibrierung (Intrinsik, Bodenebene, gesammelte Aufnahmen)"""
+    calibration = get_hardware_module('calibration')
+    if not calibration:
+        return jsonify({'error': 'Kalibrierung nicht verfügbar'}), 503
+    return jsonify(calibration.get_status())
+
+@bp.route('/api/camera/calibration/<step>', methods=['POST'])
+@log_request_details("KAMERA_KALIBRIERUNG")
+def calibrate_camera(step):
+    """Kalibrierschritt mit dem aktuellen Kamerabild: view | intrinsics | ground | aruco"""
+    calibration = get_hardware_module('calibration')
+    if not calibration:
+        return jsonify({'error': 'Kalibrierung nicht verfügbar'}), 503
+    if step not in ('view', 'intrinsics', 'ground', 'aruco'):
+        return jsonify({'error': f'Unbekannter Kalibrierschritt: {step}'}), 404
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        pattern = tuple(int(v) for v in data.get('pattern', (9, 6)))
+        square_size = float(data.get('square_size', 2.5))
+        
+        if step == 'intrinsics':
+            result = {'rms': calibration.calibrate_intrinsics(square_size)}
+        else:
+            image = _current_camera_image()
+            if image is None:
+                return jsonify({'error': 'Kein Kamerabild verfügbar'}), 503
+            
+            if step == 'view':
+                result = {'found': calibration.add_view(image, pattern)}
+            elif step == 'ground':
+                result = {'error_cm': calibration.calibrate_ground(
+                    image, pattern, square_size,
+                    origin=tuple(float(v) for v in data.get('origin', (0, 0))),
+                    rotation=float(data.get('rotation', 0)))}
+            else:
+                markers = {int(k): tuple(float(v) for v in center) for k, center in data.get('markers', {}).items()}
+                result = {'error_cm': calibration.calibrate_ground_aruco(
+                    image, markers, float(data.get('marker_size', 5.0)))}
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e), 'status': calibration.get_status()}), 400
+    
+    result['status'] = calibration.get_status()
+    return jsonify(result)
+
 # ===== SYSTEM API =====
 @bp.route('/api/system/status')
 @log_request_details("SYSTEM_STATUS")
@@ -403,13 +550,26 @@ def system_status():
         
         debug_log(f"🔧 Hardware: Kamera={camera_available}, Arm={arm_available}, Motor={motor_available}, Sensoren={sensors_available}", "INFO", "SYSTEM")
         
+        system = {
+            'cpu_usage': 25.0,
+            'memory_usage': 45.0,
+            'cpu_temperature': 42.5,
+            'uptime': '2d 3h 15m'
+        }
+        
+        # Echte Werte aus dem Sensor-Snapshot - kein Warten auf psutil
+        if sensors_available:
+            stats = get_hardware_module('sensors').get_system_stats()
+            days, rest = divmod(stats['uptime'], 86400)
+            system = {
+                'cpu_usage': stats['cpu_usage'],
+                'memory_usage': stats['memory_usage'],
+                'cpu_temperature': stats['cpu_temperature'],
+                'uptime': f"{days}d {rest // 3600}h {rest % 3600 // 60}m"
+            }
+        
         status = {
-            'system': {
-                'cpu_usage': 25.0,
-                'memory_usage': 45.0,
-                'cpu_temperature': 42.5,
-                'uptime': '2d 3h 15m'
-            },
+            'system': system,
             'hardware': {
                 'camera_available': camera_available,
                 'arm_available': arm_available,
@@ -425,6 +585,36 @@ def system_status():
         debug_log(f"System-Status Fehler: {e}", "ERROR", "SYSTEM")
         return jsonify({'error': str(e)}), 500
 
+# ===== SENSOR-VERLAUF =====
+@bp.route('/api/sensors/history')
+def sensor_history():
+    """Sensor-Verlauf aus den Rollups: ?channel=&from=&to=&step= (Unix-Zeit, Sekunden)"""
+    try:
+        sensors = get_hardware_module('sensors')
+        if sensors is None:
+            return jsonify({'error': 'Sensoren nicht verfügbar'}), 503
+        
+        channel = request.args.get('channel')
+        if not channel:
+            return jsonify({'channels': sensors.history.get_channels(),
+                            'status': sensors.history.get_status()})
+        
+        try:
+            result = sensors.history.query(channel,
+                                           start=request.args.get('from', type=float),
+                                           end=request.args.get('to', type=float),
+                                           step=request.args.get('step', type=float))
+        except KeyError:
+            return jsonify({'error': f'Unbekannter Kanal: {channel}',
+                            'channels': sensors.history.get_channels()}), 404
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # ===== TOUCH-TEST SEITE =====
 @bp.route('/touch_test')
 def touch_test():
@@ -707,42 +897,35 @@ def clear_images():
 
 @bp.route('/api/camera/download_all')
 def download_all_camera_images():
-    """Alle Bilder als ZIP herunterladen"""
+    """Bilder als ZIP streamen - optional nach Zeitraum (?from=&to=) oder Session (?session=)"""
     try:
-        if not os.path.exists(IMAGES_DIR):
-            return "Keine Bilder vorhanden", 404
-        
-        # Alle Bilddateien finden
-        image_files = []
-        for filename in os.listdir(IMAGES_DIR):
-            if filename.lower().endswith(('.jpg', '.jpeg', '.png')):
-                filepath = os.path.join(IMAGES_DIR, filename)
-                if os.path.isfile(filepath):
-                    image_files.append((filename, filepath))
-        
-        if not image_files:
-            return "Keine Bilder zum Download gefunden", 404
+        session = request.args.get('session')
         
-        # Temporäre ZIP-Datei erstellen
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as temp_zip:
-            with zipfile.ZipFile(temp_zip.name, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for filename, filepath in image_files:
-                    try:
-                        zipf.write(filepath, filename)
-                    except Exception as e:
-                        print(f"❌ Fehler beim Hinzufügen von {filepath}: {e}")
+        if session:
+            entries = select_session(SESSIONS_DIR, session)
+            name_part = re.sub(r'[^A-Za-z0-9_.-]', '_', session)
+        else:
+            try:
+                date_from = parse_date_param(request.args.get('from'))
+                date_to = parse_date_param(request.args.get('to'), end_of_day=True)
+            except ValueError as e:
+                return jsonify({'error': f'Ungültiges Datum: {e}'}), 400
+            
+            entries = select_images(IMAGES_DIR, date_from, date_to)
+            name_part = 'bilder'
+        
+        if not entries:
+            return "Keine Bilder zum Download gefunden", 404
         
-        print(f"📦 ZIP erstellt: {len(image_files)} Bilder")
+        print(f"📦 ZIP-Stream: {len(entries)} Dateien")
         
-        # ZIP-Datei senden
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        download_name = f"unkraut_bilder_{timestamp}.zip"
+        download_name = f"unkraut_{name_part}_{timestamp}.zip"
         
-        return send_file(
-            temp_zip.name,
-            as_attachment=True,
-            download_name=download_name,
-            mimetype='application/zip'
+        return Response(
+            stream_zip(entries),
+            mimetype='application/zip',
+            headers={'Content-Disposition': f'attachment; filename="{download_name}"'}
         )
         
     except Exception as e:
@@ -758,4 +941,5 @@ debug_log(f"   POST /api/debug/touch - Touch-Events", "INFO", "STARTUP")
 debug_log(f"   POST /api/camera/capture - Foto mit Debug", "INFO", "STARTUP")
 debug_log(f"   GET  /api/camera/stream - Stream mit Debug", "INFO", "STARTUP")
 debug_log(f"   GET  /api/system/status - Status mit Debug", "INFO", "STARTUP")
+debug_log(f"   GET  /api/sensors/history - Sensor-Verlauf", "INFO", "STARTUP")
 debug_log(f"   GET  /touch_test - Touch-Test Seite", "INFO", "STARTUP")
\ No newline at end of file
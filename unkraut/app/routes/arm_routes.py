@@ -202,6 +202,18 @@ def move_custom():
         
         try:
             from hardware.robot_arm import robot_arm
+            
+            # Kollisions-Bitmap statt nur 0-180° - Eigenkollision, Boden, Chassis
+            collisions = robot_arm.check_pose(validated_positions)
+            if collisions:
+                return jsonify({
+                    'error': 'Position kollidiert',
+                    'reasons': collisions,
+                    'positions': validated_positions
+                }), 400
+            if robot_arm.emergency_stopped:
+                return jsonify({'error': 'Notaus aktiv - erst zurücksetzen'}), 503
+            
             success = robot_arm.set_custom_position(validated_positions, duration)
             
             if success:
@@ -247,6 +259,14 @@ def weed_removal_sequence():
         try:
             from hardware.robot_arm import robot_arm
             
+            # Erreichbarkeit vorab prüfen (inverse Kinematik, hardware/coordinates.py)
+            angles = robot_arm.solve_xy(target_x, target_y)
+            if angles is None:
+                return jsonify({
+                    'error': f'Ziel ({target_x}, {target_y}) außerhalb des Arbeitsraums',
+                    'workspace': robot_arm.kinematics.get_workspace()
+                }), 400
+            
             # Sequenz in separatem Thread ausführen (non-blocking)
             thread = threading.Thread(
                 target=robot_arm.weed_removal_sequence,
@@ -259,6 +279,7 @@ def weed_removal_sequence():
                 'status': 'sequence_started',
                 'target_x': target_x,
                 'target_y': target_y,
+                'angles': angles,
                 'hardware': True
             })
             
@@ -338,6 +359,22 @@ def emergency_stop():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@bp.route('/api/arm/emergency_reset', methods=['POST'])
+def emergency_reset():
+    """Notaus ausdrücklich aufheben (Arm, Servos und Motoren)"""
+    try:
+        try:
+            from hardware.robot_arm import robot_arm
+            result = robot_arm.reset_emergency()
+            return jsonify(dict(result, hardware=True))
+        except ImportError:
+            return jsonify({
+                'status': 'emergency_reset',
+                'mock': True
+            })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @bp.route('/api/arm/home', methods=['POST'])
 def home_position():
     """Zur Home-Position fahren"""
@@ -378,29 +415,65 @@ def park_position():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+CALIBRATION_ACTIONS = ['start', 'pulse', 'record', 'finish', 'abort', 'reset']
+
+@bp.route('/api/arm/calibrate', methods=['GET'])
+def calibration_status():
+    """Winkel -> Puls-Tabellen aller Servos und laufende Kalibrierung"""
+    try:
+        from hardware.robot_arm import robot_arm
+        return jsonify(robot_arm.get_calibration_status())
+    except ImportError:
+        return jsonify({'servos': {}, 'session': None, 'mock': True})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @bp.route('/api/arm/calibrate', methods=['POST'])
 def calibrate_servos():
-    """Servo-Kalibrierung durchführen"""
+    """Geführte Servo-Kalibrierung - ein Schritt pro Aufruf
+    
+    start {joint, angles?, interpolation?} fährt den ersten Referenzwinkel an,
+    pulse {pulse_us | delta_us} stellt den Puls nach, record übernimmt ihn und fährt weiter,
+    finish speichert die Tabelle, abort verwirft sie, reset {joint} stellt linear zurück.
+    """
     try:
+        data = request.get_json(silent=True) or {}
+        action = data.get('action', 'start')
+        if action not in CALIBRATION_ACTIONS:
+            return jsonify({'error': f'Unbekannte Aktion: {action}'}), 400
+        
         try:
             from hardware.robot_arm import robot_arm
-            
-            # Kalibrierung in Thread (dauert länger)
-            thread = threading.Thread(
-                target=robot_arm.calibrate_servos,
-                daemon=True
-            )
-            thread.start()
-            
-            return jsonify({
-                'status': 'calibration_started',
-                'hardware': True
-            })
         except ImportError:
-            return jsonify({
-                'status': 'calibration_started',
-                'mock': True,
-                'message': 'Mock: Servo-Kalibrierung gestartet'
-            })
+            return jsonify({'error': 'Roboterarm nicht verfügbar', 'mock': True}), 503
+        
+        try:
+            if action == 'start':
+                angles = data.get('angles')
+                if angles is not None and (not isinstance(angles, list) or not all(
+                        isinstance(angle, (int, float)) and not isinstance(angle, bool) for angle in angles)):
+                    return jsonify({'error': 'angles muss eine Liste von Winkeln sein'}), 400
+                result = robot_arm.start_calibration(data.get('joint'), angles,
+                                                     data.get('interpolation', 'linear'))
+            elif action == 'pulse':
+                pulse_us, delta_us = data.get('pulse_us'), data.get('delta_us')
+                for value in (pulse_us, delta_us):
+                    if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+                        return jsonify({'error': 'pulse_us/delta_us muss eine Zahl sein'}), 400
+                result = robot_arm.set_calibration_pulse(pulse_us, delta_us)
+            elif action == 'record':
+                result = robot_arm.record_calibration_point()
+            elif action == 'finish':
+                result = robot_arm.finish_calibration()
+            elif action == 'abort':
+                result = robot_arm.abort_calibration()
+            else:
+                result = robot_arm.reset_calibration(data.get('joint'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        except RuntimeError as e:
+            return jsonify({'error': str(e)}), 409
+        
+        return jsonify(result)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
@@ -1,12 +1,152 @@
 # app/routes/control_routes.py
 """
 Fahrzeug-Steuerung Routes
+Fahrbefehle gehen an den Motor-Steuer-Thread (hardware/motors.py): jeder Befehl
+verlängert die Deadman-Deadline, bleiben Befehle aus, stoppt der Watchdog.
+Der Notaus (hardware/motion_authority.py) gilt für alle Aktoren und braucht einen ausdrücklichen Reset.
 """
-from flask import Blueprint, render_template
+from flask import Blueprint, render_template, jsonify, request
 
 bp = Blueprint('control', __name__)
 
+VALID_DIRECTIONS = ['forward', 'backward', 'left', 'right']
+
 @bp.route('/control')
 def control_panel():
     """Fahrzeug-Steuerungsseite"""
-    return render_template('control.html')
\ No newline at end of file
+    return render_template('control.html')
+
+@bp.route('/api/control/move', methods=['POST'])
+def move():
+    """Fahrbefehl - kehrt sofort zurück, der Steuer-Thread schreibt die Motoren"""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'JSON-Objekt erwartet'}), 400
+
+        direction = data.get('direction')
+        if direction not in VALID_DIRECTIONS:
+            return jsonify({'error': f'Ungültige Richtung: {direction}'}), 400
+
+        speed = data.get('speed', 50)
+        duration = data.get('duration', 0.1)
+        if isinstance(speed, bool) or not isinstance(speed, (int, float)):
+            return jsonify({'error': 'speed muss eine Zahl sein'}), 400
+        if isinstance(duration, bool) or not isinstance(duration, (int, float)) or not 0 < duration <= 5:
+            return jsonify({'error': 'duration muss zwischen 0 und 5 Sekunden liegen'}), 400
+
+        from hardware.motors import motor_controller
+        result = motor_controller.move(direction, speed, duration)
+        if 'error' in result:
+            return jsonify(result), 409
+        return jsonify(result)
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/api/control/drive', methods=['POST'])
+def drive():
+    """Differenzial-Fahrbefehl: linear/angular in % (-100..100), z.B. für einen Joystick"""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'JSON-Objekt erwartet'}), 400
+
+        values = {key: data.get(key, default) for key, default in (('linear', 0), ('angular', 0), ('duration', 0.1))}
+        for key, value in values.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return jsonify({'error': f'{key} muss eine Zahl sein'}), 400
+        if not 0 < values['duration'] <= 5:
+            return jsonify({'error': 'duration muss zwischen 0 und 5 Sekunden liegen'}), 400
+
+        from hardware.motors import motor_controller
+        result = motor_controller.drive(values['linear'], values['angular'], values['duration'])
+        if 'error' in result:
+            return jsonify(result), 409
+        return jsonify(result)
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/api/control/stop', methods=['POST'])
+def stop():
+    """Fahrzeug sofort stoppen"""
+    try:
+        from hardware.motors import motor_controller
+        return jsonify(motor_controller.stop())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/api/control/emergency_stop', methods=['POST'])
+def emergency_stop():
+    """Notaus für Motoren, Arm und Servos - bleibt bis zum Reset verriegelt"""
+    try:
+        from hardware.motion_authority import motion_authority
+        return jsonify(motion_authority.emergency_stop('api'))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/api/control/emergency_reset', methods=['POST'])
+def emergency_reset():
+    """Notaus ausdrücklich aufheben - Bewegungen starten danach nicht von selbst"""
+    try:
+        from hardware.motion_authority import motion_authority
+        return jsonify(motion_authority.reset())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/api/control/emergency')
+def emergency_status():
+    """Notaus-Zustand, angemeldete Aktoren und Stopp-Latenz"""
+    try:
+        from hardware.motion_authority import motion_authority
+        return jsonify(motion_authority.get_status())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/api/control/pose')
+def pose():
+    """Aktuelle Odometrie-Pose, mit ?since=<unix-zeit> zusätzlich der Pose-Strom seitdem"""
+    try:
+        from hardware.odometry import odometry_estimator
+        result = odometry_estimator.get_status()
+
+        since = request.args.get('since', type=float)
+        if since is not None:
+            step = request.args.get('step', default=1, type=int)
+            result['history'] = odometry_estimator.get_history(since, step)
+        return jsonify(result)
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/api/control/status')
+def status():
+    """Fahrzeug-Status für die Steuerungsseite"""
+    try:
+        from hardware.motors import motor_controller
+        from hardware.registry import hardware_registry
+        from app.utils.robot_controller import robot_controller
+
+        result = {
+            'robot': {
+                'mode': robot_controller.current_mode,
+                'motors': motor_controller.get_status()
+            },
+            'arm': {'available': False},
+            'sensors': {},
+            'battery': {}
+        }
+
+        # Nur bereits erzeugte Hardware abfragen - der Status initialisiert nichts
+        if hardware_registry.is_created('sensor_manager'):
+            sensors = hardware_registry.get('sensor_manager')
+            result['sensors'] = {'temperature': sensors.get_latest('temperature')}
+            result['battery'] = sensors.get_latest('battery') or {}
+        if hardware_registry.is_created('robot_arm'):
+            result['arm'] = hardware_registry.get('robot_arm').get_status()
+
+        return jsonify(result)
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
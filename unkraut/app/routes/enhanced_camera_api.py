@@ -3,11 +3,10 @@
 import os
 import json
 import glob
-import zipfile
-import tempfile
 from datetime import datetime
 from flask import Blueprint, jsonify, request, send_file, Response
 from app.utils.camera_handler import camera_handler
+from app.utils.zip_export import stream_zip, select_images, select_session, parse_date_param
 
 bp = Blueprint('enhanced_camera_api', __name__)
 
@@ -15,8 +14,10 @@ bp = Blueprint('enhanced_camera_api', __name__)
 def enhanced_video_stream():
     """Enhanced Video-Stream mit System-Status-Overlay"""
     try:
-        return Response(camera_handler.get_video_stream(),
-                       mimetype='multipart/x-mixed-replace; boundary=frame')
+        stream = camera_handler.get_video_stream(request.remote_addr, request.args.get('quality'))
+        if stream is None:
+            return "Zu viele Stream-Clients", 503, {'Retry-After': '5'}
+        return Response(stream, mimetype='multipart/x-mixed-replace; boundary=frame')
     except Exception as e:
         print(f"❌ Enhanced Stream-Fehler: {e}")
         return f"Stream-Fehler: {e}", 500
@@ -196,56 +197,32 @@ def clear_all_images():
 
 @bp.route('/api/camera/download_all')
 def download_all_images():
-    """Alle Bilder als ZIP-Datei herunterladen"""
+    """Alle Bilder als ZIP streamen - optional nach Zeitraum (?from=&to=) oder Session (?session=)"""
     try:
-        images_dir = "data/images"
-        
-        if not os.path.exists(images_dir):
-            return "Keine Bilder vorhanden", 404
+        session = request.args.get('session')
         
-        # Temporäre ZIP-Datei erstellen
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as temp_zip:
-            with zipfile.ZipFile(temp_zip.name, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                
-                # Alle Bilddateien zur ZIP hinzufügen
-                image_extensions = ['*.jpg', '*.jpeg', '*.png', '*.bmp']
-                file_count = 0
-                
-                for ext in image_extensions:
-                    files = glob.glob(os.path.join(images_dir, ext))
-                    files.extend(glob.glob(os.path.join(images_dir, ext.upper())))
-                    
-                    for filepath in files:
-                        try:
-                            filename = os.path.basename(filepath)
-                            zipf.write(filepath, filename)
-                            file_count += 1
-                        except Exception as e:
-                            print(f"❌ Fehler beim Hinzufügen von {filepath}: {e}")
-                
-                if file_count == 0:
-                    return "Keine Bilder gefunden", 404
-            
-            # ZIP-Datei senden
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            download_name = f"unkraut_bilder_{timestamp}.zip"
-            
-            def cleanup_temp_file():
-                try:
-                    os.unlink(temp_zip.name)
-                except:
-                    pass
-            
-            # Temp-Datei nach dem Senden löschen
-            import atexit
-            atexit.register(cleanup_temp_file)
+        if session:
+            entries = select_session("data/sessions", session)
+        else:
+            try:
+                date_from = parse_date_param(request.args.get('from'))
+                date_to = parse_date_param(request.args.get('to'), end_of_day=True)
+            except ValueError as e:
+                return jsonify({'error': f'Ungültiges Datum: {e}'}), 400
             
-            return send_file(
-                temp_zip.name,
-                as_attachment=True,
-                download_name=download_name,
-                mimetype='application/zip'
-            )
+            entries = select_images("data/images", date_from, date_to)
+        
+        if not entries:
+            return "Keine Bilder gefunden", 404
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        download_name = f"unkraut_bilder_{timestamp}.zip"
+        
+        return Response(
+            stream_zip(entries),
+            mimetype='application/zip',
+            headers={'Content-Disposition': f'attachment; filename="{download_name}"'}
+        )
             
     except Exception as e:
         print(f"❌ Download-All-Fehler: {e}")
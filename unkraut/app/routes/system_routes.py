@@ -3,7 +3,7 @@
 System-Shutdown API für Unkraut-2025
 REINE PYTHON-DATEI - Keine HTML/CSS/JS!
 """
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 import threading
 import time
 import subprocess
@@ -117,6 +117,44 @@ def get_uptime():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@bp.route('/api/system/storage', methods=['GET'])
+def get_storage_status():
+    """Speicher-Belegung, Quotas und Aufräum-Statistik"""
+    try:
+        from app.utils.storage_manager import storage_manager
+        return jsonify(storage_manager.get_status())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/api/system/storage/housekeeping', methods=['POST'])
+def run_housekeeping():
+    """Aufräumen sofort neu planen - Ausführung bleibt inkrementell im Hintergrund"""
+    try:
+        from app.utils.storage_manager import storage_manager
+        
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': 'JSON-Objekt erwartet'}), 400
+        detections = data.get('detections', {})
+        
+        # {Dateiname: Anzahl Erkennungen} - ganze Zahlen >= 0
+        if not isinstance(detections, dict):
+            return jsonify({'error': 'detections muss ein Objekt {Dateiname: Anzahl} sein'}), 400
+        for filename, count in detections.items():
+            if isinstance(count, bool) or not isinstance(count, int) or count < 0:
+                return jsonify({'error': f'Ungültige Anzahl für {filename}: {count!r}'}), 400
+        
+        storage_manager.mark_detections(detections)
+        
+        planned = storage_manager.run_now()
+        return jsonify({
+            'status': 'planned',
+            'pending_operations': planned,
+            'timestamp': int(time.time())
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 def _get_system_boot_time():
     """Ermittelt die Boot-Zeit des Systems (wie auto_shutdown.sh)"""
     try:
@@ -96,11 +96,6 @@ ${response.detections.map((d, i) => `${i+1}. ${d.class} (${(d.confidence*100).to
             
             if (count > 0) {
                 showNotification(`🌿 ${count} Unkraut erkannt!`, 'success');
-                
-                // Auto-Entfernung wenn aktiv
-                if (aiState.autoRemovalActive) {
-                    triggerAutoRemoval(response.detections[0]);
-                }
             } else {
                 showNotification('✅ Kein Unkraut erkannt', 'success');
             }
@@ -220,11 +215,22 @@ Status: ${aiState.continuousMode ? 'Kontinuierlich' : 'Bereit'}`;
     statsElement.textContent = statsText;
 }
 
-function toggleAutoRemoval() {
+async function toggleAutoRemoval() {
     const btn = document.querySelector('button[onclick="toggleAutoRemoval()"]');
     const statusElement = document.getElementById('auto-status');
     
-    aiState.autoRemovalActive = !aiState.autoRemovalActive;
+    // Entfernung läuft serverseitig (ai/pipeline.py) - Kamera, Erkennung und Arm ohne Browser-Umweg
+    const action = aiState.autoRemovalActive ? 'stop' : 'start';
+    let response;
+    try {
+        response = await apiRequest(`/api/ai/pipeline/${action}`, { method: 'POST' });
+    } catch (error) {
+        console.error('Pipeline toggle failed:', error);
+        showNotification('❌ Auto-Entfernung konnte nicht umgeschaltet werden', 'error');
+        return;
+    }
+    
+    aiState.autoRemovalActive = response.pipeline.running;
     
     if (aiState.autoRemovalActive) {
         if (btn) {
@@ -232,7 +238,7 @@ function toggleAutoRemoval() {
             btn.className = 'btn btn-danger';
         }
         if (statusElement) {
-            statusElement.textContent = 'Automatik: EIN\nModus: Unkraut-Entfernung\nReaktionszeit: < 2s';
+            statusElement.textContent = `Automatik: EIN\nModus: Unkraut-Entfernung\nLatenzbudget: ${response.pipeline.latency_budget_s}s`;
         }
         showNotification('🤖 Automatische Unkraut-Entfernung aktiviert!', 'success');
     } else {
@@ -247,25 +253,6 @@ function toggleAutoRemoval() {
     }
 }
 
-async function triggerAutoRemoval(detection) {
-    try {
-        const response = await apiRequest('/api/arm/weed_removal', {
-            method: 'POST',
-            body: JSON.stringify({
-                target_x: detection.x,
-                target_y: detection.y
-            })
-        });
-        
-        if (response.status === 'sequence_started') {
-            showNotification(`🦾 Auto-Entfernung bei (${detection.x}, ${detection.y}) gestartet`, 'success');
-        }
-    } catch (error) {
-        console.error('Auto removal failed:', error);
-        showNotification('❌ Auto-Entfernung fehlgeschlagen', 'error');
-    }
-}
-
 function startTrainingMode() {
     aiState.trainingMode = !aiState.trainingMode;
     
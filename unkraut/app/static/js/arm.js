@@ -45,13 +45,16 @@ async function moveServo(joint, angle) {
     }
     
     try {
-        const response = await apiRequest('/api/arm/move/joint', {
-            method: 'POST',
-            body: JSON.stringify({
-                joint: joint,
-                angle: angle
-            })
-        });
+        // Slider-Befehle über den offenen WebSocket
+        const response = (window.Telemetry && Telemetry.isConnected())
+            ? await Telemetry.send('arm_joint', { joint: joint, angle: angle })
+            : await apiRequest('/api/arm/move/joint', {
+                method: 'POST',
+                body: JSON.stringify({
+                    joint: joint,
+                    angle: angle
+                })
+            });
         
         if (response.status === 'success') {
             armStatus.currentPositions[joint] = angle;
@@ -113,19 +116,8 @@ async function emergencyStop() {
         armStatus.emergencyStopped = true;
         armStatus.isMoving = false;
         
-        // Alle Slider deaktivieren für 3 Sekunden
-        const sliders = document.querySelectorAll('input[type="range"]');
-        sliders.forEach(slider => {
-            slider.disabled = true;
-        });
-        
-        setTimeout(() => {
-            sliders.forEach(slider => {
-                slider.disabled = false;
-            });
-            armStatus.emergencyStopped = false;
-            showNotification('✅ Notaus zurückgesetzt', 'success');
-        }, 3000);
+        // Slider bleiben gesperrt, bis der Notaus ausdrücklich zurückgesetzt wird
+        setSlidersDisabled(true);
         
         showNotification('🚨 ROBOTERARM NOT-STOPP AKTIVIERT', 'warning');
         
@@ -135,6 +127,28 @@ async function emergencyStop() {
     }
 }
 
+async function resetEmergency() {
+    try {
+        const response = await apiRequest('/api/arm/emergency_reset', {
+            method: 'POST'
+        });
+        
+        armStatus.emergencyStopped = false;
+        setSlidersDisabled(false);
+        showNotification(response.status === 'not_stopped' ? 'ℹ️ Kein Notaus aktiv' : '✅ Notaus zurückgesetzt', 'success');
+        
+    } catch (error) {
+        console.error('Emergency reset failed:', error);
+        showNotification('❌ Notaus-Reset fehlgeschlagen', 'error');
+    }
+}
+
+function setSlidersDisabled(disabled) {
+    document.querySelectorAll('input[type="range"]').forEach(slider => {
+        slider.disabled = disabled;
+    });
+}
+
 async function weedRemovalSequence() {
     if (armStatus.emergencyStopped) {
         showNotification('🚨 Arm im Notaus-Modus!', 'warning');
@@ -215,58 +229,103 @@ async function activateTool() {
     }
 }
 
+async function calibrationStep(body) {
+    return apiRequest('/api/arm/calibrate', {
+        method: 'POST',
+        body: JSON.stringify(body)
+    });
+}
+
+// Geführte Kalibrierung: Referenzwinkel nacheinander, Puls nachstellen bis das Gelenk
+// am Winkelmesser genau dort steht, dann übernehmen
 async function calibrateServos() {
     if (armStatus.emergencyStopped) {
         showNotification('🚨 Arm im Notaus-Modus!', 'warning');
         return;
     }
     
-    if (!confirm('Servo-Kalibrierung starten? Das dauert etwa 30 Sekunden.')) {
+    const joint = prompt('Welches Gelenk kalibrieren? (base, shoulder, elbow, wrist, gripper, tool)', 'base');
+    if (!joint) {
         return;
     }
     
+    let session = null;
     try {
         armStatus.isMoving = true;
-        showNotification('⚙️ Servo-Kalibrierung gestartet', 'info');
-        
-        const response = await apiRequest('/api/arm/calibrate', {
-            method: 'POST'
-        });
+        setSlidersDisabled(true);
+        session = await calibrationStep({ action: 'start', joint: joint.trim() });
+        showNotification(`⚙️ Kalibrierung ${session.joint}: ${session.angles.join('°, ')}°`, 'info');
         
-        if (response.status === 'calibration_started') {
-            // Alle Slider während Kalibrierung deaktivieren
-            const sliders = document.querySelectorAll('input[type="range"]');
-            sliders.forEach(slider => {
-                slider.disabled = true;
-            });
-            
-            // Nach 30 Sekunden wieder aktivieren
-            setTimeout(() => {
-                sliders.forEach(slider => {
-                    slider.disabled = false;
-                });
-                armStatus.isMoving = false;
-                showNotification('✅ Servo-Kalibrierung abgeschlossen', 'success');
-                getArmStatus();
-            }, 30000);
+        while (!session.complete) {
+            const input = prompt(
+                `${session.joint} soll auf ${session.target}° stehen.\n` +
+                'Puls (µs) ändern und OK = neu ausgeben, unverändert OK = Punkt übernehmen, Abbrechen = verwerfen',
+                session.pulse_us
+            );
+            if (input === null) {
+                await calibrationStep({ action: 'abort' });
+                session = null;
+                showNotification('⚠️ Kalibrierung abgebrochen', 'warning');
+                return;
+            }
             
-        } else {
-            armStatus.isMoving = false;
-            showNotification('❌ Kalibrierung-Fehler', 'error');
+            const pulse = Number(input);
+            if (input.trim() !== '' && !Number.isNaN(pulse) && pulse !== session.pulse_us) {
+                session = await calibrationStep({ action: 'pulse', pulse_us: pulse });
+            } else {
+                session = await calibrationStep({ action: 'record' });
+            }
         }
         
+        const result = await calibrationStep({ action: 'finish' });
+        session = null;
+        showNotification(`✅ ${result.joint} kalibriert (${result.table.points.length} Punkte)`, 'success');
+        
     } catch (error) {
-        armStatus.isMoving = false;
         console.error('Calibration failed:', error);
         showNotification('❌ Kalibrierung fehlgeschlagen', 'error');
+        if (session) {
+            calibrationStep({ action: 'abort' }).catch(() => {});
+        }
+    } finally {
+        armStatus.isMoving = false;
+        setSlidersDisabled(armStatus.emergencyStopped);
+        getArmStatus();
     }
 }
 
+let armInfo = null;
+
 async function getArmStatus() {
+    // Telemetrie liefert Position und Zustand per Push
+    if (armInfo && window.Telemetry && Telemetry.isConnected()) return;
+    
     try {
-        const data = await apiRequest('/api/arm/info');
+        armInfo = await apiRequest('/api/arm/info');
+        renderArmStatus(armInfo);
         
-        const statusText = `Hardware: ${data.controller?.hardware_available ? 'Echt (PCA9685)' : 'Mock'}
+    } catch (error) {
+        console.error('Status update failed:', error);
+        const statusElement = document.getElementById('arm-status');
+        if (statusElement) {
+            statusElement.textContent = '❌ Status nicht verfügbar';
+        }
+    }
+}
+
+function applyArmTelemetry(live) {
+    if (!armInfo) return;
+    
+    armInfo.current_position = live.position || armInfo.current_position;
+    armInfo.controller.is_moving = live.moving;
+    armInfo.controller.emergency_stopped = live.emergency;
+    armStatus.isMoving = Boolean(live.moving);
+    armStatus.emergencyStopped = Boolean(live.emergency);
+    renderArmStatus(armInfo);
+}
+
+function renderArmStatus(data) {
+    const statusText = `Hardware: ${data.controller?.hardware_available ? 'Echt (PCA9685)' : 'Mock'}
 I2C Adresse: ${data.controller?.i2c_address || 'N/A'}
 Servos: ${data.controller?.servo_count || 0}
 Gelenke: ${data.joints?.join(', ') || 'N/A'}
@@ -276,42 +335,40 @@ Status: ${armStatus.isMoving ? 'Bewegt sich' : 'Bereit'}
 Aktuelle Position:
 ${Object.entries(data.current_position || {}).map(([joint, angle]) => `${joint}: ${angle}°`).join('\n')}`;
 
-        const statusElement = document.getElementById('arm-status');
-        if (statusElement) {
-            statusElement.textContent = statusText;
-        }
-        
-        // Slider-Positionen aktualisieren
-        if (data.current_position) {
-            Object.entries(data.current_position).forEach(([joint, angle]) => {
-                const slider = document.getElementById(`servo-${joint}`);
-                const angleDisplay = document.getElementById(`${joint}-angle`);
-                const valueDisplay = document.getElementById(`value-${joint}`);
-                
-                if (slider && !armStatus.isMoving) {
-                    slider.value = angle;
-                }
-                if (angleDisplay) {
-                    angleDisplay.textContent = angle;
-                }
-                if (valueDisplay) {
-                    valueDisplay.textContent = `${angle}°`;
-                }
-                
-                armStatus.currentPositions[joint] = angle;
-            });
-        }
-        
-    } catch (error) {
-        console.error('Status update failed:', error);
-        const statusElement = document.getElementById('arm-status');
-        if (statusElement) {
-            statusElement.textContent = '❌ Status nicht verfügbar';
-        }
+    const statusElement = document.getElementById('arm-status');
+    if (statusElement) {
+        statusElement.textContent = statusText;
+    }
+    
+    // Slider-Positionen aktualisieren
+    if (data.current_position) {
+        Object.entries(data.current_position).forEach(([joint, angle]) => {
+            const slider = document.getElementById(`servo-${joint}`);
+            const angleDisplay = document.getElementById(`${joint}-angle`);
+            const valueDisplay = document.getElementById(`value-${joint}`);
+            
+            if (slider && !armStatus.isMoving) {
+                slider.value = angle;
+            }
+            if (angleDisplay) {
+                angleDisplay.textContent = angle;
+            }
+            if (valueDisplay) {
+                valueDisplay.textContent = `${angle}°`;
+            }
+            
+            armStatus.currentPositions[joint] = angle;
+        });
     }
 }
 
 function startStatusUpdates() {
+    // Live-Position über WebSocket, Polling nur als Fallback
+    if (window.Telemetry) {
+        Telemetry.subscribe(['arm']);
+        Telemetry.on('arm', applyArmTelemetry);
+    }
+    
     // Sofort laden
     getArmStatus();
     
@@ -324,6 +381,7 @@ window.armControl = {
     moveServo,
     moveToPreset,
     emergencyStop,
+    resetEmergency,
     weedRemovalSequence,
     activateTool,
     calibrateServos,
@@ -69,11 +69,23 @@ function startConnectionCheck() {
     }
     
     connectionCheckInterval = setInterval(checkConnection, 30000); // 30 Sekunden
+    
+    // Offener Telemetrie-Kanal zeigt die Verbindung direkt an
+    if (window.Telemetry) {
+        Telemetry.onStatus(checkConnection);
+    }
 }
 
 function checkConnection() {
     const indicator = document.getElementById('connection-indicator');
     
+    // WebSocket steht -> kein HTTP-Polling nötig
+    if (indicator && window.Telemetry && Telemetry.isConnected()) {
+        indicator.textContent = '🟢';
+        indicator.title = 'Verbindung OK (Live)';
+        return;
+    }
+    
     if (indicator) {
         fetch('/api/system/status', { 
             method: 'HEAD',
@@ -1,14 +1,20 @@
 // unkraut/app/static/js/dashboard.js
 // Dashboard-spezifische JavaScript-Funktionen
 
+// System-Status anzeigen
+function renderSystemStatus(system) {
+    document.getElementById('system-status').innerHTML = 
+        `CPU: ${system?.cpu_usage || 'N/A'}%<br>RAM: ${system?.memory_usage || 'N/A'}%<br>Temp: ${system?.cpu_temperature || 'N/A'}°C`;
+}
+
 // System-Status aktualisieren
 function updateStatus() {
+    // Telemetrie liefert den System-Status per Push
+    if (window.Telemetry && Telemetry.isConnected()) return;
+    
     fetch('/api/system/status')
         .then(response => response.json())
-        .then(data => {
-            document.getElementById('system-status').innerHTML = 
-                `CPU: ${data.system?.cpu_usage || 'N/A'}%<br>RAM: ${data.system?.memory_usage || 'N/A'}%<br>Temp: ${data.system?.cpu_temperature || 'N/A'}°C`;
-        })
+        .then(data => renderSystemStatus(data.system))
         .catch(error => {
             document.getElementById('system-status').innerHTML = '❌ Status nicht verfügbar';
         });
@@ -260,6 +266,12 @@ function showNotification(message, type = 'info') {
 
 // Initialisierung
 document.addEventListener('DOMContentLoaded', function() {
+    // Live-Status über WebSocket, Polling nur als Fallback
+    if (window.Telemetry) {
+        Telemetry.subscribe(['system']);
+        Telemetry.on('system', renderSystemStatus);
+    }
+    
     // Status regelmäßig aktualisieren
     setInterval(updateStatus, 5000);
     
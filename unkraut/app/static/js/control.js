@@ -168,13 +168,21 @@ function stopMove(btn) {
 
 async function sendMoveCommand(direction) {
     try {
+        const command = {
+            direction: direction,
+            speed: currentSpeed,
+            duration: 0.1
+        };
+        
+        // Über den offenen WebSocket statt eines HTTP-Requests alle 100ms
+        if (window.Telemetry && Telemetry.isConnected()) {
+            await Telemetry.send('move', command);
+            return;
+        }
+        
         const response = await apiRequest('/api/control/move', {
             method: 'POST',
-            body: JSON.stringify({
-                direction: direction,
-                speed: currentSpeed,
-                duration: 0.1
-            })
+            body: JSON.stringify(command)
         });
         
         // Erfolg - kein Notification um Spam zu vermeiden
@@ -192,6 +200,11 @@ async function sendMoveCommand(direction) {
 
 async function sendStopCommand() {
     try {
+        if (window.Telemetry && Telemetry.isConnected()) {
+            await Telemetry.send('stop');
+            return;
+        }
+        
         await apiRequest('/api/control/stop', {
             method: 'POST'
         });
@@ -231,7 +244,30 @@ function getDirectionText(direction) {
     return texts[direction] || direction;
 }
 
+function renderLiveStatus() {
+    const motors = Telemetry.state.motors || {};
+    const sensors = Telemetry.state.sensors || {};
+    const arm = Telemetry.state.arm || {};
+    
+    const statusHtml = `
+        <div><strong>Status:</strong> ${motors.emergency_stopped ? 'Notaus' : 'Live'}</div>
+        <div><strong>Motoren:</strong> ${motors.is_moving ? 'Bewegt sich' : 'Gestoppt'}</div>
+        <div><strong>Geschwindigkeit:</strong> ${currentSpeed}%</div>
+        <div><strong>Temperatur:</strong> ${sensors.temperature ?? 'N/A'}°C</div>
+        <div><strong>Batterie:</strong> ${sensors.battery?.percentage ?? 'N/A'}%</div>
+        <div><strong>Arm verfügbar:</strong> ${arm.available ? 'Ja' : 'Nein'}</div>
+    `;
+    
+    const statusElement = document.getElementById('robot-status');
+    if (statusElement) {
+        statusElement.innerHTML = statusHtml;
+    }
+}
+
 async function updateRobotStatus() {
+    // Telemetrie liefert den Status per Push
+    if (window.Telemetry && Telemetry.isConnected()) return;
+    
     try {
         const data = await apiRequest('/api/control/status');
         
@@ -259,6 +295,12 @@ async function updateRobotStatus() {
 }
 
 function startStatusUpdates() {
+    // Live-Status über WebSocket, Polling nur als Fallback
+    if (window.Telemetry) {
+        Telemetry.subscribe(['motors', 'sensors', 'arm']);
+        ['motors', 'sensors', 'arm'].forEach(channel => Telemetry.on(channel, renderLiveStatus));
+    }
+    
     // Sofort updaten
     updateRobotStatus();
     
@@ -103,24 +103,40 @@ function armWeedRemove() {
     });
 }
 
+function renderStatus(system, armAvailable) {
+    const statusHtml = `
+        <div class="status-item">CPU: ${system.cpu_usage}%</div>
+        <div class="status-item">RAM: ${system.memory_usage}%</div>
+        <div class="status-item">Temp: ${system.cpu_temperature}°C</div>
+        <div class="status-item">Hardware: ${armAvailable ? 'Arm OK' : 'Mock'}</div>
+    `;
+    document.getElementById('system-status').innerHTML = statusHtml;
+}
+
+function renderLiveStatus() {
+    renderStatus(Telemetry.state.system || {}, Telemetry.state.arm?.available);
+}
+
 function updateStatus() {
+    // Telemetrie liefert den Status per Push
+    if (window.Telemetry && Telemetry.isConnected()) return;
+    
     fetch('/api/system/status')
     .then(r => r.json())
-    .then(data => {
-        const statusHtml = `
-            <div class="status-item">CPU: ${data.system.cpu_usage}%</div>
-            <div class="status-item">RAM: ${data.system.memory_usage}%</div>
-            <div class="status-item">Temp: ${data.system.cpu_temperature}°C</div>
-            <div class="status-item">Hardware: ${data.hardware.arm_available ? 'Arm OK' : 'Mock'}</div>
-        `;
-        document.getElementById('system-status').innerHTML = statusHtml;
-    })
+    .then(data => renderStatus(data.system, data.hardware.arm_available))
     .catch(err => {
         console.error('Status error:', err);
         document.getElementById('system-status').innerHTML = '<div class="error">Status nicht verfügbar</div>';
     });
 }
 
+// Live-Status über WebSocket, Polling nur als Fallback
+if (window.Telemetry) {
+    Telemetry.subscribe(['system', 'arm']);
+    Telemetry.on('system', renderLiveStatus);
+    Telemetry.on('arm', renderLiveStatus);
+}
+
 // Auto-Update Status
 setInterval(updateStatus, 5000);
 updateStatus();
@@ -0,0 +1,150 @@
+// app/static/js/telemetry.js
+// Telemetrie- und Steuerkanal über WebSocket (Socket.IO-Protokoll v5, ohne externe Bibliothek)
+// Der Roboter hat im Feld kein Internet - deshalb kein CDN-Client, sondern das
+// schlanke Engine.IO/Socket.IO-Framing direkt auf einem nativen WebSocket.
+// Solange die Verbindung steht, pausieren die Seiten ihr HTTP-Polling.
+
+const Telemetry = (function() {
+    let socket = null;
+    let connected = false;
+    let reconnectDelay = 1000;
+    let nextAckId = 1;
+
+    const pendingAcks = {};
+    const channelHandlers = {};
+    const statusHandlers = [];
+    const channels = new Set();
+    const state = {};
+
+    function url() {
+        const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+        return `${protocol}//${window.location.host}/socket.io/?EIO=4&transport=websocket`;
+    }
+
+    function connect() {
+        if (!('WebSocket' in window)) return;
+
+        socket = new WebSocket(url());
+        socket.onmessage = (event) => handlePacket(event.data);
+        socket.onclose = () => {
+            setConnected(false);
+            // Offene Acks verwerfen - Aufrufer fallen auf HTTP zurück
+            Object.keys(pendingAcks).forEach(id => {
+                pendingAcks[id].reject(new Error('Verbindung getrennt'));
+                delete pendingAcks[id];
+            });
+            setTimeout(connect, reconnectDelay);
+            reconnectDelay = Math.min(reconnectDelay * 2, 15000);
+        };
+    }
+
+    function handlePacket(packet) {
+        const engineType = packet[0];
+
+        if (engineType === '0') {
+            // Engine.IO offen -> Socket.IO-Namespace verbinden
+            socket.send('40');
+        } else if (engineType === '2') {
+            // Server-Ping beantworten
+            socket.send('3');
+        } else if (engineType === '4') {
+            handleMessage(packet.slice(1));
+        }
+    }
+
+    function handleMessage(message) {
+        const type = message[0];
+
+        if (type === '0') {
+            reconnectDelay = 1000;
+            setConnected(true);
+            if (channels.size) {
+                subscribe(Array.from(channels))
+                    .catch(error => console.warn('Telemetrie-Abo fehlgeschlagen:', error));
+            }
+        } else if (type === '2') {
+            const [event, data] = JSON.parse(message.slice(1));
+            if (event === 'telemetry') {
+                applyDelta(data.channel, data.delta);
+            }
+        } else if (type === '3') {
+            const match = message.slice(1).match(/^(\d+)(.*)$/);
+            if (match && pendingAcks[match[1]]) {
+                pendingAcks[match[1]].resolve(JSON.parse(match[2])[0]);
+                delete pendingAcks[match[1]];
+            }
+        }
+    }
+
+    function applyDelta(channel, delta) {
+        state[channel] = Object.assign(state[channel] || {}, delta);
+        (channelHandlers[channel] || []).forEach(fn => fn(state[channel], delta));
+    }
+
+    function setConnected(value) {
+        if (connected === value) return;
+        connected = value;
+        statusHandlers.forEach(fn => fn(connected));
+    }
+
+    function emit(event, data, timeout = 2000) {
+        return new Promise((resolve, reject) => {
+            if (!connected) {
+                reject(new Error('Telemetrie nicht verbunden'));
+                return;
+            }
+            const id = String(nextAckId++);
+            pendingAcks[id] = { resolve, reject };
+            socket.send('42' + id + JSON.stringify([event, data]));
+            setTimeout(() => {
+                if (pendingAcks[id]) {
+                    delete pendingAcks[id];
+                    reject(new Error('Zeitüberschreitung'));
+                }
+            }, timeout);
+        });
+    }
+
+    function subscribe(names) {
+        names.forEach(name => channels.add(name));
+        if (!connected) return Promise.resolve(null);
+
+        return emit('subscribe', names).then(ack => {
+            Object.entries(ack.snapshot || {}).forEach(([channel, snapshot]) => {
+                state[channel] = {};
+                applyDelta(channel, snapshot);
+            });
+            return ack;
+        });
+    }
+
+    return {
+        connect,
+        subscribe,
+
+        // Handler pro Kanal: fn(vollständiger Zustand, geänderte Felder)
+        on(channel, fn) {
+            (channelHandlers[channel] = channelHandlers[channel] || []).push(fn);
+            if (state[channel]) fn(state[channel], state[channel]);
+        },
+
+        // Handler für Verbindungswechsel: fn(connected)
+        onStatus(fn) {
+            statusHandlers.push(fn);
+        },
+
+        isConnected() {
+            return connected;
+        },
+
+        // Steuerbefehl senden - Promise mit der Antwort des Servers
+        send(command, params = {}) {
+            return emit('control', Object.assign({ command }, params));
+        },
+
+        state
+    };
+})();
+
+window.Telemetry = Telemetry;
+document.addEventListener('DOMContentLoaded', () => Telemetry.connect());
@@ -2,21 +2,19 @@
 Kamera-Handler für Flask
 """
 from hardware.camera import camera_manager
-import time
+from app.utils.stream_quality import stream_quality
 
 class CameraHandler:
     def __init__(self):
         self.camera_manager = camera_manager
     
-    def get_video_stream(self):
+    def get_video_stream(self, remote_addr=None, quality=None):
         self.camera_manager.start_stream()
         
-        while True:
-            frame = self.camera_manager.get_frame()
-            if frame:
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
-            time.sleep(0.033)
+        if not stream_quality.has_capacity():
+            return None  # Stream-Limit erreicht
+        # Anmeldung erst beim ersten Lesen - ein nie gelesener Stream belegt keinen Platz
+        return stream_quality.open_stream(self.camera_manager, remote_addr, stream_quality.parse_level(quality))
     
     def capture_image(self, filename=None):
         return self.camera_manager.capture_image(filename)
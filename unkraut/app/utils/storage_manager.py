@@ -0,0 +1,396 @@
+# app/utils/storage_manager.py
+"""
+Speicher-Manager für Unkraut-2025
+Quotas und Aufbewahrungsregeln für data/ und backups/,
+inkrementelle Aufräumarbeit im Hintergrund und Low-Disk-Schutz für Aufnahmen
+"""
+import os
+import json
+import stat
+import time
+import shutil
+import zipfile
+import threading
+from datetime import datetime
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MB = 1024 * 1024
+DAY = 24 * 3600
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+# Standard-Regeln pro Verzeichnis (relativ zum Projekt-Root)
+#   quota_mb:           Maximalgröße, darüber werden die ältesten Dateien gelöscht
+#   max_age_days:       Dateien älter als das werden gelöscht
+#   thin_after_days:    Leere Frames ab diesem Alter ausdünnen - nur Bilder, die
+#                       analysiert wurden und nachweislich keine Erkennung haben
+#   thin_interval_s:    Beim Ausdünnen ein leeres Bild pro Intervall behalten
+#   archive_after_days: Bilder ab diesem Alter in Tages-Archive verschieben
+DEFAULT_POLICIES = {
+    'data/images': {
+        'quota_mb': 2048, 'max_age_days': None,
+        'thin_after_days': 1, 'thin_interval_s': 600,
+        'archive_after_days': 7, 'archive_dir': 'backups/images'
+    },
+    'data/videos': {'quota_mb': 4096, 'max_age_days': 14},
+    'data/sessions': {'quota_mb': 512, 'max_age_days': 90},
+    'data/maps': {'quota_mb': 256, 'max_age_days': None},
+    'logs': {'quota_mb': 100, 'max_age_days': 14},
+    'backups/images': {'quota_mb': 4096, 'max_age_days': 180},
+    'backups/configs': {'quota_mb': 50, 'max_age_days': 365},
+}
+
+
+class StorageManager:
+    """Begrenzt das Wachstum der Datenverzeichnisse - in kleinen Schritten, ohne lange I/O-Pausen"""
+
+    def __init__(self, base_dir=PROJECT_ROOT, policies=None):
+        self.base_dir = base_dir
+        self.policies = {name: dict(policy) for name, policy in (policies or DEFAULT_POLICIES).items()}
+
+        # Low-Disk-Schwellen
+        self.min_free_mb = 1024       # Darunter: dringende Aufräumarbeit
+        self.critical_free_mb = 300   # Darunter: Aufnahmen werden abgelehnt
+
+        # Inkrementelle Arbeit
+        self.tick_interval = 2.0      # Sekunden zwischen Arbeitsschritten
+        self.ops_per_tick = 5         # Datei-Operationen pro Schritt
+        self.urgent_ops_per_tick = 50
+        self.scan_interval = 300      # Sekunden zwischen vollständigen Plänen
+
+        self.index_file = os.path.join(base_dir, 'data', 'storage_index.json')
+        self.detections = {}          # Dateiname -> Anzahl Erkennungen (0 = analysiert, leer)
+        self._index_dirty = False
+        self.lock = threading.Lock()
+        self.pending = []             # Geplante Operationen (action, path, extra)
+        self.last_scan = 0
+        self.running = False
+        self.thread = None
+
+        self._disk_cache = (0, None)
+        self.stats = {
+            'deleted_files': 0,
+            'deleted_bytes': 0,
+            'archived_files': 0,
+            'removed_dirs': 0,
+            'rejected_captures': 0,
+            'last_run': None
+        }
+
+        self._load_index()
+
+    # ===== DETEKTIONS-INDEX =====
+    def _load_index(self):
+        """Erkennungs-Index laden"""
+        try:
+            with open(self.index_file, 'r') as f:
+                self.detections = json.load(f).get('detections', {})
+        except (OSError, ValueError):
+            self.detections = {}
+
+    def _save_index(self):
+        """Erkennungs-Index atomar speichern"""
+        try:
+            os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+            tmp_file = self.index_file + '.tmp'
+            with self.lock:
+                data = {'detections': dict(self.detections)}
+            with open(tmp_file, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_file, self.index_file)
+        except OSError as e:
+            print(f"⚠️ Speicher-Index nicht gespeichert: {e}")
+
+    def mark_detection(self, filename, count=1):
+        """Erkennungs-Ergebnis eines Bildes speichern - Bilder mit Erkennung werden bevorzugt behalten"""
+        self.mark_detections({filename: count})
+
+    def mark_detections(self, results):
+        """Mehrere Ergebnisse {Dateiname: Anzahl} übernehmen - Index wird einmal gespeichert"""
+        if not results:
+            return
+        with self.lock:
+            for filename, count in results.items():
+                self.detections[os.path.basename(filename)] = max(0, int(count))
+        self._save_index()
+
+    def has_detection(self, filename):
+        """Hat das Bild Erkennungen?"""
+        return self.detections.get(os.path.basename(filename), 0) > 0
+
+    def is_known_empty(self, filename):
+        """Wurde das Bild analysiert und enthält nichts? Nur solche Bilder werden ausgedünnt"""
+        return self.detections.get(os.path.basename(filename)) == 0
+
+    def _keep_priority(self, filename):
+        """Lösch-Reihenfolge bei Quota: leer (0) < nicht analysiert (1) < mit Erkennung (2)"""
+        count = self.detections.get(os.path.basename(filename))
+        if count is None:
+            return 1
+        return 2 if count > 0 else 0
+
+    # ===== LOW-DISK BACK-PRESSURE =====
+    def get_free_mb(self, max_age=5.0):
+        """Freier Speicher in MB (kurz gecacht)"""
+        checked_at, free_mb = self._disk_cache
+        now = time.time()
+        if free_mb is None or now - checked_at > max_age:
+            try:
+                free_mb = shutil.disk_usage(self.base_dir).free / MB
+            except OSError:
+                free_mb = float('inf')
+            self._disk_cache = (now, free_mb)
+        return free_mb
+
+    def is_low_disk(self):
+        """Dringende Aufräumarbeit nötig?"""
+        return self.get_free_mb() < self.min_free_mb
+
+    def check_capture_allowed(self, expected_bytes=0):
+        """Darf eine neue Aufnahme geschrieben werden? -> (erlaubt, Grund)"""
+        free_mb = self.get_free_mb() - expected_bytes / MB
+        if free_mb < self.critical_free_mb:
+            self.stats['rejected_captures'] += 1
+            # Aufräumen sofort anstoßen statt auf den nächsten Scan zu warten
+            self.last_scan = 0
+            return False, f'Speicher fast voll ({free_mb:.0f} MB frei)'
+        return True, None
+
+    # ===== PLANUNG =====
+    def _policy_roots(self):
+        return {os.path.normpath(os.path.join(self.base_dir, rel_dir)) for rel_dir in self.policies}
+
+    def _scan_directory(self, rel_dir):
+        """Dateien eines Verzeichnisses samt Unterordnern (rec_*/seg_*.avi, Sessions) mit Größe und Alter
+
+        Unterordner mit eigener Regel werden dort gezählt, nicht doppelt hier.
+        """
+        directory = os.path.normpath(os.path.join(self.base_dir, rel_dir))
+        nested = self._policy_roots() - {directory}
+        files = []
+        for root, dirs, names in os.walk(directory):
+            dirs[:] = [name for name in dirs
+                       if not name.startswith('.') and os.path.join(root, name) not in nested]
+            for name in names:
+                if name.startswith('.'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    info = os.lstat(path)
+                except OSError:
+                    continue
+                if stat.S_ISREG(info.st_mode):
+                    files.append((path, info.st_size, info.st_mtime))
+        return files
+
+    def _plan_directory(self, rel_dir, policy, now, urgent):
+        """Operationen für ein Verzeichnis planen"""
+        files = sorted(self._scan_directory(rel_dir), key=lambda f: f[2])  # Älteste zuerst
+        operations = []
+        removed = set()
+
+        # 1. Altersgrenze
+        max_age_days = policy.get('max_age_days')
+        if max_age_days:
+            for path, size, mtime in files:
+                if now - mtime > max_age_days * DAY:
+                    operations.append(('delete', path, size))
+                    removed.add(path)
+
+        # 2. Archivierung alter Bilder in Tages-Archive
+        archive_after_days = policy.get('archive_after_days')
+        if archive_after_days and policy.get('archive_dir'):
+            for path, size, mtime in files:
+                if path in removed or not path.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                if now - mtime > archive_after_days * DAY:
+                    operations.append(('archive', path, (size, mtime, policy['archive_dir'])))
+                    removed.add(path)
+
+        # 3. Leere Frames ausdünnen - ein Bild pro Intervall bleibt
+        thin_after_days = policy.get('thin_after_days')
+        if thin_after_days:
+            interval = policy.get('thin_interval_s', 600)
+            last_kept = None
+            for path, size, mtime in files:
+                if path in removed or not path.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                if now - mtime < thin_after_days * DAY or not self.is_known_empty(path):
+                    continue
+                if last_kept is None or mtime - last_kept >= interval:
+                    last_kept = mtime
+                    continue
+                operations.append(('delete', path, size))
+                removed.add(path)
+
+        # 4. Quota - erst leere Frames, dann nicht analysierte, zuletzt Bilder mit Erkennungen
+        quota_mb = policy.get('quota_mb')
+        if quota_mb:
+            quota_bytes = quota_mb * MB * (0.8 if urgent else 1.0)
+            remaining = [f for f in files if f[0] not in removed]
+            total = sum(size for _, size, _ in remaining)
+            if total > quota_bytes:
+                by_priority = sorted(remaining, key=lambda f: (self._keep_priority(f[0]), f[2]))
+                for path, size, mtime in by_priority:
+                    if total <= quota_bytes:
+                        break
+                    operations.append(('delete', path, size))
+                    total -= size
+
+        return operations
+
+    def plan(self):
+        """Kompletten Arbeitsplan für alle Verzeichnisse erstellen"""
+        now = time.time()
+        urgent = self.is_low_disk()
+        operations = []
+        for rel_dir, policy in self.policies.items():
+            operations.extend(self._plan_directory(rel_dir, policy, now, urgent))
+
+        with self.lock:
+            self.pending = operations
+            self.last_scan = now
+        return len(operations)
+
+    # ===== AUSFÜHRUNG =====
+    def _remove_empty_parents(self, path):
+        """Leer gewordene Unterordner (Aufnahmen, Sessions) bis zum Regel-Verzeichnis entfernen"""
+        roots = self._policy_roots()
+        base_dir = os.path.normpath(self.base_dir)
+        parent = os.path.dirname(os.path.normpath(path))
+        while parent not in roots and parent.startswith(base_dir + os.sep):
+            try:
+                os.rmdir(parent)
+            except OSError:
+                return
+            self.stats['removed_dirs'] += 1
+            parent = os.path.dirname(parent)
+
+    def _delete(self, path, size):
+        """Datei löschen"""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            print(f"⚠️ Löschen fehlgeschlagen {path}: {e}")
+            return
+
+        self.stats['deleted_files'] += 1
+        self.stats['deleted_bytes'] += size
+        self._remove_empty_parents(path)
+        with self.lock:
+            if self.detections.pop(os.path.basename(path), None) is not None:
+                self._index_dirty = True
+
+    def _archive(self, archives, path, size, mtime, archive_dir):
+        """Bild in das Tages-Archiv verschieben (unkomprimiert)"""
+        day = datetime.fromtimestamp(mtime).strftime('%Y-%m-%d')
+        archive_path = os.path.join(self.base_dir, archive_dir, f'images_{day}.zip')
+
+        try:
+            zipf = archives.get(archive_path)
+            if zipf is None:
+                os.makedirs(os.path.dirname(archive_path), exist_ok=True)
+                zipf = zipfile.ZipFile(archive_path, 'a', zipfile.ZIP_STORED)
+                archives[archive_path] = zipf
+            zipf.write(path, os.path.basename(path))
+            os.remove(path)
+            self.stats['archived_files'] += 1
+            self._remove_empty_parents(path)
+        except FileNotFoundError:
+            pass
+        except (OSError, zipfile.BadZipFile) as e:
+            print(f"⚠️ Archivierung fehlgeschlagen {path}: {e}")
+
+    def step(self):
+        """Einen kleinen Arbeitsschritt ausführen - gibt Anzahl erledigter Operationen zurück"""
+        if not self.pending and time.time() - self.last_scan > self.scan_interval:
+            self.plan()
+
+        limit = self.urgent_ops_per_tick if self.is_low_disk() else self.ops_per_tick
+        with self.lock:
+            batch = self.pending[:limit]
+            self.pending = self.pending[limit:]
+
+        archives = {}
+        try:
+            for action, path, extra in batch:
+                if action == 'delete':
+                    self._delete(path, extra)
+                elif action == 'archive':
+                    size, mtime, archive_dir = extra
+                    self._archive(archives, path, size, mtime, archive_dir)
+        finally:
+            for zipf in archives.values():
+                zipf.close()
+
+            # Index nur einmal pro Schritt schreiben
+            if self._index_dirty:
+                self._index_dirty = False
+                self._save_index()
+
+        if batch:
+            self.stats['last_run'] = int(time.time())
+        return len(batch)
+
+    def run_now(self):
+        """Sofort neu planen (Arbeit läuft weiter inkrementell)"""
+        return self.plan()
+
+    def _worker(self):
+        """Hintergrund-Schleife"""
+        while self.running:
+            try:
+                self.step()
+            except Exception as e:
+                print(f"❌ Speicher-Manager Fehler: {e}")
+            time.sleep(self.tick_interval)
+
+    def start(self):
+        """Hintergrund-Aufräumen starten"""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+        print("🗄️ Speicher-Manager gestartet")
+
+    def stop(self):
+        """Hintergrund-Aufräumen stoppen"""
+        self.running = False
+
+    # ===== STATUS =====
+    def get_directory_usage(self):
+        """Belegung pro Verzeichnis"""
+        usage = {}
+        for rel_dir, policy in self.policies.items():
+            files = self._scan_directory(rel_dir)
+            size_mb = sum(size for _, size, _ in files) / MB
+            quota_mb = policy.get('quota_mb')
+            usage[rel_dir] = {
+                'files': len(files),
+                'size_mb': round(size_mb, 1),
+                'quota_mb': quota_mb,
+                'quota_percent': round(size_mb / quota_mb * 100, 1) if quota_mb else None
+            }
+        return usage
+
+    def get_status(self):
+        """Speicher-Status"""
+        free_mb = self.get_free_mb()
+        return {
+            'free_mb': round(free_mb, 0),
+            'low_disk': free_mb < self.min_free_mb,
+            'capture_allowed': free_mb >= self.critical_free_mb,
+            'pending_operations': len(self.pending),
+            'running': self.running,
+            'directories': self.get_directory_usage(),
+            'stats': dict(self.stats),
+            'timestamp': int(time.time())
+        }
+
+
+# Globale Instanz
+storage_manager = StorageManager()
@@ -0,0 +1,278 @@
+# app/utils/stream_quality.py
+"""
+Adaptive Stream-Qualität für Unkraut-2025
+Misst pro Client die Socket-Schreibzeit und senkt Auflösung, JPEG-Qualität
+oder Bildrate nur für diesen Client. Kodierte Varianten werden pro Stufe
+geteilt - zehn Zuschauer auf derselben Stufe kosten eine Kodierung.
+"""
+import os
+import time
+import threading
+import itertools
+
+import cv2
+import numpy as np
+
+# Qualitätsstufen - Stufe 0 reicht das Kamera-JPEG unverändert durch
+QUALITY_LEVELS = [
+    {'name': 'full',    'reduce': 1, 'jpeg_quality': None, 'max_fps': 30},
+    {'name': 'high',    'reduce': 1, 'jpeg_quality': 65,   'max_fps': 20},
+    {'name': 'medium',  'reduce': 2, 'jpeg_quality': 70,   'max_fps': 15},
+    {'name': 'low',     'reduce': 2, 'jpeg_quality': 50,   'max_fps': 10},
+    {'name': 'minimal', 'reduce': 4, 'jpeg_quality': 50,   'max_fps': 5},
+]
+
+# cv2.imdecode kann direkt verkleinert dekodieren - spart Dekodier- und Resize-Zeit
+_REDUCED_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+}
+
+LEVEL_NAMES = [level['name'] for level in QUALITY_LEVELS]
+
+
+class VariantCache:
+    """Pro Stufe die Kodierung des neuesten Frames - je Stufe eigener Lock"""
+
+    def __init__(self):
+        self.entries = {}                                    # Stufe -> (frame_id, jpeg)
+        self.locks = [threading.Lock() for _ in QUALITY_LEVELS]
+        self.encode_count = 0
+        self.hit_count = 0
+
+    def get(self, frame_id, jpeg_data, level):
+        """Variante für Stufe liefern - kodiert höchstens einmal pro Frame und Stufe"""
+        if level == 0:
+            return jpeg_data
+
+        with self.locks[level]:
+            cached = self.entries.get(level)
+            if cached and cached[0] == frame_id:
+                self.hit_count += 1
+                return cached[1]
+
+            data = self._encode(jpeg_data, QUALITY_LEVELS[level])
+            self.entries[level] = (frame_id, data)
+            self.encode_count += 1
+            return data
+
+    @staticmethod
+    def _encode(jpeg_data, level):
+        """Frame verkleinert dekodieren und mit niedrigerer Qualität neu kodieren"""
+        flags = _REDUCED_DECODE_FLAGS.get(level['reduce'], cv2.IMREAD_COLOR)
+        image = cv2.imdecode(np.frombuffer(jpeg_data, np.uint8), flags)
+        if image is None:
+            return jpeg_data
+
+        ok, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, level['jpeg_quality']])
+        return encoded.tobytes() if ok else jpeg_data
+
+
+class ClientStream:
+    """Durchsatz-Messung und Stufenwahl für einen Stream-Client"""
+
+    def __init__(self, client_id, remote_addr, pinned_level=None):
+        self.client_id = client_id
+        self.remote_addr = remote_addr
+        self.pinned = pinned_level is not None
+        self.level = pinned_level if self.pinned else 0
+
+        # Regelparameter
+        self.degrade_utilization = 0.7   # Schreibzeit/Frame-Intervall darüber -> Stufe runter
+        self.upgrade_utilization = 0.25  # darunter (dauerhaft) -> Stufe hoch
+        self.upgrade_after = 3.0         # Sekunden stabil bevor hochgeschaltet wird
+        self.min_frames_per_level = 5
+        self.smoothing = 0.2             # EWMA-Faktor
+
+        self.utilization = 0.0
+        self.throughput = 0.0            # Bytes/s während des Schreibens
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.frames_at_level = 0
+        self.good_since = None
+        self.last_send = 0.0
+        self.connected_at = time.time()
+
+    @property
+    def frame_interval(self):
+        return 1.0 / QUALITY_LEVELS[self.level]['max_fps']
+
+    def wait_time(self, now):
+        """Wie lange bis das nächste Frame für diese Stufe fällig ist"""
+        return max(0.0, self.last_send + self.frame_interval - now)
+
+    def record_write(self, size, blocked, now):
+        """Ein geschriebenes Frame verbuchen und ggf. Stufe anpassen"""
+        self.last_send = now
+        self.frames_sent += 1
+        self.bytes_sent += size
+        self.frames_at_level += 1
+
+        utilization = blocked / self.frame_interval
+        self.utilization += self.smoothing * (utilization - self.utilization)
+        if blocked > 0.0005:
+            self.throughput += self.smoothing * (size / blocked - self.throughput)
+
+        if self.pinned or self.frames_at_level < self.min_frames_per_level:
+            return
+
+        if self.utilization > self.degrade_utilization and self.level < len(QUALITY_LEVELS) - 1:
+            self._set_level(self.level + 1)
+        elif self.utilization < self.upgrade_utilization and self.level > 0:
+            if self.good_since is None:
+                self.good_since = now
+            elif now - self.good_since >= self.upgrade_after:
+                self._set_level(self.level - 1)
+        else:
+            self.good_since = None
+
+    def _set_level(self, level):
+        """Stufe wechseln - Messung neu beginnen"""
+        self.level = level
+        self.frames_at_level = 0
+        self.good_since = None
+        # Nach Wechsel neutral starten, sonst schaltet der alte Wert sofort weiter
+        self.utilization = (self.degrade_utilization + self.upgrade_utilization) / 2
+
+    def get_status(self):
+        return {
+            'id': self.client_id,
+            'remote_addr': self.remote_addr,
+            'level': LEVEL_NAMES[self.level],
+            'pinned': self.pinned,
+            'utilization': round(self.utilization, 2),
+            'throughput_kbps': round(self.throughput * 8 / 1000, 1),
+            'frames_sent': self.frames_sent,
+            'bytes_sent': self.bytes_sent,
+            'connected_for': round(time.time() - self.connected_at, 1)
+        }
+
+
+class StreamQualityManager:
+    """Registry der Stream-Clients plus geteilter Varianten-Cache"""
+
+    def __init__(self):
+        self.cache = VariantCache()
+        self.clients = {}
+        self.lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+        # Jeder Stream belegt dauerhaft einen Server-Thread - Rest bleibt für die API
+        self.max_clients = int(os.environ.get('UNKRAUT_MAX_STREAMS', 4))
+        self.rejected_count = 0
+
+        # Ohne neue Frames: letztes Bild wiederholen, damit ein getrennter Client
+        # beim Schreiben auffällt, und nach idle_timeout den Stream beenden
+        self.keepalive_interval = 1.0
+        self.idle_timeout = 30.0
+        self.keepalive_count = 0
+
+    @staticmethod
+    def parse_level(value):
+        """?quality=auto|full|high|medium|low|minimal|0-4 -> Stufe oder None (adaptiv)"""
+        if value is None or value == 'auto':
+            return None
+        if value in LEVEL_NAMES:
+            return LEVEL_NAMES.index(value)
+        try:
+            return max(0, min(len(QUALITY_LEVELS) - 1, int(value)))
+        except (TypeError, ValueError):
+            return None
+
+    def register_client(self, remote_addr, pinned_level=None):
+        """Client anmelden - None wenn das Stream-Limit erreicht ist"""
+        with self.lock:
+            if self.max_clients and len(self.clients) >= self.max_clients:
+                self.rejected_count += 1
+                return None
+            client = ClientStream(next(self._ids), remote_addr, pinned_level)
+            self.clients[client.client_id] = client
+        return client
+
+    def unregister_client(self, client):
+        with self.lock:
+            self.clients.pop(client.client_id, None)
+
+    def has_capacity(self):
+        """Ist noch ein Stream frei? Für die 503-Antwort, bevor der Generator läuft - zählt Ablehnungen"""
+        with self.lock:
+            if self.max_clients and len(self.clients) >= self.max_clients:
+                self.rejected_count += 1
+                return False
+            return True
+
+    def open_stream(self, camera, remote_addr, pinned_level=None, on_chunk=None):
+        """Stream-Generator, der den Client erst beim ersten Lesen anmeldet
+
+        Eine Response, die nie gelesen wird, belegt so keinen Platz. Ist das Limit
+        inzwischen erreicht, endet der Stream sofort. on_chunk(client, chunk) z.B. fürs Logging.
+        """
+        client = self.register_client(remote_addr, pinned_level)
+        if client is None:
+            return
+        try:
+            for chunk in self.stream_frames(camera, client):
+                if on_chunk:
+                    on_chunk(client, chunk)
+                yield chunk
+        finally:
+            self.unregister_client(client)
+
+    def stream_frames(self, camera, client, boundary=b'frame'):
+        """MJPEG-Multipart-Generator für einen Client - nur neue Frames, im Takt seiner Stufe"""
+        last_frame_id = None
+        last_chunk = None
+        last_frame_at = last_yield_at = time.monotonic()
+        try:
+            while True:
+                now = time.monotonic()
+                wait = client.wait_time(now)
+                if wait > 0:
+                    time.sleep(wait)
+
+                frame_id, frame = camera.get_frame_with_id()
+                if frame is None or frame_id == last_frame_id:
+                    now = time.monotonic()
+                    if now - last_frame_at >= self.idle_timeout:
+                        return   # Kamera liefert nichts - Platz freigeben, der Browser verbindet neu
+                    if last_chunk is not None and now - last_yield_at >= self.keepalive_interval:
+                        # Nur ein Schreibversuch zeigt, ob der Client noch da ist
+                        self.keepalive_count += 1
+                        last_yield_at = now
+                        yield last_chunk
+                        continue
+                    time.sleep(0.01)
+                    continue
+                last_frame_id = frame_id
+                last_frame_at = time.monotonic()
+
+                data = self.cache.get(frame_id, frame, client.level)
+                chunk = (b'--' + boundary + b'\r\n'
+                         b'Content-Type: image/jpeg\r\n\r\n' + data + b'\r\n')
+
+                # Der WSGI-Server schreibt den Chunk, bevor er den Generator fortsetzt
+                started = time.monotonic()
+                yield chunk
+                finished = time.monotonic()
+                last_chunk, last_yield_at = chunk, finished
+                client.record_write(len(chunk), finished - started, finished)
+        finally:
+            self.unregister_client(client)
+
+    def get_status(self):
+        with self.lock:
+            clients = [client.get_status() for client in self.clients.values()]
+        return {
+            'clients': clients,
+            'max_clients': self.max_clients,
+            'rejected': self.rejected_count,
+            'keepalives': self.keepalive_count,
+            'levels': QUALITY_LEVELS,
+            'encodes': self.cache.encode_count,
+            'cache_hits': self.cache.hit_count
+        }
+
+
+# Globale Instanz
+stream_quality = StreamQualityManager()
@@ -0,0 +1,332 @@
+# app/utils/telemetry.py
+"""
+Telemetrie- und Steuerkanal über WebSocket (Flask-SocketIO)
+Ein Hintergrund-Thread sammelt den Zustand von Sensoren, Arm, Motoren, Pose,
+Kamera und Erkennung mit eigener Rate pro Kanal und schickt nur geänderte Felder an die
+Clients, die den Kanal abonniert haben. Steuerbefehle kommen über denselben Kanal
+zurück - das ersetzt das HTTP-Polling der einzelnen Seiten.
+"""
+import sys
+import time
+import threading
+
+# Standard-Raten pro Kanal (Hz) - überschreibbar über app.config['TELEMETRY_RATES']
+DEFAULT_RATES = {
+    'motors': 10.0,
+    'pose': 5.0,
+    'arm': 5.0,
+    'detection': 2.0,
+    'camera': 1.0,
+    'sensors': 1.0,
+    'system': 0.2
+}
+
+# Kürzester Schlaf des Broadcast-Threads
+TICK_SECONDS = 0.02
+
+# Erlaubte Fahrtrichtungen für 'move'
+DIRECTIONS = ('forward', 'backward', 'left', 'right')
+
+
+def _strip_timestamps(state):
+    """Zeitstempel der Quellen entfernen - sonst wäre jeder Zustand ein Delta"""
+    return {key: value for key, value in state.items() if key != 'timestamp'}
+
+def _diff(previous, current):
+    """Geänderte Top-Level-Felder (flach genug für Object.assign im Browser)"""
+    if previous is None:
+        return dict(current)
+    return {key: value for key, value in current.items() if previous.get(key) != value}
+
+
+class TelemetryHub:
+    """Sammelt Zustände mit fester Rate pro Kanal und verteilt Deltas über Socket.IO"""
+
+    def __init__(self, rates=None):
+        self.rates = dict(DEFAULT_RATES)
+        self.rates.update(rates or {})
+        self.socketio = None
+
+        self.lock = threading.Lock()
+        self.subscribers = {channel: set() for channel in self.rates}
+        self.last_state = {}
+        self.next_due = {channel: 0.0 for channel in self.rates}
+        self.broadcaster_started = False
+
+        # Statistik
+        self.stats = {'emits': 0, 'skipped': 0, 'commands': 0, 'errors': 0}
+
+        self.collectors = {
+            'motors': self._collect_motors,
+            'pose': self._collect_pose,
+            'arm': self._collect_arm,
+            'detection': self._collect_detection,
+            'camera': self._collect_camera,
+            'sensors': self._collect_sensors,
+            'system': self._collect_system
+        }
+
+    # ===== SETUP =====
+    def init_app(self, app):
+        """SocketIO an die Flask-App hängen und Event-Handler registrieren"""
+        from flask_socketio import SocketIO
+
+        self.rates.update(app.config.get('TELEMETRY_RATES', {}))
+        for channel in self.rates:
+            self.subscribers.setdefault(channel, set())
+            self.next_due.setdefault(channel, 0.0)
+
+        # threading: läuft unter Werkzeug (Entwicklung) und Gunicorn gthread (Produktion)
+        self.socketio = SocketIO(app, async_mode='threading')
+        self._register_handlers(self.socketio)
+        print(f"📡 Telemetrie-Kanal bereit ({', '.join(f'{c} {r:g} Hz' for c, r in self.rates.items())})")
+        return self.socketio
+
+    def _register_handlers(self, socketio):
+        from flask import request
+        from flask_socketio import join_room, leave_room
+
+        @socketio.on('connect')
+        def on_connect():
+            self._ensure_broadcaster()
+
+        @socketio.on('disconnect')
+        def on_disconnect():
+            with self.lock:
+                for sids in self.subscribers.values():
+                    sids.discard(request.sid)
+
+        @socketio.on('subscribe')
+        def on_subscribe(channels):
+            """Kanäle abonnieren - der Client erhält sofort einen vollständigen Zustand"""
+            if isinstance(channels, str):
+                channels = [channels]
+            if not isinstance(channels, list):
+                return {'status': 'error', 'error': 'Kanal-Liste erwartet'}
+
+            accepted = [channel for channel in channels if channel in self.rates]
+            snapshot = {}
+            for channel in accepted:
+                join_room(channel)
+                with self.lock:
+                    self.subscribers[channel].add(request.sid)
+                state = self._collect(channel)
+                if state is not None:
+                    snapshot[channel] = state
+                    # Erster Abonnent: Snapshot ist die Basis für die folgenden Deltas
+                    self.last_state.setdefault(channel, state)
+            return {'status': 'success', 'channels': accepted, 'rates': self.rates, 'snapshot': snapshot}
+
+        @socketio.on('unsubscribe')
+        def on_unsubscribe(channels):
+            if isinstance(channels, str):
+                channels = [channels]
+            for channel in channels or []:
+                if channel in self.subscribers:
+                    leave_room(channel)
+                    with self.lock:
+                        self.subscribers[channel].discard(request.sid)
+            return {'status': 'success'}
+
+        @socketio.on('control')
+        def on_control(command):
+            """Steuerbefehl ausführen - die Antwort kommt als Socket.IO-Ack zurück"""
+            return self.handle_command(command)
+
+    def _ensure_broadcaster(self):
+        """Broadcast-Thread einmalig beim ersten Client starten"""
+        with self.lock:
+            if self.broadcaster_started:
+                return
+            self.broadcaster_started = True
+        self.socketio.start_background_task(self._broadcast_loop)
+
+    # ===== BROADCAST =====
+    def _broadcast_loop(self):
+        """Fällige Kanäle sammeln, Delta bilden und an den Kanal-Raum senden"""
+        while True:
+            now = time.monotonic()
+            for channel, rate in self.rates.items():
+                if rate <= 0 or now < self.next_due[channel]:
+                    continue
+                self.next_due[channel] = now + 1.0 / rate
+
+                with self.lock:
+                    has_subscribers = bool(self.subscribers[channel])
+                if not has_subscribers:
+                    # Ohne Abonnenten nichts sammeln - beim nächsten Abo kommt ein Vollzustand
+                    self.last_state.pop(channel, None)
+                    continue
+
+                state = self._collect(channel)
+                if state is None:
+                    continue
+                delta = _diff(self.last_state.get(channel), state)
+                self.last_state[channel] = state
+                if not delta:
+                    self.stats['skipped'] += 1
+                    continue
+
+                self.socketio.emit('telemetry', {
+                    'channel': channel,
+                    'delta': delta,
+                    'ts': time.time()
+                }, to=channel)
+                self.stats['emits'] += 1
+
+            self.socketio.sleep(TICK_SECONDS)
+
+    def push_now(self, *channels):
+        """Kanäle beim nächsten Tick senden (z.B. direkt nach einem Steuerbefehl)"""
+        for channel in channels:
+            if channel in self.next_due:
+                self.next_due[channel] = 0.0
+
+    def _collect(self, channel):
+        try:
+            return self.collectors[channel]()
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f"⚠️ Telemetrie {channel}: {e}")
+            return None
+
+    # ===== KOLLEKTOREN =====
+    # Nur bereits erzeugte Hardware lesen - Telemetrie soll keine Hardware initialisieren
+    def _hardware(self, name):
+        from hardware.registry import hardware_registry
+        if not hardware_registry.is_created(name):
+            return None
+        return hardware_registry.get(name)
+
+    def _collect_motors(self):
+        motors = self._hardware('motor_controller')
+        if motors is None:
+            return {'available': False}
+        return _strip_timestamps(motors.get_status())
+
+    def _collect_pose(self):
+        odometry = self._hardware('odometry_estimator')
+        if odometry is None:
+            return {'available': False}
+        return _strip_timestamps(odometry.get_status())
+
+    def _collect_arm(self):
+        arm = self._hardware('robot_arm')
+        if arm is None:
+            return {'available': False}
+        return arm.get_status()
+
+    def _collect_camera(self):
+        camera = self._hardware('camera_manager')
+        if camera is None:
+            return {'available': False}
+        info = camera.get_camera_info()
+        try:
+            from app.utils.stream_quality import stream_quality
+            info['stream_clients'] = len(stream_quality.clients)
+        except ImportError:
+            pass
+        return info
+
+    def _collect_detection(self):
+        # Erkennung nur melden, wenn das KI-Modul schon geladen ist
+        module = sys.modules.get('ai.weed_detection')
+        if module is None:
+            return {'available': False}
+        detector = module.weed_detector
+        state = detector.get_detection_stats()
+        state['last_result'] = detector.last_result
+        return state
+
+    def _collect_sensors(self):
+        sensors = self._hardware('sensor_manager')
+        if sensors is None:
+            return {'available': False}
+        data = sensors.get_sensor_data()
+        data.pop('system', None)  # eigener, langsamerer Kanal
+        return _strip_timestamps(data)
+
+    def _collect_system(self):
+        sensors = self._hardware('sensor_manager')
+        if sensors is None:
+            return {'available': False}
+        return _strip_timestamps(sensors.get_system_stats())
+
+    # ===== STEUERUNG =====
+    def handle_command(self, command):
+        """Steuerbefehl validieren und an die Hardware weitergeben"""
+        if not isinstance(command, dict) or not isinstance(command.get('command'), str):
+            return {'status': 'error', 'error': 'Befehl erwartet: {"command": ...}'}
+
+        from hardware.registry import hardware_registry
+        from hardware.motion_authority import motion_authority
+        name = command['command']
+        self.stats['commands'] += 1
+
+        try:
+            if name == 'move':
+                direction = command.get('direction')
+                if direction not in DIRECTIONS:
+                    return {'status': 'error', 'error': f'Ungültige Richtung: {direction}'}
+                speed = command.get('speed', 50)
+                duration = command.get('duration', 0.1)
+                if not isinstance(speed, (int, float)) or not isinstance(duration, (int, float)):
+                    return {'status': 'error', 'error': 'speed und duration müssen Zahlen sein'}
+                # Über das Netz immer mit Deadman-Deadline fahren
+                if not 0 < duration <= 5:
+                    return {'status': 'error', 'error': 'duration muss zwischen 0 und 5 Sekunden liegen'}
+                result = hardware_registry.get('motor_controller').move(direction, speed, duration)
+                self.push_now('motors')
+                return result
+
+            if name == 'stop':
+                result = hardware_registry.get('motor_controller').stop()
+                self.push_now('motors')
+                return result
+
+            if name == 'emergency_stop':
+                # Eine Verriegelung für alle Aktoren - bleibt bis emergency_reset
+                result = motion_authority.emergency_stop('telemetry')
+                self.push_now('motors', 'arm')
+                return result
+
+            if name == 'emergency_reset':
+                result = motion_authority.reset()
+                self.push_now('motors', 'arm')
+                return result
+
+            if name == 'arm_preset':
+                preset = command.get('preset')
+                success = hardware_registry.get('robot_arm').move_to_preset(preset)
+                self.push_now('arm')
+                return {'status': 'success' if success else 'error', 'preset': preset}
+
+            if name == 'arm_joint':
+                joint = command.get('joint')
+                angle = command.get('angle')
+                if not isinstance(angle, (int, float)):
+                    return {'status': 'error', 'error': 'angle muss eine Zahl sein'}
+                # Slider schicken viele Zwischenwerte - fließend in das neue Ziel übergehen
+                success = hardware_registry.get('robot_arm').move_joint(joint, angle, duration=0.3, mode='blend')
+                self.push_now('arm')
+                return {'status': 'success' if success else 'error', 'joint': joint, 'angle': angle}
+
+            return {'status': 'error', 'error': f'Unbekannter Befehl: {name}'}
+
+        except Exception as e:
+            self.stats['errors'] += 1
+            return {'status': 'error', 'error': str(e)}
+
+    def get_status(self):
+        with self.lock:
+            subscribers = {channel: len(sids) for channel, sids in self.subscribers.items()}
+        return {
+            'enabled': self.socketio is not None,
+            'rates': self.rates,
+            'subscribers': subscribers,
+            'stats': dict(self.stats)
+        }
+
+
+# Globale Instanz
+telemetry = TelemetryHub()
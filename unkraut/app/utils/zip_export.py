@@ -0,0 +1,155 @@
+# app/utils/zip_export.py
+"""
+Streaming-ZIP-Export für Unkraut-2025
+Schreibt ZIP-Einträge direkt in die HTTP-Antwort - ohne Temp-Datei,
+mit konstantem Speicherbedarf
+"""
+import os
+import zipfile
+from datetime import datetime, timedelta
+
+CHUNK_SIZE = 64 * 1024  # Lese-/Sendeblock
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+# Bereits komprimierte Formate - Deflate kostet nur CPU
+STORED_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.zip', '.avi', '.mp4', '.h264', '.npz')
+
+
+class _StreamBuffer:
+    """Nicht-seekbarer Schreibpuffer - wird vom Generator nach jedem Block geleert"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """Gepufferte Bytes abholen und Puffer leeren"""
+        if not self._chunks:
+            return b''
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(entries, chunk_size=CHUNK_SIZE):
+    """
+    ZIP-Archiv als Byte-Generator erzeugen
+    entries: Liste von (arcname, filepath)-Paaren
+    JPEG/PNG werden unkomprimiert (ZIP_STORED) übernommen, der Rest mit Deflate
+    """
+    buffer = _StreamBuffer()
+
+    # Ohne seek() schreibt zipfile Data-Descriptors statt Header nachträglich zu patchen
+    with zipfile.ZipFile(buffer, 'w') as zipf:
+        for arcname, filepath in entries:
+            try:
+                zinfo = zipfile.ZipInfo.from_file(filepath, arcname)
+                source = open(filepath, 'rb')
+            except OSError as e:
+                print(f"❌ Fehler beim Hinzufügen von {filepath}: {e}")
+                continue
+
+            if filepath.lower().endswith(STORED_EXTENSIONS):
+                zinfo.compress_type = zipfile.ZIP_STORED
+            else:
+                zinfo.compress_type = zipfile.ZIP_DEFLATED
+
+            with source, zipf.open(zinfo, 'w') as target:
+                while True:
+                    block = source.read(chunk_size)
+                    if not block:
+                        break
+                    target.write(block)
+
+                    data = buffer.drain()
+                    if data:
+                        yield data
+
+            data = buffer.drain()
+            if data:
+                yield data
+
+    # Central Directory
+    data = buffer.drain()
+    if data:
+        yield data
+
+
+def parse_date_param(value, end_of_day=False):
+    """
+    Datums-Parameter parsen: Unix-Timestamp, 'YYYY-MM-DD' oder ISO-Format
+    Bei reinem Datum und end_of_day=True zählt der ganze Tag mit
+    """
+    if value is None or value == '':
+        return None
+
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    try:
+        parsed = datetime.strptime(value, '%Y-%m-%d')
+        if end_of_day:
+            parsed += timedelta(days=1)
+        return parsed.timestamp()
+    except ValueError:
+        pass
+
+    # Wirft ValueError bei ungültigem Format
+    return datetime.fromisoformat(value).timestamp()
+
+
+def select_images(images_dir, date_from=None, date_to=None):
+    """Bilder im Verzeichnis wählen, optional gefiltert nach Änderungszeit [date_from, date_to)"""
+    entries = []
+
+    if not os.path.isdir(images_dir):
+        return entries
+
+    for filename in sorted(os.listdir(images_dir)):
+        if not filename.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+
+        filepath = os.path.join(images_dir, filename)
+        try:
+            if not os.path.isfile(filepath):
+                continue
+            mtime = os.path.getmtime(filepath)
+        except OSError:
+            continue
+
+        if date_from is not None and mtime < date_from:
+            continue
+        if date_to is not None and mtime >= date_to:
+            continue
+
+        entries.append((filename, filepath))
+
+    return entries
+
+
+def select_session(sessions_dir, session):
+    """Alle Dateien einer Session (Unterordner von data/sessions) wählen"""
+    sessions_root = os.path.abspath(sessions_dir)
+    session_dir = os.path.abspath(os.path.join(sessions_root, session))
+
+    # Sicherheitscheck - nur Unterordner von sessions_dir
+    if os.path.dirname(session_dir) != sessions_root or not os.path.isdir(session_dir):
+        return []
+
+    entries = []
+    for root, _, files in os.walk(session_dir):
+        for filename in sorted(files):
+            filepath = os.path.join(root, filename)
+            arcname = os.path.join(session, os.path.relpath(filepath, session_dir))
+            entries.append((arcname, filepath))
+
+    return entries
@@ -0,0 +1,34 @@
+# config/gunicorn_config.py
+"""
+Gunicorn-Konfiguration für den Produktionsbetrieb von Unkraut-2025
+Start: python run.py --production
+   oder: gunicorn -c config/gunicorn_config.py app.main:app
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('FLASK_PORT', 5000)}"
+
+# Genau EIN Worker-Prozess - Kamera, GPIO und I2C sind Prozess-Singletons.
+# Parallelität kommt aus Threads: MJPEG-Streams und WebSockets (Telemetrie) belegen je einen.
+workers = 1
+worker_class = 'gthread'
+threads = int(os.environ.get('UNKRAUT_THREADS', 32))
+
+# Streams laufen unbegrenzt - der Timeout gilt nur dem Worker-Heartbeat
+timeout = 60
+graceful_timeout = 5
+keepalive = 5
+
+# Worker nie recyceln und App erst im Worker laden - sonst würde die Hardware
+# im Master initialisiert oder bei jedem Recycle neu aufgebaut
+max_requests = 0
+preload_app = False
+
+# Zugriffe protokolliert bereits debug_log der API-Routes
+accesslog = None
+errorlog = '-'
+loglevel = 'info'
+
+
+def when_ready(server):
+    print(f"🚀 Gunicorn bereit: {bind} (1 Worker, {threads} Threads)")
@@ -1,12 +1,30 @@
 # hardware/__init__.py
 """
 Hardware-Module für Unkraut-2025
+Instanzen werden erst beim ersten Zugriff erzeugt (siehe registry.py)
 """
+import importlib
 
-from .camera import camera_manager
-from .robot_arm import robot_arm
-from .motors import motor_controller
-from .sensors import sensor_manager, get_sensor_data, get_system_stats
+from .registry import hardware_registry
+
+# Exportierter Name -> Untermodul
+_LAZY_EXPORTS = {
+    'camera_manager': 'camera',
+    'robot_arm': 'robot_arm',
+    'motor_controller': 'motors',
+    'sensor_manager': 'sensors',
+    'odometry_estimator': 'odometry',
+    'camera_calibration': 'camera_calibration',
+    'motion_authority': 'motion_authority',
+    'get_sensor_data': 'sensors',
+    'get_system_stats': 'sensors'
+}
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        module = importlib.import_module(f'.{_LAZY_EXPORTS[name]}', __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __version__ = "1.0.0"
 __all__ = [
@@ -14,6 +32,10 @@ __all__ = [
     'robot_arm', 
     'motor_controller',
     'sensor_manager',
+    'odometry_estimator',
+    'camera_calibration',
+    'motion_authority',
     'get_sensor_data',
-    'get_system_stats'
-]
\ No newline at end of file
+    'get_system_stats',
+    'hardware_registry'
+]
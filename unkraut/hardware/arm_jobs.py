@@ -0,0 +1,359 @@
+# hardware/arm_jobs.py
+"""
+Job-Warteschlange für die Unkraut-Entfernung (Unkraut-2025)
+Alle erreichbaren Unkräuter werden in einer Reihenfolge abgearbeitet, die die
+Armwege minimiert: Nächster-Nachbar-Tour über die Fahrzeit im Gelenkraum,
+danach 2-opt. Neue Erkennungen werden per günstigster Einfügung in die
+bestehende Tour gesetzt, vor jedem Anfahren wird mit der aktuellen Fahrzeug-Pose
+nachoptimiert. Kennzahl ist die Zahl entfernter Unkräuter pro Minute.
+"""
+import time
+import threading
+from collections import deque
+
+import numpy as np
+
+from hardware.coordinates import world_to_arm, IK_JOINTS
+
+ARM_JOINT_SPEED_DEG_S = 120.0     # Planungsannahme für das langsamste Gelenk
+MOVE_OVERHEAD_S = 0.2             # Anfahren/Abbremsen pro Bewegung
+MAX_JOBS = 32
+JOB_TIMEOUT_S = 10.0              # Ohne max_age: so lange darf ein Job warten
+TWO_OPT_MAX_PASSES = 8
+THROUGHPUT_WINDOW_S = 60.0
+
+
+def travel_time(start, goal, speed=ARM_JOINT_SPEED_DEG_S):
+    """Dauer einer synchronen Gelenkbewegung - das Gelenk mit dem größten Weg bestimmt sie"""
+    delta = max(abs(goal[joint] - start.get(joint, goal[joint])) for joint in goal)
+    return MOVE_OVERHEAD_S + delta / speed
+
+
+def travel_matrix(angles, speed=ARM_JOINT_SPEED_DEG_S):
+    """Fahrzeiten zwischen allen Posen ((N x Gelenke)-Array) als (N x N)-Matrix"""
+    angles = np.asarray(angles, dtype=float)
+    delta = np.abs(angles[:, None, :] - angles[None, :, :]).max(axis=-1)
+    return MOVE_OVERHEAD_S + delta / speed
+
+
+def path_cost(cost, order):
+    """Fahrzeit einer offenen Tour ab Knoten 0 (aktuelle Armstellung)"""
+    nodes = [0] + list(order)
+    return float(sum(cost[a, b] for a, b in zip(nodes, nodes[1:])))
+
+
+def nearest_neighbour(cost, nodes):
+    """Gierige Tour ab Knoten 0 über die Knoten in nodes"""
+    remaining = set(nodes)
+    order = []
+    current = 0
+    while remaining:
+        current = min(remaining, key=lambda node: cost[current, node])
+        order.append(current)
+        remaining.remove(current)
+    return order
+
+
+def cheapest_insertion(cost, order, node):
+    """Knoten an der Stelle einfügen, die die Tour am wenigsten verlängert"""
+    nodes = [0] + order
+    best_index, best_delta = len(order), cost[nodes[-1], node]
+    for index in range(len(order)):
+        a, b = nodes[index], nodes[index + 1]
+        delta = cost[a, node] + cost[node, b] - cost[a, b]
+        if delta < best_delta:
+            best_index, best_delta = index, delta
+    order.insert(best_index, node)
+    return order
+
+
+def two_opt(cost, order, max_passes=TWO_OPT_MAX_PASSES):
+    """Segmente umdrehen, solange die offene Tour kürzer wird - Start bleibt fest"""
+    nodes = [0] + list(order)
+    count = len(nodes)
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, count - 1):
+            for k in range(i + 1, count):
+                before = cost[nodes[i - 1], nodes[i]]
+                after = cost[nodes[i - 1], nodes[k]]
+                if k + 1 < count:
+                    before += cost[nodes[k], nodes[k + 1]]
+                    after += cost[nodes[i], nodes[k + 1]]
+                if after < before - 1e-9:
+                    nodes[i:k + 1] = reversed(nodes[i:k + 1])
+                    improved = True
+        if not improved:
+            break
+    return nodes[1:]
+
+
+class WeedJobScheduler:
+    """Sammelt Unkraut-Ziele im Weltrahmen und arbeitet sie in optimierter Reihenfolge ab
+
+    listener (optional) bekommt on_dispatch(job), on_step(job, schritt), on_finish(job, erfolg)
+    und on_drop(job, grund) - so hängt die Erkennungs-Pipeline ihre Zeitstempel an.
+    """
+
+    def __init__(self, arm, pose_source=None, max_age=None, listener=None, max_jobs=MAX_JOBS):
+        self.arm = arm
+        self.pose_source = pose_source      # () -> aktuelle Fahrzeug-Pose, None = Fahrzeug steht
+        self.max_age = max_age              # Sekunden seit der letzten Beobachtung
+        self.listener = listener
+        self.max_jobs = max_jobs
+
+        self.lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self.jobs = {}                      # job_id -> Job (wartend)
+        self.order = []                     # geplante Reihenfolge (job_ids)
+        self.active = None
+
+        self.running = False
+        self.thread = None
+        self.started_at = None
+        self._at_rest = True
+        self.removed_times = deque()
+        self.stats = {'submitted': 0, 'removed': 0, 'failed': 0, 'dropped': 0,
+                      'full_plans': 0, 'incremental_plans': 0}
+        self.last_plan = {}
+
+    # ===== JOBS =====
+    def submit(self, job_id, wx, wy, observed=None, context=None):
+        """Ziel (Weltrahmen, m) einreihen oder aktualisieren - True, wenn neu"""
+        observed = observed if observed is not None else time.time()
+        dropped = None
+        with self.lock:
+            if self.active is not None and self.active['id'] == job_id:
+                return False
+            job = self.jobs.get(job_id)
+            if job is not None:
+                # Neue Beobachtung - Position und Alter auffrischen
+                job.update(x=wx, y=wy, observed=observed, context=context or job['context'])
+                is_new = False
+            else:
+                if len(self.jobs) >= self.max_jobs:
+                    oldest = min(self.jobs.values(), key=lambda j: j['observed'])
+                    dropped = self._remove(oldest['id'])
+                self.jobs[job_id] = {'id': job_id, 'x': wx, 'y': wy, 'observed': observed,
+                                     'submitted': time.time(), 'context': context, 'reachable': None}
+                self.stats['submitted'] += 1
+                is_new = True
+        if dropped:
+            self._notify('on_drop', dropped, 'queue_overflow')
+        self._wakeup.set()
+        return is_new
+
+    def _remove(self, job_id):
+        job = self.jobs.pop(job_id, None)
+        if job_id in self.order:
+            self.order.remove(job_id)
+        if job is not None:
+            self.stats['dropped'] += 1
+        return job
+
+    def clear(self):
+        """Alle wartenden Jobs verwerfen (z.B. Notaus)"""
+        with self.lock:
+            dropped = list(self.jobs.values())
+            self.jobs.clear()
+            self.order = []
+            self.stats['dropped'] += len(dropped)
+        for job in dropped:
+            self._notify('on_drop', job, 'cleared')
+
+    def _notify(self, event, *args):
+        handler = getattr(self.listener, event, None) if self.listener else None
+        if handler:
+            try:
+                handler(*args)
+            except Exception as e:
+                print(f"⚠️ Job-Listener {event} fehlgeschlagen: {e}")
+
+    # ===== PLANUNG =====
+    def _pose(self):
+        pose = self.pose_source() if self.pose_source else None
+        return pose or {'x': 0.0, 'y': 0.0, 'heading': 0.0}
+
+    def _expire(self, now):
+        """Zu alte Jobs verwerfen - unerreichbar gebliebene mit eigenem Grund"""
+        limit = self.max_age if self.max_age is not None else JOB_TIMEOUT_S
+        expired = []
+        with self.lock:
+            for job in list(self.jobs.values()):
+                if now - job['observed'] > limit:
+                    self._remove(job['id'])
+                    expired.append((job, 'unreachable' if job['reachable'] is False else 'stale'))
+        for job, reason in expired:
+            self._notify('on_drop', job, reason)
+
+    def plan(self):
+        """Reihenfolge für die wartenden Jobs aus der aktuellen Armstellung - Liste von job_ids"""
+        started = time.perf_counter()
+        pose = self._pose()
+        start = self.arm.get_current_position()
+
+        with self.lock:
+            jobs = list(self.jobs.values())
+            previous = [job_id for job_id in self.order if job_id in self.jobs]
+
+        # Anfahr-Posen im aktuellen Arm-Rahmen - IK kostet Mikrosekunden
+        reachable = []
+        for job in jobs:
+            x, y = world_to_arm(pose, job['x'], job['y'])
+            angles = self.arm.solve_xy(x, y, self.arm.approach_height)
+            if angles is not None and self.arm.solve_xy(x, y) is None:
+                angles = None               # Anfahrhöhe erreichbar, Boden nicht
+            job['reachable'] = angles is not None
+            if angles is not None:
+                job['arm_x'], job['arm_y'] = x, y
+                reachable.append((job, angles))
+
+        if not reachable:
+            with self.lock:
+                self.order = []
+            return []
+
+        ids = [job['id'] for job, _ in reachable]
+        angles = [[start[joint] for joint in IK_JOINTS]] + [[a[joint] for joint in IK_JOINTS] for _, a in reachable]
+        cost = travel_matrix(angles)
+        node_of = {job_id: index + 1 for index, job_id in enumerate(ids)}
+
+        # Bestehende Tour weiterverwenden, neue Ziele einfügen - sonst neu aufbauen
+        kept = [node_of[job_id] for job_id in previous if job_id in node_of]
+        if kept:
+            order = kept
+            for node in range(1, len(ids) + 1):
+                if node not in order:
+                    cheapest_insertion(cost, order, node)
+            self.stats['incremental_plans'] += 1
+            mode = 'incremental'
+        else:
+            order = nearest_neighbour(cost, range(1, len(ids) + 1))
+            self.stats['full_plans'] += 1
+            mode = 'full'
+        seeded = path_cost(cost, order)
+        order = two_opt(cost, order)
+
+        planned = [ids[node - 1] for node in order]
+        with self.lock:
+            self.order = planned
+        self.last_plan = {
+            'mode': mode,
+            'jobs': len(planned),
+            'travel_s': round(path_cost(cost, order), 3),
+            'seed_travel_s': round(seeded, 3),
+            'id_order_travel_s': round(path_cost(cost, sorted(range(1, len(ids) + 1), key=lambda n: ids[n - 1])), 3),
+            'plan_ms': round((time.perf_counter() - started) * 1000, 3)
+        }
+        return planned
+
+    # ===== ABARBEITEN =====
+    def _next_job(self):
+        """Ersten Job der Tour entnehmen - geplant wird ohne Lock, daher kann er inzwischen
+        fehlen (clear() beim Notaus, Überlauf in submit()): dann neu planen"""
+        while True:
+            self._expire(time.time())
+            planned = self.plan()
+            with self.lock:
+                if not planned:
+                    return None
+                job = self.jobs.pop(planned[0], None)
+                if job is None:
+                    continue
+                self.order = planned[1:]
+                self.active = job
+                return job
+
+    def _run_job(self, job):
+        self._notify('on_dispatch', job)
+        success = self.arm.weed_removal_sequence(
+            job['arm_x'], job['arm_y'], on_step=lambda step: self._notify('on_step', job, step),
+            return_to_detect=False)
+
+        with self.lock:
+            self.active = None
+            if success:
+                self.stats['removed'] += 1
+                self.removed_times.append(time.time())
+            else:
+                self.stats['failed'] += 1
+        self._notify('on_finish', job, success)
+
+    def _loop(self):
+        while self.running:
+            if getattr(self.arm, 'emergency_stopped', False):
+                time.sleep(0.05)
+                continue
+
+            job = self._next_job()
+            if job is None:
+                # Nichts erreichbar - einmal in Beobachtungsstellung, dann auf neue Ziele warten
+                if not self._at_rest:
+                    self.arm.move_to_preset('weed_detect', 1.0)
+                    self._at_rest = True
+                self._wakeup.wait(0.1)
+                self._wakeup.clear()
+                continue
+
+            self._at_rest = False
+            try:
+                self._run_job(job)
+            except Exception as e:
+                print(f"❌ Unkraut-Job {job['id']} fehlgeschlagen: {e}")
+                with self.lock:
+                    self.active = None
+                    self.stats['failed'] += 1
+                self._notify('on_finish', job, False)
+
+    def start(self):
+        if self.running:
+            return False
+        self.running = True
+        self.started_at = time.time()
+        self.thread = threading.Thread(target=self._loop, name='arm-jobs', daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        if not self.running:
+            return False
+        self.running = False
+        self._wakeup.set()
+        if self.thread:
+            self.thread.join(timeout=15.0)
+        self.clear()
+        return True
+
+    # ===== KENNZAHLEN =====
+    def weeds_per_minute(self, now=None):
+        """Entfernte Unkräuter pro Minute im gleitenden Fenster (max. 60 s)"""
+        now = now if now is not None else time.time()
+        with self.lock:
+            while self.removed_times and now - self.removed_times[0] > THROUGHPUT_WINDOW_S:
+                self.removed_times.popleft()
+            count = len(self.removed_times)
+        if not self.started_at:
+            return 0.0
+        window = min(THROUGHPUT_WINDOW_S, max(now - self.started_at, 1e-6))
+        return round(count * 60.0 / window, 2)
+
+    def get_status(self):
+        with self.lock:
+            active = self.active
+            pending = len(self.jobs)
+            order = list(self.order)
+            stats = dict(self.stats)
+        runtime = time.time() - self.started_at if self.started_at else 0.0
+        return {
+            'running': self.running,
+            'weeds_per_minute': self.weeds_per_minute(),
+            'average_per_minute': round(stats['removed'] * 60.0 / runtime, 2) if runtime > 0 else 0.0,
+            'pending': pending,
+            'planned_order': order,
+            'active': active['id'] if active else None,
+            'last_plan': dict(self.last_plan),
+            'stats': stats
+        }
+
+    def cleanup(self):
+        self.stop()
@@ -0,0 +1,228 @@
+# hardware/arm_safety.py
+"""
+Kollisionsprüfung des Roboterarms über eine vorberechnete Konfigurationsraum-Bitmap
+Für jede Zelle des Rasters (base, shoulder, elbow, wrist) steht ein Bit: blockiert
+durch Eigenkollision, Boden oder Fahrzeug-Chassis. Jeder Trajektorienpunkt wird vor
+dem Schreiben mit einem Bit-Lookup geprüft - O(1), der Regeltakt bleibt schnell.
+Geprüft wird konservativ: Sicherheitsabstände decken die Rasterweite ab.
+Ziele hinter einem blockierten Weg werden über Zwischenposen umgeleitet.
+"""
+import math
+
+import numpy as np
+
+from hardware.coordinates import ARM_GEOMETRY, IK_JOINTS
+
+# Hindernisse in cm, Arm-Rahmen (Ursprung unter der Drehachse am Boden, x vorwärts)
+SAFETY_GEOMETRY = {
+    'ground_clearance': 2.0,   # Arm-Glieder über dem Boden
+    'tool_penetration': 3.0,   # Werkzeugspitze darf so tief in den Boden
+    'chassis_front': -4.0,     # Chassis beginnt hinter dieser x-Ebene ...
+    'chassis_top': 16.0,       # ... und reicht bis zu dieser Höhe
+    'link_radius': 2.0,        # halbe Glied-Dicke für Eigenkollision
+    'min_fold': 25.0,          # kleinster Winkel zwischen Ober- und Unterarm (Grad)
+    'margin': 1.5              # deckt den Rasterfehler ab
+}
+
+# Rasterweite pro Gelenk in Grad - base wirkt nur auf das Chassis, daher gröber
+GRID_STEPS = {'base': 5.0, 'shoulder': 2.0, 'elbow': 2.0, 'wrist': 2.0}
+
+LINK_SAMPLES = 4               # Prüfpunkte pro Glied
+
+# Aufbau dauert ~1 s - pro Prozess einmal je Grenzen und Geometrie
+_BITMAP_CACHE = {}
+
+
+class SafetyViolation(RuntimeError):
+    """Trajektorienpunkt liegt in einer blockierten Zelle"""
+
+
+def link_points(shoulder, elbow, wrist, geometry=ARM_GEOMETRY):
+    """Prüfpunkte (r, z) in cm entlang Oberarm, Unterarm und Werkzeug - numpy-fähig
+
+    Rückgabe: dict Glied -> (r, z) mit Form (..., LINK_SAMPLES). Winkel-Konvention wie
+    hardware/coordinates.py.
+    """
+    g = geometry
+    shoulder = np.radians(np.asarray(shoulder, dtype=float))[..., None]
+    forearm = shoulder - np.radians(180.0 - np.asarray(elbow, dtype=float))[..., None]
+    tool = forearm + np.radians(np.asarray(wrist, dtype=float) - 90.0)[..., None]
+    t = np.linspace(0.0, 1.0, LINK_SAMPLES + 1)[1:]
+
+    r0, z0 = g['shoulder_offset'], g['shoulder_height']
+    upper = (r0 + t * g['upper_arm'] * np.cos(shoulder), z0 + t * g['upper_arm'] * np.sin(shoulder))
+    r1, z1 = upper[0][..., -1:], upper[1][..., -1:]
+    lower = (r1 + t * g['forearm'] * np.cos(forearm), z1 + t * g['forearm'] * np.sin(forearm))
+    r2, z2 = lower[0][..., -1:], lower[1][..., -1:]
+    effector = (r2 + t * g['tool'] * np.cos(tool), z2 + t * g['tool'] * np.sin(tool))
+    return {'upper_arm': upper, 'forearm': lower, 'tool': effector}
+
+
+class ArmSafety:
+    """Konfigurationsraum-Bitmap mit O(1)-Prüfung, Wegprüfung und Umleitung"""
+
+    def __init__(self, limits=None, geometry=None):
+        self.geometry = dict(SAFETY_GEOMETRY, **(geometry or {}))
+        self.limits = {joint: (0.0, 180.0) for joint in IK_JOINTS}
+        for joint, (low, high) in (limits or {}).items():
+            if joint in self.limits:
+                self.limits[joint] = (float(low), float(high))
+
+        # Achsen: (Gelenk, Untergrenze, Schritt, Zellen)
+        self._axes = []
+        for joint in IK_JOINTS:
+            low, high = self.limits[joint]
+            step = GRID_STEPS[joint]
+            self._axes.append((joint, low, step, int(round((high - low) / step)) + 1))
+        self.shape = tuple(axis[3] for axis in self._axes)
+        self.stats = {'checks': 0, 'blocked': 0, 'rerouted': 0, 'rejected': 0, 'violations': 0}
+        self._build()
+
+    # ===== AUFBAU =====
+    def _axis_values(self, index):
+        joint, low, step, size = self._axes[index]
+        return low + step * np.arange(size)
+
+    def _planar_blocked(self, shoulder, elbow, wrist):
+        """Eigenkollision und Boden je (shoulder, elbow, wrist) plus tiefster Chassis-Punkt"""
+        g = self.geometry
+        points = link_points(shoulder, elbow, wrist)
+        margin = g['margin']
+
+        blocked = np.asarray(elbow, dtype=float) < g['min_fold'] + GRID_STEPS['elbow'] / 2
+        for link in ('upper_arm', 'forearm'):
+            blocked |= points[link][1].min(axis=-1) < g['ground_clearance'] + margin
+        blocked |= points['tool'][1].min(axis=-1) < -g['tool_penetration'] + margin
+
+        # Werkzeug gegen Oberarm
+        dr = points['tool'][0][..., :, None] - points['upper_arm'][0][..., None, :]
+        dz = points['tool'][1][..., :, None] - points['upper_arm'][1][..., None, :]
+        blocked |= np.sqrt(dr * dr + dz * dz).min(axis=(-1, -2)) < 2 * g['link_radius'] + margin
+
+        # Weitester Punkt nach hinten unterhalb der Chassis-Oberkante (r < 0 liegt hinter der Drehachse)
+        r = np.concatenate([points[link][0] for link in points], axis=-1)
+        z = np.concatenate([points[link][1] for link in points], axis=-1)
+        rear = np.where(z < g['chassis_top'] + margin, r, np.inf).min(axis=-1)
+        return blocked, rear
+
+    def _build(self):
+        """Bitmap Ebene für Ebene aufbauen - base wirkt über cos(Gierwinkel) auf die Chassis-Prüfung"""
+        key = (tuple(self._axes), tuple(sorted(self.geometry.items())))
+        if key in _BITMAP_CACHE:
+            self.bitmap, self.blocked_ratio = _BITMAP_CACHE[key]
+            self._bits = self.bitmap.tobytes()
+            return
+
+        g = self.geometry
+        base, shoulder, elbow, wrist = (self._axis_values(i) for i in range(4))
+        s, e, w = np.meshgrid(shoulder, elbow, wrist, indexing='ij')
+
+        planar = np.empty(s.shape, dtype=bool)
+        rear = np.empty(s.shape)
+        for i in range(len(shoulder)):
+            planar[i], rear[i] = self._planar_blocked(s[i], e[i], w[i])
+
+        # Gierwinkel -90..90° -> cos >= 0, der hinterste Punkt bestimmt die Chassis-Kollision
+        cos_yaw = np.cos(np.radians(base - 90.0))
+        occupancy = np.empty((len(base),) + s.shape, dtype=bool)
+        for b, c in enumerate(cos_yaw):
+            occupancy[b] = planar | (rear * max(c, 0.0) < g['chassis_front'] + g['margin'])
+
+        self.blocked_ratio = round(float(occupancy.mean()), 4)
+        self.bitmap = np.packbits(occupancy.ravel())
+        self._bits = self.bitmap.tobytes()
+        _BITMAP_CACHE[key] = (self.bitmap, self.blocked_ratio)
+
+    # ===== PRÜFEN =====
+    def _index(self, angles):
+        index = 0
+        for joint, low, step, size in self._axes:
+            cell = int((angles[joint] - low) / step + 0.5)
+            if cell < 0 or cell >= size:
+                return None
+            index = index * size + cell
+        return index
+
+    def is_free(self, angles):
+        """O(1): Gelenkstellung ({gelenk: winkel}) frei? Außerhalb der Grenzen gilt als blockiert"""
+        self.stats['checks'] += 1
+        index = self._index(angles)
+        if index is None or (self._bits[index >> 3] >> (7 - (index & 7))) & 1:
+            self.stats['blocked'] += 1
+            return False
+        return True
+
+    def explain(self, angles):
+        """Exakte Prüfung einer Stellung ohne Raster und Sicherheitsabstand - Liste der Gründe"""
+        g = self.geometry
+        reasons = []
+        for joint in IK_JOINTS:
+            low, high = self.limits[joint]
+            if not low <= angles[joint] <= high:
+                reasons.append(f'limit:{joint}')
+
+        points = link_points(angles['shoulder'], angles['elbow'], angles['wrist'])
+        if angles['elbow'] < g['min_fold'] or self._tool_hits_arm(points):
+            reasons.append('self')
+        if (min(points['upper_arm'][1].min(), points['forearm'][1].min()) < g['ground_clearance'] or
+                points['tool'][1].min() < -g['tool_penetration']):
+            reasons.append('ground')
+
+        yaw = math.radians(angles['base'] - 90.0)
+        for link in points.values():
+            for r, z in zip(link[0].ravel(), link[1].ravel()):
+                if z < g['chassis_top'] and r * math.cos(yaw) < g['chassis_front']:
+                    reasons.append('chassis')
+                    break
+            if 'chassis' in reasons:
+                break
+        return reasons
+
+    def _tool_hits_arm(self, points):
+        dr = points['tool'][0][:, None] - points['upper_arm'][0][None, :]
+        dz = points['tool'][1][:, None] - points['upper_arm'][1][None, :]
+        return bool(np.sqrt(dr * dr + dz * dz).min() < 2 * self.geometry['link_radius'])
+
+    def check_path(self, start, goal):
+        """Gerader Weg im Gelenkraum mit Rasterweite abtasten - Anteil des ersten blockierten Punkts oder None"""
+        delta = max(abs(goal[joint] - start[joint]) / GRID_STEPS[joint] for joint in IK_JOINTS)
+        samples = max(1, int(math.ceil(delta)))
+        for k in range(samples + 1):
+            f = k / samples
+            if not self.is_free({joint: start[joint] + f * (goal[joint] - start[joint]) for joint in IK_JOINTS}):
+                return f
+        return None
+
+    def find_route(self, start, goal, safe_poses=()):
+        """Zwischenposen für einen blockierten Weg - Liste von Posen bis zum Ziel oder None
+
+        Kandidaten: erst Arm dann Drehung, erst Drehung dann Arm, dann über eine sichere Pose
+        (einziehen, drehen, ausfahren).
+        """
+        if not self.is_free(goal):
+            self.stats['rejected'] += 1
+            return None
+        if self.check_path(start, goal) is None:
+            return [goal]
+
+        candidates = [[dict(goal, base=start['base'])], [dict(start, base=goal['base'])]]
+        for pose in safe_poses:
+            safe = {joint: pose[joint] for joint in IK_JOINTS}
+            candidates += [[safe], [dict(safe, base=start['base']), dict(safe, base=goal['base'])]]
+        for vias in candidates:
+            waypoints = [start] + vias + [goal]
+            if all(self.check_path(a, b) is None for a, b in zip(waypoints, waypoints[1:])):
+                self.stats['rerouted'] += 1
+                return vias + [goal]
+        self.stats['rejected'] += 1
+        return None
+
+    def get_status(self):
+        return {
+            'grid': dict(zip(IK_JOINTS, self.shape)),
+            'steps': dict(GRID_STEPS),
+            'bitmap_bytes': len(self._bits),
+            'blocked_ratio': self.blocked_ratio,
+            'geometry': dict(self.geometry),
+            'stats': dict(self.stats)
+        }
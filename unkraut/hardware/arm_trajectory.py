@@ -0,0 +1,216 @@
+# hardware/arm_trajectory.py
+"""
+Trajektorien-Ausführung für den Roboterarm (Unkraut-2025)
+Ein Thread interpoliert alle Gelenke gemeinsam mit fester Servo-Update-Rate:
+jede Bewegung hat eine Dauer, alle Gelenke starten und kommen gleichzeitig an.
+Aufrufer bekommen ein MotionHandle und können auf das Ende warten.
+Neue Bewegungen ersetzen die laufende (replace), setzen ihre Geschwindigkeit
+fort (blend) oder werden hinten angehängt (queue).
+"""
+import time
+import threading
+from collections import deque
+
+MOTION_MODES = ('replace', 'blend', 'queue')
+
+
+def _hermite(tau):
+    """Kubische Hermite-Basis für Startgeschwindigkeit (h10) und Ziel (h01), Endgeschwindigkeit null
+
+    p(tau) = p0 + h01 * (p1 - p0) + h10 * v0 * T - liefert zusätzlich die Ableitungen nach tau.
+    """
+    tau2 = tau * tau
+    tau3 = tau2 * tau
+    return (tau3 - 2 * tau2 + tau, -2 * tau3 + 3 * tau2), (3 * tau2 - 4 * tau + 1, -6 * tau2 + 6 * tau)
+
+
+class MotionHandle:
+    """Eine angeforderte Bewegung - wait() blockiert bis sie fertig, ersetzt oder abgebrochen ist"""
+
+    def __init__(self, targets, duration, mode):
+        self.targets = dict(targets)
+        self.duration = duration
+        self.mode = mode
+        self.status = 'pending'     # pending | running | completed | preempted | cancelled
+        self.started_at = None
+        self.finished_at = None
+        self.expected_arrival = None  # monotonic - Schätzung der Servos, nicht des Sollwerts
+        self._done = threading.Event()
+
+    def _finish(self, status):
+        self.status = status
+        self.finished_at = time.monotonic()
+        self._done.set()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Auf das Ende warten - True nur, wenn die Bewegung ihr Ziel erreicht hat"""
+        self._done.wait(timeout)
+        return self.status == 'completed'
+
+    def to_dict(self):
+        eta = None if self.expected_arrival is None else round(max(0.0, self.expected_arrival - time.monotonic()), 3)
+        return {'targets': self.targets, 'duration': self.duration, 'mode': self.mode, 'status': self.status,
+                'eta_s': eta}
+
+
+class _Segment:
+    """Aktive Bewegung: gemeinsame Zeitbasis für alle Gelenke"""
+
+    def __init__(self, handle, start, velocity, started_at):
+        self.handle = handle
+        self.start = dict(start)
+        self.goal = {joint: handle.targets.get(joint, angle) for joint, angle in start.items()}
+        self.velocity = dict(velocity)
+        self.duration = max(handle.duration, 1e-6)
+        self.started_at = started_at
+
+    def sample(self, now):
+        """Positionen und Geschwindigkeiten (°/s) zum Zeitpunkt now"""
+        tau = min(1.0, max(0.0, (now - self.started_at) / self.duration))
+        (h10, h01), (d10, d01) = _hermite(tau)
+        positions = {}
+        velocities = {}
+        for joint, p0 in self.start.items():
+            v0 = self.velocity.get(joint, 0.0) * self.duration
+            delta = self.goal[joint] - p0
+            positions[joint] = p0 + h01 * delta + h10 * v0
+            velocities[joint] = (d01 * delta + d10 * v0) / self.duration
+        return positions, velocities, tau >= 1.0
+
+
+class TrajectoryExecutor:
+    """Interpoliert Bewegungen mit fester Rate und schreibt alle Gelenke pro Takt in einem Aufruf"""
+
+    def __init__(self, write, initial_positions, rate_hz=50):
+        self.write = write                      # write({gelenk: winkel}) - einmal pro Takt
+        self.rate_hz = rate_hz
+        self.positions = dict(initial_positions)
+        self.velocities = {joint: 0.0 for joint in initial_positions}
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._queue = deque()
+        self._active = None
+        self._stop_event = threading.Event()
+        self.stats = {'motions': 0, 'completed': 0, 'preempted': 0, 'cancelled': 0,
+                      'ticks': 0, 'overruns': 0}
+
+        self.thread = threading.Thread(target=self._loop, name='arm-trajectory', daemon=True)
+        self.thread.start()
+
+    # ===== BEFEHLE =====
+    def execute(self, targets, duration, mode='replace'):
+        """Bewegung zu targets ({gelenk: winkel}) in duration Sekunden einplanen"""
+        if mode not in MOTION_MODES:
+            raise ValueError(f"Unbekannter Modus: {mode}")
+        unknown = set(targets) - set(self.positions)
+        if unknown:
+            raise ValueError(f"Unbekannte Gelenke: {', '.join(sorted(unknown))}")
+
+        handle = MotionHandle(targets, max(0.0, float(duration)), mode)
+        with self._lock:
+            if mode != 'queue':
+                # Laufende und wartende Bewegungen ersetzen - die neue startet am aktuellen Sollwert
+                self._abort_all('preempted')
+            self._queue.append(handle)
+            self.stats['motions'] += 1
+        self._wakeup.set()
+        return handle
+
+    def cancel(self):
+        """Alle Bewegungen abbrechen und am aktuellen Sollwert stehen bleiben
+
+        Nach der Rückkehr schreibt der Thread nichts mehr - der Schreibtakt läuft unter demselben Lock.
+        """
+        with self._lock:
+            self._abort_all('cancelled')
+
+    def _abort_all(self, status):
+        aborted = ([self._active.handle] if self._active else []) + list(self._queue)
+        for handle in aborted:
+            handle._finish(status)
+            self.stats[status] += 1
+        self._active = None
+        self._queue.clear()
+        if status == 'cancelled':
+            self.velocities = {joint: 0.0 for joint in self.velocities}
+
+    # ===== REGELTAKT =====
+    def is_busy(self):
+        return self._active is not None or bool(self._queue)
+
+    def busy_until(self, now=None):
+        """Zeitpunkt (monotonic), an dem der Sollwert aller laufenden und wartenden Bewegungen am Ziel ist"""
+        now = now or time.monotonic()
+        with self._lock:
+            end = now
+            if self._active is not None:
+                end = max(end, self._active.started_at + self._active.handle.duration)
+            return end + sum(handle.duration for handle in self._queue)
+
+    def _tick(self, now):
+        with self._lock:
+            if self._active is None and self._queue:
+                handle = self._queue.popleft()
+                velocity = self.velocities if handle.mode == 'blend' else {}
+                self._active = _Segment(handle, self.positions, velocity, now)
+                handle.status = 'running'
+                handle.started_at = now
+            if self._active is None:
+                return
+
+            positions, velocities, finished = self._active.sample(now)
+            self.positions = positions
+            self.velocities = velocities
+            self.write(positions)
+            self.stats['ticks'] += 1
+
+            if finished:
+                self._active.handle._finish('completed')
+                self.stats['completed'] += 1
+                self._active = None
+                self.velocities = {joint: 0.0 for joint in velocities}
+
+    def _loop(self):
+        period = 1.0 / self.rate_hz
+        next_tick = time.monotonic()
+        while not self._stop_event.is_set():
+            if not self.is_busy():
+                self._wakeup.wait()
+                self._wakeup.clear()
+                next_tick = time.monotonic()
+                continue
+
+            try:
+                self._tick(time.monotonic())
+            except Exception as e:
+                print(f"⚠️ Arm-Trajektorie abgebrochen: {e}")
+                self.cancel()
+
+            next_tick += period
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                self.stats['overruns'] += 1
+                next_tick = time.monotonic()
+
+    def get_status(self):
+        active = self._active
+        return {
+            'busy': self.is_busy(),
+            'rate_hz': self.rate_hz,
+            'active': active.handle.to_dict() if active else None,
+            'queued': len(self._queue),
+            'stats': dict(self.stats)
+        }
+
+    def stop(self):
+        self.cancel()
+        self._stop_event.set()
+        self._wakeup.set()
+        self.thread.join(timeout=1.0)
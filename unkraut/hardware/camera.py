@@ -8,8 +8,15 @@ import numpy as np
 import time
 import threading
 import os
+import json
+import glob
+import hashlib
 import subprocess
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DETECTION_CACHE_FILE = os.path.join(PROJECT_ROOT, 'data', 'camera_detect.json')
+DETECTION_CACHE_TTL = 6 * 3600  # Sekunden
+
 class CameraManager:
     def __init__(self):
         self.camera = None
@@ -17,8 +24,39 @@ class CameraManager:
         self.current_frame = None
         self.frame_lock = threading.Lock()
         self.camera_type = 'mock'
+        self.camera_device = None
         self.libcamera_process = None
         self._libcamera_working = None  # Cache für libcamera Test-Ergebnis
+        self.frame_id = 0               # Fortlaufende Frame-Nummer
+        self.last_frame_time = None     # time.monotonic() des letzten Frames
+        self.frame_listeners = []       # Callbacks (frame_id, jpeg_data, timestamp)
+        self._stream_generation = 0     # Alte Worker beenden sich bei Neustart selbst
+        self._stream_started_at = None
+        self._grace_camera_type = None  # Kamera-Typ, für den die Startphase schon gewährt wurde
+        self._grace_until = 0.0
+        self._stall_started = None      # Letzter Frame vor dem laufenden Stall
+        
+        # Supervisor: Stall-Erkennung und Neustart mit Backoff
+        self.supervisor_thread = None
+        self._restart_requested = threading.Event()
+        self._redetect_requested = False
+        self.supervisor = {
+            'stall_timeout': 0.5,       # Sekunden ohne Frame = Stall
+            'startup_grace': 3.0,       # Nur erster Start nach Erkennung/Typwechsel - libcamera braucht länger
+            'backoff_initial': 0.25,
+            'backoff_max': 8.0,
+            'stable_reset': 10.0,       # Nach so langer Stabilität Backoff zurücksetzen
+            'redetect_after': 5         # Fehlversuche bis zur erneuten Kamera-Erkennung
+        }
+        self.supervisor_stats = {
+            'restart_count': 0,
+            'stall_count': 0,
+            'failed_restarts': 0,
+            'total_downtime': 0.0,
+            'last_stall': None,
+            'last_restart': None,
+            'current_backoff': 0.0
+        }
         self.settings = {
             'brightness': 50,
             'contrast': 50,
@@ -26,30 +64,112 @@ class CameraManager:
             'framerate': 20
         }
         
+        # Kamera-Erkennung läuft im Hintergrund - Import blockiert nicht
+        self.detection_done = threading.Event()
+        self.detection_source = None    # 'cache' oder 'probe'
+        self.detection_duration = None
+        self._restart_after_detection = False
+        
         print("📷 Kamera-Manager startet...")
-        self._detect_camera()
+        threading.Thread(target=self._detect_camera, daemon=True).start()
     
-    def _detect_camera(self):
-        """Verbesserte Kamera-Erkennung für libcamera"""
-        print("🔍 Suche verfügbare Kameras...")
-        
-        # 1. Teste libcamera (funktioniert bei dir!)
-        if self._test_libcamera_working():
-            self.camera_type = 'libcamera'
-            print("✅ libcamera Kamera erfolgreich erkannt!")
-            return
+    def _detect_camera(self, use_cache=True):
+        """Kamera-Erkennung - Cache oder Probes (libcamera, danach USB)"""
+        started = time.monotonic()
+        try:
+            device_key = self._device_key()
+            
+            if use_cache and self._load_detection_cache(device_key):
+                self.detection_source = 'cache'
+                print(f"✅ Kamera aus Cache: {self.camera_type}")
+                return
+            
+            print("🔍 Suche verfügbare Kameras...")
+            self._libcamera_working = None
+            
+            # Nacheinander: /dev/video* gehört bei der Pi-Kamera zur libcamera-Pipeline,
+            # eine gleichzeitige USB-Probe ließe libcamera mit "device busy" scheitern.
+            # Der Hintergrund-Thread hält den Start trotzdem nicht auf.
+            libcamera_ok = self._test_libcamera_working()
+            usb_device = None if libcamera_ok else self._find_usb_camera()
+            
+            if libcamera_ok:
+                # 1. libcamera bevorzugt
+                self.camera_type = 'libcamera'
+                print("✅ libcamera Kamera erfolgreich erkannt!")
+            elif usb_device is not None:
+                # 2. USB Fallback
+                self.camera_type = 'usb'  
+                self.camera_device = usb_device
+                print(f"✅ USB Kamera gefunden")
+            else:
+                # 3. Mock als letzter Fallback
+                self.camera_type = 'mock'
+                print("⚠️  Fallback zu Mock-Modus")
+            
+            self.detection_source = 'probe'
+            # Mock nicht cachen - beim nächsten Start erneut nach Hardware suchen
+            if self.camera_type != 'mock':
+                self._save_detection_cache(device_key)
+            
+        except Exception as e:
+            print(f"❌ Kamera-Erkennung Fehler: {e}")
+        finally:
+            self.detection_duration = round(time.monotonic() - started, 3)
+            # Nächster Stream-Start bekommt wieder eine Startphase
+            self._grace_camera_type = None
+            self.detection_done.set()
+            
+            # Stream lief vorläufig als Mock - auf erkannte Kamera umschalten
+            if self._restart_after_detection and self.camera_type != 'mock':
+                self._restart_after_detection = False
+                self.restart_stream()
+    
+    def wait_for_detection(self, timeout=None):
+        """Auf Abschluss der Kamera-Erkennung warten (z.B. in Tests)"""
+        return self.detection_done.wait(timeout)
+    
+    @staticmethod
+    def _device_key():
+        """Schlüssel über die vorhandenen Kamera-Geräte - ändert sich beim An-/Abstecken"""
+        devices = sorted(glob.glob('/dev/video*') + glob.glob('/dev/media*'))
+        return hashlib.sha1('\n'.join(devices).encode()).hexdigest()[:16]
+    
+    def _load_detection_cache(self, device_key):
+        """Gecachtes Erkennungsergebnis übernehmen falls gültig"""
+        try:
+            with open(DETECTION_CACHE_FILE, 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return False
         
-        # 2. USB Fallback
-        usb_device = self._find_usb_camera()
-        if usb_device is not None:
-            self.camera_type = 'usb'  
-            self.camera_device = usb_device
-            print(f"✅ USB Kamera gefunden")
-            return
+        if cache.get('device_key') != device_key:
+            return False
+        if time.time() - cache.get('timestamp', 0) > DETECTION_CACHE_TTL:
+            return False
         
-        # 3. Mock als letzter Fallback
-        self.camera_type = 'mock'
-        print("⚠️  Fallback zu Mock-Modus")
+        self.camera_type = cache.get('camera_type', 'mock')
+        self.camera_device = cache.get('camera_device')
+        self._libcamera_working = cache.get('libcamera_working')
+        return True
+    
+    def _save_detection_cache(self, device_key):
+        """Erkennungsergebnis mit Zeitstempel speichern"""
+        cache = {
+            'device_key': device_key,
+            'timestamp': time.time(),
+            'camera_type': self.camera_type,
+            'camera_device': self.camera_device,
+            'libcamera_working': self._libcamera_working
+        }
+        try:
+            os.makedirs(os.path.dirname(DETECTION_CACHE_FILE), exist_ok=True)
+            tmp_file = DETECTION_CACHE_FILE + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(cache, f)
+            os.replace(tmp_file, DETECTION_CACHE_FILE)
+        except OSError as e:
+            print(f"⚠️  Kamera-Cache nicht gespeichert: {e}")
     
     def _test_libcamera_working(self):
         """Teste ob libcamera tatsächlich funktioniert - mit Caching"""
@@ -109,6 +229,9 @@ class CameraManager:
     def _find_usb_camera(self):
         """USB Kamera finden"""
         for device in [0, 1, 2]:
+            # Nicht vorhandene Geräte gar nicht erst öffnen
+            if os.name == 'posix' and not os.path.exists(f'/dev/video{device}'):
+                continue
             try:
                 cap = cv2.VideoCapture(device)
                 if cap.isOpened():
@@ -125,8 +248,22 @@ class CameraManager:
         if self.is_streaming:
             return True
             
+        # Erkennung noch nicht fertig: vorläufig Mock, danach automatisch umschalten
+        if not self.detection_done.is_set():
+            self._restart_after_detection = True
+        
         print(f"📹 Starte {self.camera_type} Stream...")
         
+        self._stream_generation += 1
+        self._stream_started_at = time.monotonic()
+        
+        # Startphase nur beim ersten Start nach Erkennung oder Typwechsel - nicht bei jedem Neustart
+        if self._grace_camera_type != self.camera_type:
+            self._grace_camera_type = self.camera_type
+            self._grace_until = self._stream_started_at + self.supervisor['startup_grace']
+        
+        self._ensure_supervisor()
+        
         if self.camera_type == 'libcamera':
             return self._start_libcamera_stream()
         elif self.camera_type == 'usb':
@@ -138,15 +275,20 @@ class CameraManager:
         """libcamera Stream - optimiert für deine Kamera"""
         try:
             self.is_streaming = True
-            threading.Thread(target=self._libcamera_worker, daemon=True).start()
+            threading.Thread(target=self._libcamera_worker, args=(self._stream_generation,), daemon=True).start()
             print("✅ libcamera Stream gestartet")
             return True
         except Exception as e:
             print(f"❌ libcamera Stream Fehler: {e}")
             return self._start_mock_stream()
     
-    def _libcamera_worker(self):
+    def _stream_active(self, generation):
+        """Läuft dieser Worker noch? (Neustart erhöht die Generation)"""
+        return self.is_streaming and generation == self._stream_generation
+    
+    def _libcamera_worker(self, generation):
         """libcamera Worker - robuste Version"""
+        process = None
         try:
             # Verwende raspistill-ähnlichen Ansatz mit mjpeg
             cmd = [
@@ -160,17 +302,18 @@ class CameraManager:
                 '--output', '-'  # Stdout
             ]
             
-            self.libcamera_process = subprocess.Popen(
+            process = subprocess.Popen(
                 cmd, 
                 stdout=subprocess.PIPE,
                 stderr=subprocess.DEVNULL,
                 bufsize=10**5
             )
+            self.libcamera_process = process
             
             # MJPEG Stream parsen
             buffer = b""
-            while self.is_streaming and self.libcamera_process.poll() is None:
-                chunk = self.libcamera_process.stdout.read(4096)
+            while self._stream_active(generation) and process.poll() is None:
+                chunk = process.stdout.read(4096)
                 if not chunk:
                     break
                     
@@ -189,17 +332,17 @@ class CameraManager:
                     # Komplettes JPEG Frame
                     jpeg_data = buffer[start:end + 2]
                     
-                    with self.frame_lock:
-                        self.current_frame = jpeg_data
+                    self._publish_frame(jpeg_data)
                     
                     buffer = buffer[end + 2:]
                     
         except Exception as e:
             print(f"❌ libcamera Worker Fehler: {e}")
         finally:
-            if self.libcamera_process:
-                self.libcamera_process.terminate()
-                self.libcamera_process = None
+            if process:
+                process.terminate()
+                if self.libcamera_process is process:
+                    self.libcamera_process = None
     
     def _start_usb_stream(self):
         """USB Kamera Stream"""
@@ -211,7 +354,7 @@ class CameraManager:
             
             if self.camera.isOpened():
                 self.is_streaming = True
-                threading.Thread(target=self._usb_worker, daemon=True).start()
+                threading.Thread(target=self._usb_worker, args=(self._stream_generation,), daemon=True).start()
                 print("✅ USB Stream gestartet")
                 return True
         except Exception as e:
@@ -219,17 +362,17 @@ class CameraManager:
         
         return self._start_mock_stream()
     
-    def _usb_worker(self):
+    def _usb_worker(self, generation):
         """USB Kamera Worker"""
-        while self.is_streaming and self.camera and self.camera.isOpened():
+        camera = self.camera
+        while self._stream_active(generation) and camera.isOpened():
             try:
-                ret, frame = self.camera.read()
+                ret, frame = camera.read()
                 if ret and frame is not None:
                     # Frame zu JPEG
                     _, jpeg_data = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
                     
-                    with self.frame_lock:
-                        self.current_frame = jpeg_data.tobytes()
+                    self._publish_frame(jpeg_data.tobytes())
                 else:
                     time.sleep(0.1)
                     
@@ -241,17 +384,17 @@ class CameraManager:
         """Mock Stream für Tests"""
         try:
             self.is_streaming = True
-            threading.Thread(target=self._mock_worker, daemon=True).start()
+            threading.Thread(target=self._mock_worker, args=(self._stream_generation,), daemon=True).start()
             print("✅ Mock Stream gestartet")
             return True
         except Exception as e:
             print(f"❌ Mock Stream Fehler: {e}")
             return False
     
-    def _mock_worker(self):
+    def _mock_worker(self, generation):
         """Mock Kamera Worker"""
         frame_count = 0
-        while self.is_streaming:
+        while self._stream_active(generation):
             try:
                 # Dynamischer Mock-Frame
                 frame = np.zeros((480, 640, 3), dtype=np.uint8)
@@ -275,8 +418,7 @@ class CameraManager:
                 # Frame zu JPEG
                 _, jpeg_data = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
                 
-                with self.frame_lock:
-                    self.current_frame = jpeg_data.tobytes()
+                self._publish_frame(jpeg_data.tobytes())
                 
                 frame_count += 1
                 time.sleep(1.0 / self.settings['framerate'])
@@ -285,6 +427,31 @@ class CameraManager:
                 print(f"❌ Mock Worker Fehler: {e}")
                 break
     
+    def _publish_frame(self, jpeg_data):
+        """Neues JPEG-Frame übernehmen und Listener benachrichtigen"""
+        timestamp = time.time()
+        with self.frame_lock:
+            self.current_frame = jpeg_data
+            self.frame_id += 1
+            self.last_frame_time = time.monotonic()
+            frame_id = self.frame_id
+        
+        for listener in list(self.frame_listeners):
+            try:
+                listener(frame_id, jpeg_data, timestamp)
+            except Exception as e:
+                print(f"❌ Frame-Listener Fehler: {e}")
+    
+    def add_frame_listener(self, callback):
+        """Callback für jedes neue Frame registrieren - muss schnell zurückkehren"""
+        if callback not in self.frame_listeners:
+            self.frame_listeners.append(callback)
+    
+    def remove_frame_listener(self, callback):
+        """Frame-Callback entfernen"""
+        if callback in self.frame_listeners:
+            self.frame_listeners.remove(callback)
+    
     def stop_stream(self):
         """Stream stoppen"""
         self.is_streaming = False
@@ -317,8 +484,28 @@ class CameraManager:
                 return self.current_frame
             return None
     
+    def get_frame_with_id(self):
+        """Aktuelles Frame mit Frame-Nummer - (frame_id, jpeg_data) oder (frame_id, None)"""
+        with self.frame_lock:
+            return self.frame_id, self.current_frame
+    
+    def _storage_allows_capture(self):
+        """Low-Disk-Schutz - Aufnahme ablehnen wenn der Speicher fast voll ist"""
+        try:
+            from app.utils.storage_manager import storage_manager
+        except ImportError:
+            return True
+        
+        allowed, reason = storage_manager.check_capture_allowed()
+        if not allowed:
+            print(f"⚠️  Aufnahme abgelehnt: {reason}")
+        return allowed
+    
     def capture_image(self, filename=None):
         """Foto aufnehmen - startet Stream automatisch falls nötig"""
+        if not self._storage_allows_capture():
+            return None
+        
         # Stream automatisch starten falls nicht aktiv
         if not self.is_streaming:
             print("📹 Starte Stream für Capture...")
@@ -431,19 +618,126 @@ class CameraManager:
             'is_streaming': self.is_streaming,
             'settings': self.settings.copy(),
             'frame_available': self.current_frame is not None,
-            'libcamera_working': self._libcamera_working if self._libcamera_working is not None else False
+            'libcamera_working': self._libcamera_working if self._libcamera_working is not None else False,
+            'detection': {
+                'pending': not self.detection_done.is_set(),
+                'source': self.detection_source,
+                'duration': self.detection_duration
+            },
+            'supervisor': self.get_supervisor_stats()
         }
     
-    def restart_stream(self):
-        """Stream neu starten"""
-        print("🔄 Starte Kamera neu...")
+    def restart_stream(self, redetect=False):
+        """Stream-Neustart anfordern - erledigt der Supervisor im Hintergrund, blockiert nicht"""
+        print("🔄 Kamera-Neustart angefordert...")
+        self._redetect_requested = self._redetect_requested or redetect
+        self._restart_requested.set()
+        self._ensure_supervisor()
+        return True
+    
+    # ===== SUPERVISOR =====
+    def _ensure_supervisor(self):
+        """Supervisor-Thread einmalig starten"""
+        if self.supervisor_thread is None or not self.supervisor_thread.is_alive():
+            self.supervisor_thread = threading.Thread(target=self._supervisor_loop, daemon=True)
+            self.supervisor_thread.start()
+    
+    def _supervisor_loop(self):
+        """Überwacht Frame-Ankunft, erkennt Stalls und startet den Worker mit Backoff neu"""
+        stats = self.supervisor_stats
+        config = self.supervisor
+        backoff = 0.0
+        next_attempt = 0.0
+        
+        while True:
+            self._restart_requested.wait(0.1)
+            now = time.monotonic()
+            
+            # Manueller Neustart (restart_stream)
+            if self._restart_requested.is_set():
+                self._restart_requested.clear()
+                redetect = self._redetect_requested
+                self._redetect_requested = False
+                self._restart_worker(redetect)
+                stats['restart_count'] += 1
+                stats['last_restart'] = time.time()
+                continue
+            
+            if not self.is_streaming:
+                self._stall_started = None
+                continue
+            
+            last_frame = self.last_frame_time
+            started = self._stream_started_at or now
+            
+            # Frames kommen (wieder) an
+            if last_frame is not None and last_frame >= started and now - last_frame < config['stall_timeout']:
+                if self._stall_started is not None:
+                    stats['total_downtime'] += last_frame - self._stall_started
+                    self._stall_started = None
+                if backoff and now - started > config['stable_reset']:
+                    backoff = 0.0
+                    stats['failed_restarts'] = 0
+                    stats['current_backoff'] = 0.0
+                continue
+            
+            # Startphase abwarten (nur erster Start, siehe start_stream)
+            if now < self._grace_until and (last_frame is None or last_frame < started):
+                continue
+            
+            # Frisch gestarteter Worker: erst nach stall_timeout ohne Frame als Stall werten
+            no_frame_yet = last_frame is None or last_frame < started
+            if self._stall_started is None and no_frame_yet and now - started < config['stall_timeout']:
+                continue
+            
+            if self._stall_started is None:
+                self._stall_started = last_frame if last_frame is not None else started
+                stats['stall_count'] += 1
+                stats['last_stall'] = time.time()
+                print(f"⚠️  Kamera-Stall erkannt ({now - self._stall_started:.2f}s ohne Frame)")
+            
+            if now < next_attempt:
+                continue
+            
+            redetect = stats['failed_restarts'] >= config['redetect_after']
+            self._restart_worker(redetect)
+            stats['restart_count'] += 1
+            stats['failed_restarts'] += 1
+            stats['last_restart'] = time.time()
+            
+            backoff = min(config['backoff_max'], backoff * 2 if backoff else config['backoff_initial'])
+            stats['current_backoff'] = backoff
+            next_attempt = time.monotonic() + backoff
+    
+    def _restart_worker(self, redetect=False):
+        """Stream-Worker neu starten - Kamera-Erkennung bleibt gecacht, außer redetect"""
         self.stop_stream()
-        time.sleep(2)
-        self._detect_camera()
+        if redetect:
+            self.detection_done.clear()
+            self._detect_camera(use_cache=False)
         return self.start_stream()
+    
+    def get_supervisor_stats(self):
+        """Neustart- und Ausfallzeit-Metriken"""
+        stats = dict(self.supervisor_stats)
+        
+        # Laufenden Ausfall mitzählen, nicht erst wenn wieder Frames kommen
+        stall_started = self._stall_started
+        current_outage = time.monotonic() - stall_started if stall_started is not None else 0.0
+        stats['current_outage'] = round(current_outage, 3)
+        stats['total_downtime'] = round(stats['total_downtime'] + current_outage, 3)
+        if self.last_frame_time is not None:
+            stats['last_frame_age'] = round(time.monotonic() - self.last_frame_time, 3)
+        else:
+            stats['last_frame_age'] = None
+        return stats
 
-# Globale Instanz
-camera_manager = CameraManager()
+# Globale Instanz - wird erst beim ersten Zugriff erzeugt (hardware/registry.py)
+def __getattr__(name):
+    if name == 'camera_manager':
+        from hardware.registry import hardware_registry
+        return hardware_registry.get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Test-Funktion
 def test_camera():
@@ -492,4 +786,6 @@ def test_camera():
         return False
 
 if __name__ == '__main__':
+    # Direkt gestartet: eigene Instanz für den Selbsttest
+    camera_manager = CameraManager()
     test_camera()
\ No newline at end of file
@@ -0,0 +1,348 @@
+# hardware/camera_calibration.py
+"""
+Kamerakalibrierung für Unkraut-2025
+Intrinsik und Linsenverzeichnung aus Schachbrett-Aufnahmen, Bodenebene als
+Homographie aus einem flach liegenden Schachbrett oder ArUco-Markern mit bekannter
+Position. Das Ergebnis liegt in data/camera_calibration.json.
+
+Pro Frame wird nichts mehr gerechnet: cv2.initUndistortRectifyMap-Tabellen für
+remap() und eine Pixel -> Boden-Tabelle (cm, Arm-Koordinaten wie hardware/coordinates.py)
+werden einmal pro Bildgröße aufgebaut und gecacht. Punkt-Transformationen arbeiten
+auf ganzen Detektions-Arrays.
+"""
+import os
+import json
+import time
+import threading
+
+import cv2
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CALIBRATION_FILE = os.path.join(PROJECT_ROOT, 'data', 'camera_calibration.json')
+
+DEFAULT_IMAGE_SIZE = (640, 480)
+DEFAULT_PATTERN = (9, 6)           # Innere Ecken des Schachbretts
+DEFAULT_SQUARE_SIZE = 2.5          # cm
+MIN_INTRINSIC_VIEWS = 5
+ARUCO_DICTIONARY = 'DICT_4X4_50'
+
+
+def _to_gray(image):
+    return image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
+def find_checkerboard(image, pattern=DEFAULT_PATTERN):
+    """Innere Schachbrett-Ecken mit Subpixel-Genauigkeit - (N x 2) float32 oder None"""
+    gray = _to_gray(image)
+    found, corners = cv2.findChessboardCorners(
+        gray, pattern, cv2.CALIB_CB_ADAPTIVE_THRESH | cv2.CALIB_CB_NORMALIZE_IMAGE)
+    if not found:
+        return None
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+    corners = cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria)
+    return corners.reshape(-1, 2)
+
+
+def find_aruco_markers(image, dictionary=ARUCO_DICTIONARY):
+    """ArUco-Marker finden - {id: (4 x 2) Ecken im Uhrzeigersinn ab oben links}"""
+    aruco = cv2.aruco
+    marker_dict = aruco.getPredefinedDictionary(getattr(aruco, dictionary))
+    gray = _to_gray(image)
+    if hasattr(aruco, 'ArucoDetector'):
+        corners, ids, _ = aruco.ArucoDetector(marker_dict, aruco.DetectorParameters()).detectMarkers(gray)
+    else:
+        corners, ids, _ = aruco.detectMarkers(gray, marker_dict)
+    if ids is None:
+        return {}
+    return {int(marker_id): marker.reshape(4, 2) for marker_id, marker in zip(ids.flatten(), corners)}
+
+
+def board_ground_points(pattern=DEFAULT_PATTERN, square_size=DEFAULT_SQUARE_SIZE, origin=(0.0, 0.0), rotation=0.0):
+    """Bodenkoordinaten (cm) der Schachbrett-Ecken - origin ist die erste Ecke, rotation in Grad"""
+    cols, rows = pattern
+    grid = np.array([(col * square_size, row * square_size) for row in range(rows) for col in range(cols)])
+    angle = np.radians(rotation)
+    turn = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+    return (grid @ turn.T + np.asarray(origin, dtype=float)).astype(np.float32)
+
+
+class CameraCalibration:
+    """Kalibrierdaten, gecachte Entzerrungs-Tabellen und Pixel -> Boden-Transformation"""
+
+    def __init__(self, path=CALIBRATION_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.views = []                 # Schachbrett-Ecken für die Intrinsik-Kalibrierung
+        self.view_pattern = None
+        self.view_size = None
+        self._reset()
+        self.load()
+
+    def _reset(self):
+        width, height = DEFAULT_IMAGE_SIZE
+        self.image_size = DEFAULT_IMAGE_SIZE
+        # Grobe Lochkamera ohne Verzeichnung bis zur ersten Kalibrierung
+        self.camera_matrix = np.array([[width, 0, width / 2], [0, width, height / 2], [0, 0, 1]], dtype=np.float64)
+        self.dist_coeffs = np.zeros(5)
+        self.intrinsics_rms = None
+        self.homography = None
+        self.ground_error = None
+        self.calibrated_at = None
+        self._invalidate()
+
+    def _invalidate(self):
+        """Gecachte Tabellen verwerfen - nach jeder neuen Kalibrierung"""
+        self._undistort_maps = {}
+        self._ground_tables = {}
+        self._optimal_matrix = {}
+
+    # ===== SPEICHERN / LADEN =====
+    def load(self):
+        """Gespeicherte Kalibrierung übernehmen - False, wenn keine vorhanden"""
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        with self.lock:
+            self.image_size = tuple(data.get('image_size', DEFAULT_IMAGE_SIZE))
+            self.camera_matrix = np.array(data['camera_matrix'], dtype=np.float64)
+            self.dist_coeffs = np.array(data['dist_coeffs'], dtype=np.float64)
+            self.intrinsics_rms = data.get('intrinsics_rms')
+            homography = data.get('homography')
+            self.homography = np.array(homography, dtype=np.float64) if homography else None
+            self.ground_error = data.get('ground_error')
+            self.calibrated_at = data.get('calibrated_at')
+            self._invalidate()
+        return True
+
+    def save(self):
+        """Kalibrierung atomar speichern"""
+        data = {
+            'image_size': list(self.image_size),
+            'camera_matrix': self.camera_matrix.tolist(),
+            'dist_coeffs': self.dist_coeffs.flatten().tolist(),
+            'intrinsics_rms': self.intrinsics_rms,
+            'homography': self.homography.tolist() if self.homography is not None else None,
+            'ground_error': self.ground_error,
+            'calibrated_at': self.calibrated_at
+        }
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_file = self.path + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_file, self.path)
+            return True
+        except OSError as e:
+            print(f"⚠️  Kamerakalibrierung nicht gespeichert: {e}")
+            return False
+
+    # ===== KALIBRIEREN =====
+    def add_view(self, image, pattern=DEFAULT_PATTERN):
+        """Schachbrett-Aufnahme für die Intrinsik sammeln - True, wenn das Brett gefunden wurde"""
+        corners = find_checkerboard(image, pattern)
+        if corners is None:
+            return False
+
+        size = (image.shape[1], image.shape[0])
+        if self.view_pattern not in (None, tuple(pattern)) or self.view_size not in (None, size):
+            self.views = []             # Muster oder Auflösung gewechselt - neu sammeln
+        self.view_pattern = tuple(pattern)
+        self.view_size = size
+        self.views.append(corners)
+        return True
+
+    def calibrate_intrinsics(self, square_size=DEFAULT_SQUARE_SIZE):
+        """Kameramatrix und Verzeichnung aus den gesammelten Aufnahmen - RMS-Fehler in Pixeln"""
+        if len(self.views) < MIN_INTRINSIC_VIEWS:
+            raise ValueError(f"Mindestens {MIN_INTRINSIC_VIEWS} Aufnahmen nötig, vorhanden: {len(self.views)}")
+
+        board = np.zeros((len(self.views[0]), 3), np.float32)
+        board[:, :2] = board_ground_points(self.view_pattern, square_size)
+        rms, matrix, dist, _, _ = cv2.calibrateCamera(
+            [board] * len(self.views), [v.reshape(-1, 1, 2) for v in self.views], self.view_size, None, None)
+
+        with self.lock:
+            self.image_size = self.view_size
+            self.camera_matrix = matrix
+            self.dist_coeffs = dist.flatten()
+            self.intrinsics_rms = round(float(rms), 4)
+            # Bodenebene passt nicht mehr zur neuen Intrinsik
+            self.homography = None
+            self.ground_error = None
+            self.calibrated_at = time.time()
+            self._invalidate()
+        self.views = []
+        self.save()
+        return self.intrinsics_rms
+
+    def _fit_ground(self, pixels, ground, image_size):
+        """Homographie entzerrte Pixel -> Boden (cm) schätzen - mittlerer Restfehler in cm"""
+        if len(pixels) < 4:
+            raise ValueError("Mindestens 4 Bodenpunkte nötig")
+        if tuple(image_size) != tuple(self.image_size):
+            raise ValueError(f"Bildgröße {tuple(image_size)} passt nicht zur Intrinsik {tuple(self.image_size)}")
+
+        undistorted = cv2.undistortPoints(np.asarray(pixels, np.float64).reshape(-1, 1, 2),
+                                          self.camera_matrix, self.dist_coeffs, P=self.camera_matrix)
+        homography, _ = cv2.findHomography(undistorted, np.asarray(ground, np.float64).reshape(-1, 1, 2))
+        if homography is None:
+            raise ValueError("Homographie nicht bestimmbar - Punkte liegen auf einer Linie")
+
+        projected = cv2.perspectiveTransform(undistorted, homography).reshape(-1, 2)
+        error = float(np.linalg.norm(projected - np.asarray(ground).reshape(-1, 2), axis=1).mean())
+
+        with self.lock:
+            self.homography = homography
+            self.ground_error = round(error, 4)
+            self.calibrated_at = time.time()
+            self._ground_tables = {}
+        self.save()
+        return self.ground_error
+
+    def calibrate_ground(self, image, pattern=DEFAULT_PATTERN, square_size=DEFAULT_SQUARE_SIZE,
+                         origin=(0.0, 0.0), rotation=0.0):
+        """Bodenebene aus einem flach liegenden Schachbrett - origin/rotation: Lage der ersten Ecke (cm, Grad)"""
+        corners = find_checkerboard(image, pattern)
+        if corners is None:
+            raise ValueError("Schachbrett nicht gefunden")
+        ground = board_ground_points(pattern, square_size, origin, rotation)
+        return self._fit_ground(corners, ground, (image.shape[1], image.shape[0]))
+
+    def calibrate_ground_aruco(self, image, markers, marker_size, dictionary=ARUCO_DICTIONARY):
+        """Bodenebene aus ArUco-Markern - markers: {id: (x, y)} Mittelpunkt in cm, Kanten an den Achsen"""
+        found = find_aruco_markers(image, dictionary)
+        half = marker_size / 2.0
+        # Ecken oben links, oben rechts, unten rechts, unten links - "oben" zeigt in +x
+        offsets = np.array([(half, half), (half, -half), (-half, -half), (-half, half)])
+
+        pixels, ground = [], []
+        for marker_id, center in markers.items():
+            if int(marker_id) in found:
+                pixels.extend(found[int(marker_id)])
+                ground.extend(np.asarray(center, dtype=float) + offsets)
+        if not pixels:
+            raise ValueError("Keine der angegebenen ArUco-Marker gefunden")
+        return self._fit_ground(np.array(pixels), np.array(ground), (image.shape[1], image.shape[0]))
+
+    # ===== GECACHTE TABELLEN =====
+    def _scaled_matrix(self, size):
+        """Kameramatrix für eine andere Auflösung (gleiches Seitenverhältnis)"""
+        scale_x = size[0] / self.image_size[0]
+        scale_y = size[1] / self.image_size[1]
+        matrix = self.camera_matrix.copy()
+        matrix[0] *= scale_x
+        matrix[1] *= scale_y
+        return matrix
+
+    def get_undistort_maps(self, size=None):
+        """initUndistortRectifyMap-Tabellen pro Bildgröße - einmal berechnet, danach aus dem Cache"""
+        size = tuple(size or self.image_size)
+        maps = self._undistort_maps.get(size)
+        if maps is None:
+            with self.lock:
+                matrix = self._scaled_matrix(size)
+                maps = cv2.initUndistortRectifyMap(matrix, self.dist_coeffs, None, matrix, size, cv2.CV_16SC2)
+                self._undistort_maps[size] = maps
+        return maps
+
+    def undistort(self, frame):
+        """Frame entzerren - ein remap() mit gecachten Tabellen"""
+        map1, map2 = self.get_undistort_maps((frame.shape[1], frame.shape[0]))
+        return cv2.remap(frame, map1, map2, cv2.INTER_LINEAR)
+
+    @property
+    def ground_calibrated(self):
+        return self.homography is not None
+
+    def get_ground_table(self, size=None):
+        """Boden-Koordinate (cm) für jedes Pixel - (H x W x 2) float32, gecacht pro Bildgröße"""
+        if self.homography is None:
+            return None
+        size = tuple(size or self.image_size)
+        table = self._ground_tables.get(size)
+        if table is None:
+            width, height = size
+            xs, ys = np.meshgrid(np.arange(width, dtype=np.float64), np.arange(height, dtype=np.float64))
+            pixels = np.stack([xs, ys], axis=-1).reshape(-1, 1, 2)
+            table = self._exact_ground(pixels, size).reshape(height, width, 2).astype(np.float32)
+            with self.lock:
+                self._ground_tables[size] = table
+        return table
+
+    # ===== PUNKT-TRANSFORMATIONEN =====
+    def _exact_ground(self, pixels, size):
+        matrix = self._scaled_matrix(size)
+        undistorted = cv2.undistortPoints(np.asarray(pixels, np.float64).reshape(-1, 1, 2),
+                                          matrix, self.dist_coeffs, P=self.camera_matrix)
+        return cv2.perspectiveTransform(undistorted, self.homography).reshape(-1, 2)
+
+    def undistort_points(self, pixels, size=None):
+        """Pixel (N x 2) -> entzerrte Pixel (N x 2) in einem Aufruf"""
+        size = tuple(size or self.image_size)
+        matrix = self._scaled_matrix(size)
+        points = np.asarray(pixels, np.float64).reshape(-1, 1, 2)
+        return cv2.undistortPoints(points, matrix, self.dist_coeffs, P=matrix).reshape(-1, 2)
+
+    def pixels_to_ground(self, pixels, size=None, exact=False):
+        """Pixel (N x 2) -> Boden (N x 2, cm) - Tabellen-Lookup, exact=True rechnet subpixelgenau"""
+        if self.homography is None:
+            raise ValueError("Bodenebene nicht kalibriert")
+        size = tuple(size or self.image_size)
+        pixels = np.asarray(pixels, dtype=np.float64).reshape(-1, 2)
+        if exact:
+            return self._exact_ground(pixels, size)
+
+        table = self.get_ground_table(size)
+        cols = np.clip(np.rint(pixels[:, 0]).astype(int), 0, size[0] - 1)
+        rows = np.clip(np.rint(pixels[:, 1]).astype(int), 0, size[1] - 1)
+        return table[rows, cols].astype(np.float64)
+
+    def ground_to_pixels(self, points, size=None):
+        """Boden (N x 2, cm) -> Pixel (N x 2) inkl. Verzeichnung - z.B. für Overlays"""
+        if self.homography is None:
+            raise ValueError("Bodenebene nicht kalibriert")
+        size = tuple(size or self.image_size)
+        ground = np.asarray(points, np.float64).reshape(-1, 1, 2)
+        ideal = cv2.perspectiveTransform(ground, np.linalg.inv(self.homography)).reshape(-1, 2)
+
+        # Ideale Pixel -> normierte Strahlen -> mit Verzeichnung projizieren
+        normalized = cv2.undistortPoints(ideal.reshape(-1, 1, 2), self.camera_matrix, None)
+        rays = np.concatenate([normalized.reshape(-1, 2), np.ones((len(ideal), 1))], axis=1)
+        projected, _ = cv2.projectPoints(rays, np.zeros(3), np.zeros(3),
+                                         self._scaled_matrix(size), self.dist_coeffs)
+        return projected.reshape(-1, 2)
+
+    def detections_to_ground(self, detections, size=None):
+        """Boden-Koordinaten an alle Detektionen hängen (detection['ground'] = {'x', 'y'}) - ein Batch"""
+        if self.homography is None or not detections:
+            return detections
+        centers = [(d['center']['x'], d['center']['y']) for d in detections]
+        for detection, (x, y) in zip(detections, self.pixels_to_ground(centers, size)):
+            detection['ground'] = {'x': round(float(x), 2), 'y': round(float(y), 2)}
+        return detections
+
+    def get_status(self):
+        return {
+            'file': self.path,
+            'image_size': list(self.image_size),
+            'intrinsics_calibrated': self.intrinsics_rms is not None,
+            'intrinsics_rms': self.intrinsics_rms,
+            'ground_calibrated': self.ground_calibrated,
+            'ground_error_cm': self.ground_error,
+            'calibrated_at': self.calibrated_at,
+            'collected_views': len(self.views),
+            'min_views': MIN_INTRINSIC_VIEWS,
+            'cached_sizes': [list(size) for size in self._undistort_maps]
+        }
+
+
+# Globale Instanz - erst beim ersten Zugriff erzeugt (hardware/registry.py)
+def __getattr__(name):
+    if name == 'camera_calibration':
+        from hardware.registry import hardware_registry
+        return hardware_registry.get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,230 @@
+# hardware/coordinates.py
+"""
+Koordinaten-System und inverse Kinematik für den Unkraut-2025 Roboterarm
+Bodenpunkt (x, y) in cm relativ zum Arm-Fuß -> Servo-Winkel für base/shoulder/elbow/wrist.
+x zeigt in Fahrtrichtung, y nach links, das Werkzeug steht senkrecht auf dem Boden.
+
+Der Fuß dreht analytisch (atan2); shoulder/elbow/wrist hängen dann nur noch vom
+radialen Abstand r und der Werkzeughöhe h ab. Dafür liegt eine dichte Tabelle
+über (r, h) vor, bilinear interpoliert - ein Solve kostet wenige Mikrosekunden.
+Tabellenzellen am Rand des Arbeitsraums fallen auf den analytischen Solver zurück.
+"""
+import math
+
+import numpy as np
+
+# Arm-Geometrie in cm
+ARM_GEOMETRY = {
+    'shoulder_height': 20.0,   # Schulterachse über dem Boden
+    'shoulder_offset': 3.0,    # Schulterachse vor der Drehachse des Fußes
+    'upper_arm': 18.0,         # Schulter -> Ellbogen
+    'forearm': 16.0,           # Ellbogen -> Handgelenk
+    'tool': 10.0               # Handgelenk -> Werkzeugspitze
+}
+
+# Servo-Konvention (Servo-Winkel in Grad):
+#   base:     90 = geradeaus, größer = nach links
+#   shoulder: Oberarm-Elevation über der Horizontalen (90 = senkrecht)
+#   elbow:    180 - Beugung (90 = Unterarm rechtwinklig zum Oberarm)
+#   wrist:    90 + Winkel zwischen Unterarm-Verlängerung und Werkzeug
+IK_JOINTS = ('base', 'shoulder', 'elbow', 'wrist')
+
+# Lage der Arm-Basis im Fahrzeug (m, x vorwärts, y links)
+ARM_MOUNT_M = (0.25, 0.0)
+
+TABLE_R_STEP = 0.2             # cm
+TABLE_H_STEP = 1.0             # cm
+TABLE_MAX_HEIGHT = 15.0        # Anfahrhöhen über dem Boden
+
+
+def arm_to_world(pose, x_cm, y_cm):
+    """Punkt im Arm-Rahmen (cm) -> Weltrahmen der Odometrie (m)"""
+    px = ARM_MOUNT_M[0] + x_cm / 100.0
+    py = ARM_MOUNT_M[1] + y_cm / 100.0
+    c, s = math.cos(pose['heading']), math.sin(pose['heading'])
+    return pose['x'] + c * px - s * py, pose['y'] + s * px + c * py
+
+
+def world_to_arm(pose, wx, wy):
+    """Weltpunkt (m) -> Arm-Rahmen (cm) bei der gegebenen Fahrzeug-Pose"""
+    dx, dy = wx - pose['x'], wy - pose['y']
+    c, s = math.cos(pose['heading']), math.sin(pose['heading'])
+    return (c * dx + s * dy - ARM_MOUNT_M[0]) * 100.0, (-s * dx + c * dy - ARM_MOUNT_M[1]) * 100.0
+
+
+class ArmKinematics:
+    """Inverse Kinematik mit Lookup-Tabelle und analytischem Rückfall"""
+
+    def __init__(self, limits=None, geometry=None):
+        self.geometry = dict(ARM_GEOMETRY, **(geometry or {}))
+        self.limits = {joint: (0.0, 180.0) for joint in IK_JOINTS}
+        for joint, (low, high) in (limits or {}).items():
+            if joint in self.limits:
+                self.limits[joint] = (float(low), float(high))
+
+        geometry = self.geometry
+        self.max_reach = geometry['shoulder_offset'] + geometry['upper_arm'] + geometry['forearm']
+        self.stats = {'table': 0, 'analytic': 0, 'unreachable': 0}
+        self._build_table()
+
+    # ===== ANALYTISCH =====
+    def _solve_planar(self, r, h, elbow_up=True):
+        """shoulder/elbow/wrist für radialen Abstand r und Werkzeughöhe h - numpy-fähig, NaN wenn unerreichbar"""
+        g = self.geometry
+        l1, l2 = g['upper_arm'], g['forearm']
+
+        # Handgelenk senkrecht über der Werkzeugspitze
+        dx = np.asarray(r, dtype=float) - g['shoulder_offset']
+        dz = np.asarray(h, dtype=float) + g['tool'] - g['shoulder_height']
+
+        cos_bend = (dx * dx + dz * dz - l1 * l1 - l2 * l2) / (2 * l1 * l2)
+        with np.errstate(invalid='ignore'):
+            bend = np.arccos(np.where(np.abs(cos_bend) <= 1.0, cos_bend, np.nan))
+        if not elbow_up:
+            bend = -bend
+
+        elevation = np.arctan2(dz, dx) + np.arctan2(l2 * np.sin(bend), l1 + l2 * np.cos(bend))
+        forearm = elevation - bend
+        # Werkzeug zeigt senkrecht nach unten: forearm + wrist = -90°
+        wrist = -math.pi / 2 - forearm
+
+        return np.degrees(elevation), 180.0 - np.degrees(bend), 90.0 + np.degrees(wrist)
+
+    def _within_limits(self, shoulder, elbow, wrist):
+        ok = np.isfinite(shoulder) & np.isfinite(elbow) & np.isfinite(wrist)
+        for joint, values in (('shoulder', shoulder), ('elbow', elbow), ('wrist', wrist)):
+            low, high = self.limits[joint]
+            with np.errstate(invalid='ignore'):
+                ok &= (values >= low - 1e-9) & (values <= high + 1e-9)
+        return ok
+
+    def _solve_analytic(self, r, h):
+        """Ellbogen oben bevorzugt, sonst unten - jeweils nur innerhalb der Gelenkgrenzen"""
+        for elbow_up in (True, False):
+            angles = self._solve_planar(r, h, elbow_up)
+            if self._within_limits(*angles):
+                return tuple(float(value) for value in angles)
+        return None
+
+    # ===== TABELLE =====
+    def _build_table(self):
+        """Gelenkwinkel über dem (r, h)-Raster vorberechnen - unerreichbare Zellen sind NaN"""
+        self.r_values = np.arange(0.0, self.max_reach + TABLE_R_STEP, TABLE_R_STEP)
+        self.h_values = np.arange(0.0, TABLE_MAX_HEIGHT + TABLE_H_STEP, TABLE_H_STEP)
+        r_grid, h_grid = np.meshgrid(self.r_values, self.h_values, indexing='ij')
+
+        table = np.full(r_grid.shape + (3,), np.nan)
+        for elbow_up in (False, True):
+            angles = self._solve_planar(r_grid, h_grid, elbow_up)
+            valid = self._within_limits(*angles)
+            for index, values in enumerate(angles):
+                table[..., index] = np.where(valid, values, table[..., index])
+        self.table = table
+
+        # Listen statt numpy für Einzelabfragen - skalare Indizierung ist so deutlich schneller
+        self._rows = table.tolist()
+        self.reachable_cells = int(np.isfinite(table[..., 0]).sum())
+
+    def _lookup(self, r, h):
+        """Bilineare Interpolation - None, wenn eine Ecke der Zelle unerreichbar ist"""
+        fr = r / TABLE_R_STEP
+        fh = h / TABLE_H_STEP
+        i = int(fr)
+        j = int(fh)
+        if i < 0 or j < 0 or i + 1 >= len(self._rows) or j + 1 >= len(self.h_values):
+            return None
+        tr = fr - i
+        th = fh - j
+        rows = self._rows
+        c00, c01, c10, c11 = rows[i][j], rows[i][j + 1], rows[i + 1][j], rows[i + 1][j + 1]
+
+        result = []
+        for k in range(3):
+            value = ((c00[k] * (1 - th) + c01[k] * th) * (1 - tr) +
+                     (c10[k] * (1 - th) + c11[k] * th) * tr)
+            if value != value:  # NaN - Zelle am Rand des Arbeitsraums
+                return None
+            result.append(value)
+        return result
+
+    # ===== ÖFFENTLICH =====
+    def _base_angle(self, x, y):
+        base = 90.0 + math.degrees(math.atan2(y, x))
+        low, high = self.limits['base']
+        return base if low <= base <= high else None
+
+    def solve(self, x, y, height=0.0):
+        """Bodenpunkt (cm) -> {'base', 'shoulder', 'elbow', 'wrist'} oder None, wenn unerreichbar"""
+        base = self._base_angle(x, y)
+        r = math.hypot(x, y)
+        if base is None or r > self.max_reach:
+            self.stats['unreachable'] += 1
+            return None
+
+        angles = self._lookup(r, height)
+        if angles is not None:
+            self.stats['table'] += 1
+        else:
+            angles = self._solve_analytic(r, height)
+            if angles is None:
+                self.stats['unreachable'] += 1
+                return None
+            self.stats['analytic'] += 1
+
+        shoulder, elbow, wrist = angles
+        return {'base': round(base, 2), 'shoulder': round(shoulder, 2),
+                'elbow': round(elbow, 2), 'wrist': round(wrist, 2)}
+
+    def solve_many(self, points, height=0.0):
+        """Viele Bodenpunkte auf einmal (N x 2, cm) -> (N x 4)-Array, unerreichbare Zeilen NaN"""
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        x, y = points[:, 0], points[:, 1]
+        r = np.hypot(x, y)
+        base = 90.0 + np.degrees(np.arctan2(y, x))
+
+        # Bilinear im Raster, vektorisiert
+        fr = r / TABLE_R_STEP
+        fh = np.full_like(r, height / TABLE_H_STEP)
+        i = np.clip(fr.astype(int), 0, len(self.r_values) - 2)
+        j = np.clip(fh.astype(int), 0, len(self.h_values) - 2)
+        tr = (fr - i)[:, None]
+        th = (fh - j)[:, None]
+        table = self.table
+        planar = ((table[i, j] * (1 - th) + table[i, j + 1] * th) * (1 - tr) +
+                  (table[i + 1, j] * (1 - th) + table[i + 1, j + 1] * th) * tr)
+
+        result = np.column_stack([base, planar])
+        low, high = self.limits['base']
+        outside = (r > self.max_reach) | (base < low) | (base > high) | (fr >= len(self.r_values) - 1)
+        result[outside] = np.nan
+
+        # Randzellen analytisch nachrechnen
+        for index in np.flatnonzero(~outside & np.isnan(result[:, 1])):
+            angles = self._solve_analytic(r[index], height)
+            if angles is not None:
+                result[index, 1:] = angles
+        return result
+
+    def forward(self, angles):
+        """Servo-Winkel -> Werkzeugspitze (x, y, z) in cm - zur Kontrolle der IK"""
+        g = self.geometry
+        yaw = math.radians(angles['base'] - 90.0)
+        elevation = math.radians(angles['shoulder'])
+        forearm = elevation - math.radians(180.0 - angles['elbow'])
+        tool = forearm + math.radians(angles['wrist'] - 90.0)
+
+        r = (g['shoulder_offset'] + g['upper_arm'] * math.cos(elevation) +
+             g['forearm'] * math.cos(forearm) + g['tool'] * math.cos(tool))
+        z = (g['shoulder_height'] + g['upper_arm'] * math.sin(elevation) +
+             g['forearm'] * math.sin(forearm) + g['tool'] * math.sin(tool))
+        return r * math.cos(yaw), r * math.sin(yaw), z
+
+    def get_workspace(self):
+        """Erreichbarer Bodenring (Werkzeughöhe 0) in cm"""
+        reachable = self.r_values[np.isfinite(self.table[:, 0, 0])]
+        return {
+            'min_radius': round(float(reachable.min()), 1) if len(reachable) else None,
+            'max_radius': round(float(reachable.max()), 1) if len(reachable) else None,
+            'base_limits': self.limits['base'],
+            'reachable_cells': self.reachable_cells
+        }
@@ -13,9 +13,29 @@ MOTOR_ENABLE_RIGHT = 13
 # Sensor Pins
 ULTRASONIC_TRIGGER = 23
 ULTRASONIC_ECHO = 24
+
+# HC-SR04 Ultraschall-Sensoren (ECHO über Spannungsteiler 5V -> 3,3V!)
+ULTRASONIC_SENSORS = {
+    'front': {'trigger': ULTRASONIC_TRIGGER, 'echo': ULTRASONIC_ECHO},
+    'left': {'trigger': 22, 'echo': 10},
+    'right': {'trigger': 9, 'echo': 11},
+    'back': {'trigger': 8, 'echo': 7}
+}
 SOIL_MOISTURE_PIN = 25
 TEMPERATURE_PIN = 4
 
+# Rad-Encoder - Kanal A löst aus, Kanal B gibt die Richtung
+# Rechts auf GPIO14/15 (UART): serielle Konsole in raspi-config abschalten!
+ENCODER_LEFT_A = 5
+ENCODER_LEFT_B = 6
+ENCODER_RIGHT_A = 14
+ENCODER_RIGHT_B = 15
+
+ENCODER_PINS = {
+    'left_motor': {'a': ENCODER_LEFT_A, 'b': ENCODER_LEFT_B},
+    'right_motor': {'a': ENCODER_RIGHT_A, 'b': ENCODER_RIGHT_B}
+}
+
 # LED/Status Pins
 STATUS_LED_GREEN = 16
 STATUS_LED_RED = 17
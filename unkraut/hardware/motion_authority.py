@@ -0,0 +1,128 @@
+# hardware/motion_authority.py
+"""
+Zentrale Bewegungsfreigabe für Unkraut-2025
+Arm, Servos und Fahrmotoren fragen vor jedem Befehl und jedem Regeltakt hier nach.
+Der Notaus hält alle angemeldeten Aktoren synchron an (laufende und wartende
+Bewegungen werden verworfen) und bleibt aktiv, bis reset() ausdrücklich aufgerufen
+wird - kein Timer gibt die Antriebe von selbst wieder frei.
+"""
+import time
+import threading
+import weakref
+from collections import deque
+
+LATENCY_WINDOW = 50
+
+
+class MotionAuthority:
+    """Notaus-Verriegelung und Anhalten aller angemeldeten Aktoren"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._actuators = weakref.WeakKeyDictionary()   # Aktor -> Name, Aktor braucht halt()
+        self._listeners = []
+        self.epoch = 0              # zählt jeden Notaus - Sequenzen erkennen daran Unterbrechungen
+        self.reason = None
+        self.stopped_at = None
+        self.stop_latencies = deque(maxlen=LATENCY_WINDOW)
+        self.stats = {'emergency_stops': 0, 'resets': 0, 'rejected': 0}
+
+    # ===== ANMELDUNG =====
+    def register(self, name, actuator):
+        """Aktor anmelden - halt() muss laufende und wartende Bewegungen sofort verwerfen"""
+        with self.lock:
+            self._actuators[actuator] = name
+
+    def unregister(self, actuator):
+        with self.lock:
+            self._actuators.pop(actuator, None)
+
+    def add_listener(self, callback):
+        """callback(reason) nach dem Anhalten aller Aktoren (z.B. Pipeline stoppen)"""
+        with self.lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self.lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    # ===== FREIGABE =====
+    @property
+    def stopped(self):
+        return self._stopped.is_set()
+
+    def allows(self):
+        """Darf ein neuer Befehl starten?"""
+        if self._stopped.is_set():
+            self.stats['rejected'] += 1
+            return False
+        return True
+
+    def emergency_stop(self, reason='manual'):
+        """Verriegeln und alle Aktoren anhalten - kehrt erst zurück, wenn nichts mehr fährt"""
+        started = time.monotonic()
+        with self.lock:
+            # Erst verriegeln: jeder Regeltakt ab jetzt schreibt nichts mehr
+            self._stopped.set()
+            self.epoch += 1
+            self.reason = reason
+            self.stopped_at = time.time()
+            self.stats['emergency_stops'] += 1
+            actuators = list(self._actuators.items())
+            listeners = list(self._listeners)
+
+        halted = []
+        for actuator, name in actuators:
+            try:
+                actuator.halt()
+                halted.append(name)
+            except Exception as e:
+                print(f"⚠️ Notaus {name} fehlgeschlagen: {e}")
+        latency_ms = (time.monotonic() - started) * 1000
+        self.stop_latencies.append(latency_ms)
+
+        for callback in listeners:
+            try:
+                callback(reason)
+            except Exception as e:
+                print(f"⚠️ Notaus-Listener fehlgeschlagen: {e}")
+
+        print(f"🚨 NOTAUS ({reason}) - angehalten: {', '.join(halted) or 'keine Aktoren'}")
+        return {'status': 'emergency_stop_activated', 'reason': reason, 'halted': halted,
+                'latency_ms': round(latency_ms, 2)}
+
+    def reset(self):
+        """Notaus aufheben - nur ausdrücklich, Bewegungen starten danach nicht von selbst"""
+        if not self._stopped.is_set():
+            return {'status': 'not_stopped'}
+        with self.lock:
+            self._stopped.clear()
+            self.reason = None
+            self.stopped_at = None
+            self.stats['resets'] += 1
+        print("✅ Notaus zurückgesetzt")
+        return {'status': 'emergency_reset'}
+
+    def get_status(self):
+        with self.lock:
+            actuators = sorted(self._actuators.values())
+        latencies = list(self.stop_latencies)
+        return {
+            'emergency_stopped': self.stopped,
+            'reason': self.reason,
+            'stopped_at': self.stopped_at,
+            'epoch': self.epoch,
+            'actuators': actuators,
+            'stop_latency_ms': {
+                'last': round(latencies[-1], 2) if latencies else None,
+                'max': round(max(latencies), 2) if latencies else None
+            },
+            'stats': dict(self.stats)
+        }
+
+
+# Eine Instanz für den ganzen Prozess - reine Python-Logik, keine Hardware
+motion_authority = MotionAuthority()
@@ -2,17 +2,76 @@
 """
 Motor-Controller für Unkraut-2025 Fahrzeug
 Unterstützt GPIO-Motoren mit Mock-Fallback
+
+Ein Regel-Thread mit fester Frequenz (100 Hz) ist der einzige Schreiber der
+Motor-Ausgänge: er führt die Geschwindigkeit beider Seiten mit Beschleunigungs-
+und Ruck-Begrenzung an das Ziel heran, wendet die Kalibrierfaktoren an und
+schreibt nur geänderte GPIO-Werte.
 """
+import math
 import time
 import threading
+from collections import deque
+
+from hardware.motion_authority import motion_authority
+
+# Fahrtrichtungen -> (linear, angular) in % der Maximalgeschwindigkeit
+DIRECTION_VECTORS = {
+    'forward': (1, 0),
+    'backward': (-1, 0),
+    'left': (0, 1),
+    'right': (0, -1)
+}
 
 class MotorController:
-    def __init__(self):
+    def __init__(self, authority=None):
         self.gpio_available = False
         self.is_moving = False
         self.current_direction = None
         self.current_speed = 0
-        self.emergency_stopped = False
+        self.authority = authority or motion_authority   # Notaus für Arm, Servos und Motoren
+        
+        # Kalibrierung für Geradeausfahrt (set_motor_calibration)
+        self.left_motor_factor = 1.0
+        self.right_motor_factor = 1.0
+        
+        # Regelschleife
+        self.control_hz = 100
+        self.max_accel = 300.0       # %/s - Beschleunigung pro Seite
+        self.max_jerk = 3000.0       # %/s³ - Änderung der Beschleunigung
+        self.stop_decel = 1000.0     # %/s - Abbremsen nach Ablauf des Watchdogs
+        self.deadman_timeout = 0.3   # Mindest-Deadline für Befehle mit duration > 0
+        
+        # Befehlsübergabe: move()/drive() hinterlegen nur das neueste Ziel
+        # und verlängern die Deadline, die Regelschleife übernimmt es beim nächsten Tick
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending = None          # Neuestes, noch nicht übernommenes Ziel
+        self._deadline = None         # Monotone Deadline, None = ohne Watchdog
+        self._stop_generation = 0     # stop() zählt hoch - ein vorher übernommenes Ziel verfällt
+        self._control_thread = None
+        
+        # Zustand der Regelung pro Seite (% Tastverhältnis, Vorzeichen = Richtung)
+        self.target = {'left_motor': 0.0, 'right_motor': 0.0}
+        self.velocity = {'left_motor': 0.0, 'right_motor': 0.0}
+        self.accel = {'left_motor': 0.0, 'right_motor': 0.0}
+        self._braking = False
+        
+        # Zuletzt geschriebene Ausgänge - nur Änderungen gehen an GPIO
+        self._outputs = {'left_motor': ('stop', 0.0), 'right_motor': ('stop', 0.0)}
+        
+        self.control_stats = {
+            'commands': 0,
+            'applied': 0,
+            'coalesced': 0,
+            'watchdog_stops': 0,
+            'gpio_writes': 0,
+            'last_latency_ms': None,
+            'max_latency_ms': 0.0
+        }
+        self._tick_periods = deque(maxlen=500)
+        self._tick_overruns = 0
         
         # Motor-Pin-Konfiguration (Beispiel für L298N)
         self.motor_pins = {
@@ -29,6 +88,12 @@ class MotorController:
         }
         
         self.init_hardware()
+        self.authority.register('motor_controller', self)
+    
+    @property
+    def emergency_stopped(self):
+        """Notaus aktiv? Gilt bis zum ausdrücklichen reset_emergency()"""
+        return self.authority.stopped
     
     def init_hardware(self):
         """GPIO Hardware initialisieren"""
@@ -50,7 +115,7 @@ class MotorController:
             
             self.gpio_available = True
             print("✅ Motor-Hardware initialisiert (GPIO)")
-            
+        
         except ImportError:
             print("⚠️ RPi.GPIO nicht verfügbar")
             self._init_mock_mode()
@@ -63,9 +128,14 @@ class MotorController:
         self.gpio_available = False
         print("🔧 Motor Mock-Modus aktiviert")
     
+    # ===== BEFEHLE =====
     def move(self, direction, speed=50, duration=0.1):
-        """Fahrzeug bewegen"""
-        if self.emergency_stopped:
+        """Fahrzeug in eine der vier Richtungen bewegen
+        
+        duration > 0: Deadman-Zeit, ohne neuen Befehl stoppt der Watchdog danach
+        duration = 0: Bewegung hält bis stop()
+        """
+        if not self.authority.allows():
             return {'error': 'Emergency stop active'}
         
         # Parameter validieren
@@ -75,18 +145,11 @@ class MotorController:
         if direction not in ['forward', 'backward', 'left', 'right', 'stop']:
             return {'error': f'Invalid direction: {direction}'}
         
-        self.current_direction = direction
-        self.current_speed = speed
-        self.is_moving = direction != 'stop'
-        
-        if self.gpio_available:
-            self._move_hardware(direction, speed)
-        else:
-            self._move_mock(direction, speed)
+        if direction == 'stop':
+            return self.stop()
         
-        # Automatisch stoppen nach duration
-        if duration > 0 and direction != 'stop':
-            threading.Timer(duration, self.stop).start()
+        linear, angular = DIRECTION_VECTORS[direction]
+        self._submit(direction, speed, linear * speed, angular * speed, duration)
         
         return {
             'status': 'success',
@@ -96,45 +159,200 @@ class MotorController:
             'hardware': self.gpio_available
         }
     
-    def _move_hardware(self, direction, speed):
-        """Hardware-Bewegung"""
-        try:
-            import RPi.GPIO as GPIO
+    def drive(self, linear, angular=0, duration=0.1):
+        """Differenzial-Antrieb: linear und angular in % (-100..100)
+        
+        Positive angular-Werte drehen nach links. Übersteigt eine Seite 100%,
+        werden beide Seiten gemeinsam skaliert - die Kurve bleibt erhalten.
+        """
+        if not self.authority.allows():
+            return {'error': 'Emergency stop active'}
+        
+        linear = max(-100.0, min(100.0, float(linear)))
+        angular = max(-100.0, min(100.0, float(angular)))
+        speed = round(max(abs(linear), abs(angular)))
+        self._submit('drive', speed, linear, angular, duration)
+        
+        left, right = self._mix(linear, angular)
+        return {
+            'status': 'success',
+            'linear': linear,
+            'angular': angular,
+            'left': round(left, 1),
+            'right': round(right, 1),
+            'duration': duration,
+            'hardware': self.gpio_available
+        }
+    
+    @staticmethod
+    def _mix(linear, angular):
+        """(linear, angular) -> (links, rechts) in %, gemeinsam auf ±100 begrenzt"""
+        left = linear - angular
+        right = linear + angular
+        scale = max(1.0, abs(left) / 100.0, abs(right) / 100.0)
+        return left / scale, right / scale
+    
+    def _submit(self, direction, speed, linear, angular, duration):
+        """Neuestes Ziel hinterlegen und Deadline verlängern"""
+        now = time.monotonic()
+        with self._lock:
+            # Noch nicht übernommenes Ziel wird ersetzt (Coalescing)
+            if self._pending is not None:
+                self.control_stats['coalesced'] += 1
+            self._pending = (direction, speed, linear, angular, now)
+            self._deadline = now + max(duration, self.deadman_timeout) if duration > 0 else None
+            self.control_stats['commands'] += 1
             
-            # PWM-Wert berechnen (0-100%)
-            pwm_value = speed
+            self.current_direction = direction
+            self.current_speed = speed
+            self.is_moving = True
+        
+        self._ensure_control_thread()
+        self._wakeup.set()
+    
+    def _ensure_control_thread(self):
+        """Regel-Thread einmalig starten"""
+        if self._control_thread is None or not self._control_thread.is_alive():
+            with self._lock:
+                if self._control_thread is None or not self._control_thread.is_alive():
+                    self._control_thread = threading.Thread(target=self._control_loop, daemon=True)
+                    self._control_thread.start()
+    
+    # ===== REGELSCHLEIFE =====
+    def _control_loop(self):
+        """Fester Takt solange sich etwas bewegt, sonst Schlaf bis zum nächsten Befehl"""
+        period = 1.0 / self.control_hz
+        next_tick = time.monotonic()
+        last_tick = None
+        
+        while True:
+            if self._is_idle():
+                self._wakeup.wait()
+                self._wakeup.clear()
+                next_tick = time.monotonic()
+                last_tick = None
             
-            if direction == 'forward':
-                self._set_motor_direction('left_motor', 'forward')
-                self._set_motor_direction('right_motor', 'forward')
-                self._set_motor_speed('left_motor', pwm_value)
-                self._set_motor_speed('right_motor', pwm_value)
-                
-            elif direction == 'backward':
-                self._set_motor_direction('left_motor', 'backward')
-                self._set_motor_direction('right_motor', 'backward')
-                self._set_motor_speed('left_motor', pwm_value)
-                self._set_motor_speed('right_motor', pwm_value)
-                
-            elif direction == 'left':
-                self._set_motor_direction('left_motor', 'backward')
-                self._set_motor_direction('right_motor', 'forward')
-                self._set_motor_speed('left_motor', pwm_value)
-                self._set_motor_speed('right_motor', pwm_value)
-                
-            elif direction == 'right':
-                self._set_motor_direction('left_motor', 'forward')
-                self._set_motor_direction('right_motor', 'backward')
-                self._set_motor_speed('left_motor', pwm_value)
-                self._set_motor_speed('right_motor', pwm_value)
+            now = time.monotonic()
+            if last_tick is not None:
+                self._tick_periods.append(now - last_tick)
+            last_tick = now
+            
+            self._tick(period, now)
+            
+            next_tick += period
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Takt verpasst - neu aufsetzen statt nachzuholen
+                self._tick_overruns += 1
+                next_tick = time.monotonic()
+    
+    def _is_idle(self):
+        with self._lock:
+            if self._pending is not None or self._deadline is not None:
+                return False
+        return all(self.target[m] == 0 and self.velocity[m] == 0 and self.accel[m] == 0
+                   for m in self.target)
+    
+    def _tick(self, dt, now):
+        """Ein Regelschritt: Ziel übernehmen, Watchdog prüfen, Rampe, Ausgänge schreiben"""
+        with self._lock:
+            command = self._pending
+            self._pending = None
+            expired = self._deadline is not None and now >= self._deadline
+            if expired:
+                self._deadline = None
+            generation = self._stop_generation
+        
+        with self._io_lock:
+            # stop() zwischen Übernahme und Ausgabe: das Ziel ist verworfen,
+            # sonst führe es ohne Deadline (Watchdog) weiter
+            if self.emergency_stopped or generation != self._stop_generation:
+                return
+            
+            if command is not None and not expired:
+                direction, speed, linear, angular, issued_at = command
+                left, right = self._mix(linear, angular)
+                if (left, right) != (self.target['left_motor'], self.target['right_motor']):
+                    self.control_stats['applied'] += 1
+                    if not self.gpio_available:
+                        print(f"🔧 Mock: {direction} @ {speed}%")
+                self.target = {'left_motor': left, 'right_motor': right}
+                self._braking = False
                 
-            elif direction == 'stop':
-                self._stop_all_motors()
+                latency_ms = (now - issued_at) * 1000
+                self.control_stats['last_latency_ms'] = round(latency_ms, 2)
+                self.control_stats['max_latency_ms'] = round(max(self.control_stats['max_latency_ms'], latency_ms), 2)
             
-            print(f"🚗 Hardware: {direction} @ {speed}%")
+            elif expired:
+                # Keine Befehle mehr - zügig, aber ohne Schlag abbremsen
+                self.control_stats['watchdog_stops'] += 1
+                self.target = {'left_motor': 0.0, 'right_motor': 0.0}
+                self._braking = True
+                self.current_direction = 'stop'
+                self.current_speed = 0
             
-        except Exception as e:
-            print(f"❌ Hardware-Bewegung fehlgeschlagen: {e}")
+            for motor in self.target:
+                self._ramp(motor, dt)
+            
+            self._write_outputs()
+            
+            if all(self.velocity[m] == 0 and self.target[m] == 0 for m in self.target):
+                with self._lock:
+                    if self._pending is None:
+                        self.is_moving = False
+    
+    def _ramp(self, motor, dt):
+        """Geschwindigkeit mit Beschleunigungs- und Ruck-Grenze zum Ziel führen"""
+        error = self.target[motor] - self.velocity[motor]
+        
+        if self._braking:
+            # Notbremsung nach Watchdog: nur Verzögerungs-Grenze, kein Ruck-Limit
+            step = self.stop_decel * dt
+            self.velocity[motor] += max(-step, min(step, error))
+            self.accel[motor] = 0.0
+        else:
+            # Gewünschte Beschleunigung - so begrenzt, dass sie bis zum Ziel
+            # mit max_jerk wieder auf 0 abgebaut werden kann (kein Überschwingen).
+            # Der Abzug von einem Ruck-Schritt gleicht die diskrete Abtastung aus.
+            jerk_step = self.max_jerk * dt
+            reachable = max(0.0, math.sqrt(2 * self.max_jerk * abs(error)) - jerk_step)
+            desired = math.copysign(min(self.max_accel, reachable, abs(error) / dt), error)
+            
+            current = self.accel[motor]
+            self.accel[motor] = current + max(-jerk_step, min(jerk_step, desired - current))
+            
+            new_velocity = self.velocity[motor] + self.accel[motor] * dt
+            # Ziel überschritten oder im letzten Ruck-Schritt -> einrasten
+            remaining = self.target[motor] - new_velocity
+            if remaining * error <= 0 or (abs(remaining) <= jerk_step * dt and abs(self.accel[motor]) <= jerk_step):
+                new_velocity = self.target[motor]
+                self.accel[motor] = 0.0
+            self.velocity[motor] = new_velocity
+        
+        if abs(self.velocity[motor] - self.target[motor]) < 1e-6:
+            self.velocity[motor] = self.target[motor]
+    
+    def _write_outputs(self):
+        """Kalibrierte Sollwerte schreiben - nur geänderte Richtung/PWM"""
+        factors = {'left_motor': self.left_motor_factor, 'right_motor': self.right_motor_factor}
+        
+        for motor, velocity in self.velocity.items():
+            duty = round(min(100.0, abs(velocity) * factors[motor]), 1)
+            direction = 'stop' if duty == 0 else ('forward' if velocity > 0 else 'backward')
+            last_direction, last_duty = self._outputs[motor]
+            
+            if direction != last_direction:
+                if self.gpio_available:
+                    self._set_motor_direction(motor, direction)
+                self.control_stats['gpio_writes'] += 1
+            if duty != last_duty:
+                if self.gpio_available:
+                    self._set_motor_speed(motor, duty)
+                self.control_stats['gpio_writes'] += 1
+            
+            self._outputs[motor] = (direction, duty)
     
     def _set_motor_direction(self, motor, direction):
         """Motor-Richtung setzen"""
@@ -162,43 +380,69 @@ class MotorController:
             self._set_motor_direction(motor, 'stop')
             self._set_motor_speed(motor, 0)
     
-    def _move_mock(self, direction, speed):
-        """Mock-Bewegung für Tests"""
-        print(f"🔧 Mock: {direction} @ {speed}%")
-        
-        # Simulierte Latenz
-        time.sleep(0.01)
-    
     def stop(self):
-        """Fahrzeug stoppen"""
-        self.current_direction = 'stop'
-        self.current_speed = 0
-        self.is_moving = False
+        """Fahrzeug stoppen - sofort, ohne Rampe und ohne auf den Regel-Thread zu warten"""
+        with self._lock:
+            self._pending = None
+            self._deadline = None
+            self._stop_generation += 1
         
-        if self.gpio_available:
-            self._stop_all_motors()
-            print("🛑 Hardware gestoppt")
-        else:
-            print("🛑 Mock gestoppt")
+        with self._io_lock:
+            was_moving = self.is_moving
+            self.current_direction = 'stop'
+            self.current_speed = 0
+            self.is_moving = False
+            
+            for motor in self.target:
+                self.target[motor] = 0.0
+                self.velocity[motor] = 0.0
+                self.accel[motor] = 0.0
+                self._outputs[motor] = ('stop', 0.0)
+            
+            if self.gpio_available:
+                self._stop_all_motors()
+                if was_moving:
+                    print("🛑 Hardware gestoppt")
+            elif was_moving:
+                print("🛑 Mock gestoppt")
         
         return {'status': 'stopped'}
     
-    def emergency_stop(self):
-        """Notaus - Sofortiger Stopp"""
-        self.emergency_stopped = True
+    def stop_all(self):
+        """Alias für stop() (System-Shutdown)"""
+        return self.stop()
+    
+    def emergency_stop(self, reason='motor_controller'):
+        """Notaus - hält über die zentrale Freigabe Motoren, Arm und Servos an"""
+        self.authority.emergency_stop(reason)
+        return {'status': 'emergency_stop_activated'}
+    
+    def reset_emergency(self):
+        """Notaus ausdrücklich aufheben"""
+        return self.authority.reset()
+    
+    def halt(self):
+        """Vom Notaus aufgerufen: sofort stoppen, wartende Befehle verwerfen"""
         self.stop()
-        
         print("🚨 MOTOR NOT-STOPP AKTIVIERT!")
+    
+    def get_loop_stats(self):
+        """Takt-Statistik der Regelschleife (Jitter in ms)"""
+        periods = sorted(self._tick_periods)
+        if not periods:
+            return {'rate_hz': self.control_hz, 'samples': 0, 'overruns': self._tick_overruns}
         
-        # Nach 2 Sekunden Reset erlauben
-        def reset_emergency():
-            time.sleep(2.0)
-            self.emergency_stopped = False
-            print("✅ Motor-Notaus zurückgesetzt")
-        
-        threading.Thread(target=reset_emergency, daemon=True).start()
-        
-        return {'status': 'emergency_stop_activated'}
+        nominal = 1.0 / self.control_hz
+        jitter = sorted(abs(p - nominal) for p in periods)
+        return {
+            'rate_hz': self.control_hz,
+            'samples': len(periods),
+            'mean_period_ms': round(sum(periods) / len(periods) * 1000, 3),
+            'jitter_mean_ms': round(sum(jitter) / len(jitter) * 1000, 3),
+            'jitter_p99_ms': round(jitter[min(len(jitter) - 1, int(len(jitter) * 0.99))] * 1000, 3),
+            'jitter_max_ms': round(jitter[-1] * 1000, 3),
+            'overruns': self._tick_overruns
+        }
     
     def get_status(self):
         """Motor-Status abrufen"""
@@ -208,17 +452,22 @@ class MotorController:
             'speed': self.current_speed,
             'emergency_stopped': self.emergency_stopped,
             'hardware_available': self.gpio_available,
+            'velocity': {motor: round(v, 1) for motor, v in self.velocity.items()},
+            'calibration': {'left': self.left_motor_factor, 'right': self.right_motor_factor},
+            'control': dict(self.control_stats),
+            'loop': self.get_loop_stats(),
             'timestamp': int(time.time())
         }
     
     def set_motor_calibration(self, left_factor=1.0, right_factor=1.0):
-        """Motor-Kalibrierung für Geradeausfahrt"""
+        """Motor-Kalibrierung für Geradeausfahrt (wirkt ab dem nächsten Regeltakt)"""
         self.left_motor_factor = left_factor
         self.right_motor_factor = right_factor
         print(f"⚙️ Motor-Kalibrierung: Links={left_factor}, Rechts={right_factor}")
     
     def cleanup(self):
         """GPIO aufräumen"""
+        self.authority.unregister(self)
         if self.gpio_available:
             try:
                 import RPi.GPIO as GPIO
@@ -234,9 +483,9 @@ class MotorController:
             except:
                 pass
 
-# Globale Instanz
-motor_controller = MotorController()
-
-# Cleanup bei Programmende
-import atexit
-atexit.register(motor_controller.cleanup)
\ No newline at end of file
+# Globale Instanz - erst beim ersten Zugriff erzeugt, Cleanup registriert die Registry
+def __getattr__(name):
+    if name == 'motor_controller':
+        from hardware.registry import hardware_registry
+        return hardware_registry.get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
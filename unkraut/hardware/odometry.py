@@ -0,0 +1,335 @@
+# hardware/odometry.py
+"""
+Rad-Odometrie für Unkraut-2025
+Integriert die Pose (x, y, heading) mit fester Rate aus Encoder-Ticks oder - im
+Mock-Modus - aus der geschriebenen Motor-PWM über ein einfaches Motormodell.
+GPS-Fixes korrigieren Position und Kurs über einen Komplementärfilter.
+Jede Pose bekommt einen Zeitstempel; über pose_at() lassen sich Erkennungen
+nachträglich der Position zum Aufnahmezeitpunkt zuordnen.
+"""
+import math
+import time
+import bisect
+import threading
+from collections import deque
+
+from hardware.gpio_config import ENCODER_PINS
+
+# Fahrzeug-Geometrie
+WHEEL_BASE_M = 0.30          # Abstand der Räder
+WHEEL_DIAMETER_M = 0.12
+TICKS_PER_REV = 360          # Encoder-Flanken pro Radumdrehung
+
+# Motormodell (Mock): Radgeschwindigkeit bei 100% PWM und Ansprechzeit
+MODEL_MAX_SPEED_MPS = 0.5
+MODEL_TIME_CONSTANT_S = 0.15
+
+EARTH_RADIUS_M = 6371000.0
+
+
+def _wrap_angle(angle):
+    """Winkel auf -pi..pi"""
+    return (angle + math.pi) % (2 * math.pi) - math.pi
+
+
+class OdometryEstimator:
+    """Pose-Schätzung aus Radbewegung, optional mit GPS fusioniert"""
+
+    def __init__(self, rate_hz=50, history_seconds=30):
+        self.rate_hz = rate_hz
+        self.encoders_available = False
+        self.ticks = {'left_motor': 0, 'right_motor': 0}
+        self._last_ticks = dict(self.ticks)
+        self.meters_per_tick = math.pi * WHEEL_DIAMETER_M / TICKS_PER_REV
+
+        # Motormodell-Zustand (Mock)
+        self.model_speed = {'left_motor': 0.0, 'right_motor': 0.0}
+
+        # Pose im lokalen Rahmen (Start = Ursprung, x in Startrichtung)
+        self.lock = threading.Lock()
+        self.x = 0.0
+        self.y = 0.0
+        self.heading = 0.0
+        self.distance = 0.0
+
+        # Neueste Pose als unveränderliches dict - Leser bekommen sie ohne Lock
+        self.pose = self._make_pose(time.time(), 0.0, 0.0)
+        self.history = deque(maxlen=int(rate_hz * history_seconds))
+
+        # GPS-Fusion (Komplementärfilter)
+        self.gps_gain = 0.2          # Positions-Korrektur pro Fix bei 1 m Genauigkeit
+        self.heading_gain = 0.3      # Kurs-Korrektur aus GPS-Fahrtrichtung
+        self.min_course_distance = 1.0
+        self.geo_origin = None       # (lat, lon) des lokalen Ursprungs
+        self._geo_offset = (0.0, 0.0)  # Lokale Pose beim ersten Fix
+        self._last_gps_xy = None
+        self.gps_fixes = 0
+        self.gps_interval = 1.0
+
+        # Takt-Statistik
+        self.loop_stats = {'ticks': 0, 'overruns': 0, 'max_period_ms': 0.0}
+
+        self._init_encoders()
+
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    # ===== ENCODER =====
+    def _init_encoders(self):
+        """Encoder-Flanken per GPIO-Interrupt zählen"""
+        try:
+            import RPi.GPIO as GPIO
+
+            GPIO.setmode(GPIO.BCM)
+            for motor, pins in ENCODER_PINS.items():
+                GPIO.setup(pins['a'], GPIO.IN, pull_up_down=GPIO.PUD_UP)
+                GPIO.setup(pins['b'], GPIO.IN, pull_up_down=GPIO.PUD_UP)
+                GPIO.add_event_detect(pins['a'], GPIO.RISING,
+                                      callback=self._make_tick_callback(GPIO, motor, pins['b']))
+
+            self.encoders_available = True
+            print("✅ Rad-Encoder initialisiert (GPIO)")
+
+        except ImportError:
+            print("🔧 Odometrie im Mock-Modus (Motormodell)")
+        except Exception as e:
+            print(f"⚠️ Encoder-Initialisierung fehlgeschlagen: {e} - Motormodell aktiv")
+
+    def _make_tick_callback(self, GPIO, motor, pin_b):
+        def on_edge(channel):
+            # Kanal B hinkt bei Vorwärtsfahrt nach
+            self.ticks[motor] += 1 if GPIO.input(pin_b) == GPIO.LOW else -1
+        return on_edge
+
+    # ===== INTEGRATION =====
+    def _wheel_distances(self, dt):
+        """Zurückgelegte Strecke beider Räder seit dem letzten Takt (m)"""
+        if self.encoders_available:
+            ticks = dict(self.ticks)
+            distances = {motor: (ticks[motor] - self._last_ticks[motor]) * self.meters_per_tick
+                         for motor in ticks}
+            self._last_ticks = ticks
+            return distances['left_motor'], distances['right_motor']
+
+        # Motormodell: Radgeschwindigkeit folgt der PWM mit Verzögerung 1. Ordnung
+        duty = self._commanded_duty()
+        alpha = min(1.0, dt / MODEL_TIME_CONSTANT_S)
+        for motor in self.model_speed:
+            target = duty[motor] / 100.0 * MODEL_MAX_SPEED_MPS
+            self.model_speed[motor] += alpha * (target - self.model_speed[motor])
+        return self.model_speed['left_motor'] * dt, self.model_speed['right_motor'] * dt
+
+    def _commanded_duty(self):
+        """Geschriebene PWM der Motoren (mit Vorzeichen) - ohne Motoren erzeugen"""
+        from hardware.registry import hardware_registry
+        if not hardware_registry.is_created('motor_controller'):
+            return {'left_motor': 0.0, 'right_motor': 0.0}
+
+        outputs = hardware_registry.get('motor_controller')._outputs
+        return {motor: (-duty if direction == 'backward' else duty)
+                for motor, (direction, duty) in outputs.items()}
+
+    def integrate(self, left, right, dt, timestamp=None):
+        """Eine Radbewegung (m) in die Pose einrechnen (Mittelpunkt-Verfahren)"""
+        ds = (left + right) / 2.0
+        dtheta = (right - left) / WHEEL_BASE_M
+
+        with self.lock:
+            mid_heading = self.heading + dtheta / 2.0
+            self.x += ds * math.cos(mid_heading)
+            self.y += ds * math.sin(mid_heading)
+            self.heading = _wrap_angle(self.heading + dtheta)
+            self.distance += abs(ds)
+
+            velocity = ds / dt if dt > 0 else 0.0
+            omega = dtheta / dt if dt > 0 else 0.0
+            self._publish(timestamp or time.time(), velocity, omega)
+
+    def _publish(self, timestamp, velocity, omega):
+        """Neue Pose ablegen (Aufrufer hält self.lock)"""
+        self.pose = self._make_pose(timestamp, velocity, omega)
+        self.history.append((timestamp, self.x, self.y, self.heading))
+
+    def _make_pose(self, timestamp, velocity, omega):
+        return {
+            'timestamp': timestamp,
+            'x': round(self.x, 4),
+            'y': round(self.y, 4),
+            'heading': round(self.heading, 5),
+            'heading_deg': round(math.degrees(self.heading), 2),
+            'velocity': round(velocity, 4),
+            'omega': round(omega, 4),
+            'distance': round(self.distance, 3)
+        }
+
+    def _loop(self):
+        """Integrations-Schleife mit fester Rate, GPS im langsameren Takt"""
+        period = 1.0 / self.rate_hz
+        next_tick = time.monotonic()
+        last_tick = next_tick
+        next_gps = next_tick
+
+        while self.running:
+            now = time.monotonic()
+            dt = now - last_tick
+            last_tick = now
+
+            try:
+                left, right = self._wheel_distances(dt)
+                self.integrate(left, right, dt)
+
+                if now >= next_gps:
+                    next_gps = now + self.gps_interval
+                    self._poll_gps()
+            except Exception as e:
+                print(f"⚠️ Odometrie-Fehler: {e}")
+
+            self.loop_stats['ticks'] += 1
+            self.loop_stats['max_period_ms'] = round(max(self.loop_stats['max_period_ms'], dt * 1000), 2)
+
+            next_tick += period
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                self.loop_stats['overruns'] += 1
+                next_tick = time.monotonic()
+
+    # ===== GPS-FUSION =====
+    def _poll_gps(self):
+        """Echte GPS-Fixes vom Sensor-Manager übernehmen (Mock-GPS wird ignoriert)"""
+        from hardware.registry import hardware_registry
+        if not hardware_registry.is_created('sensor_manager'):
+            return
+        sensors = hardware_registry.get('sensor_manager')
+        if not getattr(sensors, 'gps_available', False):
+            return
+        fix = sensors.get_gps_position()
+        self.update_gps(fix['latitude'], fix['longitude'], fix.get('accuracy', 5.0))
+
+    def _geo_to_local(self, lat, lon):
+        """Geo-Koordinaten -> lokale Meter (äquirektangulär, für Feldgrößen genau genug)"""
+        origin_lat, origin_lon = self.geo_origin
+        north = math.radians(lat - origin_lat) * EARTH_RADIUS_M
+        east = math.radians(lon - origin_lon) * EARTH_RADIUS_M * math.cos(math.radians(origin_lat))
+        return east, north
+
+    def update_gps(self, lat, lon, accuracy=5.0):
+        """GPS-Fix einrechnen: Position und - bei Fahrt - Kurs sanft korrigieren"""
+        with self.lock:
+            if self.geo_origin is None:
+                # Erster Fix legt den Geo-Bezug des lokalen Rahmens fest
+                self.geo_origin = (lat, lon)
+                self._geo_offset = (self.x, self.y)
+                self._last_gps_xy = (self.x, self.y)
+                self.gps_fixes += 1
+                return
+
+            east, north = self._geo_to_local(lat, lon)
+            gps_x = east + self._geo_offset[0]
+            gps_y = north + self._geo_offset[1]
+
+            alpha = min(1.0, self.gps_gain / max(1.0, accuracy))
+            self.x += alpha * (gps_x - self.x)
+            self.y += alpha * (gps_y - self.y)
+
+            # Kurs aus der GPS-Fahrtrichtung - nur bei Vorwärtsfahrt über genug Strecke
+            dx = gps_x - self._last_gps_xy[0]
+            dy = gps_y - self._last_gps_xy[1]
+            if math.hypot(dx, dy) >= self.min_course_distance:
+                if self.pose['velocity'] > 0.05:
+                    course = math.atan2(dy, dx)
+                    self.heading = _wrap_angle(self.heading + self.heading_gain * _wrap_angle(course - self.heading))
+                self._last_gps_xy = (gps_x, gps_y)
+
+            self.gps_fixes += 1
+            self._publish(time.time(), self.pose['velocity'], self.pose['omega'])
+
+    def to_geo(self, x, y):
+        """Lokale Meter -> (lat, lon), solange noch kein GPS-Fix da ist: None"""
+        if self.geo_origin is None:
+            return None
+        origin_lat, origin_lon = self.geo_origin
+        east = x - self._geo_offset[0]
+        north = y - self._geo_offset[1]
+        lat = origin_lat + math.degrees(north / EARTH_RADIUS_M)
+        lon = origin_lon + math.degrees(east / (EARTH_RADIUS_M * math.cos(math.radians(origin_lat))))
+        return lat, lon
+
+    # ===== ABFRAGEN =====
+    def get_pose(self):
+        """Neueste Pose (dict, wird nie verändert)"""
+        return self.pose
+
+    def pose_at(self, timestamp):
+        """Pose zu einem Zeitpunkt (time.time()) - linear interpoliert aus der Historie"""
+        with self.lock:
+            history = list(self.history)
+        if not history:
+            return None
+
+        times = [entry[0] for entry in history]
+        index = bisect.bisect_left(times, timestamp)
+        if index == 0:
+            t, x, y, heading = history[0]
+        elif index >= len(history):
+            t, x, y, heading = history[-1]
+        else:
+            (t0, x0, y0, h0), (t1, x1, y1, h1) = history[index - 1], history[index]
+            f = (timestamp - t0) / (t1 - t0) if t1 > t0 else 0.0
+            t = timestamp
+            x = x0 + f * (x1 - x0)
+            y = y0 + f * (y1 - y0)
+            heading = _wrap_angle(h0 + f * _wrap_angle(h1 - h0))
+
+        pose = {'timestamp': t, 'x': round(x, 4), 'y': round(y, 4), 'heading': round(heading, 5)}
+        geo = self.to_geo(x, y)
+        if geo:
+            pose['latitude'], pose['longitude'] = round(geo[0], 7), round(geo[1], 7)
+        return pose
+
+    def get_history(self, since=None, step=1):
+        """Pose-Strom seit `since` (time.time()), jede `step`-te Pose"""
+        with self.lock:
+            history = list(self.history)
+        if since is not None:
+            history = history[bisect.bisect_right([entry[0] for entry in history], since):]
+        return [{'timestamp': t, 'x': round(x, 4), 'y': round(y, 4), 'heading': round(h, 5)}
+                for t, x, y, h in history[::max(1, int(step))]]
+
+    def reset(self, x=0.0, y=0.0, heading=0.0):
+        """Pose neu setzen (z.B. an einer bekannten Startmarke)"""
+        with self.lock:
+            self.x, self.y, self.heading = x, y, heading
+            self.history.clear()
+            self._publish(time.time(), 0.0, 0.0)
+
+    def get_status(self):
+        geo = self.to_geo(self.x, self.y)
+        return {
+            'pose': self.pose,
+            'geo': {'latitude': round(geo[0], 7), 'longitude': round(geo[1], 7)} if geo else None,
+            'source': 'encoder' if self.encoders_available else 'motor_model',
+            'rate_hz': self.rate_hz,
+            'gps_fixes': self.gps_fixes,
+            'loop': dict(self.loop_stats)
+        }
+
+    def cleanup(self):
+        """Schleife beenden und Encoder-Interrupts lösen"""
+        self.running = False
+        if self.encoders_available:
+            try:
+                import RPi.GPIO as GPIO
+                for pins in ENCODER_PINS.values():
+                    GPIO.remove_event_detect(pins['a'])
+            except Exception:
+                pass
+
+# Globale Instanz - erst beim ersten Zugriff erzeugt (hardware/registry.py)
+def __getattr__(name):
+    if name == 'odometry_estimator':
+        from hardware.registry import hardware_registry
+        return hardware_registry.get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
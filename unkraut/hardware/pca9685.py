@@ -0,0 +1,179 @@
+# hardware/pca9685.py
+"""
+PCA9685-Ausgabe mit Schattenregistern für Unkraut-2025
+Alle 16 Kanalregister werden im Speicher gespiegelt. set_duty() ändert nur den
+Schatten, flush() schickt die geänderten Kanäle als EINEN Auto-Increment-
+Blockschreibzugriff ab LEDn_ON_L - ein I2C-Transfer pro Interpolationstakt
+statt einem pro Gelenk. Der Mock-Bus zählt Transfers und Bytes.
+"""
+import time
+import threading
+
+# Register (Datenblatt PCA9685)
+MODE1 = 0x00
+PRESCALE = 0xFE
+LED0_ON_L = 0x06
+REGISTERS_PER_CHANNEL = 4
+CHANNELS = 16
+
+MODE1_RESTART = 0x80
+MODE1_AI = 0x20              # Auto-Increment: Registeradresse zählt bei Blockzugriffen mit
+MODE1_SLEEP = 0x10
+
+OSCILLATOR_HZ = 25000000
+FULL_ON = 0x1000             # Bit 4 in LEDn_ON_H
+
+
+def duty_to_counts(duty_cycle):
+    """16-Bit-Duty-Cycle -> (ON, OFF) in 12-Bit-Zählern - wie adafruit_pca9685"""
+    if duty_cycle >= 0xFFFF:
+        return FULL_ON, 0
+    return 0, (max(0, int(duty_cycle)) + 1) >> 4
+
+
+class BusioI2CBus:
+    """Echter I2C-Bus über busio (Adafruit Blinka)"""
+
+    def __init__(self, i2c=None):
+        if i2c is None:
+            import board
+            import busio
+            i2c = busio.I2C(board.SCL, board.SDA)
+        self.i2c = i2c
+
+    def write(self, address, data):
+        while not self.i2c.try_lock():
+            time.sleep(0.0001)
+        try:
+            self.i2c.writeto(address, bytes(data))
+        finally:
+            self.i2c.unlock()
+
+
+class MockI2CBus:
+    """I2C-Bus ohne Hardware: bildet die Register nach und zählt Transfers und Bytes"""
+
+    def __init__(self):
+        self.registers = {}
+        self.stats = {'transactions': 0, 'bytes': 0}
+
+    def write(self, address, data):
+        data = bytes(data)
+        self.stats['transactions'] += 1
+        self.stats['bytes'] += len(data)
+        registers = self.registers.setdefault(address, bytearray(256))
+        start = data[0]
+        # Auto-Increment aktiv -> Folgebytes in die Folgeregister
+        auto_increment = registers[MODE1] & MODE1_AI or start == MODE1
+        for offset, value in enumerate(data[1:]):
+            registers[start + offset if auto_increment else start] = value
+
+    def read_channel(self, address, channel):
+        """(ON, OFF) eines Kanals aus den nachgebildeten Registern"""
+        registers = self.registers.get(address, bytearray(256))
+        base = LED0_ON_L + REGISTERS_PER_CHANNEL * channel
+        on_l, on_h, off_l, off_h = registers[base:base + REGISTERS_PER_CHANNEL]
+        return on_l | on_h << 8, off_l | off_h << 8
+
+
+class _ChannelProxy:
+    """Kompatibel zu pca.channels[n].duty_cycle der Adafruit-Bibliothek - schreibt sofort"""
+
+    def __init__(self, output, channel):
+        self._output = output
+        self._channel = channel
+
+    @property
+    def duty_cycle(self):
+        return self._output.duty[self._channel]
+
+    @duty_cycle.setter
+    def duty_cycle(self, value):
+        self._output.set_duty(self._channel, value)
+        self._output.flush()
+
+
+class PCA9685Output:
+    """16 PWM-Kanäle mit Schattenregistern und Block-Flush"""
+
+    def __init__(self, bus, address=0x40, frequency=50):
+        self.bus = bus
+        self.address = address
+        self.frequency = frequency
+        self.lock = threading.Lock()
+
+        # Schatten: gewünschter und zuletzt geschriebener Zustand pro Kanal
+        self.duty = [0] * CHANNELS
+        self._staged = [duty_to_counts(0)] * CHANNELS
+        self._written = [None] * CHANNELS      # None = unbekannt, wird beim ersten Flush geschrieben
+        self.stats = {'flushes': 0, 'transactions': 0, 'bytes': 0, 'channels_written': 0}
+
+        self.channels = [_ChannelProxy(self, channel) for channel in range(CHANNELS)]
+        self._configure()
+
+    def _write(self, data):
+        self.bus.write(self.address, data)
+        self.stats['transactions'] += 1
+        self.stats['bytes'] += len(data)
+
+    def _configure(self):
+        """Frequenz setzen und Auto-Increment einschalten"""
+        prescale = int(OSCILLATOR_HZ / 4096.0 / self.frequency + 0.5)
+        self._write([MODE1, MODE1_SLEEP])
+        self._write([PRESCALE, prescale])
+        self._write([MODE1, MODE1_AI])
+        time.sleep(0.0005)  # Oszillator stabilisieren
+        self._write([MODE1, MODE1_RESTART | MODE1_AI])
+
+    def set_duty(self, channel, duty_cycle):
+        """Kanal im Schatten setzen - geschrieben wird erst mit flush()"""
+        with self.lock:
+            self.duty[channel] = int(duty_cycle)
+            self._staged[channel] = duty_to_counts(duty_cycle)
+
+    def set_all(self, duty_cycle):
+        for channel in range(CHANNELS):
+            self.set_duty(channel, duty_cycle)
+
+    def pending_channels(self):
+        with self.lock:
+            return [channel for channel in range(CHANNELS) if self._staged[channel] != self._written[channel]]
+
+    def flush(self):
+        """Geänderte Kanäle in einem Auto-Increment-Transfer schreiben - Anzahl geschriebener Kanäle"""
+        with self.lock:
+            dirty = [channel for channel in range(CHANNELS) if self._staged[channel] != self._written[channel]]
+            if not dirty:
+                return 0
+
+            # Zusammenhängender Bereich vom ersten bis zum letzten geänderten Kanal;
+            # unveränderte Kanäle dazwischen gehen mit, das spart weitere Transfers
+            first, last = dirty[0], dirty[-1]
+            payload = [LED0_ON_L + REGISTERS_PER_CHANNEL * first]
+            for channel in range(first, last + 1):
+                on, off = self._staged[channel]
+                payload.extend((on & 0xFF, on >> 8, off & 0xFF, off >> 8))
+
+            self._write(payload)
+            for channel in range(first, last + 1):
+                self._written[channel] = self._staged[channel]
+
+            self.stats['flushes'] += 1
+            self.stats['channels_written'] += last - first + 1
+            return last - first + 1
+
+    def get_status(self):
+        return {
+            'address': hex(self.address),
+            'frequency': self.frequency,
+            'bus': type(self.bus).__name__,
+            'stats': dict(self.stats)
+        }
+
+
+def open_output(address=0x40, frequency=50):
+    """PCA9685 am echten I2C-Bus öffnen, sonst am Mock-Bus - (output, hardware_available)"""
+    try:
+        return PCA9685Output(BusioI2CBus(), address, frequency), True
+    except Exception:
+        return PCA9685Output(MockI2CBus(), address, frequency), False
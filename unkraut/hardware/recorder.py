@@ -0,0 +1,553 @@
+# hardware/recorder.py
+"""
+Video-Aufzeichnung für Unkraut-2025
+Schreibt den MJPEG-Stream der Kamera ohne Dekodieren in segmentierte
+MJPEG-AVI-Dateien (data/videos) - optional libcamera-vid H.264-Passthrough
+"""
+import os
+import json
+import time
+import queue
+import struct
+import threading
+import subprocess
+from datetime import datetime
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VIDEOS_DIR = os.path.join(PROJECT_ROOT, 'data', 'videos')
+
+AVIF_HASINDEX = 0x10
+AVIIF_KEYFRAME = 0x10
+
+
+def _jpeg_size(jpeg_data):
+    """Breite/Höhe aus dem SOF-Marker lesen - ohne Dekodieren"""
+    i = 2
+    length = len(jpeg_data)
+    while i + 9 < length:
+        if jpeg_data[i] != 0xFF:
+            i += 1
+            continue
+        marker = jpeg_data[i + 1]
+        if marker in (0xC0, 0xC1, 0xC2):
+            height, width = struct.unpack('>HH', jpeg_data[i + 5:i + 9])
+            return width, height
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        segment_length = struct.unpack('>H', jpeg_data[i + 2:i + 4])[0]
+        i += 2 + segment_length
+    return None
+
+
+class MjpegAviWriter:
+    """Minimaler MJPEG-AVI-Writer (RIFF AVI 1.0 mit idx1-Index)"""
+
+    def __init__(self, path, width, height, fps):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.fps = max(1, int(round(fps)))
+        self.frame_count = 0
+        self.max_frame_size = 0
+        self.index = []            # (Offset relativ zu 'movi', Größe)
+        self.file = open(path, 'wb')
+        self._write_header()
+        self.movi_start = self.file.tell()
+        self.file.write(b'LIST\0\0\0\0movi')
+
+    def _write_header(self):
+        """RIFF-Header mit Platzhaltern schreiben - wird beim Schließen gepatcht"""
+        micro_sec_per_frame = int(1000000 / self.fps)
+
+        avih = struct.pack(
+            '<IIIIIIIIII16x',
+            micro_sec_per_frame,  # dwMicroSecPerFrame
+            0,                    # dwMaxBytesPerSec
+            0,                    # dwPaddingGranularity
+            AVIF_HASINDEX,        # dwFlags
+            0,                    # dwTotalFrames (Platzhalter)
+            0,                    # dwInitialFrames
+            1,                    # dwStreams
+            0,                    # dwSuggestedBufferSize
+            self.width,
+            self.height
+        )
+        strh = struct.pack(
+            '<4s4sIHHIIIIIIIIhhhh',
+            b'vids', b'MJPG',
+            0, 0, 0, 0,
+            1, self.fps,          # dwScale, dwRate
+            0,                    # dwStart
+            0,                    # dwLength (Platzhalter)
+            0,                    # dwSuggestedBufferSize
+            0xFFFFFFFF,           # dwQuality
+            0,                    # dwSampleSize
+            0, 0, self.width, self.height
+        )
+        strf = struct.pack(
+            '<IiiHH4sIiiII',
+            40, self.width, self.height, 1, 24, b'MJPG',
+            self.width * self.height * 3, 0, 0, 0, 0
+        )
+
+        strl = b'strl' + self._chunk(b'strh', strh) + self._chunk(b'strf', strf)
+        hdrl = b'hdrl' + self._chunk(b'avih', avih) + self._chunk(b'LIST', strl)
+
+        self.file.write(b'RIFF\0\0\0\0AVI ')
+        self.avih_offset = self.file.tell() + 12 + 8   # 'LIST' size 'hdrl' + 'avih' size
+        self.strh_offset = self.avih_offset + len(avih) + 12 + 8   # 'LIST' size 'strl' + 'strh' size
+        self.file.write(self._chunk(b'LIST', hdrl))
+
+    @staticmethod
+    def _chunk(fourcc, data):
+        """RIFF-Chunk mit Padding auf gerade Länge"""
+        padding = b'\0' if len(data) % 2 else b''
+        return fourcc + struct.pack('<I', len(data)) + data + padding
+
+    def write_frame(self, jpeg_data):
+        """JPEG-Frame unverändert anhängen - gibt Byte-Offset in der Datei zurück"""
+        offset = self.file.tell()
+        self.file.write(self._chunk(b'00dc', jpeg_data))
+        self.index.append((offset - self.movi_start - 8, len(jpeg_data)))
+        self.frame_count += 1
+        self.max_frame_size = max(self.max_frame_size, len(jpeg_data))
+        return offset
+
+    def size(self):
+        """Aktuelle Dateigröße in Bytes"""
+        return self.file.tell()
+
+    def close(self, actual_fps=None):
+        """idx1 anhängen und Header-Felder patchen"""
+        movi_end = self.file.tell()
+
+        idx1 = b''.join(
+            b'00dc' + struct.pack('<III', AVIIF_KEYFRAME, offset, size)
+            for offset, size in self.index
+        )
+        self.file.write(b'idx1' + struct.pack('<I', len(idx1)) + idx1)
+        file_end = self.file.tell()
+
+        self.file.seek(4)
+        self.file.write(struct.pack('<I', file_end - 8))
+        self.file.seek(self.movi_start + 4)
+        self.file.write(struct.pack('<I', movi_end - self.movi_start - 8))
+
+        # Tatsächliche Bildrate eintragen, damit die Wiedergabezeit stimmt
+        fps = max(1, int(round(actual_fps))) if actual_fps else self.fps
+        self.file.seek(self.avih_offset)
+        self.file.write(struct.pack('<I', int(1000000 / fps)))
+        self.file.seek(self.avih_offset + 16)
+        self.file.write(struct.pack('<I', self.frame_count))
+        self.file.seek(self.avih_offset + 28)
+        self.file.write(struct.pack('<I', self.max_frame_size))
+        self.file.seek(self.strh_offset + 24)
+        self.file.write(struct.pack('<I', fps))
+        self.file.seek(self.strh_offset + 32)
+        self.file.write(struct.pack('<II', self.frame_count, self.max_frame_size))
+
+        self.file.close()
+
+
+class VideoRecorder:
+    """Aufzeichnung in rollierende Segmente mit Such-Index"""
+
+    def __init__(self, videos_dir=VIDEOS_DIR):
+        self.videos_dir = videos_dir
+        self.is_recording = False
+        self.mode = None                 # 'mjpeg' oder 'h264'
+        self.recording_dir = None
+        self.segment_seconds = 300       # Segmentlänge
+        self.segment_max_mb = 200        # Segment-Größenlimit
+        self.max_segments = 0            # 0 = unbegrenzt, sonst ältestes Segment löschen
+        self.keyframe_interval = 1.0     # Such-Index: ein Eintrag pro Sekunde
+
+        self.frame_queue = queue.Queue(maxsize=60)
+        self.writer_thread = None
+        self.h264_process = None
+        self.h264_monitor_thread = None
+        self.camera = None
+        self._restart_stream = False
+
+        self.segments = []               # Abgeschlossene Segmente (Index-Einträge)
+        self.segment_counter = 0         # Fortlaufende Segment-Nummer - nie wiederverwendet
+        self.current_segment = None
+        self.writer = None
+        self.last_error = None
+        self.stats = {
+            'frames_written': 0,
+            'frames_dropped': 0,
+            'bytes_written': 0,
+            'started_at': None
+        }
+
+    # ===== STEUERUNG =====
+    def start(self, mode='mjpeg', segment_seconds=None, max_segments=None):
+        """Aufzeichnung starten"""
+        if self.is_recording:
+            return {'status': 'already_recording', 'directory': self.recording_dir}
+
+        if mode not in ('mjpeg', 'h264'):
+            return {'error': f'Unbekannter Modus: {mode}'}
+
+        allowed, reason = self._storage_allows_recording()
+        if not allowed:
+            return {'error': reason}
+
+        from hardware.camera import camera_manager
+        self.camera = camera_manager
+
+        if segment_seconds:
+            self.segment_seconds = max(10, int(segment_seconds))
+        if max_segments is not None:
+            self.max_segments = max(0, int(max_segments))
+
+        name = datetime.now().strftime('rec_%y%m%d_%H%M%S')
+        self.recording_dir = os.path.join(self.videos_dir, name)
+        os.makedirs(self.recording_dir, exist_ok=True)
+
+        self.segments = []
+        self.segment_counter = 0
+        self.last_error = None
+        self.stats = {'frames_written': 0, 'frames_dropped': 0, 'bytes_written': 0,
+                      'started_at': time.time()}
+        self.mode = mode
+
+        if mode == 'h264':
+            if not self._start_h264():
+                return {'error': 'H.264-Passthrough nur mit libcamera verfügbar'}
+            self.is_recording = True
+            self.h264_monitor_thread = threading.Thread(target=self._h264_monitor, daemon=True)
+            self.h264_monitor_thread.start()
+        else:
+            if not self.camera.is_streaming:
+                self.camera.start_stream()
+            self.is_recording = True
+            self.writer_thread = threading.Thread(target=self._writer_worker, daemon=True)
+            self.writer_thread.start()
+            self.camera.add_frame_listener(self._on_frame)
+
+        print(f"🎬 Aufzeichnung gestartet ({mode}): {self.recording_dir}")
+        return {'status': 'recording', 'mode': mode, 'directory': self.recording_dir}
+
+    def stop(self):
+        """Aufzeichnung beenden und Index schreiben"""
+        if not self.is_recording:
+            return {'status': 'not_recording'}
+
+        self.is_recording = False
+
+        if self.mode == 'h264':
+            self._stop_h264()
+        else:
+            self.camera.remove_frame_listener(self._on_frame)
+            self.frame_queue.put(None)
+            if self.writer_thread:
+                self.writer_thread.join(timeout=5)
+            self.writer_thread = None
+
+        self._write_index()
+        print(f"🛑 Aufzeichnung beendet: {len(self.segments)} Segmente")
+        return {'status': 'stopped', 'directory': self.recording_dir, 'segments': len(self.segments)}
+
+    # ===== MJPEG-AVI =====
+    def _on_frame(self, frame_id, jpeg_data, timestamp):
+        """Frame-Listener der Kamera - nur einreihen, nie blockieren"""
+        if not self.is_recording:
+            return
+        try:
+            self.frame_queue.put_nowait((jpeg_data, timestamp))
+        except queue.Full:
+            self.stats['frames_dropped'] += 1
+
+    def _writer_worker(self):
+        """Schreib-Thread: Frames in Segmente schreiben"""
+        try:
+            while True:
+                item = self.frame_queue.get()
+                if item is None:
+                    break
+
+                jpeg_data, timestamp = item
+                if self.writer is None or self._segment_full(timestamp):
+                    allowed, reason = self._storage_allows_recording()
+                    if not allowed:
+                        self.last_error = reason
+                        break
+                    self._rotate_segment(jpeg_data, timestamp)
+
+                offset = self.writer.write_frame(jpeg_data)
+                segment = self.current_segment
+                if timestamp - segment['last_keyframe'] >= self.keyframe_interval:
+                    segment['keyframes'].append([round(timestamp, 3), self.writer.frame_count - 1, offset])
+                    segment['last_keyframe'] = timestamp
+                segment['end_time'] = timestamp
+
+                self.stats['frames_written'] += 1
+                self.stats['bytes_written'] += len(jpeg_data)
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"❌ Aufzeichnungs-Fehler: {e}")
+        finally:
+            try:
+                self._close_segment()
+            except Exception as e:
+                print(f"❌ Segment nicht abgeschlossen: {e}")
+                self.writer = None
+                self.current_segment = None
+
+            # Schreib-Thread beendet ohne stop() (Fehler, Speicher voll) - Aufzeichnung abbrechen
+            if self.is_recording:
+                self._abort_recording()
+
+            # Restliche Frames verwerfen
+            while not self.frame_queue.empty():
+                self.frame_queue.get_nowait()
+
+    def _abort_recording(self):
+        """Aufzeichnung nach Fehler beenden - Listener abmelden, Index sichern"""
+        self.is_recording = False
+        if self.camera:
+            self.camera.remove_frame_listener(self._on_frame)
+        self._write_index()
+        print(f"⚠️ Aufzeichnung abgebrochen: {self.last_error}")
+
+    @staticmethod
+    def _storage_allows_recording():
+        """Low-Disk-Schutz des Speicher-Managers -> (erlaubt, Grund)"""
+        try:
+            from app.utils.storage_manager import storage_manager
+        except ImportError:
+            return True, None
+        return storage_manager.check_capture_allowed()
+
+    def _segment_full(self, timestamp):
+        """Muss ein neues Segment begonnen werden?"""
+        segment = self.current_segment
+        if timestamp - segment['start_time'] >= self.segment_seconds:
+            return True
+        return self.writer.size() >= self.segment_max_mb * 1024 * 1024
+
+    def _rotate_segment(self, jpeg_data, timestamp):
+        """Aktuelles Segment schließen und neues öffnen"""
+        self._close_segment()
+
+        size = _jpeg_size(jpeg_data) or tuple(self.camera.settings['resolution'])
+        self.segment_counter += 1
+        number = self.segment_counter
+        filename = f'seg_{number:05d}.avi'
+        path = os.path.join(self.recording_dir, filename)
+
+        self.writer = MjpegAviWriter(path, size[0], size[1], self.camera.settings['framerate'])
+        self.current_segment = {
+            'file': filename,
+            'start_time': timestamp,
+            'end_time': timestamp,
+            'last_keyframe': float('-inf'),
+            'keyframes': []      # [Zeitstempel, Frame-Nr., Byte-Offset]
+        }
+
+    def _close_segment(self):
+        """Segment abschließen, Index ergänzen, ggf. ältestes Segment löschen"""
+        if self.writer is None:
+            return
+
+        segment = self.current_segment
+        duration = segment['end_time'] - segment['start_time']
+        frames = self.writer.frame_count
+        actual_fps = (frames - 1) / duration if duration > 0 and frames > 1 else None
+        self.writer.close(actual_fps)
+
+        segment.pop('last_keyframe', None)
+        segment['frames'] = frames
+        segment['fps'] = round(actual_fps, 2) if actual_fps else None
+        self.segments.append(segment)
+        self.writer = None
+        self.current_segment = None
+
+        if self.max_segments and len(self.segments) > self.max_segments:
+            oldest = self.segments.pop(0)
+            try:
+                os.remove(os.path.join(self.recording_dir, oldest['file']))
+            except OSError:
+                pass
+
+        self._write_index()
+
+    # ===== H.264-PASSTHROUGH =====
+    def _start_h264(self):
+        """libcamera-vid schreibt H.264 direkt in Segmentdateien"""
+        if self.camera.camera_type != 'libcamera':
+            return False
+
+        # Kamera kann nur von einem Prozess geöffnet werden
+        self._restart_stream = self.camera.is_streaming
+        if self._restart_stream:
+            self.camera.stop_stream()
+
+        width, height = self.camera.settings['resolution']
+        cmd = [
+            'libcamera-vid',
+            '--timeout', '0',
+            '--nopreview',
+            '--codec', 'h264',
+            '--inline',                  # SPS/PPS in jedem Segment
+            '--width', str(width),
+            '--height', str(height),
+            '--framerate', str(self.camera.settings['framerate']),
+            '--segment', str(self.segment_seconds * 1000),
+            '--output', os.path.join(self.recording_dir, 'seg_%05d.h264')
+        ]
+        try:
+            self.h264_process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            return True
+        except Exception as e:
+            print(f"❌ libcamera-vid H.264 Fehler: {e}")
+            if self._restart_stream:
+                self.camera.start_stream()
+            return False
+
+    def _stop_h264(self):
+        """H.264-Aufzeichnung beenden und Segmente indizieren"""
+        if self.h264_process:
+            try:
+                self.h264_process.terminate()
+                self.h264_process.wait(timeout=3)
+            except Exception:
+                self.h264_process.kill()
+            self.h264_process = None
+
+        self._prune_h264_segments(writing=False)
+
+        # Segment-Zeiten aus den Dateizeiten ableiten
+        previous_end = self.stats['started_at']
+        for filename in sorted(os.listdir(self.recording_dir)):
+            if not filename.endswith('.h264'):
+                continue
+            end_time = os.path.getmtime(os.path.join(self.recording_dir, filename))
+            self.segments.append({
+                'file': filename,
+                'start_time': previous_end,
+                'end_time': end_time,
+                'keyframes': []
+            })
+            previous_end = end_time
+
+        if self._restart_stream:
+            self.camera.start_stream()
+
+    def _h264_monitor(self):
+        """Während H.264-Aufzeichnung: max_segments durchsetzen, bei vollem Speicher stoppen"""
+        while self.is_recording and self.mode == 'h264':
+            time.sleep(1.0)
+
+            if self.h264_process and self.h264_process.poll() is not None:
+                self.last_error = f'libcamera-vid beendet (Code {self.h264_process.returncode})'
+                self.stop()
+                return
+
+            allowed, reason = self._storage_allows_recording()
+            if not allowed:
+                self.last_error = reason
+                self.stop()
+                return
+
+            self._prune_h264_segments()
+
+    def _prune_h264_segments(self, writing=True):
+        """Älteste H.264-Segmente löschen - während der Aufnahme wird das neueste noch geschrieben"""
+        if not self.max_segments:
+            return
+        try:
+            files = sorted(f for f in os.listdir(self.recording_dir) if f.endswith('.h264'))
+        except OSError:
+            return
+        keep = self.max_segments + (1 if writing else 0)
+        for filename in files[:max(0, len(files) - keep)]:
+            try:
+                os.remove(os.path.join(self.recording_dir, filename))
+            except OSError:
+                pass
+
+    # ===== INDEX =====
+    def _write_index(self):
+        """index.json der Aufzeichnung atomar schreiben"""
+        if not self.recording_dir:
+            return
+
+        index = {
+            'mode': self.mode,
+            'started_at': self.stats['started_at'],
+            'segment_seconds': self.segment_seconds,
+            'segments': self.segments
+        }
+        path = os.path.join(self.recording_dir, 'index.json')
+        try:
+            with open(path + '.tmp', 'w') as f:
+                json.dump(index, f)
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            print(f"⚠️ Index nicht geschrieben: {e}")
+
+    @staticmethod
+    def seek(recording_dir, timestamp):
+        """Position zu einem Zeitpunkt finden -> (Segmentdatei, Frame-Nr., Byte-Offset)"""
+        with open(os.path.join(recording_dir, 'index.json'), 'r') as f:
+            index = json.load(f)
+
+        for segment in index['segments']:
+            if segment['start_time'] <= timestamp <= segment['end_time']:
+                best = None
+                for keyframe in segment['keyframes']:
+                    if keyframe[0] > timestamp:
+                        break
+                    best = keyframe
+                if best is None:
+                    return segment['file'], 0, None
+                return segment['file'], best[1], best[2]
+
+        return None
+
+    def list_recordings(self):
+        """Vorhandene Aufzeichnungen"""
+        recordings = []
+        if not os.path.isdir(self.videos_dir):
+            return recordings
+
+        for name in sorted(os.listdir(self.videos_dir), reverse=True):
+            index_path = os.path.join(self.videos_dir, name, 'index.json')
+            try:
+                with open(index_path, 'r') as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                continue
+            segments = index.get('segments', [])
+            recordings.append({
+                'name': name,
+                'mode': index.get('mode'),
+                'started_at': index.get('started_at'),
+                'segments': len(segments),
+                'duration': round(segments[-1]['end_time'] - segments[0]['start_time'], 1) if segments else 0
+            })
+        return recordings
+
+    def get_status(self):
+        """Aufzeichnungs-Status"""
+        status = {
+            'is_recording': self.is_recording,
+            'mode': self.mode,
+            'directory': self.recording_dir,
+            'segments': len(self.segments),
+            'segment_seconds': self.segment_seconds,
+            'queue_size': self.frame_queue.qsize(),
+            'last_error': self.last_error,
+            'stats': dict(self.stats)
+        }
+        if self.current_segment:
+            status['current_segment'] = self.current_segment['file']
+        return status
+
+
+# Globale Instanz
+video_recorder = VideoRecorder()
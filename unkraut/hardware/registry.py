@@ -0,0 +1,118 @@
+# hardware/registry.py
+"""
+Lazy Hardware-Registry für Unkraut-2025
+Die globalen Hardware-Instanzen (Kamera, Arm, Motoren, Sensoren, Servos, Odometrie,
+Kamerakalibrierung)
+werden erst beim ersten Zugriff oder im Hintergrund-Warm-up erzeugt.
+Import und Server-Start warten nicht mehr auf GPIO, I2C oder Kamera-Tests.
+"""
+import time
+import atexit
+import importlib
+import threading
+
+# Name der globalen Instanz -> (Modul, Klasse, Konstruktor-Argumente)
+HARDWARE_FACTORIES = {
+    'camera_manager': ('hardware.camera', 'CameraManager', {}),
+    'robot_arm': ('hardware.robot_arm', 'RobotArmController', {'debug_mode': False}),
+    'motor_controller': ('hardware.motors', 'MotorController', {}),
+    'sensor_manager': ('hardware.sensors', 'SensorManager', {}),
+    'servo_controller': ('hardware.servo_controller', 'ServoController', {}),
+    'odometry_estimator': ('hardware.odometry', 'OdometryEstimator', {}),
+    'camera_calibration': ('hardware.camera_calibration', 'CameraCalibration', {}),
+}
+
+# Warm-up-Reihenfolge - Kamera zuerst, ihre Erkennung dauert am längsten
+# Odometrie früh, damit keine Fahrt vor dem Start der Integration verloren geht
+WARMUP_ORDER = ['camera_manager', 'motor_controller', 'odometry_estimator', 'sensor_manager', 'robot_arm']
+
+
+class HardwareRegistry:
+    """Erzeugt jede Hardware-Instanz genau einmal - beim ersten Zugriff"""
+
+    def __init__(self):
+        self.instances = {}
+        self.locks = {name: threading.Lock() for name in HARDWARE_FACTORIES}
+        self.build_times = {}
+        self.errors = {}
+        self.warmup_thread = None
+
+    def get(self, name):
+        """Instanz liefern, bei Bedarf erzeugen"""
+        instance = self.instances.get(name)
+        if instance is not None:
+            return instance
+
+        if name not in HARDWARE_FACTORIES:
+            raise KeyError(f"Unbekannte Hardware: {name}")
+
+        with self.locks[name]:
+            # Anderer Thread war schneller
+            instance = self.instances.get(name)
+            if instance is not None:
+                return instance
+
+            module_name, class_name, kwargs = HARDWARE_FACTORIES[name]
+            started = time.monotonic()
+            try:
+                module = importlib.import_module(module_name)
+                instance = getattr(module, class_name)(**kwargs)
+            except Exception as e:
+                self.errors[name] = str(e)
+                raise
+
+            self.build_times[name] = round(time.monotonic() - started, 3)
+            self.errors.pop(name, None)
+
+            # Als echtes Modul-Attribut ablegen - weitere Imports gehen am __getattr__ vorbei
+            setattr(module, name, instance)
+
+            # Paket-Attribut überschreiben (hardware.robot_arm ist sonst das Untermodul)
+            package = importlib.import_module('hardware')
+            if name in package.__all__:
+                setattr(package, name, instance)
+
+            self.instances[name] = instance
+
+            # Cleanup nur für tatsächlich erzeugte Hardware
+            if hasattr(instance, 'cleanup'):
+                atexit.register(instance.cleanup)
+
+            return instance
+
+    def is_created(self, name):
+        return name in self.instances
+
+    def warm_up(self, names=None):
+        """Hardware im Hintergrund erzeugen - blockiert den Aufrufer nicht"""
+        if self.warmup_thread and self.warmup_thread.is_alive():
+            return self.warmup_thread
+
+        names = list(names) if names is not None else WARMUP_ORDER
+
+        def warmup_loop():
+            started = time.monotonic()
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"⚠️  Hardware-Warm-up {name} fehlgeschlagen: {e}")
+            print(f"🔥 Hardware-Warm-up fertig ({time.monotonic() - started:.2f}s)")
+
+        self.warmup_thread = threading.Thread(target=warmup_loop, daemon=True)
+        self.warmup_thread.start()
+        return self.warmup_thread
+
+    def get_status(self):
+        return {
+            name: {
+                'created': name in self.instances,
+                'build_time': self.build_times.get(name),
+                'error': self.errors.get(name)
+            }
+            for name in HARDWARE_FACTORIES
+        }
+
+
+# Globale Instanz
+hardware_registry = HardwareRegistry()
@@ -2,6 +2,8 @@
 """
 GEFIXTE Roboterarm-Implementierung ohne Spam
 Kontrolliertes Logging und einmalige Initialisierung
+Bewegungen laufen über den Trajektorien-Thread (hardware/arm_trajectory.py):
+alle Gelenke synchron mit fester Update-Rate, ohne den Aufrufer zu blockieren.
 """
 import time
 import threading
@@ -9,27 +11,37 @@ import math
 import os
 from datetime import datetime
 
+from hardware.arm_trajectory import TrajectoryExecutor
+from hardware.pca9685 import open_output
+from hardware.coordinates import ArmKinematics, IK_JOINTS
+from hardware.arm_jobs import WeedJobScheduler, travel_time
+from hardware.arm_safety import ArmSafety, SafetyViolation
+from hardware.servo_model import ArmStateEstimator
+from hardware.servo_calibration import ServoCalibration, CalibrationSession, REFERENCE_ANGLES, pulse_to_duty
+from hardware.motion_authority import motion_authority
+
 class RobotArmController:
     """Roboterarm-Controller mit kontrolliertem Logging"""
     
-    def __init__(self, debug_mode=False):
+    def __init__(self, debug_mode=False, authority=None):
         self.debug_mode = debug_mode  # Standard: KEIN Debug-Spam
         self.hardware_available = False
         self.pca = None
         self.i2c_address = 0x40
         self.servo_count = 6
-        self.is_moving = False
-        self.emergency_stopped = False
+        self.authority = authority or motion_authority   # Notaus für Arm, Servos und Motoren
+        self.update_rate_hz = 50      # Servo-Updates pro Sekunde während einer Bewegung
+        self.approach_height = 5.0    # cm Werkzeughöhe beim Anfahren eines Unkrauts
         self.initialized = False
         
-        # Servo-Konfiguration
+        # Servo-Konfiguration - min/max_pulse (µs) gelten, bis ein Gelenk kalibriert ist
         self.servos = {
-            'base': {'channel': 0, 'min_angle': 0, 'max_angle': 180, 'default': 90, 'current': 90},
-            'shoulder': {'channel': 1, 'min_angle': 0, 'max_angle': 180, 'default': 90, 'current': 90},
-            'elbow': {'channel': 2, 'min_angle': 0, 'max_angle': 180, 'default': 90, 'current': 90},
-            'wrist': {'channel': 3, 'min_angle': 0, 'max_angle': 180, 'default': 90, 'current': 90},
-            'gripper': {'channel': 4, 'min_angle': 0, 'max_angle': 180, 'default': 90, 'current': 90},
-            'tool': {'channel': 5, 'min_angle': 0, 'max_angle': 180, 'default': 0, 'current': 0}
+            'base': {'channel': 0, 'min_angle': 0, 'max_angle': 180, 'min_pulse': 1250, 'max_pulse': 2500, 'default': 90, 'current': 90},
+            'shoulder': {'channel': 1, 'min_angle': 0, 'max_angle': 180, 'min_pulse': 1250, 'max_pulse': 2500, 'default': 90, 'current': 90},
+            'elbow': {'channel': 2, 'min_angle': 0, 'max_angle': 180, 'min_pulse': 1250, 'max_pulse': 2500, 'default': 90, 'current': 90},
+            'wrist': {'channel': 3, 'min_angle': 0, 'max_angle': 180, 'min_pulse': 1250, 'max_pulse': 2500, 'default': 90, 'current': 90},
+            'gripper': {'channel': 4, 'min_angle': 0, 'max_angle': 180, 'min_pulse': 1250, 'max_pulse': 2500, 'default': 90, 'current': 90},
+            'tool': {'channel': 5, 'min_angle': 0, 'max_angle': 180, 'min_pulse': 1250, 'max_pulse': 2500, 'default': 0, 'current': 0}
         }
         
         # Preset-Positionen
@@ -41,10 +53,44 @@ class RobotArmController:
             'maintenance': {'base': 90, 'shoulder': 135, 'elbow': 135, 'wrist': 90, 'gripper': 0, 'tool': 0}
         }
         
+        # Kollisionsprüfung (hardware/arm_safety.py) - jeder Servo-Takt wird vorher nachgeschlagen
+        self.safety = ArmSafety({joint: (self.servos[joint]['min_angle'], self.servos[joint]['max_angle'])
+                                 for joint in IK_JOINTS})
+        
+        # Winkel -> Puls-Tabellen pro Servo (hardware/servo_calibration.py), vorab zu Duty-Cycles kompiliert
+        self.calibration = ServoCalibration({joint: (servo['min_pulse'], servo['max_pulse'])
+                                             for joint, servo in self.servos.items()})
+        self.calibration_session = None
+        self._calibration_lock = threading.Lock()
+        
+        # Servo-Modell: geschätzte Ist-Stellung statt des zuletzt gesendeten Sollwerts
+        self.estimator = ArmStateEstimator({joint: servo['current'] for joint, servo in self.servos.items()})
+        
         # Initialisierung nur einmal
         if not self.initialized:
             self._init_hardware()
             self.initialized = True
+        
+        self.executor = TrajectoryExecutor(self._write_joints, self.get_current_position(), self.update_rate_hz)
+        
+        # Inverse Kinematik (hardware/coordinates.py) mit den Gelenkgrenzen aus self.servos
+        self.kinematics = ArmKinematics({joint: (self.servos[joint]['min_angle'], self.servos[joint]['max_angle'])
+                                         for joint in IK_JOINTS})
+        
+        # Job-Warteschlange für mehrere Unkräuter (hardware/arm_jobs.py) - Thread startet mit start()
+        self.jobs = WeedJobScheduler(self)
+        
+        self.authority.register('robot_arm', self)
+    
+    @property
+    def emergency_stopped(self):
+        """Notaus aktiv? Gilt bis zum ausdrücklichen reset_emergency()"""
+        return self.authority.stopped
+    
+    @property
+    def is_moving(self):
+        """Läuft oder wartet eine Bewegung - oder sind die Servos noch unterwegs?"""
+        return self.executor.is_busy() or not self.estimator.settled()
     
     def _log(self, message, level='INFO'):
         """Kontrolliertes Logging - nur wenn debug_mode=True"""
@@ -54,37 +100,20 @@ class RobotArmController:
     
     def _init_hardware(self):
         """Hardware-Initialisierung - OHNE Spam"""
-        try:
-            # Versuche PCA9685 zu importieren
-            from adafruit_pca9685 import PCA9685
-            import board
-            import busio
-            
-            # I2C-Verbindung
-            i2c = busio.I2C(board.SCL, board.SDA)
-            self.pca = PCA9685(i2c, address=self.i2c_address)
-            self.pca.frequency = 50
-            
-            self.hardware_available = True
+        # PCA9685 mit Schattenregistern - ohne I2C am Mock-Bus, der Transfers zählt
+        self.pca, self.hardware_available = open_output(self.i2c_address, frequency=50)
+        if self.hardware_available:
             self._log("Hardware-Initialisierung erfolgreich", 'SUCCESS')
-            
-            # NUR EINMAL zur Home-Position - OHNE Spam
-            self._move_to_preset_silent('home')
-            
-        except Exception as e:
-            self.hardware_available = False
-            self._log(f"Hardware nicht verfügbar: {e}", 'WARNING')
+        else:
+            self._log("Hardware nicht verfügbar", 'WARNING')
             self._log("Verwende Mock-Modus", 'INFO')
-    
-    def _angle_to_duty_cycle(self, angle):
-        """Winkel zu PWM-Duty-Cycle konvertieren"""
-        min_duty = 0x1000  # ~6.25% duty cycle
-        max_duty = 0x2000  # ~12.5% duty cycle
         
-        angle = max(0, min(180, angle))
-        duty_cycle = min_duty + (angle / 180.0) * (max_duty - min_duty)
-        
-        return int(duty_cycle)
+        # NUR EINMAL zur Home-Position - OHNE Spam
+        self._move_to_preset_silent('home')
+    
+    def _angle_to_duty_cycle(self, joint_name, angle):
+        """Winkel zu PWM-Duty-Cycle - Nachschlagen in der kalibrierten Tabelle des Gelenks"""
+        return self.calibration.tables[joint_name].duty_at(angle)
     
     def _move_to_preset_silent(self, preset_name):
         """Zur Preset-Position fahren - OHNE Debug-Ausgabe"""
@@ -93,124 +122,173 @@ class RobotArmController:
         
         preset = self.presets[preset_name]
         
-        if self.hardware_available and self.pca:
-            try:
-                for joint_name, angle in preset.items():
-                    if joint_name in self.servos:
-                        servo = self.servos[joint_name]
-                        duty_cycle = self._angle_to_duty_cycle(angle)
-                        self.pca.channels[servo['channel']].duty_cycle = duty_cycle
-                        servo['current'] = angle
-                        
-                        # Kurze Pause zwischen Servos
-                        time.sleep(0.02)
-                
-                return True
-                
-            except Exception as e:
-                self._log(f"Hardware-Preset-Fehler: {e}", 'ERROR')
-                return False
-        else:
-            # Mock-Modus - nur Current-Position updaten
-            for joint_name, angle in preset.items():
-                if joint_name in self.servos:
-                    self.servos[joint_name]['current'] = angle
-            
+        try:
+            self._write_joints({joint: angle for joint, angle in preset.items() if joint in self.servos})
             return True
+        except Exception as e:
+            self._log(f"Hardware-Preset-Fehler: {e}", 'ERROR')
+            return False
+    
+    def _write_joints(self, positions):
+        """Ein Servo-Update für alle Gelenke (vom Trajektorien-Thread pro Takt aufgerufen)
+        
+        Blockierte Stellungen werden nicht geschrieben - die Ausnahme bricht die Trajektorie ab.
+        """
+        if self.authority.stopped:
+            raise RuntimeError("Notaus aktiv")
+        if not self.safety.is_free(positions):
+            self.safety.stats['violations'] += 1
+            raise SafetyViolation(f"Kollision bei {', '.join(self.safety.explain(positions)) or 'Sicherheitsabstand'}")
+        
+        tables = self.calibration.tables
+        for joint_name, angle in positions.items():
+            self.pca.set_duty(self.servos[joint_name]['channel'], tables[joint_name].duty_at(angle))
+        
+        # Nur geänderte Kanäle, alle in einem I2C-Transfer
+        self.pca.flush()
+        self.estimator.command(positions)
     
-    def move_joint(self, joint_name, angle, duration=1.0):
-        """Einzelnes Gelenk bewegen - OHNE Spam"""
-        if self.emergency_stopped:
+    def _start_motion(self, targets, duration, wait, mode, calibration=False):
+        """Bewegung an den Trajektorien-Thread geben - MotionHandle oder mit wait=True das Ergebnis"""
+        if not self.authority.allows():
             self._log("Bewegung blockiert - Emergency Stop aktiv", 'WARNING')
             return False
+        if self.calibration_session is not None and not calibration:
+            self._log("Bewegung blockiert - Servo-Kalibrierung läuft", 'WARNING')
+            return False
         
-        if joint_name not in self.servos:
-            self._log(f"Unbekanntes Gelenk: {joint_name}", 'ERROR')
+        # Ziel und geraden Weg gegen die Kollisions-Bitmap prüfen, bei Bedarf über eine Zwischenpose
+        start = {joint: self.executor.positions[joint] for joint in IK_JOINTS}
+        goal = {joint: targets.get(joint, start[joint]) for joint in IK_JOINTS}
+        if mode == 'queue':
+            # Startpunkt ist das Ende der Warteschlange - nur das Ziel prüfen, den Weg prüft der Regeltakt
+            route = [goal] if self.safety.is_free(goal) else None
+        else:
+            route = self.safety.find_route(start, goal, [self.presets['home']])
+        if route is None:
+            self._log(f"Bewegung abgelehnt - {', '.join(self.check_pose(targets))}", 'WARNING')
             return False
         
-        servo = self.servos[joint_name]
-        angle = max(servo['min_angle'], min(servo['max_angle'], angle))
-        
-        if self.hardware_available and self.pca:
-            try:
-                duty_cycle = self._angle_to_duty_cycle(angle)
-                self.pca.channels[servo['channel']].duty_cycle = duty_cycle
-                servo['current'] = angle
-                
-                # NUR bei debug_mode ausgeben
-                if self.debug_mode:
-                    print(f"🦾 {joint_name}: {angle}° (Hardware)")
-                
-                # Pause für Servo-Bewegung
-                time.sleep(max(0.1, duration))
-                
-                return True
-                
-            except Exception as e:
-                self._log(f"Hardware-Bewegung fehlgeschlagen: {e}", 'ERROR')
-                return False
+        if len(route) > 1:
+            # Dauer nach Gelenkweg auf die Teilstücke verteilen, das letzte bringt alle Ziele (auch Werkzeug)
+            waypoints = [start] + route
+            spans = [max(abs(b[joint] - a[joint]) for joint in IK_JOINTS) for a, b in zip(waypoints, waypoints[1:])]
+            total = sum(spans) or 1.0
+            self._log(f"Umweg über {len(route) - 1} Zwischenpose(n) wegen Kollision auf direktem Weg")
+            for index, (via, span) in enumerate(zip(route[:-1], spans)):
+                self.executor.execute(via, duration * span / total, mode if index == 0 else 'queue')
+            handle = self.executor.execute(targets, duration * spans[-1] / total, 'queue')
         else:
-            # Mock-Modus - nur Current-Position updaten
-            servo['current'] = angle
-            
-            # NUR bei debug_mode ausgeben
-            if self.debug_mode:
-                print(f"🦾 {joint_name}: {angle}° (Mock)")
-            
-            return True
+            handle = self.executor.execute(targets, duration, mode)
+        handle.expected_arrival = self.estimator.predict_arrival(targets, self.executor.busy_until())
+        if wait:
+            return self._wait_arrival(handle, duration)
+        return handle
     
-    def move_to_preset(self, preset_name, duration=2.0):
-        """Zur Preset-Position fahren"""
-        if self.emergency_stopped:
-            self._log("Bewegung blockiert - Emergency Stop aktiv", 'WARNING')
+    def _wait_arrival(self, handle, duration):
+        """Bis die Servos wirklich angekommen sind - Sollwert-Ende plus vorhergesagte Restfahrt, ohne Reserve"""
+        if not handle.wait(duration + 5.0):
+            return False
+        return self.estimator.wait_settled(timeout=5.0)
+    
+    def check_pose(self, positions):
+        """Kollisionsgründe für eine (Teil-)Stellung - leere Liste, wenn frei"""
+        pose = self.get_current_position()
+        pose.update(positions)
+        if self.safety.is_free(pose):
+            return []
+        return self.safety.explain(pose) or ['margin']
+    
+    def _clamp(self, joint_name, angle):
+        servo = self.servos[joint_name]
+        return max(servo['min_angle'], min(servo['max_angle'], angle))
+    
+    def move_joint(self, joint_name, angle, duration=1.0, wait=False, mode='replace'):
+        """Einzelnes Gelenk bewegen - kehrt sofort zurück, mit wait=True nach Bewegungsende"""
+        if joint_name not in self.servos:
+            self._log(f"Unbekanntes Gelenk: {joint_name}", 'ERROR')
             return False
         
+        angle = self._clamp(joint_name, angle)
+        
+        # NUR bei debug_mode ausgeben
+        if self.debug_mode:
+            print(f"🦾 {joint_name}: {angle}° in {duration}s ({'Hardware' if self.hardware_available else 'Mock'})")
+        
+        return self._start_motion({joint_name: angle}, duration, wait, mode)
+    
+    def move_to_preset(self, preset_name, duration=2.0, wait=False, mode='replace'):
+        """Zur Preset-Position fahren - alle Gelenke kommen gleichzeitig an"""
         if preset_name not in self.presets:
             self._log(f"Unbekanntes Preset: {preset_name}", 'ERROR')
             return False
         
         self._log(f"Fahre zu Preset: {preset_name}")
         
-        self.is_moving = True
-        
-        def move_sequence():
-            try:
-                preset = self.presets[preset_name]
-                
-                if self.hardware_available and self.pca:
-                    # Hardware-Bewegung
-                    for joint_name, angle in preset.items():
-                        if joint_name in self.servos:
-                            servo = self.servos[joint_name]
-                            duty_cycle = self._angle_to_duty_cycle(angle)
-                            self.pca.channels[servo['channel']].duty_cycle = duty_cycle
-                            servo['current'] = angle
-                            
-                            # Kurze Pause zwischen Servos
-                            time.sleep(0.05)
-                    
-                    # Warten auf Bewegungsende
-                    time.sleep(duration)
-                    
-                else:
-                    # Mock-Modus
-                    for joint_name, angle in preset.items():
-                        if joint_name in self.servos:
-                            self.servos[joint_name]['current'] = angle
-                    
-                    # Simuliere Bewegungszeit
-                    time.sleep(duration * 0.2)
-                
-                self.is_moving = False
-                
-            except Exception as e:
-                self._log(f"Preset-Bewegung fehlgeschlagen: {e}", 'ERROR')
-                self.is_moving = False
-        
-        # Bewegung in separatem Thread
-        thread = threading.Thread(target=move_sequence, daemon=True)
-        thread.start()
+        targets = {joint: self._clamp(joint, angle) for joint, angle in self.presets[preset_name].items()
+                   if joint in self.servos}
+        return self._start_motion(targets, duration, wait, mode)
+    
+    def set_custom_position(self, positions, duration=1.5, wait=False, mode='replace'):
+        """Mehrere Gelenke synchron auf beliebige Winkel fahren"""
+        targets = {joint: self._clamp(joint, angle) for joint, angle in positions.items() if joint in self.servos}
+        if not targets:
+            self._log("Keine gültigen Gelenke", 'ERROR')
+            return False
+        
+        return self._start_motion(targets, duration, wait, mode)
+    
+    def solve_xy(self, x, y, height=0.0):
+        """Bodenpunkt (cm relativ zum Arm-Fuß) -> Gelenkwinkel oder None, wenn unerreichbar"""
+        return self.kinematics.solve(x, y, height)
+    
+    def move_to_xy(self, x, y, height=0.0, duration=1.0, wait=False, mode='replace'):
+        """Werkzeugspitze senkrecht über/auf den Bodenpunkt (x, y) fahren"""
+        angles = self.solve_xy(x, y, height)
+        if angles is None:
+            self._log(f"Punkt ({x}, {y}) außerhalb des Arbeitsraums", 'WARNING')
+            return False
+        
+        return self._start_motion(angles, duration, wait, mode)
+    
+    def weed_removal_sequence(self, target_x=0, target_y=0, on_step=None, return_to_detect=True):
+        """Unkraut bei (target_x, target_y) in cm entfernen - jeder Schritt wartet auf den vorherigen
         
+        Bricht ab, sobald ein Schritt nicht ankommt (Notaus oder neue Bewegung). True bei Erfolg.
+        on_step(schritt) wird nach jedem abgeschlossenen Schritt aufgerufen (z.B. 'tool_on').
+        return_to_detect=False bleibt über dem Unkraut - die Job-Warteschlange fährt direkt weiter.
+        """
+        hover = self.solve_xy(target_x, target_y, self.approach_height)
+        if hover is None or self.solve_xy(target_x, target_y) is None:
+            self._log(f"Unkraut bei ({target_x}, {target_y}) nicht erreichbar", 'WARNING')
+            return False
+        
+        # Anfahrzeit aus dem Gelenkweg statt fest - kurze Wege zwischen Nachbarn gehen schneller
+        approach_duration = travel_time(self.get_current_position(), hover)
+        
+        # Ein Notaus zwischen zwei Schritten beendet die Sequenz - auch nach einem Reset
+        epoch = self.authority.epoch
+        self._log(f"Unkraut-Entfernung bei X={target_x}, Y={target_y}")
+        steps = [
+            ('approach', 'Anfahren', lambda: self._start_motion(hover, approach_duration, True, 'replace')),
+            ('descend', 'Absenken', lambda: self.move_to_xy(target_x, target_y, 0.0, 0.5, wait=True)),
+            ('tool_on', 'Werkzeug an', lambda: self.move_joint('tool', 180, 0.5, wait=True)),
+            ('tool_off', 'Werkzeug aus', lambda: self.move_joint('tool', 0, 0.3, wait=True)),
+            ('lift', 'Anheben', lambda: self.move_to_xy(target_x, target_y, self.approach_height, 0.5, wait=True)),
+            ('return', 'Zurück', lambda: self.move_to_preset('weed_detect', 1.0, wait=True))
+        ]
+        if not return_to_detect:
+            steps.pop()
+        
+        for step, (key, description, action) in enumerate(steps, 1):
+            self._log(f"{step}/{len(steps)}: {description}")
+            if self.authority.epoch != epoch or not action():
+                self._log(f"Unkraut-Entfernung abgebrochen bei: {description}", 'WARNING')
+                return False
+            if on_step:
+                on_step(key)
+        
+        self._log("Unkraut-Entfernung abgeschlossen", 'SUCCESS')
         return True
     
     def home_position(self):
@@ -226,47 +304,174 @@ class RobotArmController:
         self._log("Aktiviere Werkzeug")
         return self.move_joint('tool', 180, 0.5)
     
-    def emergency_stop(self):
-        """Notaus"""
-        self.emergency_stopped = True
-        self.is_moving = False
-        
-        if self.hardware_available and self.pca:
-            try:
-                for servo in self.servos.values():
-                    self.pca.channels[servo['channel']].duty_cycle = 0
-                self._log("Hardware-Notaus aktiviert", 'EMERGENCY')
-            except:
-                pass
+    def emergency_stop(self, reason='robot_arm'):
+        """Notaus - hält über die zentrale Freigabe Arm, Servos und Motoren an"""
+        self.authority.emergency_stop(reason)
+        return True
+    
+    def reset_emergency(self):
+        """Notaus ausdrücklich aufheben"""
+        return self.authority.reset()
+    
+    def halt(self):
+        """Vom Notaus aufgerufen: Trajektorie und Jobs verwerfen, Servos stromlos"""
+        # Trajektorie abbrechen - danach schreibt der Thread keine Servos mehr
+        self.executor.cancel()
+        self.estimator.hold()
+        self.jobs.clear()
+        self.calibration_session = None
         
-        # Nach 3 Sekunden Reset
-        def reset_emergency():
-            time.sleep(3.0)
-            self.emergency_stopped = False
-            self._log("Notaus zurückgesetzt", 'INFO')
+        try:
+            for servo in self.servos.values():
+                self.pca.set_duty(servo['channel'], 0)
+            self.pca.flush()
+            self._log("Hardware-Notaus aktiviert", 'EMERGENCY')
+        except Exception as e:
+            self._log(f"Notaus-Ausgabe fehlgeschlagen: {e}", 'ERROR')
+    
+    # ===== SERVO-KALIBRIERUNG =====
+    def start_calibration(self, joint_name, angles=None, interpolation='linear'):
+        """Geführte Kalibrierung starten - fährt den ersten Referenzwinkel an
         
-        thread = threading.Thread(target=reset_emergency, daemon=True)
-        thread.start()
+        Referenzwinkel, die mit der aktuellen Stellung der übrigen Gelenke kollidieren,
+        werden übersprungen. ValueError bei ungültiger Eingabe, RuntimeError wenn der Arm belegt ist.
+        """
+        with self._calibration_lock:
+            if joint_name not in self.servos:
+                raise ValueError(f"Unbekanntes Gelenk: {joint_name}")
+            if self.calibration_session is not None:
+                raise RuntimeError(f"Kalibrierung von {self.calibration_session.joint} läuft bereits")
+            if not self.authority.allows():
+                raise RuntimeError("Notaus aktiv")
+            if self.executor.is_busy():
+                raise RuntimeError("Arm bewegt sich")
+            
+            servo = self.servos[joint_name]
+            pose = dict(self.executor.positions)
+            reachable = [float(angle) for angle in (angles or REFERENCE_ANGLES)
+                         if servo['min_angle'] <= angle <= servo['max_angle']
+                         and (joint_name not in IK_JOINTS or self.safety.is_free(dict(pose, **{joint_name: angle})))]
+            session = CalibrationSession(joint_name, self.calibration.tables[joint_name], reachable, interpolation)
+            
+            self.calibration_session = session
+            self._log(f"Kalibrierung {joint_name}: Referenzwinkel {reachable}")
+            self._calibration_goto(session)
+            return session.get_status()
+    
+    def _calibration_goto(self, session):
+        """Referenzwinkel mit der bisherigen Tabelle anfahren, dann den Kalibrierpuls schreiben"""
+        if not self._start_motion({session.joint: session.target}, 1.0, True, 'replace', calibration=True):
+            self.calibration_session = None
+            raise RuntimeError(f"Referenzwinkel {session.target}° nicht erreicht")
+        self._write_calibration_pulse(session)
+    
+    def _write_calibration_pulse(self, session):
+        if not self.authority.allows():
+            raise RuntimeError("Notaus aktiv")
+        self.pca.set_duty(self.servos[session.joint]['channel'], pulse_to_duty(session.pulse, self.calibration.frequency))
+        self.pca.flush()
+    
+    def _require_session(self):
+        if self.calibration_session is None:
+            raise RuntimeError("Keine Kalibrierung aktiv")
+        return self.calibration_session
+    
+    def set_calibration_pulse(self, pulse_us=None, delta_us=None):
+        """Puls am aktuellen Referenzwinkel absolut setzen oder um delta_us verstellen"""
+        with self._calibration_lock:
+            session = self._require_session()
+            if pulse_us is not None:
+                session.set_pulse(pulse_us)
+            else:
+                session.jog(delta_us or 0)
+            self._write_calibration_pulse(session)
+            return session.get_status()
+    
+    def record_calibration_point(self):
+        """Gelenk steht genau am Referenzwinkel - Puls übernehmen und nächsten Winkel anfahren"""
+        with self._calibration_lock:
+            session = self._require_session()
+            if session.record() is not None:
+                self._calibration_goto(session)
+            return session.get_status()
+    
+    def finish_calibration(self):
+        """Tabelle aus den gemessenen Punkten speichern - gilt ab dem nächsten Servo-Takt"""
+        with self._calibration_lock:
+            session = self._require_session()
+            table = session.build()
+            self.calibration.set_table(session.joint, table.points, table.interpolation)
+            self.calibration_session = None
+            self._rewrite_joint(session.joint)
+            self._log(f"Kalibrierung {session.joint} gespeichert ({len(table.points)} Punkte)", 'SUCCESS')
+            return {'status': 'calibrated', 'joint': session.joint, 'table': table.to_dict()}
+    
+    def abort_calibration(self):
+        """Kalibrierung verwerfen - die bisherige Tabelle bleibt"""
+        with self._calibration_lock:
+            session = self._require_session()
+            self.calibration_session = None
+            self._rewrite_joint(session.joint)
+            return {'status': 'aborted', 'joint': session.joint}
+    
+    def reset_calibration(self, joint_name):
+        """Gelenk zurück auf die lineare Zuordnung aus min_pulse/max_pulse"""
+        with self._calibration_lock:
+            if self.calibration_session is not None and self.calibration_session.joint == joint_name:
+                raise RuntimeError(f"Kalibrierung von {joint_name} läuft")
+            self.calibration.reset(joint_name)
+            self._rewrite_joint(joint_name)
+            return {'status': 'reset', 'joint': joint_name}
+    
+    def _rewrite_joint(self, joint_name):
+        """Sollstellung mit der aktuellen Tabelle neu schreiben - ersetzt einen gejoggten Kalibrierpuls
         
-        return True
+        Alle Gelenke, denn die Kollisionsprüfung in _write_joints braucht die ganze Stellung.
+        """
+        if self.executor.is_busy() or not self.authority.allows():
+            return
+        try:
+            self._write_joints(dict(self.executor.positions))
+        except Exception as e:
+            self._log(f"Gelenk {joint_name} nicht neu geschrieben: {e}", 'ERROR')
+    
+    def get_calibration_status(self):
+        session = self.calibration_session
+        return {
+            'servos': self.calibration.get_status(),
+            'session': session.get_status() if session else None
+        }
     
     def get_current_position(self):
-        """Aktuelle Position aller Gelenke"""
+        """Geschätzte Ist-Position aller Gelenke (Servo-Modell, nicht der letzte Sollwert)"""
+        for joint, angle in self.estimator.estimate().items():
+            self.servos[joint]['current'] = round(angle, 1)
         return {joint: servo['current'] for joint, servo in self.servos.items()}
     
+    def get_commanded_position(self):
+        """Zuletzt gesendeter Sollwert aller Gelenke"""
+        return {joint: round(angle, 1) for joint, angle in self.executor.positions.items()}
+    
     def get_arm_info(self):
         """Arm-Informationen"""
         return {
             'controller': {
                 'hardware_available': self.hardware_available,
                 'i2c_address': hex(self.i2c_address),
+                'pwm_output': self.pca.get_status(),
                 'servo_count': self.servo_count,
                 'is_moving': self.is_moving,
                 'emergency_stopped': self.emergency_stopped
             },
             'joints': list(self.servos.keys()),
             'presets': list(self.presets.keys()),
-            'current_position': self.get_current_position()
+            'current_position': self.get_current_position(),
+            'motion': self.executor.get_status(),
+            'servos': self.estimator.get_status(),
+            'workspace': self.kinematics.get_workspace(),
+            'safety': self.safety.get_status(),
+            'calibration': self.get_calibration_status(),
+            'jobs': self.jobs.get_status()
         }
     
     def get_status(self):
@@ -286,15 +491,24 @@ class RobotArmController:
     def disable_debug(self):
         """Debug-Modus deaktivieren"""
         self.debug_mode = False
+    
+    def cleanup(self):
+        """Job-Warteschlange und Trajektorien-Thread beenden"""
+        self.authority.unregister(self)
+        self.jobs.stop()
+        self.executor.stop()
 
-# Globale Instanz - OHNE Debug-Spam
-robot_arm = RobotArmController(debug_mode=False)
+# Globale Instanz - OHNE Debug-Spam, erst beim ersten Zugriff erzeugt (hardware/registry.py)
+def __getattr__(name):
+    if name == 'robot_arm':
+        from hardware.registry import hardware_registry
+        return hardware_registry.get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Test-Funktionen
 def test_robot_arm_silent():
     """Test ohne Spam"""
     print("🧪 Teste Roboterarm (leise)...")
-    
     info = robot_arm.get_arm_info()
     print(f"✅ Hardware: {info['controller']['hardware_available']}")
     print(f"✅ Servos: {info['controller']['servo_count']}")
@@ -304,14 +518,14 @@ def test_robot_arm_silent():
 def test_robot_arm_debug():
     """Test mit Debug"""
     print("🧪 Teste Roboterarm (debug)...")
-    
     robot_arm.enable_debug()
-    robot_arm.move_joint('base', 45)
-    time.sleep(0.5)
-    robot_arm.move_joint('base', 90)
+    robot_arm.move_joint('base', 45, 0.5, wait=True)
+    robot_arm.move_joint('base', 90, 0.5, wait=True)
     robot_arm.disable_debug()
     
     return True
 
 if __name__ == '__main__':
+    # Direkt gestartet: eigene Instanz für den Selbsttest
+    robot_arm = RobotArmController(debug_mode=False)
     test_robot_arm_silent()
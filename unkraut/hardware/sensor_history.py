@@ -0,0 +1,282 @@
+# hardware/sensor_history.py
+"""
+Sensor-Zeitreihen für Unkraut-2025
+Jeder Kanal (z.B. 'battery.voltage', 'distances.front') hat einen festen
+numpy-Ringpuffer für Rohwerte und Rollups mit 1 s, 10 s und 1 min Auflösung
+(min/max/mittel). Verlaufsabfragen lesen nur die Rollups, nie die Rohwerte.
+Rohwerte werden periodisch binär nach data/sessions/<session>/ geschrieben.
+"""
+import os
+import json
+import time
+import threading
+from datetime import datetime
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SESSIONS_DIR = os.path.join(PROJECT_ROOT, 'data', 'sessions')
+
+RAW_CAPACITY = 4096          # Rohwerte pro Kanal (Ultraschall mit 20 Hz: ~3,4 min)
+
+# Auflösung in Sekunden -> Anzahl Buckets (1 h, 6 h, 24 h)
+ROLLUPS = {1: 3600, 10: 2160, 60: 1440}
+
+# Nicht als Zeitreihe führen - die Position hat ihren eigenen Verlauf in der Odometrie
+EXCLUDED_SENSORS = {'gps'}
+
+MAX_POINTS = 500             # Ohne step: so viele Punkte pro Abfrage höchstens
+
+# Binärformat der Sitzungsdateien: Zeit, Kanal-Nummer, Wert (14 Bytes pro Wert)
+RECORD_DTYPE = np.dtype([('t', '<f8'), ('channel', '<u2'), ('value', '<f4')])
+DATA_FILE = 'sensors.bin'
+CHANNELS_FILE = 'sensors_channels.json'
+
+
+def flatten_reading(name, value):
+    """Messwert in numerische Kanäle zerlegen: {'voltage': 12.3} -> {'battery.voltage': 12.3}"""
+    if isinstance(value, bool):
+        return {}
+    if isinstance(value, (int, float)):
+        return {name: float(value)}
+    if isinstance(value, dict):
+        channels = {}
+        for key, item in value.items():
+            if key != 'timestamp':
+                channels.update(flatten_reading(f"{name}.{key}", item))
+        return channels
+    return {}
+
+
+class _Rollup:
+    """Ringpuffer aus Zeit-Buckets fester Breite mit min/max/Summe/Anzahl"""
+
+    def __init__(self, resolution, capacity):
+        self.resolution = resolution
+        self.capacity = capacity
+        self.bucket_ids = np.full(capacity, -1, dtype=np.int64)
+        self.mins = np.zeros(capacity)
+        self.maxs = np.zeros(capacity)
+        self.sums = np.zeros(capacity)
+        self.counts = np.zeros(capacity, dtype=np.int64)
+
+    def add(self, timestamp, value):
+        bucket = int(timestamp // self.resolution)
+        slot = bucket % self.capacity
+        if self.bucket_ids[slot] != bucket:
+            # Slot gehört zu einem abgelaufenen Bucket - überschreiben
+            self.bucket_ids[slot] = bucket
+            self.mins[slot] = self.maxs[slot] = self.sums[slot] = value
+            self.counts[slot] = 1
+        else:
+            self.mins[slot] = min(self.mins[slot], value)
+            self.maxs[slot] = max(self.maxs[slot], value)
+            self.sums[slot] += value
+            self.counts[slot] += 1
+
+    def retention(self):
+        return self.resolution * self.capacity
+
+    def query(self, start, end):
+        """Belegte Buckets im Zeitraum, aufsteigend"""
+        first = int(start // self.resolution)
+        last = int(end // self.resolution)
+        first = max(first, last - self.capacity + 1)
+        wanted = np.arange(first, last + 1, dtype=np.int64)
+        slots = wanted % self.capacity
+        valid = self.bucket_ids[slots] == wanted
+        slots = slots[valid]
+        return (wanted[valid], self.mins[slots].copy(), self.maxs[slots].copy(),
+                self.sums[slots].copy(), self.counts[slots].copy())
+
+
+class _Channel:
+    """Rohwert-Ring und Rollups eines Kanals"""
+
+    def __init__(self, channel_id):
+        self.channel_id = channel_id
+        self.times = np.zeros(RAW_CAPACITY)
+        self.values = np.zeros(RAW_CAPACITY, dtype=np.float32)
+        self.written = 0          # Rohwerte insgesamt
+        self.flushed = 0          # davon bereits auf Platte
+        self.rollups = {resolution: _Rollup(resolution, capacity) for resolution, capacity in ROLLUPS.items()}
+
+    def add(self, timestamp, value):
+        slot = self.written % RAW_CAPACITY
+        self.times[slot] = timestamp
+        self.values[slot] = value
+        self.written += 1
+        for rollup in self.rollups.values():
+            rollup.add(timestamp, value)
+
+    def unflushed(self):
+        """Noch nicht geschriebene Rohwerte (im Ring überschriebene sind verloren)"""
+        first = max(self.flushed, self.written - RAW_CAPACITY)
+        slots = np.arange(first, self.written) % RAW_CAPACITY
+        return self.times[slots], self.values[slots]
+
+
+class SensorHistory:
+    """Zeitreihen-Speicher für alle Sensor-Kanäle"""
+
+    def __init__(self, sessions_dir=SESSIONS_DIR, flush_interval=30.0):
+        self.sessions_dir = sessions_dir
+        self.flush_interval = flush_interval
+        self.session = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.channels = {}
+        self.lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self.thread = None
+        self.stats = {'samples': 0, 'flushes': 0, 'flushed_bytes': 0, 'last_flush': None}
+
+    # ===== SCHREIBEN =====
+    def record(self, name, value, timestamp=None):
+        """Messwert eines Sensors eintragen - verschachtelte Werte ergeben mehrere Kanäle"""
+        if name in EXCLUDED_SENSORS:
+            return
+        timestamp = time.time() if timestamp is None else timestamp
+        readings = flatten_reading(name, value)
+        with self.lock:
+            for channel_name, channel_value in readings.items():
+                channel = self.channels.get(channel_name)
+                if channel is None:
+                    channel = self.channels[channel_name] = _Channel(len(self.channels))
+                channel.add(timestamp, channel_value)
+            self.stats['samples'] += len(readings)
+
+    # ===== ABFRAGEN =====
+    def get_channels(self):
+        """Bekannte Kanäle"""
+        with self.lock:
+            return sorted(self.channels)
+
+    def _pick_rollup(self, channel, start, step):
+        """Gröbste Auflösung <= step, die den Zeitraum noch abdeckt"""
+        resolutions = sorted(channel.rollups)
+        chosen = resolutions[0]
+        for resolution in resolutions:
+            if resolution <= step:
+                chosen = resolution
+        # Rollups reichen vom neuesten Wert des Kanals so weit zurück, wie sie Buckets haben
+        latest = channel.times[(channel.written - 1) % RAW_CAPACITY]
+        age = latest - start
+        while channel.rollups[chosen].retention() < age and chosen != resolutions[-1]:
+            chosen = resolutions[resolutions.index(chosen) + 1]
+        return channel.rollups[chosen]
+
+    def query(self, channel_name, start=None, end=None, step=None):
+        """Verlauf eines Kanals aus den Rollups - Spalten t/min/max/mean, step in Sekunden"""
+        end = time.time() if end is None else end
+        start = end - 600 if start is None else start
+        if end <= start:
+            raise ValueError('from muss vor to liegen')
+        if step is None:
+            step = max(1.0, (end - start) / MAX_POINTS)
+        if step <= 0:
+            raise ValueError('step muss positiv sein')
+
+        with self.lock:
+            channel = self.channels.get(channel_name)
+            if channel is None:
+                raise KeyError(channel_name)
+            rollup = self._pick_rollup(channel, start, step)
+            buckets, mins, maxs, sums, counts = rollup.query(start, end)
+
+        # Mehrere Buckets zu einem Schritt zusammenfassen
+        factor = max(1, int(round(step / rollup.resolution)))
+        keys = buckets // factor
+        if len(keys):
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+            keys = keys[starts]
+            mins = np.minimum.reduceat(mins, starts)
+            maxs = np.maximum.reduceat(maxs, starts)
+            sums = np.add.reduceat(sums, starts)
+            counts = np.add.reduceat(counts, starts)
+
+        return {
+            'channel': channel_name,
+            'from': start,
+            'to': end,
+            'resolution': rollup.resolution,
+            'step': rollup.resolution * factor,
+            't': (keys * factor * rollup.resolution).tolist(),
+            'min': np.round(mins, 3).tolist(),
+            'max': np.round(maxs, 3).tolist(),
+            'mean': np.round(sums / np.maximum(counts, 1), 3).tolist()
+        }
+
+    # ===== PERSISTENZ =====
+    def session_dir(self):
+        return os.path.join(self.sessions_dir, self.session)
+
+    def flush(self):
+        """Neue Rohwerte aller Kanäle an die Sitzungsdatei anhängen"""
+        with self.lock:
+            parts = []
+            for channel in self.channels.values():
+                times, values = channel.unflushed()
+                if len(times):
+                    records = np.empty(len(times), dtype=RECORD_DTYPE)
+                    records['t'] = times
+                    records['channel'] = channel.channel_id
+                    records['value'] = values
+                    parts.append(records)
+                channel.flushed = channel.written
+            channel_ids = {name: channel.channel_id for name, channel in self.channels.items()}
+
+        if not parts:
+            return 0
+
+        records = np.concatenate(parts)
+        records.sort(order='t')
+        os.makedirs(self.session_dir(), exist_ok=True)
+        with open(os.path.join(self.session_dir(), CHANNELS_FILE), 'w') as f:
+            json.dump(channel_ids, f, indent=2)
+        with open(os.path.join(self.session_dir(), DATA_FILE), 'ab') as f:
+            records.tofile(f)
+
+        self.stats['flushes'] += 1
+        self.stats['flushed_bytes'] += records.nbytes
+        self.stats['last_flush'] = time.time()
+        return len(records)
+
+    def _flush_loop(self):
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ Sensor-Verlauf nicht gespeichert: {e}")
+
+    def start(self):
+        """Periodisches Speichern starten"""
+        if self.thread and self.thread.is_alive():
+            return
+        self._stop_event.clear()
+        self.thread = threading.Thread(target=self._flush_loop, name='sensor-history-flush', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Speichern beenden - offene Rohwerte noch schreiben"""
+        self._stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=2.0)
+            self.thread = None
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"⚠️ Sensor-Verlauf nicht gespeichert: {e}")
+
+    def get_status(self):
+        with self.lock:
+            channels = len(self.channels)
+        return dict(self.stats, channels=channels, session=self.session)
+
+
+def read_session(session_dir):
+    """Sitzungsdatei lesen -> {kanal: (zeiten, werte)}"""
+    with open(os.path.join(session_dir, CHANNELS_FILE)) as f:
+        channel_ids = json.load(f)
+    records = np.fromfile(os.path.join(session_dir, DATA_FILE), dtype=RECORD_DTYPE)
+    return {name: (records['t'][records['channel'] == channel_id],
+                   records['value'][records['channel'] == channel_id])
+            for name, channel_id in channel_ids.items()}
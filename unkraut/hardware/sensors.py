@@ -2,21 +2,78 @@
 """
 Sensor-Manager für Unkraut-2025
 Temperatursensor, GPS, Ultraschall, etc.
+
+Ein Sampler liest jeden Sensor in seiner eigenen Rate in einen Snapshot, der bei
+jeder Messung als Ganzes ausgetauscht wird. HTTP-Handler und Telemetrie lesen
+nur den Snapshot und warten nie auf 1-Wire, psutil oder Ultraschall-Echos.
 """
 import time
 import psutil
 import threading
 import random
 
+from hardware.sensor_history import SensorHistory, SESSIONS_DIR
+from hardware.ultrasonic import UltrasonicArray
+
+# Abtastraten in Hz - jeder Sensor so oft, wie er sinnvoll Neues liefert
+SENSOR_RATES = {
+    'temperature': 0.5,  # DS18B20: eine 1-Wire-Wandlung dauert ~750 ms
+    'humidity': 0.5,
+    'gps': 1.0,
+    'battery': 1.0,
+    'distances': 20.0,   # HC-SR04 - misst selbst im Round-Robin, hier nur übernehmen
+    'system': 1.0
+}
+
+# Sensor -> Lesemethode
+SENSOR_READERS = {
+    'temperature': 'get_temperature',
+    'humidity': 'get_humidity',
+    'gps': 'get_gps_position',
+    'battery': 'get_battery_status',
+    'distances': 'read_distances',
+    'system': 'read_system_stats'
+}
+
+# Blockierende Sensoren bekommen einen eigenen Thread, damit sie die schnellen nicht ausbremsen
+BLOCKING_SENSORS = ['temperature']
+
 class SensorManager:
-    def __init__(self):
+    def __init__(self, rates=None, start_sampler=True, sessions_dir=SESSIONS_DIR):
         self.sensors_available = False
         self.temperature = 22.0
         self.humidity = 45.0
         self.gps_lat = 53.5511  # Hamburg
         self.gps_lon = 9.9937
+        self.gps_available = False  # Erst mit echtem GPS-Modul - Odometrie fusioniert nur dann
         self.battery_voltage = 12.4
         self.init_sensors()
+        
+        # Ultraschall misst in eigenen Zeitfenstern und löst bei Hindernissen den Motor-Notaus aus
+        self.ultrasonic = UltrasonicArray()
+        
+        # Sampler-Zustand: der Snapshot wird nie verändert, nur ersetzt
+        self.rates = dict(SENSOR_RATES)
+        self.rates.update(rates or {})
+        self._snapshot = {}
+        self._publish_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self.sampler_threads = []
+        self.sample_stats = {name: {'count': 0, 'errors': 0, 'duration_ms': 0.0, 'last_sample': None}
+                             for name in SENSOR_READERS}
+        
+        # Verlauf aller Messwerte für Diagramme, periodisch nach data/sessions gespeichert
+        self.history = SensorHistory(sessions_dir)
+        
+        # psutil.cpu_percent(interval=None) misst seit dem letzten Aufruf - einmal vorbereiten
+        psutil.cpu_percent(interval=None)
+        
+        # Erste Messung synchron, damit der Snapshot nie leer ist
+        for name in SENSOR_READERS:
+            self._sample(name)
+        
+        if start_sampler:
+            self.start_sampler()
     
     def init_sensors(self):
         """Sensoren initialisieren"""
@@ -86,15 +143,23 @@ class SensorManager:
             # Hier würde echte GPS-Position ausgelesen werden
             pass
         
-        # Mock-GPS mit leichter Bewegung
-        self.gps_lat += random.uniform(-0.0001, 0.0001)
-        self.gps_lon += random.uniform(-0.0001, 0.0001)
+        # Mock-GPS folgt der Odometrie statt zufällig zu springen
+        source = 'mock'
+        from hardware.registry import hardware_registry
+        if hardware_registry.is_created('odometry_estimator'):
+            odometry = hardware_registry.get('odometry_estimator')
+            if odometry.geo_origin is None:
+                odometry.update_gps(self.gps_lat, self.gps_lon)
+            pose = odometry.get_pose()
+            self.gps_lat, self.gps_lon = odometry.to_geo(pose['x'], pose['y'])
+            source = 'odometry'
         
         return {
             'latitude': round(self.gps_lat, 6),
             'longitude': round(self.gps_lon, 6),
             'accuracy': 3.2,
             'satellites': 8,
+            'source': source,
             'timestamp': int(time.time())
         }
     
@@ -115,25 +180,17 @@ class SensorManager:
         }
     
     def get_ultrasonic_distance(self, sensor_id='front'):
-        """Ultraschall-Abstandsmessung"""
-        # Mock-Abstandssensor
-        if sensor_id == 'front':
-            base_distance = 50
-        elif sensor_id == 'left':
-            base_distance = 30
-        elif sensor_id == 'right':
-            base_distance = 40
-        else:
-            base_distance = 25
-        
-        # Zufällige Schwankungen
-        distance = base_distance + random.uniform(-10, 15)
-        return max(5, distance)  # Minimum 5cm
+        """Ultraschall-Abstand in cm - letzter gefilterter Wert, None vor der ersten Messung"""
+        return self.ultrasonic.get_distance(sensor_id)
     
-    def get_system_stats(self):
-        """System-Statistiken"""
+    def read_distances(self):
+        """Alle Ultraschall-Abstände (median-gefiltert)"""
+        return self.ultrasonic.get_distances()
+    
+    def read_system_stats(self):
+        """System-Statistiken messen (CPU-Last seit der letzten Messung, ohne Wartezeit)"""
         try:
-            cpu_percent = psutil.cpu_percent(interval=0.1)
+            cpu_percent = psutil.cpu_percent(interval=None)
             memory = psutil.virtual_memory()
             disk = psutil.disk_usage('/')
             
@@ -166,24 +223,105 @@ class SensorManager:
                 'timestamp': int(time.time())
             }
     
-    def get_sensor_data(self):
-        """Alle Sensor-Daten sammeln"""
+    # ===== SAMPLER =====
+    def _sample(self, name):
+        """Einen Sensor lesen und den Snapshot mit dem neuen Wert austauschen"""
+        stats = self.sample_stats[name]
+        started = time.monotonic()
+        try:
+            value = getattr(self, SENSOR_READERS[name])()
+        except Exception as e:
+            stats['errors'] += 1
+            print(f"⚠️ Sensor {name} nicht lesbar: {e}")
+            return
+        
+        with self._publish_lock:
+            snapshot = dict(self._snapshot)
+            snapshot[name] = value
+            self._snapshot = snapshot
+        self.history.record(name, value)
+        
+        stats['count'] += 1
+        stats['duration_ms'] = round((time.monotonic() - started) * 1000, 2)
+        stats['last_sample'] = time.monotonic()
+    
+    def _sampler_loop(self, names):
+        """Sensoren nach Fälligkeit lesen - jeder in seiner eigenen Rate"""
+        due = {name: time.monotonic() + 1.0 / self.rates[name] for name in names}
+        while not self._stop_event.is_set():
+            name = min(due, key=due.get)
+            delay = due[name] - time.monotonic()
+            if delay > 0 and self._stop_event.wait(delay):
+                break
+            
+            self._sample(name)
+            # Feste Rate; nach langen Lesezeiten nicht nachholen, sondern neu ansetzen
+            due[name] = max(due[name] + 1.0 / self.rates[name], time.monotonic())
+    
+    def start_sampler(self):
+        """Sampler-Threads starten: blockierende Sensoren einzeln, der Rest gemeinsam"""
+        if self.sampler_threads:
+            return
+        self._stop_event.clear()
+        
+        active = [name for name in SENSOR_READERS if self.rates.get(name, 0) > 0]
+        groups = [[name] for name in active if name in BLOCKING_SENSORS]
+        groups.append([name for name in active if name not in BLOCKING_SENSORS])
+        
+        for names in groups:
+            if not names:
+                continue
+            thread = threading.Thread(target=self._sampler_loop, args=(names,),
+                                      name=f"sensor-sampler-{names[0] if len(names) == 1 else 'fast'}", daemon=True)
+            thread.start()
+            self.sampler_threads.append(thread)
+        self.history.start()
+        self.ultrasonic.start()
+        print(f"📊 Sensor-Sampler gestartet ({len(self.sampler_threads)} Threads)")
+    
+    def stop_sampler(self):
+        """Sampler-Threads beenden, offenen Verlauf speichern"""
+        self._stop_event.set()
+        for thread in self.sampler_threads:
+            thread.join(timeout=2.0)
+        self.sampler_threads = []
+        self.ultrasonic.stop()
+        self.history.stop()
+    
+    def get_latest(self, name):
+        """Letzter Messwert eines Sensors aus dem Snapshot - blockiert nie"""
+        return self._snapshot.get(name)
+    
+    def get_sampler_status(self):
+        """Raten, Alter und Lesedauer pro Sensor"""
+        now = time.monotonic()
+        status = {}
+        for name, stats in self.sample_stats.items():
+            last_sample = stats['last_sample']
+            status[name] = {
+                'rate_hz': self.rates.get(name, 0),
+                'count': stats['count'],
+                'errors': stats['errors'],
+                'duration_ms': stats['duration_ms'],
+                'age_s': round(now - last_sample, 3) if last_sample is not None else None
+            }
         return {
-            'temperature': self.get_temperature(),
-            'humidity': self.get_humidity(),
-            'gps': self.get_gps_position(),
-            'battery': self.get_battery_status(),
-            'distances': {
-                'front': round(self.get_ultrasonic_distance('front'), 1),
-                'left': round(self.get_ultrasonic_distance('left'), 1),
-                'right': round(self.get_ultrasonic_distance('right'), 1),
-                'back': round(self.get_ultrasonic_distance('back'), 1)
-            },
-            'system': self.get_system_stats(),
-            'timestamp': int(time.time()),
-            'hardware_available': self.sensors_available
+            'running': any(thread.is_alive() for thread in self.sampler_threads),
+            'sensors': status
         }
     
+    def get_system_stats(self):
+        """System-Statistiken aus dem Snapshot"""
+        return dict(self._snapshot.get('system') or self.read_system_stats())
+    
+    def get_sensor_data(self):
+        """Alle Sensor-Daten aus dem Snapshot"""
+        snapshot = self._snapshot
+        data = {name: snapshot.get(name) for name in SENSOR_READERS}
+        data['timestamp'] = int(time.time())
+        data['hardware_available'] = self.sensors_available
+        return data
+    
     def start_monitoring(self, interval=5):
         """Kontinuierliches Sensor-Monitoring starten"""
         def monitor_loop():
@@ -200,11 +338,11 @@ class SensorManager:
                     
                     # Hindernisse erkennen
                     for direction, distance in data['distances'].items():
-                        if distance < 15:
+                        if distance is not None and distance < 15:
                             print(f"⚠️ Hindernis {direction}: {distance}cm")
                     
                     time.sleep(interval)
-                    
+                
                 except Exception as e:
                     print(f"Sensor-Monitor-Fehler: {e}")
                     time.sleep(interval)
@@ -213,22 +351,27 @@ class SensorManager:
         thread.start()
         print(f"📊 Sensor-Monitoring gestartet (Intervall: {interval}s)")
         return thread
-
+    
     def cleanup(self):
         """Sensoren aufräumen"""
+        self.stop_sampler()
+        self.ultrasonic.cleanup()
         print("🧹 Sensor-Manager aufgeräumt")
 
-# Globale Instanz und Funktionen für Kompatibilität
-sensor_manager = SensorManager()
+# Globale Instanz - erst beim ersten Zugriff erzeugt, Cleanup registriert die Registry
+def __getattr__(name):
+    if name == 'sensor_manager':
+        from hardware.registry import hardware_registry
+        return hardware_registry.get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
+# Funktionen für Kompatibilität
 def get_sensor_data():
     """Kompatibilitätsfunktion"""
-    return sensor_manager.get_sensor_data()
+    from hardware.registry import hardware_registry
+    return hardware_registry.get('sensor_manager').get_sensor_data()
 
 def get_system_stats():
     """Kompatibilitätsfunktion"""
-    return sensor_manager.get_system_stats()
-
-# Cleanup bei Programmende
-import atexit
-atexit.register(sensor_manager.cleanup)
\ No newline at end of file
+    from hardware.registry import hardware_registry
+    return hardware_registry.get('sensor_manager').get_system_stats()
@@ -0,0 +1,259 @@
+# hardware/servo_calibration.py
+"""
+Servo-Kalibrierung für den Roboterarm (Unkraut-2025)
+Hobby-Servos setzen den PWM-Puls weder linear noch bei allen Exemplaren gleich in
+einen Winkel um. Pro Servo liegt deshalb eine gemessene Winkel -> Puls-Tabelle
+(stückweise linear oder monotoner kubischer Spline) in data/servo_calibration.json.
+
+Gemessen wird mit einer geführten Kalibrierung: der Arm fährt nacheinander
+Referenzwinkel an, der Puls wird per Jog nachgestellt, bis das Gelenk am Winkelmesser
+genau dort steht, und dann übernommen. Jede Tabelle wird beim Laden einmal in eine
+Ganzzahl-Nachschlagetabelle mit 0.1° Auflösung übersetzt - der Servo-Takt rechnet
+danach nur noch einen Index aus.
+"""
+import os
+import json
+import time
+import threading
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CALIBRATION_FILE = os.path.join(PROJECT_ROOT, 'data', 'servo_calibration.json')
+
+LUT_STEPS_PER_DEGREE = 10          # 0.1° Auflösung
+LUT_MAX_ANGLE = 180
+PULSE_RANGE_US = (500, 2500)       # Was ein Hobby-Servo verträgt - nie außerhalb schreiben
+JOG_RANGE_US = 300                 # Max. Abweichung vom bisherigen Puls während der Kalibrierung
+REFERENCE_ANGLES = (0, 45, 90, 135, 180)
+INTERPOLATIONS = ('linear', 'spline')
+
+
+def pulse_to_duty(pulse_us, frequency=50):
+    """Pulsbreite (µs) -> 16-Bit-Duty-Cycle der PWM-Periode"""
+    return int(round(pulse_us * frequency / 1000000.0 * 0xFFFF))
+
+
+def _monotone_cubic(angles, pulses, grid):
+    """Monotoner kubischer Hermite-Spline (Fritsch-Butland) - kein Überschwingen zwischen den Punkten"""
+    h = np.diff(angles)
+    delta = np.diff(pulses) / h
+    slopes = np.empty(len(angles))
+    slopes[0], slopes[-1] = delta[0], delta[-1]
+    w1 = 2 * h[1:] + h[:-1]
+    w2 = h[1:] + 2 * h[:-1]
+    slopes[1:-1] = (w1 + w2) / (w1 / delta[:-1] + w2 / delta[1:])
+
+    index = np.clip(np.searchsorted(angles, grid, side='right') - 1, 0, len(h) - 1)
+    t = (grid - angles[index]) / h[index]
+    t2, t3 = t * t, t * t * t
+    return ((2 * t3 - 3 * t2 + 1) * pulses[index] + (t3 - 2 * t2 + t) * h[index] * slopes[index]
+            + (-2 * t3 + 3 * t2) * pulses[index + 1] + (t3 - t2) * h[index] * slopes[index + 1])
+
+
+class PulseTable:
+    """Winkel -> Puls-Tabelle eines Servos, kompiliert zu Duty-Cycles in 0.1°-Schritten"""
+
+    def __init__(self, points, interpolation='linear', frequency=50):
+        if interpolation not in INTERPOLATIONS:
+            raise ValueError(f"Unbekannte Interpolation: {interpolation}")
+        points = sorted((float(angle), float(pulse)) for angle, pulse in points)
+        if len(points) < 2:
+            raise ValueError("Mindestens zwei Kalibrierpunkte nötig")
+
+        angles = np.array([angle for angle, _ in points])
+        pulses = np.array([pulse for _, pulse in points])
+        steps = np.diff(pulses)
+        if np.any(np.diff(angles) <= 0):
+            raise ValueError("Kalibrierwinkel doppelt")
+        if not (np.all(steps > 0) or np.all(steps < 0)):
+            raise ValueError("Puls muss mit dem Winkel streng monoton steigen oder fallen")
+        if pulses.min() < PULSE_RANGE_US[0] or pulses.max() > PULSE_RANGE_US[1]:
+            raise ValueError(f"Puls außerhalb {PULSE_RANGE_US[0]}-{PULSE_RANGE_US[1]}µs")
+
+        self.points = [[angle, pulse] for angle, pulse in points]
+        self.interpolation = interpolation
+        self.frequency = frequency
+
+        grid = np.arange(LUT_MAX_ANGLE * LUT_STEPS_PER_DEGREE + 1) / LUT_STEPS_PER_DEGREE
+        if interpolation == 'spline' and len(points) > 2:
+            curve = _monotone_cubic(angles, pulses, grid)
+        else:
+            curve = np.interp(grid, angles, pulses)
+        # Außerhalb der Messpunkte mit der Steigung des Randstücks weiter, aber nie aus dem Pulsbereich
+        below, above = grid < angles[0], grid > angles[-1]
+        curve[below] = pulses[0] + (grid[below] - angles[0]) * steps[0] / (angles[1] - angles[0])
+        curve[above] = pulses[-1] + (grid[above] - angles[-1]) * steps[-1] / (angles[-1] - angles[-2])
+        curve = np.clip(curve, *PULSE_RANGE_US)
+
+        # Python-Listen: Index-Zugriff im Servo-Takt ist schneller als auf numpy-Skalare
+        self.pulse_us = np.rint(curve).astype(int).tolist()
+        self.duty = np.rint(curve * frequency / 1000000.0 * 0xFFFF).astype(int).tolist()
+        self._last = len(self.duty) - 1
+
+    @classmethod
+    def linear(cls, min_pulse, max_pulse, frequency=50):
+        """Unkalibrierte Zuordnung 0-180° -> min_pulse..max_pulse"""
+        return cls([(0, min_pulse), (LUT_MAX_ANGLE, max_pulse)], 'linear', frequency)
+
+    def _index(self, angle):
+        index = int(angle * LUT_STEPS_PER_DEGREE + 0.5)
+        if index < 0:
+            return 0
+        if index > self._last:
+            return self._last
+        return index
+
+    def duty_at(self, angle):
+        """16-Bit-Duty-Cycle für angle - ein Index, keine Umrechnung"""
+        return self.duty[self._index(angle)]
+
+    def pulse_at(self, angle):
+        return self.pulse_us[self._index(angle)]
+
+    def to_dict(self):
+        return {'points': self.points, 'interpolation': self.interpolation}
+
+
+class ServoCalibration:
+    """Kalibrier-Speicher: eine PulseTable pro Servo, Standard aus min_pulse/max_pulse"""
+
+    def __init__(self, pulse_ranges, frequency=50, path=CALIBRATION_FILE):
+        self.path = path
+        self.frequency = frequency
+        self.lock = threading.Lock()
+        self.defaults = dict(pulse_ranges)          # Gelenk -> (min_pulse, max_pulse)
+        self.tables = {joint: PulseTable.linear(*pulses, frequency=frequency)
+                       for joint, pulses in self.defaults.items()}
+        self.calibrated = {}
+        self.load()
+
+    # ===== SPEICHERN / LADEN =====
+    def load(self):
+        """Gespeicherte Tabellen übernehmen - False, wenn keine vorhanden"""
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        for joint, values in data.get('joints', {}).items():
+            if joint not in self.tables:
+                continue
+            try:
+                table = PulseTable(values['points'], values.get('interpolation', 'linear'), self.frequency)
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"⚠️  Servo-Kalibrierung {joint} ungültig: {e}")
+                continue
+            self.tables[joint] = table
+            self.calibrated[joint] = values.get('calibrated_at')
+        return True
+
+    def save(self):
+        """Kalibrierte Tabellen atomar speichern"""
+        data = {'joints': {joint: dict(self.tables[joint].to_dict(), calibrated_at=calibrated_at)
+                           for joint, calibrated_at in self.calibrated.items()}}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_file = self.path + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_file, self.path)
+            return True
+        except OSError as e:
+            print(f"⚠️  Servo-Kalibrierung nicht gespeichert: {e}")
+            return False
+
+    # ===== TABELLEN =====
+    def duty(self, joint, angle):
+        return self.tables[joint].duty_at(angle)
+
+    def set_table(self, joint, points, interpolation='linear'):
+        """Gemessene Punkte übernehmen - die neue Tabelle gilt ab dem nächsten Servo-Takt"""
+        if joint not in self.tables:
+            raise ValueError(f"Unbekanntes Gelenk: {joint}")
+        table = PulseTable(points, interpolation, self.frequency)
+        with self.lock:
+            self.tables[joint] = table
+            self.calibrated[joint] = time.time()
+        self.save()
+        return table
+
+    def reset(self, joint):
+        """Zurück auf die lineare Standard-Zuordnung"""
+        if joint not in self.tables:
+            raise ValueError(f"Unbekanntes Gelenk: {joint}")
+        with self.lock:
+            self.tables[joint] = PulseTable.linear(*self.defaults[joint], frequency=self.frequency)
+            self.calibrated.pop(joint, None)
+        self.save()
+
+    def get_status(self):
+        return {
+            joint: dict(table.to_dict(), calibrated=joint in self.calibrated,
+                        calibrated_at=self.calibrated.get(joint))
+            for joint, table in self.tables.items()
+        }
+
+
+class CalibrationSession:
+    """Geführte Kalibrierung eines Gelenks: Referenzwinkel anfahren, Puls nachstellen, übernehmen"""
+
+    def __init__(self, joint, table, angles=REFERENCE_ANGLES, interpolation='linear'):
+        if interpolation not in INTERPOLATIONS:
+            raise ValueError(f"Unbekannte Interpolation: {interpolation}")
+        if len(angles) < 2:
+            raise ValueError("Mindestens zwei Referenzwinkel nötig")
+        self.joint = joint
+        self.table = table                  # bisherige Tabelle - Startwert und Jog-Grenzen
+        self.angles = [float(angle) for angle in angles]
+        self.interpolation = interpolation
+        self.points = []
+        self.step = 0
+        self.pulse = table.pulse_at(self.angles[0])
+
+    @property
+    def target(self):
+        """Aktueller Referenzwinkel - None, wenn alle gemessen sind"""
+        return self.angles[self.step] if self.step < len(self.angles) else None
+
+    def set_pulse(self, pulse_us):
+        """Puls für den aktuellen Referenzwinkel setzen - begrenzt um den bisherigen Wert"""
+        if self.target is None:
+            raise RuntimeError("Alle Referenzwinkel gemessen")
+        nominal = self.table.pulse_at(self.target)
+        low = max(PULSE_RANGE_US[0], nominal - JOG_RANGE_US)
+        high = min(PULSE_RANGE_US[1], nominal + JOG_RANGE_US)
+        self.pulse = int(max(low, min(high, round(pulse_us))))
+        return self.pulse
+
+    def jog(self, delta_us):
+        return self.set_pulse(self.pulse + delta_us)
+
+    def record(self):
+        """Gelenk steht am Referenzwinkel - Punkt übernehmen und zum nächsten Winkel"""
+        if self.target is None:
+            raise RuntimeError("Alle Referenzwinkel gemessen")
+        self.points.append([self.target, self.pulse])
+        self.step += 1
+        if self.target is not None:
+            self.pulse = self.table.pulse_at(self.target)
+        return self.target
+
+    def build(self):
+        """Tabelle aus den gemessenen Punkten (prüft Monotonie und Pulsbereich)"""
+        if len(self.points) < 2:
+            raise ValueError("Mindestens zwei gemessene Punkte nötig")
+        return PulseTable(self.points, self.interpolation, self.table.frequency)
+
+    def get_status(self):
+        return {
+            'joint': self.joint,
+            'target': self.target,
+            'pulse_us': self.pulse,
+            'step': self.step,
+            'angles': self.angles,
+            'points': self.points,
+            'interpolation': self.interpolation,
+            'complete': self.target is None
+        }
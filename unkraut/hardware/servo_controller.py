@@ -2,102 +2,119 @@
 """
 PCA9685 PWM-Servo-Controller für Unkraut-2025 Roboterarm
 16-Kanal PWM mit I2C Ansteuerung
+Schreibt über die Schattenregister aus hardware/pca9685.py: ein I2C-Transfer
+pro Interpolationsschritt, egal wie viele Servos sich bewegen.
 """
 import time
 import math
+import threading
 
-try:
-    import board
-    import busio
-    from adafruit_pca9685 import PCA9685
-    from adafruit_motor import servo
-    I2C_AVAILABLE = True
-    print("✅ Adafruit CircuitPython Libraries verfügbar")
-except ImportError:
-    I2C_AVAILABLE = False
-    print("⚠️  Adafruit Libraries nicht verfügbar - Mock-Modus")
+from hardware.pca9685 import PCA9685Output, BusioI2CBus, MockI2CBus
+from hardware.motion_authority import motion_authority
+from hardware.servo_calibration import PulseTable
+
+# I2C-Probe erst beim ersten ServoController - nicht beim Import
+I2C_AVAILABLE = None
+
+def _probe_i2c_libraries():
+    """Adafruit CircuitPython Libraries (board/busio) einmalig laden"""
+    global I2C_AVAILABLE
+    
+    if I2C_AVAILABLE is not None:
+        return I2C_AVAILABLE
+    
+    try:
+        import board
+        import busio
+        I2C_AVAILABLE = True
+        print("✅ Adafruit CircuitPython Libraries verfügbar")
+    except ImportError:
+        I2C_AVAILABLE = False
+        print("⚠️  Adafruit Libraries nicht verfügbar - Mock-Modus")
+    
+    return I2C_AVAILABLE
 
 class ServoController:
-    def __init__(self, i2c_address=0x40, frequency=50):
+    def __init__(self, i2c_address=0x40, frequency=50, authority=None):
         """
         PCA9685 Servo-Controller initialisieren
         i2c_address: I2C Adresse (Standard: 0x40) - Du hast 0x40! ✅
         frequency: PWM Frequenz (Standard: 50Hz für Servos)
+        authority: zentrale Notaus-Freigabe (hardware/motion_authority.py)
         """
         self.i2c_address = i2c_address
         self.frequency = frequency
         self.pca = None
+        self.hardware_available = False
         self.servos = {}
         self.servo_positions = {}
         self.servo_limits = {}
         self.is_initialized = False
+        self.authority = authority or motion_authority
+        self._io_lock = threading.Lock()   # Schreiben und Notaus schließen sich aus
         
         print(f"🔧 Initialisiere ServoController (0x{i2c_address:02x})")
+        _probe_i2c_libraries()
         self._initialize_controller()
+        self.authority.register('servo_controller', self)
     
     def _initialize_controller(self):
         """PCA9685 Controller initialisieren"""
+        self.is_initialized = True
+        
         if not I2C_AVAILABLE:
+            # Mock-Bus zählt Transfers und Bytes (Benchmarks ohne Hardware)
+            self.pca = PCA9685Output(MockI2CBus(), self.i2c_address, self.frequency)
             print("🎭 Mock-ServoController initialisiert")
-            self.is_initialized = True
             return True
         
         try:
-            # I2C Bus initialisieren
-            i2c = busio.I2C(board.SCL, board.SDA)
-            
-            # PCA9685 initialisieren
-            self.pca = PCA9685(i2c, address=self.i2c_address)
-            self.pca.frequency = self.frequency
+            # PCA9685 am I2C-Bus initialisieren
+            self.pca = PCA9685Output(BusioI2CBus(), self.i2c_address, self.frequency)
+            self.hardware_available = True
             
             print(f"✅ PCA9685 erfolgreich initialisiert!")
             print(f"   Adresse: 0x{self.i2c_address:02x}")
             print(f"   Frequenz: {self.frequency}Hz")
-            self.is_initialized = True
             return True
-            
+        
         except Exception as e:
             print(f"❌ PCA9685 Initialisierung fehlgeschlagen: {e}")
             print("🎭 Wechsle zu Mock-Modus")
-            self.is_initialized = True
+            self.pca = PCA9685Output(MockI2CBus(), self.i2c_address, self.frequency)
             return False
     
     def add_servo(self, servo_id, channel, min_angle=0, max_angle=180, 
-                  min_pulse=500, max_pulse=2500, default_angle=90):
+                  min_pulse=500, max_pulse=2500, default_angle=90, pulse_table=None):
         """
         Servo zu Controller hinzufügen
         servo_id: Eindeutige ID (z.B. 'base', 'shoulder', 'elbow')
         channel: PWM Kanal (0-15)
+        pulse_table: kalibrierte PulseTable (hardware/servo_calibration.py), sonst linear min_pulse..max_pulse
         """
-        if not I2C_AVAILABLE or not self.pca:
-            # Mock-Servo
-            self.servos[servo_id] = {
-                'channel': channel,
-                'min_angle': min_angle,
-                'max_angle': max_angle,
-                'mock': True
-            }
-            print(f"🎭 Mock-Servo '{servo_id}' auf Kanal {channel}")
+        if not 0 <= channel < 16:
+            print(f"❌ Servo '{servo_id}' Fehler: Kanal {channel} ungültig")
+            return False
+        
+        try:
+            table = pulse_table or PulseTable.linear(min_pulse, max_pulse, frequency=self.frequency)
+        except ValueError as e:
+            print(f"❌ Servo '{servo_id}' Fehler: {e}")
+            return False
+        
+        self.servos[servo_id] = {
+            'channel': channel,
+            'min_angle': min_angle,
+            'max_angle': max_angle,
+            'min_pulse': min_pulse,
+            'max_pulse': max_pulse,
+            'table': table,
+            'mock': not self.hardware_available
+        }
+        if self.hardware_available:
+            print(f"✅ Echtes Servo '{servo_id}' auf Kanal {channel}")
         else:
-            try:
-                # Echtes Servo über Adafruit Library
-                servo_obj = servo.Servo(
-                    self.pca.channels[channel],
-                    min_pulse=min_pulse,
-                    max_pulse=max_pulse
-                )
-                
-                self.servos[servo_id] = {
-                    'servo': servo_obj,
-                    'channel': channel,
-                    'min_angle': min_angle,
-                    'max_angle': max_angle,
-                    'mock': False
-                }
-                print(f"✅ Echtes Servo '{servo_id}' auf Kanal {channel}")
-            except Exception as e:
-                print(f"❌ Servo '{servo_id}' Fehler: {e}")
-                return False
+            print(f"🎭 Mock-Servo '{servo_id}' auf Kanal {channel}")
         
         # Limits und Position speichern
         self.servo_limits[servo_id] = (min_angle, max_angle)
@@ -107,30 +124,30 @@ class ServoController:
         self.set_servo_angle(servo_id, default_angle)
         return True
     
+    def _stage_angle(self, servo_id, angle):
+        """Winkel begrenzen, in Pulsbreite umrechnen und im Schattenregister ablegen"""
+        servo_info = self.servos[servo_id]
+        angle = max(servo_info['min_angle'], min(servo_info['max_angle'], angle))
+        
+        # Winkel -> 16-Bit-Duty-Cycle aus der vorab kompilierten Tabelle (0.1° Auflösung)
+        self.pca.set_duty(servo_info['channel'], servo_info['table'].duty_at(angle))
+        self.servo_positions[servo_id] = angle
+        return angle
+    
     def set_servo_angle(self, servo_id, angle):
         """Servo auf bestimmten Winkel setzen"""
         if servo_id not in self.servos:
             print(f"❌ Servo '{servo_id}' nicht gefunden")
             return False
         
-        servo_info = self.servos[servo_id]
-        
-        # Winkel begrenzen
-        min_angle = servo_info['min_angle']
-        max_angle = servo_info['max_angle']
-        angle = max(min_angle, min(max_angle, angle))
-        
-        if servo_info.get('mock', False):
-            # Mock-Servo
-            print(f"🎭 Mock-Servo '{servo_id}': {angle}°")
-            self.servo_positions[servo_id] = angle
-            return True
-        
         try:
-            # Echtes Servo
-            servo_info['servo'].angle = angle
-            self.servo_positions[servo_id] = angle
-            print(f"🦾 Servo '{servo_id}': {angle}°")
+            with self._io_lock:
+                if not self.authority.allows():
+                    print(f"🚨 Servo '{servo_id}' blockiert - Notaus aktiv")
+                    return False
+                angle = self._stage_angle(servo_id, angle)
+                self.pca.flush()
+            print(f"{'🎭 Mock-Servo' if self.servos[servo_id]['mock'] else '🦾 Servo'} '{servo_id}': {angle}°")
             return True
         except Exception as e:
             print(f"❌ Servo '{servo_id}' Fehler: {e}")
@@ -147,6 +164,11 @@ class ServoController:
         
         print(f"🦾 Bewege {len(servo_angles)} Servos in {duration}s")
         
+        unknown = [servo_id for servo_id in servo_angles if servo_id not in self.servos]
+        if unknown:
+            print(f"❌ Servo '{unknown[0]}' nicht gefunden")
+            return
+        
         # Startpositionen sammeln
         start_positions = {}
         for servo_id in servo_angles:
@@ -161,15 +183,25 @@ class ServoController:
             # Smooth interpolation
             smooth_progress = 0.5 * (1 - math.cos(progress * math.pi))
             
-            for servo_id, target_angle in servo_angles.items():
-                start_angle = start_positions[servo_id]
-                current_angle = start_angle + (target_angle - start_angle) * smooth_progress
-                self.set_servo_angle(servo_id, current_angle)
+            with self._io_lock:
+                # Notaus bricht die Interpolation vor dem nächsten Schritt ab
+                if not self.authority.allows():
+                    print("🚨 Servo-Bewegung abgebrochen - Notaus aktiv")
+                    return False
+                
+                for servo_id, target_angle in servo_angles.items():
+                    start_angle = start_positions[servo_id]
+                    current_angle = start_angle + (target_angle - start_angle) * smooth_progress
+                    self._stage_angle(servo_id, current_angle)
+                
+                # Alle Servos dieses Schritts in einem I2C-Transfer
+                self.pca.flush()
             
             if step < steps:
                 time.sleep(step_duration)
         
         print("✅ Servo-Bewegung abgeschlossen")
+        return True
     
     def get_all_positions(self):
         """Alle aktuellen Servo-Positionen"""
@@ -177,20 +209,22 @@ class ServoController:
     
     def disable_all_servos(self):
         """Alle Servos deaktivieren (Strom sparen)"""
-        if self.pca:
-            try:
-                for channel in range(16):
-                    self.pca.channels[channel].duty_cycle = 0
-                print("🔌 Alle Servos deaktiviert")
-            except Exception as e:
-                print(f"❌ Servo-Deaktivierung fehlgeschlagen: {e}")
-        else:
-            print("🎭 Mock: Alle Servos deaktiviert")
+        try:
+            self.pca.set_all(0)
+            self.pca.flush()
+            print("🔌 Alle Servos deaktiviert" if self.hardware_available else "🎭 Mock: Alle Servos deaktiviert")
+        except Exception as e:
+            print(f"❌ Servo-Deaktivierung fehlgeschlagen: {e}")
+    
+    def emergency_stop(self, reason='servo_controller'):
+        """Not-Stopp - hält über die zentrale Freigabe Servos, Arm und Motoren an"""
+        self.authority.emergency_stop(reason)
     
-    def emergency_stop(self):
-        """Not-Stopp für alle Servos"""
+    def halt(self):
+        """Vom Notaus aufgerufen: laufende Interpolation endet, alle Servos stromlos"""
         print("🚨 SERVO EMERGENCY STOP")
-        self.disable_all_servos()
+        with self._io_lock:
+            self.disable_all_servos()
     
     def get_controller_info(self):
         """Controller-Informationen"""
@@ -199,7 +233,8 @@ class ServoController:
             'i2c_address': f"0x{self.i2c_address:02x}",
             'frequency': self.frequency,
             'servo_count': len(self.servos),
-            'hardware_available': I2C_AVAILABLE and self.pca is not None,
+            'hardware_available': self.hardware_available,
+            'pwm_output': self.pca.get_status(),
             'servos': {
                 servo_id: {
                     'channel': info['channel'],
@@ -211,8 +246,12 @@ class ServoController:
             }
         }
 
-# Globale Instanz
-servo_controller = ServoController()
+# Globale Instanz - wird erst beim ersten Zugriff erzeugt (hardware/registry.py)
+def __getattr__(name):
+    if name == 'servo_controller':
+        from hardware.registry import hardware_registry
+        return hardware_registry.get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Test-Funktion
 def test_servo_controller():
@@ -239,4 +278,6 @@ def test_servo_controller():
     print("✅ ServoController-Test abgeschlossen")
 
 if __name__ == '__main__':
+    # Direkt gestartet: eigene Instanz für den Selbsttest
+    servo_controller = ServoController()
     test_servo_controller()
@@ -0,0 +1,267 @@
+# hardware/servo_model.py
+"""
+Servo-Zustandsschätzung für den Roboterarm (Unkraut-2025)
+Hobby-Servos melden ihre Position nicht zurück und folgen dem PWM-Sollwert nur mit
+begrenzter Geschwindigkeit und Beschleunigung. Pro Gelenk läuft ein kinematisches
+Modell mit, das aus dem gesendeten Sollwert-Strom die tatsächliche Stellung schätzt,
+die verbleibende Fahrzeit berechnet und meldet, wann ein Servo wirklich angekommen ist.
+Geschwindigkeit und Beschleunigung lassen sich aus einer gemessenen Sprungantwort
+kalibrieren und liegen in data/servo_dynamics.json.
+"""
+import os
+import json
+import math
+import time
+import threading
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DYNAMICS_FILE = os.path.join(PROJECT_ROOT, 'data', 'servo_dynamics.json')
+
+# Grad/s und Grad/s² unter Last - MG996R an Basis/Schulter/Ellbogen, SG90 am Rest
+SERVO_DYNAMICS = {
+    'base': {'speed': 200.0, 'accel': 1200.0},
+    'shoulder': {'speed': 150.0, 'accel': 800.0},
+    'elbow': {'speed': 180.0, 'accel': 1000.0},
+    'wrist': {'speed': 300.0, 'accel': 2000.0},
+    'gripper': {'speed': 300.0, 'accel': 2000.0},
+    'tool': {'speed': 300.0, 'accel': 2000.0}
+}
+DEFAULT_DYNAMICS = {'speed': 200.0, 'accel': 1200.0}
+
+SETTLE_TOLERANCE = 0.05     # Grad - darunter gilt ein Servo als angekommen
+INTEGRATION_STEP = 0.002    # s
+
+
+def rest_to_rest_time(distance, speed, accel):
+    """Zeitoptimale Fahrt über distance Grad aus dem Stand in den Stand (Trapez- oder Dreiecksprofil)"""
+    distance = abs(distance)
+    if distance * accel <= speed * speed:
+        return 2.0 * math.sqrt(distance / accel)
+    return distance / speed + speed / accel
+
+
+class ServoModel:
+    """Ein Servo als beschleunigungs- und geschwindigkeitsbegrenztes Folgeglied seines Sollwerts"""
+
+    def __init__(self, position, speed, accel):
+        self.position = float(position)
+        self.velocity = 0.0
+        self.command = float(position)
+        self.speed = float(speed)
+        self.accel = float(accel)
+
+    def advance(self, dt):
+        """Modell um dt Sekunden weiterrechnen - bremst so, dass es genau am Sollwert steht"""
+        while dt > 1e-9:
+            step = min(dt, INTEGRATION_STEP)
+            dt -= step
+            error = self.command - self.position
+            if abs(error) <= SETTLE_TOLERANCE and abs(self.velocity) <= self.accel * step:
+                self.position = self.command
+                self.velocity = 0.0
+                continue
+            desired = math.copysign(min(self.speed, math.sqrt(2.0 * self.accel * abs(error))), error)
+            change = max(-self.accel * step, min(self.accel * step, desired - self.velocity))
+            self.velocity += change
+            move = self.velocity * step
+            if abs(move) >= abs(error) and move * error > 0:
+                # Ziel in diesem Schritt erreicht
+                self.position = self.command
+                self.velocity = 0.0
+            else:
+                self.position += move
+
+    def settled(self):
+        return self.position == self.command and self.velocity == 0.0
+
+    def time_to_settle(self):
+        """Verbleibende Fahrzeit zum aktuellen Sollwert bei unverändertem Sollwert"""
+        if self.settled():
+            return 0.0
+        error = self.command - self.position
+        direction = 1.0 if error >= 0 else -1.0
+        distance = abs(error)
+        velocity = self.velocity * direction       # positiv = auf das Ziel zu
+        accel, speed = self.accel, self.speed
+
+        if velocity < 0:
+            # Fährt weg - erst bremsen, dann aus dem Stand zurück
+            return -velocity / accel + rest_to_rest_time(distance + velocity * velocity / (2 * accel), speed, accel)
+        stop_distance = velocity * velocity / (2 * accel)
+        if stop_distance >= distance:
+            # Zu schnell zum Anhalten - über das Ziel hinaus und zurück
+            return velocity / accel + rest_to_rest_time(stop_distance - distance, speed, accel)
+        peak = math.sqrt(accel * distance + velocity * velocity / 2)
+        if peak <= speed:
+            return (peak - velocity) / accel + peak / accel
+        accelerate = (speed * speed - velocity * velocity) / (2 * accel)
+        brake = speed * speed / (2 * accel)
+        return (speed - velocity) / accel + (distance - accelerate - brake) / speed + speed / accel
+
+
+def fit_step_response(samples):
+    """Geschwindigkeit und Beschleunigung aus einer gemessenen Sprungantwort [(t, winkel), ...]
+
+    Höchstgeschwindigkeit = größte Steigung zwischen Messpunkten, Beschleunigung aus der
+    Zeit bis zu dieser Geschwindigkeit. Messpunkte z.B. aus Kamerabildern einer Markierung am Gelenk.
+    """
+    samples = sorted((float(t), float(angle)) for t, angle in samples)
+    if len(samples) < 3:
+        raise ValueError("Mindestens 3 Messpunkte erforderlich")
+
+    velocities = []
+    for (t0, a0), (t1, a1) in zip(samples, samples[1:]):
+        if t1 > t0:
+            velocities.append(((t0 + t1) / 2, abs(a1 - a0) / (t1 - t0)))
+    if not velocities:
+        raise ValueError("Messpunkte ohne zeitlichen Abstand")
+
+    speed = max(v for _, v in velocities)
+    if speed <= 0:
+        raise ValueError("Keine Bewegung in den Messpunkten")
+    start = samples[0][0]
+    reached = next(t for t, v in velocities if v >= 0.9 * speed)
+    accel = 0.9 * speed / max(reached - start, INTEGRATION_STEP)
+    return {'speed': round(speed, 1), 'accel': round(accel, 1)}
+
+
+class ArmStateEstimator:
+    """Geschätzte Ist-Stellung aller Gelenke aus dem gesendeten Sollwert-Strom"""
+
+    def __init__(self, initial_positions, path=DYNAMICS_FILE):
+        self.path = path
+        self.dynamics = {joint: dict(SERVO_DYNAMICS.get(joint, DEFAULT_DYNAMICS)) for joint in initial_positions}
+        self.calibrated = {}
+        self.load()
+
+        self.lock = threading.Lock()
+        self.models = {joint: ServoModel(angle, **self.dynamics[joint]) for joint, angle in initial_positions.items()}
+        self.updated_at = time.monotonic()
+
+    # ===== KALIBRIERUNG =====
+    def load(self):
+        """Kalibrierte Dynamik übernehmen - False, wenn keine vorhanden"""
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        for joint, values in data.get('joints', {}).items():
+            if joint in self.dynamics:
+                self.dynamics[joint] = {'speed': float(values['speed']), 'accel': float(values['accel'])}
+                self.calibrated[joint] = values.get('calibrated_at')
+        return True
+
+    def save(self):
+        """Dynamik atomar speichern"""
+        data = {'joints': {joint: dict(values, calibrated_at=self.calibrated.get(joint))
+                           for joint, values in self.dynamics.items()}}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_file = self.path + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_file, self.path)
+            return True
+        except OSError as e:
+            print(f"⚠️  Servo-Dynamik nicht gespeichert: {e}")
+            return False
+
+    def calibrate(self, joint, samples):
+        """Gemessene Sprungantwort eines Gelenks übernehmen und speichern"""
+        if joint not in self.dynamics:
+            raise ValueError(f"Unbekanntes Gelenk: {joint}")
+        fitted = fit_step_response(samples)
+        with self.lock:
+            self._advance(time.monotonic())
+            self.dynamics[joint] = fitted
+            self.models[joint].speed = fitted['speed']
+            self.models[joint].accel = fitted['accel']
+            self.calibrated[joint] = time.time()
+        self.save()
+        return fitted
+
+    # ===== SCHÄTZUNG =====
+    def _advance(self, now):
+        dt = now - self.updated_at
+        if dt > 0:
+            for model in self.models.values():
+                model.advance(dt)
+            self.updated_at = now
+
+    def command(self, positions, now=None):
+        """Neuer Sollwert (pro Servo-Takt) - das Modell läuft bis now mit dem alten Sollwert"""
+        with self.lock:
+            self._advance(now or time.monotonic())
+            for joint, angle in positions.items():
+                self.models[joint].command = float(angle)
+
+    def hold(self, now=None):
+        """Sollwert auf die geschätzte Stellung setzen (Notaus - Servos stromlos, keine Weiterfahrt)"""
+        with self.lock:
+            self._advance(now or time.monotonic())
+            for model in self.models.values():
+                model.command = model.position
+                model.velocity = 0.0
+
+    def estimate(self, now=None):
+        """Geschätzte Ist-Stellung aller Gelenke"""
+        with self.lock:
+            self._advance(now or time.monotonic())
+            return {joint: model.position for joint, model in self.models.items()}
+
+    def settled(self, now=None):
+        with self.lock:
+            self._advance(now or time.monotonic())
+            return all(model.settled() for model in self.models.values())
+
+    def remaining(self, now=None):
+        """Sekunden, bis alle Servos ihren aktuellen Sollwert erreicht haben"""
+        with self.lock:
+            self._advance(now or time.monotonic())
+            return max(model.time_to_settle() for model in self.models.values())
+
+    def predict_arrival(self, targets, commanded_end, now=None):
+        """Erwartete Ankunft (monotonic) an targets, wenn der Sollwert um commanded_end dort ist
+
+        Langsamer als der Sollwert geht nicht: mindestens die zeitoptimale Fahrt von der
+        geschätzten Stellung aus, und nicht vor dem Ende des Sollwert-Verlaufs.
+        """
+        now = now or time.monotonic()
+        with self.lock:
+            self._advance(now)
+            arrival = commanded_end
+            for joint, target in targets.items():
+                model = self.models[joint]
+                probe = ServoModel(model.position, model.speed, model.accel)
+                probe.velocity, probe.command = model.velocity, float(target)
+                arrival = max(arrival, now + probe.time_to_settle())
+            return arrival
+
+    def wait_settled(self, timeout=5.0):
+        """Bis zur vorhergesagten Ankunft schlafen (ohne feste Reserve) - True, wenn angekommen"""
+        deadline = time.monotonic() + timeout
+        while True:
+            now = time.monotonic()
+            if self.settled(now):
+                return True
+            if now >= deadline:
+                return False
+            time.sleep(min(max(self.remaining(now), INTEGRATION_STEP), deadline - now))
+
+    def get_status(self, now=None):
+        with self.lock:
+            self._advance(now or time.monotonic())
+            return {
+                joint: {
+                    'position': round(model.position, 1),
+                    'velocity': round(model.velocity, 1),
+                    'command': round(model.command, 1),
+                    'eta_s': round(model.time_to_settle(), 3),
+                    'speed': model.speed,
+                    'accel': model.accel,
+                    'calibrated': joint in self.calibrated
+                }
+                for joint, model in self.models.items()
+            }
@@ -0,0 +1,325 @@
+# hardware/ultrasonic.py
+"""
+HC-SR04 Ultraschall-Sensoren für Unkraut-2025
+Echos werden über GPIO-Flanken-Callbacks mit monotonen Zeitstempeln gemessen -
+kein Busy-Wait auf den Echo-Pin. Die Sensoren feuern reihum in festen
+Zeitfenstern, damit sich ihre Echos nicht gegenseitig stören; ein Median-Filter
+verwirft Ausreißer. Ein Hindernis in Fahrtrichtung löst den Motor-Notaus aus.
+Ohne RPi.GPIO antwortet ein Mock-Echo-Generator auf die Trigger.
+"""
+import time
+import queue
+import random
+import statistics
+import threading
+from collections import deque
+
+from hardware.gpio_config import ULTRASONIC_SENSORS
+
+SPEED_OF_SOUND_CM_S = 34300.0
+MAX_RANGE_CM = 400.0         # HC-SR04-Datenblatt - ohne Echo gilt der Weg als frei
+TRIGGER_PULSE_S = 0.00001    # 10 µs Trigger-Puls
+BURST_DELAY_S = 0.0005       # 8 x 40 kHz Burst bis zur steigenden Echo-Flanke
+
+SLOT_S = 0.03                # Messfenster pro Sensor: max. Echo 23 ms + Abklingen
+MEDIAN_WINDOW = 3
+STOP_DISTANCE_CM = 15.0
+PRIORITY_SENSOR = 'front'    # Wird zwischen allen anderen gemessen
+
+# Mock-Welt: Abstände in cm
+MOCK_DISTANCES = {'front': 50.0, 'left': 30.0, 'right': 40.0, 'back': 25.0}
+
+
+class RPiEchoBackend:
+    """Echte Sensoren über RPi.GPIO - Flanken kommen per Interrupt-Callback"""
+
+    def __init__(self):
+        import RPi.GPIO as GPIO
+        self.GPIO = GPIO
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setwarnings(False)
+        self.pins = []
+
+    def setup(self, name, trigger, echo, callback):
+        GPIO = self.GPIO
+        GPIO.setup(trigger, GPIO.OUT, initial=GPIO.LOW)
+        GPIO.setup(echo, GPIO.IN)
+
+        def on_edge(channel):
+            # Zeitstempel zuerst - vor dem Pegel-Lesen
+            timestamp = time.monotonic()
+            callback(channel, GPIO.input(channel), timestamp)
+
+        GPIO.add_event_detect(echo, GPIO.BOTH, callback=on_edge)
+        self.pins.extend([trigger, echo])
+
+    def trigger(self, pin):
+        self.GPIO.output(pin, self.GPIO.HIGH)
+        time.sleep(TRIGGER_PULSE_S)
+        self.GPIO.output(pin, self.GPIO.LOW)
+
+    def cleanup(self):
+        for pin in self.pins:
+            try:
+                self.GPIO.remove_event_detect(pin)
+            except Exception:
+                pass
+        self.GPIO.cleanup(self.pins)
+
+
+class MockEchoBackend:
+    """Echo-Generator ohne Hardware: beantwortet Trigger mit Flanken passend zu self.distances"""
+
+    def __init__(self, distances=None, noise_cm=0.5):
+        self.distances = dict(MOCK_DISTANCES if distances is None else distances)
+        self.noise_cm = noise_cm
+        self.sensors = {}          # Trigger-Pin -> (Name, Echo-Pin)
+        self.callbacks = {}        # Echo-Pin -> Callback
+        self._spikes = {}
+        self._busy_until = 0.0
+        self._queue = queue.Queue()
+        self.stats = {'triggers': 0, 'echoes': 0, 'overlaps': 0}
+        self._worker = threading.Thread(target=self._echo_loop, name='ultrasonic-mock', daemon=True)
+        self._worker.start()
+
+    def setup(self, name, trigger, echo, callback):
+        self.sensors[trigger] = (name, echo)
+        self.callbacks[echo] = callback
+
+    def spike(self, name, distance_cm):
+        """Einmaliger Ausreißer beim nächsten Echo dieses Sensors"""
+        self._spikes[name] = distance_cm
+
+    def trigger(self, pin):
+        now = time.monotonic()
+        self.stats['triggers'] += 1
+        # Übersprechen: ein Trigger, während noch ein Echo unterwegs ist
+        if now < self._busy_until:
+            self.stats['overlaps'] += 1
+
+        name, echo = self.sensors[pin]
+        distance = self._spikes.pop(name, self.distances.get(name))
+        if distance is None or distance > MAX_RANGE_CM:
+            return  # Kein Echo im Messbereich
+
+        distance = max(2.0, distance + random.gauss(0, self.noise_cm)) if self.noise_cm else distance
+        rise = now + BURST_DELAY_S
+        fall = rise + 2 * distance / SPEED_OF_SOUND_CM_S
+        self._busy_until = fall
+        self._queue.put((echo, rise, fall))
+
+    def _echo_loop(self):
+        while True:
+            echo, rise, fall = self._queue.get()
+            if echo is None:
+                break
+            for level, at in ((1, rise), (0, fall)):
+                delay = at - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                self.callbacks[echo](echo, level, time.monotonic())
+            self.stats['echoes'] += 1
+
+    def cleanup(self):
+        self._queue.put((None, 0, 0))
+
+
+class UltrasonicArray:
+    """Mehrere HC-SR04 im Round-Robin mit Median-Filter und Notaus-Pfad"""
+
+    def __init__(self, sensors=None, backend=None, slot_s=SLOT_S, median_window=MEDIAN_WINDOW,
+                 stop_distance_cm=STOP_DISTANCE_CM, motors=None):
+        self.sensors = dict(ULTRASONIC_SENSORS if sensors is None else sensors)
+        self.slot_s = slot_s
+        self.median_window = median_window
+        self.stop_distance_cm = stop_distance_cm
+        self.hardware_available = False
+        self._motors = motors
+
+        self.backend = backend if backend is not None else self._init_backend()
+        self.schedule = self._build_schedule()
+
+        # Messwerte: Fenster für den Median, gefilterter Wert pro Sensor
+        self._windows = {name: deque(maxlen=median_window) for name in self.sensors}
+        self.filtered = {name: None for name in self.sensors}
+
+        # Laufende Messung - Callbacks gehören nur zum aktiven Sensor
+        self._echo_pins = {config['echo']: name for name, config in self.sensors.items()}
+        self._active = None
+        self._rise = None
+        self._echo_time = None
+        self._echo_done = threading.Event()
+
+        self._stop_event = threading.Event()
+        self.thread = None
+        self.stats = {'measurements': 0, 'timeouts': 0, 'ignored_edges': 0,
+                      'overruns': 0, 'emergency_stops': 0}
+
+        for name, config in self.sensors.items():
+            self.backend.setup(name, config['trigger'], config['echo'], self._on_edge)
+
+    def _init_backend(self):
+        try:
+            backend = RPiEchoBackend()
+            self.hardware_available = True
+            print("✅ Ultraschall-Sensoren initialisiert (GPIO-Flanken)")
+            return backend
+        except (ImportError, RuntimeError) as e:
+            print(f"⚠️ Ultraschall-Hardware nicht verfügbar: {e}")
+            print("🔧 Ultraschall Mock-Echo aktiviert")
+            return MockEchoBackend()
+
+    def _build_schedule(self):
+        """Reihenfolge der Messfenster - der Prioritätssensor zwischen allen anderen"""
+        others = [name for name in self.sensors if name != PRIORITY_SENSOR]
+        if PRIORITY_SENSOR not in self.sensors:
+            return others
+        if not others:
+            return [PRIORITY_SENSOR]
+        schedule = []
+        for name in others:
+            schedule.extend([PRIORITY_SENSOR, name])
+        return schedule
+
+    # ===== MESSUNG =====
+    def _on_edge(self, pin, level, timestamp):
+        """Flanken-Callback: steigend startet, fallend beendet die Laufzeitmessung"""
+        if self._echo_pins.get(pin) != self._active:
+            self.stats['ignored_edges'] += 1  # Echo außerhalb des eigenen Fensters
+            return
+        if level:
+            self._rise = timestamp
+        elif self._rise is not None:
+            self._echo_time = timestamp - self._rise
+            self._echo_done.set()
+
+    def measure(self, name):
+        """Einen Sensor auslösen und auf sein Echo warten - None ohne Echo im Messbereich"""
+        self._rise = None
+        self._echo_time = None
+        self._echo_done.clear()
+        self._active = name
+        self.backend.trigger(self.sensors[name]['trigger'])
+
+        received = self._echo_done.wait(self.slot_s)
+        self._active = None
+        if not received:
+            self.stats['timeouts'] += 1
+            return None
+
+        distance = self._echo_time * SPEED_OF_SOUND_CM_S / 2
+        return distance if distance <= MAX_RANGE_CM else None
+
+    def _add_reading(self, name, distance):
+        window = self._windows[name]
+        window.append(MAX_RANGE_CM if distance is None else distance)
+        filtered = round(statistics.median(window), 1)
+        self.filtered[name] = filtered
+        self.stats['measurements'] += 1
+        self._check_obstacle(name, filtered)
+
+    def _loop(self):
+        next_slot = time.monotonic()
+        index = 0
+        while not self._stop_event.is_set():
+            name = self.schedule[index % len(self.schedule)]
+            index += 1
+            self._add_reading(name, self.measure(name))
+
+            # Festes Zeitfenster - Nachhall abklingen lassen, bevor der nächste Sensor feuert
+            next_slot += self.slot_s
+            delay = next_slot - time.monotonic()
+            if delay > 0:
+                self._stop_event.wait(delay)
+            else:
+                self.stats['overruns'] += 1
+                next_slot = time.monotonic()
+
+    # ===== NOTAUS =====
+    def _get_motors(self):
+        if self._motors is not None:
+            return self._motors
+        from hardware.registry import hardware_registry
+        if hardware_registry.is_created('motor_controller'):
+            return hardware_registry.get('motor_controller')
+        return None
+
+    @staticmethod
+    def _travel_directions(motors):
+        """Sensoren in Fahrtrichtung - aus Soll- und Ist-Geschwindigkeit der Regelung"""
+        linear_target = motors.target['left_motor'] + motors.target['right_motor']
+        linear_velocity = motors.velocity['left_motor'] + motors.velocity['right_motor']
+        directions = set()
+        if linear_target > 0 or linear_velocity > 0:
+            directions.add('front')
+        if linear_target < 0 or linear_velocity < 0:
+            directions.add('back')
+        return directions
+
+    def _check_obstacle(self, name, distance):
+        if distance >= self.stop_distance_cm:
+            return
+        motors = self._get_motors()
+        if motors is None or motors.emergency_stopped:
+            return
+        if name not in self._travel_directions(motors):
+            return
+
+        # Direkt aus dem Messthread - stop() schreibt die Ausgänge ohne auf den Regeltakt zu warten
+        motors.emergency_stop(f'obstacle:{name}')
+        self.stats['emergency_stops'] += 1
+        print(f"🚨 Hindernis {name}: {distance}cm - Notaus")
+
+    def worst_case_stop_latency(self):
+        """Obergrenze Hindernis -> Notaus pro Sensor in Sekunden
+
+        Der Median kippt erst nach median_window // 2 + 1 neuen Messungen; jede
+        kommt spätestens eine Wiederholperiode nach der vorigen, plus ihr Fenster.
+        """
+        confirmations = self.median_window // 2 + 1
+        count = len(self.schedule)
+        latencies = {}
+        for name in self.sensors:
+            positions = [i for i, entry in enumerate(self.schedule) if entry == name]
+            gaps = [(positions[(i + 1) % len(positions)] - position) % count or count
+                    for i, position in enumerate(positions)]
+            period = max(gaps) * self.slot_s
+            latencies[name] = round(confirmations * period + self.slot_s, 3)
+        return latencies
+
+    # ===== STEUERUNG & STATUS =====
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self._stop_event.clear()
+        self.thread = threading.Thread(target=self._loop, name='ultrasonic', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    def get_distance(self, name='front'):
+        """Gefilterter Abstand in cm (None vor der ersten Messung)"""
+        return self.filtered.get(name)
+
+    def get_distances(self):
+        return dict(self.filtered)
+
+    def get_status(self):
+        return {
+            'hardware_available': self.hardware_available,
+            'running': bool(self.thread and self.thread.is_alive()),
+            'distances': self.get_distances(),
+            'schedule': list(self.schedule),
+            'slot_ms': round(self.slot_s * 1000, 1),
+            'stop_distance_cm': self.stop_distance_cm,
+            'worst_case_stop_latency_s': self.worst_case_stop_latency(),
+            'stats': dict(self.stats)
+        }
+
+    def cleanup(self):
+        self.stop()
+        self.backend.cleanup()
@@ -1,13 +1,18 @@
 #!/usr/bin/env python3
 """
 Unkraut-2025 Main Entry Point
+Entwicklung:  python run.py               (Werkzeug, Debug + Reloader)
+Produktion:   python run.py --production  (Gunicorn, siehe config/gunicorn_config.py)
+              oder UNKRAUT_SERVER=production
 """
 import os
 import sys
+import runpy
 import subprocess
 
 # Konstanten
 C_FLASKPORT = 5000  # Flask Port
+C_GUNICORN_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'gunicorn_config.py')
 
 # Python path setzen
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -31,10 +36,46 @@ def get_wlan0_ip():
     
     return "127.0.0.1"
 
+def is_production():
+    """Produktionsmodus per Flag oder Umgebungsvariable"""
+    return '--production' in sys.argv or os.environ.get('UNKRAUT_SERVER') == 'production'
+
+def run_production(port):
+    """Gunicorn mit einem Worker-Prozess und Thread-Pool starten"""
+    from gunicorn.app.base import BaseApplication
+    
+    class UnkrautServer(BaseApplication):
+        """Gunicorn-Anwendung mit Einstellungen aus config/gunicorn_config.py"""
+        
+        def load_config(self):
+            settings = runpy.run_path(C_GUNICORN_CONFIG)
+            for key, value in settings.items():
+                if key in self.cfg.settings and value is not None:
+                    self.cfg.set(key, value)
+            self.cfg.set('bind', f'0.0.0.0:{port}')
+        
+        def load(self):
+            # Erst im Worker importieren - Hardware gehört diesem Prozess
+            from app.main import app
+            return app
+    
+    print("🚀 Starte Gunicorn (Produktion)...")
+    print(f"📡 Zugriff über: http://{get_wlan0_ip()}:{port}")
+    UnkrautServer().run()
+
 def main():
     # Port aus Umgebungsvariable oder Default
     port = int(os.environ.get('FLASK_PORT', C_FLASKPORT))
     
+    if is_production():
+        try:
+            run_production(port)
+        except ImportError as e:
+            print(f"❌ Import-Fehler: {e}")
+            print("💡 Führe 'pip install -r requirements.txt' aus")
+            sys.exit(1)
+        return
+    
     try:
         from app.main import app
         print("✅ Unkraut-2025 Module erfolgreich geladen")
@@ -45,12 +86,23 @@ def main():
         print(f"📡 Zugriff über: http://{hostap}:{port}")
         print("🛑 Stoppen mit Ctrl+C")
         
-        app.run(
-            host='0.0.0.0',
-            port=port,
-            debug=True,
-            threaded=True
-        )
+        # Mit Telemetrie-Kanal über SocketIO starten (WebSocket unter Werkzeug)
+        from app.utils.telemetry import telemetry
+        if telemetry.socketio is not None:
+            telemetry.socketio.run(
+                app,
+                host='0.0.0.0',
+                port=port,
+                debug=True,
+                allow_unsafe_werkzeug=True
+            )
+        else:
+            app.run(
+                host='0.0.0.0',
+                port=port,
+                debug=True,
+                threaded=True
+            )
         
     except ImportError as e:
         print(f"❌ Import-Fehler: {e}")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# tests/load_test.py
+"""
+Last-Test: API-Latenz unter gleichzeitigen MJPEG-Streams
+Startet den Server im Entwicklungs- und im Produktionsmodus, öffnet N Streams
+und misst die Antwortzeit von /api/camera/status.
+
+Aufruf: python tests/load_test.py [--streams 4] [--requests 200] [--mode dev|production|both]
+"""
+import os
+import sys
+import time
+import signal
+import socket
+import argparse
+import threading
+import subprocess
+import http.client
+
+# Python-Pfad anpassen
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def _start_server(mode, port):
+    """run.py im gewünschten Modus starten und warten bis er antwortet"""
+    env = dict(os.environ, FLASK_PORT=str(port))
+    args = [sys.executable, 'run.py'] + (['--production'] if mode == 'production' else [])
+    # Eigene Prozessgruppe - der Werkzeug-Reloader startet einen Kindprozess
+    process = subprocess.Popen(args, cwd=project_root, env=env, start_new_session=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/api/camera/status')
+            connection.getresponse().read()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"Server ({mode}) antwortet nicht")
+
+def _stream_reader(port, stop_event, counters):
+    """Einen MJPEG-Stream dauerhaft lesen"""
+    try:
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        connection.request('GET', '/api/camera/stream')
+        response = connection.getresponse()
+        if response.status != 200:
+            counters['rejected'] += 1
+            return
+        while not stop_event.is_set():
+            if not response.read(16384):
+                break
+            counters['bytes'] += 16384
+    except (OSError, http.client.HTTPException):
+        if not stop_event.is_set():
+            counters['errors'] += 1
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def run_load_test(mode, streams, requests):
+    """Latenz von /api/camera/status bei `streams` offenen Streams messen"""
+    port = _free_port()
+    process = _start_server(mode, port)
+    stop_event = threading.Event()
+    counters = {'bytes': 0, 'rejected': 0, 'errors': 0}
+
+    try:
+        readers = [threading.Thread(target=_stream_reader, args=(port, stop_event, counters), daemon=True)
+                   for _ in range(streams)]
+        for reader in readers:
+            reader.start()
+        time.sleep(2.0)  # Streams einschwingen lassen
+
+        latencies = []
+        failures = 0
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        started = time.monotonic()
+        for _ in range(requests):
+            t0 = time.perf_counter()
+            try:
+                connection.request('GET', '/api/camera/status')
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    failures += 1
+            except OSError:
+                failures += 1
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            latencies.append((time.perf_counter() - t0) * 1000)
+        duration = time.monotonic() - started
+    finally:
+        stop_event.set()
+        os.killpg(process.pid, signal.SIGTERM)
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+
+    return {
+        'mode': mode,
+        'streams': streams,
+        'p50_ms': round(_percentile(latencies, 0.50), 2),
+        'p95_ms': round(_percentile(latencies, 0.95), 2),
+        'p99_ms': round(_percentile(latencies, 0.99), 2),
+        'max_ms': round(max(latencies), 2),
+        'failures': failures,
+        'requests_per_s': round(requests / duration, 1),
+        'stream_mb': round(counters['bytes'] / 1024 / 1024, 1),
+        'streams_rejected': counters['rejected']
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Unkraut-2025 Last-Test')
+    parser.add_argument('--streams', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--mode', choices=['dev', 'production', 'both'], default='both')
+    args = parser.parse_args()
+
+    modes = ['dev', 'production'] if args.mode == 'both' else [args.mode]
+    print(f"🧪 Last-Test: {args.streams} Streams, {args.requests} Requests /api/camera/status")
+    print("=" * 70)
+    for mode in modes:
+        result = run_load_test(mode, args.streams, args.requests)
+        print(f"{mode:>10}: p50 {result['p50_ms']:7.2f} ms | p95 {result['p95_ms']:7.2f} ms | "
+              f"p99 {result['p99_ms']:7.2f} ms | max {result['max_ms']:7.2f} ms | "
+              f"{result['requests_per_s']} req/s | Fehler {result['failures']} | "
+              f"Streams abgelehnt {result['streams_rejected']}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+# tests/test_arm_jobs.py
+"""
+Teste die Job-Warteschlange des Arms: Tourplanung (Nächster Nachbar + 2-opt) gegen
+das Optimum, inkrementelles Einfügen, Fahrzeugbewegung, Durchsatz-Kennzahl und das
+Abarbeiten mit dem echten Arm-Controller
+"""
+import os
+import sys
+import time
+import random
+import itertools
+
+import numpy as np
+
+# Python-Pfad anpassen
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from hardware.arm_jobs import (WeedJobScheduler, travel_matrix, path_cost, nearest_neighbour,
+                               two_opt, cheapest_insertion)
+from hardware.coordinates import ArmKinematics, arm_to_world
+from hardware.robot_arm import RobotArmController
+
+class PlanningArm:
+    """Nur was die Planung braucht - keine Bewegungen"""
+    approach_height = 5.0
+    emergency_stopped = False
+
+    def __init__(self):
+        self.kinematics = ArmKinematics()
+
+    def get_current_position(self):
+        return {'base': 90, 'shoulder': 75, 'elbow': 105, 'wrist': 90, 'gripper': 90, 'tool': 0}
+
+    def solve_xy(self, x, y, height=0.0):
+        return self.kinematics.solve(x, y, height)
+
+def _submit_arm_points(scheduler, points, pose=None):
+    pose = pose or {'x': 0.0, 'y': 0.0, 'heading': 0.0}
+    for job_id, (x, y) in enumerate(points, 1):
+        wx, wy = arm_to_world(pose, x, y)
+        scheduler.submit(job_id, wx, wy)
+
+def test_two_opt_close_to_optimum():
+    """NN + 2-opt liegt bei kleinen Instanzen nah am per Brute Force bestimmten Optimum"""
+    rng = np.random.default_rng(7)
+    for _ in range(5):
+        angles = rng.uniform(0, 180, size=(8, 4))
+        cost = travel_matrix(angles)
+        nodes = range(1, 8)
+        best = min(path_cost(cost, order) for order in itertools.permutations(nodes))
+        planned = two_opt(cost, nearest_neighbour(cost, nodes))
+        assert sorted(planned) == list(nodes)
+        assert path_cost(cost, planned) <= best * 1.1
+
+def test_plan_beats_detection_order():
+    """Die geplante Tour ist kürzer als die Abarbeitung in Erkennungs-Reihenfolge"""
+    random.seed(3)
+    scheduler = WeedJobScheduler(PlanningArm())
+    points = [(random.uniform(12, 30), random.uniform(-15, 15)) for _ in range(12)]
+    _submit_arm_points(scheduler, points)
+
+    order = scheduler.plan()
+    assert sorted(order) == list(range(1, 13))
+    plan = scheduler.last_plan
+    assert plan['mode'] == 'full'
+    assert plan['travel_s'] <= plan['seed_travel_s']
+    assert plan['travel_s'] < plan['id_order_travel_s']
+    assert plan['plan_ms'] < 50
+
+def test_incremental_insertion():
+    """Neue Erkennungen werden in die bestehende Tour eingefügt statt neu zu planen"""
+    scheduler = WeedJobScheduler(PlanningArm())
+    _submit_arm_points(scheduler, [(15, -10), (20, -5), (25, 0), (20, 10)])
+    first = scheduler.plan()
+
+    scheduler.submit(99, *arm_to_world({'x': 0.0, 'y': 0.0, 'heading': 0.0}, 22, -2))
+    second = scheduler.plan()
+    assert scheduler.last_plan['mode'] == 'incremental'
+    assert 99 in second and len(second) == len(first) + 1
+
+    # Einfügen allein: kein Knoten verschwindet, keiner doppelt
+    cost = travel_matrix(np.random.default_rng(1).uniform(0, 180, size=(6, 4)))
+    assert sorted(cheapest_insertion(cost, [1, 3, 5], 4)) == [1, 3, 4, 5]
+
+def test_vehicle_motion_changes_reachability():
+    """Ein Unkraut vor der Reichweite kommt in Reichweite, sobald das Fahrzeug vorfährt"""
+    pose = {'x': 0.0, 'y': 0.0, 'heading': 0.0}
+    scheduler = WeedJobScheduler(PlanningArm(), pose_source=lambda: pose)
+    _submit_arm_points(scheduler, [(45, 0)])
+    assert scheduler.plan() == []
+    assert scheduler.jobs[1]['reachable'] is False
+
+    pose = {'x': 0.2, 'y': 0.0, 'heading': 0.0}
+    assert scheduler.plan() == [1]
+    assert abs(scheduler.jobs[1]['arm_x'] - 25) < 1e-6
+
+def test_weeds_per_minute():
+    """Durchsatz im gleitenden 60-s-Fenster"""
+    scheduler = WeedJobScheduler(PlanningArm())
+    now = time.time()
+    scheduler.started_at = now - 120
+    scheduler.removed_times.extend([now - 90, now - 50, now - 30, now - 10, now - 5])
+    assert scheduler.weeds_per_minute(now) == 4.0
+
+    scheduler.started_at = now - 30
+    scheduler.removed_times.clear()
+    scheduler.removed_times.extend([now - 20, now - 10, now - 5])
+    assert scheduler.weeds_per_minute(now) == 6.0
+
+def test_job_removed_between_plan_and_pop():
+    """clear() zwischen Planung und Entnahme - kein KeyError, es wird neu geplant"""
+    scheduler = WeedJobScheduler(PlanningArm())
+    _submit_arm_points(scheduler, [(20, -5), (25, 0)])
+    original_plan = scheduler.plan
+    calls = []
+
+    def plan_then_clear_first():
+        planned = original_plan()
+        if not calls:
+            with scheduler.lock:
+                # Wie clear(): Job weg, die bereits geplante Liste bleibt unverändert
+                del scheduler.jobs[planned[0]]
+        calls.append(planned)
+        return planned
+
+    scheduler.plan = plan_then_clear_first
+    job = scheduler._next_job()
+    assert len(calls) == 2
+    assert job is not None and job['id'] == calls[1][0]
+    assert job['id'] != calls[0][0]
+    assert scheduler.jobs == {}
+
+def test_robot_arm_works_through_jobs():
+    """Der echte Arm arbeitet zwei Jobs nacheinander ab und meldet den Durchsatz"""
+    arm = RobotArmController()
+    try:
+        _submit_arm_points(arm.jobs, [(20, 8), (22, -6)])
+        arm.jobs.start()
+        deadline = time.time() + 10
+        while arm.jobs.stats['removed'] < 2 and time.time() < deadline:
+            time.sleep(0.05)
+        status = arm.jobs.get_status()
+        assert status['stats']['removed'] == 2
+        assert status['weeds_per_minute'] > 0
+        assert arm.get_arm_info()['jobs']['pending'] == 0
+    finally:
+        arm.cleanup()
+
+if __name__ == '__main__':
+    test_two_opt_close_to_optimum()
+    test_plan_beats_detection_order()
+    test_incremental_insertion()
+    test_vehicle_motion_changes_reachability()
+    test_weeds_per_minute()
+    test_job_removed_between_plan_and_pop()
+    test_robot_arm_works_through_jobs()
+    print("✅ Job-Warteschlangen-Tests bestanden")
@@ -0,0 +1,149 @@
+# tests/test_arm_trajectory.py
+"""
+Teste den Trajektorien-Thread des Roboterarms: synchrone Gelenke, feste Rate,
+Warten auf das Ende, Ersetzen, Überblenden und Abbrechen
+"""
+import os
+import sys
+import time
+import threading
+
+# Python-Pfad anpassen
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from hardware.arm_trajectory import TrajectoryExecutor
+from hardware.robot_arm import RobotArmController
+
+class _Recorder:
+    """Merkt sich jeden Schreibtakt mit Zeitstempel"""
+
+    def __init__(self):
+        self.writes = []
+        self.lock = threading.Lock()
+
+    def __call__(self, positions):
+        with self.lock:
+            self.writes.append((time.monotonic(), dict(positions)))
+
+def _executor(rate_hz=50):
+    recorder = _Recorder()
+    executor = TrajectoryExecutor(recorder, {'base': 0.0, 'elbow': 0.0, 'wrist': 90.0}, rate_hz)
+    return executor, recorder
+
+def test_joints_move_synchronized():
+    """Alle Gelenke haben denselben Fortschritt und kommen im selben Takt an"""
+    executor, recorder = _executor()
+    try:
+        handle = executor.execute({'base': 90.0, 'elbow': 10.0}, 0.4)
+        assert handle.wait(2.0)
+    finally:
+        executor.stop()
+
+    for _, positions in recorder.writes:
+        # Fortschritt beider Gelenke identisch, unbewegtes Gelenk bleibt stehen
+        assert abs(positions['base'] / 90.0 - positions['elbow'] / 10.0) < 1e-9
+        assert positions['wrist'] == 90.0
+    assert recorder.writes[-1][1]['base'] == 90.0 and recorder.writes[-1][1]['elbow'] == 10.0
+
+    # Feste Rate: ~0,4 s x 50 Hz Schreibtakte, einer pro Takt für alle Gelenke
+    assert 18 <= len(recorder.writes) <= 23, len(recorder.writes)
+    periods = [b[0] - a[0] for a, b in zip(recorder.writes, recorder.writes[1:])]
+    assert max(periods) < 0.04
+
+def test_smooth_start_and_stop():
+    """Geschwindigkeit am Anfang und Ende null - kein Sprung auf volle Servo-Geschwindigkeit"""
+    executor, recorder = _executor()
+    try:
+        executor.execute({'base': 90.0}, 0.5).wait(2.0)
+    finally:
+        executor.stop()
+
+    steps = [b[1]['base'] - a[1]['base'] for a, b in zip(recorder.writes, recorder.writes[1:])]
+    assert steps[0] < max(steps) / 3
+    assert steps[-1] < max(steps) / 3
+
+def test_preempt_replaces_running_motion():
+    """Eine neue Bewegung ersetzt die laufende und startet an deren aktuellem Sollwert"""
+    executor, recorder = _executor()
+    try:
+        first = executor.execute({'base': 90.0}, 1.0)
+        time.sleep(0.3)
+        second = executor.execute({'base': 20.0}, 0.3)
+        assert first.wait(1.0) is False
+        assert first.status == 'preempted'
+        assert second.wait(2.0)
+    finally:
+        executor.stop()
+
+    trace = [positions['base'] for _, positions in recorder.writes]
+    jumps = [abs(b - a) for a, b in zip(trace, trace[1:])]
+    assert max(jumps) < 10.0
+    assert trace[-1] == 20.0
+
+def test_blend_keeps_velocity():
+    """Beim Überblenden läuft die Bewegung mit ihrer Geschwindigkeit in das neue Ziel weiter"""
+    results = {}
+    for mode in ('replace', 'blend'):
+        executor, recorder = _executor()
+        try:
+            executor.execute({'base': 90.0}, 1.0)
+            time.sleep(0.5)
+            switch = time.monotonic()
+            executor.execute({'base': 100.0}, 0.5, mode=mode).wait(2.0)
+        finally:
+            executor.stop()
+        trace = [(t, positions['base']) for t, positions in recorder.writes if t > switch]
+        results[mode] = trace[1][1] - trace[0][1]
+
+    # Ohne Überblenden startet die neue Bewegung aus dem Stand
+    assert results['blend'] > 2 * results['replace']
+
+def test_queue_and_cancel():
+    """Angehängte Bewegungen laufen nacheinander, cancel() stoppt sofort ohne weitere Schreibtakte"""
+    executor, recorder = _executor()
+    try:
+        first = executor.execute({'base': 30.0}, 0.2)
+        second = executor.execute({'base': 60.0}, 0.2, mode='queue')
+        assert second.wait(2.0) and first.status == 'completed'
+
+        executor.execute({'base': 0.0}, 1.0)
+        time.sleep(0.2)
+        executor.cancel()
+        writes = len(recorder.writes)
+        time.sleep(0.1)
+        assert len(recorder.writes) == writes
+        assert executor.is_busy() is False
+    finally:
+        executor.stop()
+
+def test_robot_arm_move_does_not_block():
+    """move_joint/move_to_preset kehren sofort zurück, wait=True wartet auf das Ende"""
+    arm = RobotArmController()
+    try:
+        started = time.monotonic()
+        handle = arm.move_to_preset('park', 0.3)
+        assert time.monotonic() - started < 0.05
+        assert arm.is_moving
+        assert handle.wait(2.0)
+        # Sollwert ist da, der Servo fährt laut Modell noch hinterher
+        assert arm.get_commanded_position()['shoulder'] == 45
+        assert arm.estimator.wait_settled(2.0)
+        assert arm.get_current_position()['shoulder'] == 45
+        assert arm.is_moving is False
+
+        assert arm.move_joint('base', 250, 0.1, wait=True) is True
+        assert arm.get_current_position()['base'] == 180
+        assert arm.move_joint('nase', 10) is False
+    finally:
+        arm.cleanup()
+
+if __name__ == '__main__':
+    test_joints_move_synchronized()
+    test_smooth_start_and_stop()
+    test_preempt_replaces_running_motion()
+    test_blend_keeps_velocity()
+    test_queue_and_cancel()
+    test_robot_arm_move_does_not_block()
+    print("✅ Arm-Trajektorien-Tests bestanden")
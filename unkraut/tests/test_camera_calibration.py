@@ -0,0 +1,147 @@
+# tests/test_camera_calibration.py
+"""
+Teste die Kamerakalibrierung mit synthetischen Aufnahmen: Intrinsik aus gerenderten
+Schachbrettern, Bodenebene trotz Linsenverzeichnung, gecachte Tabellen und
+Speichern/Laden
+"""
+import os
+import sys
+import tempfile
+
+import cv2
+import numpy as np
+
+# Python-Pfad anpassen
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from hardware.camera_calibration import CameraCalibration, board_ground_points, find_checkerboard
+
+SIZE = (640, 480)
+MATRIX = np.array([[600.0, 0, 320], [0, 600.0, 240], [0, 0, 1]])
+DISTORTION = np.array([-0.25, 0.08, 0.0, 0.0, 0.0])
+
+def _calibration():
+    return CameraCalibration(os.path.join(tempfile.mkdtemp(), 'camera_calibration.json'))
+
+def _render_board(rvec, tvec, pattern=(9, 6), square=2.5, px_per_cm=20):
+    """Schachbrett in Brett-Koordinaten zeichnen und per Homographie ins Kamerabild legen"""
+    cols, rows = pattern[0] + 1, pattern[1] + 1
+    margin = 1.0
+    board = np.full((int((rows * square + 2 * margin) * px_per_cm), int((cols * square + 2 * margin) * px_per_cm)),
+                    255, np.uint8)
+    for row in range(rows):
+        for col in range(cols):
+            if (row + col) % 2 == 0:
+                x0 = int((margin + col * square) * px_per_cm)
+                y0 = int((margin + row * square) * px_per_cm)
+                board[y0:y0 + int(square * px_per_cm), x0:x0 + int(square * px_per_cm)] = 0
+
+    # Brettpixel -> Brett-cm (Ursprung = erste innere Ecke) -> Kamerabild
+    to_cm = np.array([[1 / px_per_cm, 0, -margin - square], [0, 1 / px_per_cm, -margin - square], [0, 0, 1]])
+    rotation, _ = cv2.Rodrigues(np.asarray(rvec, float))
+    to_image = MATRIX @ np.column_stack([rotation[:, 0], rotation[:, 1], np.asarray(tvec, float)])
+    return cv2.warpPerspective(board, to_image @ to_cm, SIZE, borderValue=255)
+
+def test_intrinsics_from_rendered_boards():
+    """Kameramatrix aus mehreren Schachbrett-Lagen wird wiedergefunden"""
+    calibration = _calibration()
+    poses = [((0.1, 0.2, 0.0), (-10, -6, 45)), ((-0.2, 0.1, 0.1), (-9, -7, 50)),
+             ((0.25, -0.15, -0.1), (-11, -5, 55)), ((-0.1, -0.25, 0.05), (-10, -8, 48)),
+             ((0.3, 0.1, 0.2), (-12, -6, 60)), ((0.0, 0.3, -0.2), (-8, -5, 52))]
+    for rvec, tvec in poses:
+        assert calibration.add_view(_render_board(rvec, tvec))
+
+    rms = calibration.calibrate_intrinsics(square_size=2.5)
+    assert rms < 1.0
+    assert abs(calibration.camera_matrix[0, 0] - 600) < 15
+    assert abs(calibration.camera_matrix[1, 2] - 240) < 10
+    assert calibration.views == []
+
+    # Ground-Kalibrierung vom Boden aus (Kamera schaut senkrecht nach unten)
+    image = _render_board((0, 0, 0), (-10, -6, 40))
+    assert find_checkerboard(image) is not None
+    error = calibration.calibrate_ground(image, origin=(15, 5))
+    assert error < 0.05
+    ground = calibration.pixels_to_ground([[320, 240]], exact=True)[0]
+    assert np.allclose(ground, (15 + 10, 5 + 6), atol=0.1)
+
+def test_ground_mapping_with_distortion():
+    """Pixel -> Boden trifft trotz starker Verzeichnung, Tabelle und exakte Rechnung stimmen überein"""
+    calibration = _calibration()
+    calibration.camera_matrix = MATRIX.copy()
+    calibration.dist_coeffs = DISTORTION.copy()
+    calibration.image_size = SIZE
+
+    # Kamera 50 cm über dem Boden, leicht gekippt
+    rvec, tvec = np.array([0.2, -0.1, 0.05]), np.array([-20.0, -10.0, 50.0])
+    ground = np.array([(x, y) for x in range(0, 45, 5) for y in range(0, 25, 5)], dtype=float)
+    points3d = np.column_stack([ground, np.zeros(len(ground))])
+    pixels, _ = cv2.projectPoints(points3d, rvec, tvec, MATRIX, DISTORTION)
+    pixels = pixels.reshape(-1, 2)
+
+    assert calibration._fit_ground(pixels, ground, SIZE) < 0.01
+
+    check = np.array([[12.3, 7.7], [31.0, 18.2], [4.4, 20.1]])
+    check_pixels, _ = cv2.projectPoints(np.column_stack([check, np.zeros(3)]), rvec, tvec, MATRIX, DISTORTION)
+    check_pixels = check_pixels.reshape(-1, 2)
+
+    exact = calibration.pixels_to_ground(check_pixels, exact=True)
+    assert np.allclose(exact, check, atol=0.02)
+    # Tabelle rundet auf ganze Pixel - bei ~12 px/cm unter 0,1 cm
+    assert np.allclose(calibration.pixels_to_ground(check_pixels), check, atol=0.1)
+    assert np.allclose(calibration.ground_to_pixels(check), check_pixels, atol=0.05)
+
+    detections = [{'center': {'x': int(round(x)), 'y': int(round(y))}} for x, y in check_pixels]
+    calibration.detections_to_ground(detections)
+    assert abs(detections[1]['ground']['x'] - 31.0) < 0.15
+
+def test_maps_are_cached_and_persisted():
+    """Entzerrungs-Tabellen werden einmal gebaut; Kalibrierung übersteht Neustart"""
+    calibration = _calibration()
+    calibration.camera_matrix = MATRIX.copy()
+    calibration.dist_coeffs = DISTORTION.copy()
+    maps = calibration.get_undistort_maps(SIZE)
+    assert calibration.get_undistort_maps(SIZE) is maps
+
+    frame = np.zeros((480, 640, 3), np.uint8)
+    assert calibration.undistort(frame).shape == frame.shape
+    # Halbe Auflösung bekommt eigene Tabellen mit skalierter Kameramatrix
+    calibration.undistort(np.zeros((240, 320, 3), np.uint8))
+    assert len(calibration.get_status()['cached_sizes']) == 2
+
+    ground = np.array([(x, y) for x in range(0, 30, 10) for y in range(0, 30, 10)], dtype=float)
+    pixels = ground * 10 + 100
+    calibration._fit_ground(pixels, ground, SIZE)
+
+    reloaded = CameraCalibration(calibration.path)
+    assert reloaded.ground_calibrated
+    assert np.allclose(reloaded.dist_coeffs, DISTORTION)
+    assert np.allclose(reloaded.pixels_to_ground([[250, 150]], exact=True),
+                       calibration.pixels_to_ground([[250, 150]], exact=True))
+
+def test_uncalibrated_ground_is_rejected():
+    """Ohne Bodenebene keine Boden-Koordinaten, zu wenige Aufnahmen -> ValueError"""
+    calibration = _calibration()
+    assert calibration.ground_calibrated is False
+    try:
+        calibration.pixels_to_ground([[1, 2]])
+        assert False, "ValueError erwartet"
+    except ValueError:
+        pass
+    try:
+        calibration.calibrate_intrinsics()
+        assert False, "ValueError erwartet"
+    except ValueError:
+        pass
+    detections = [{'center': {'x': 1, 'y': 2}}]
+    assert 'ground' not in calibration.detections_to_ground(detections)[0]
+    assert len(board_ground_points()) == 54
+
+if __name__ == '__main__':
+    test_intrinsics_from_rendered_boards()
+    test_ground_mapping_with_distortion()
+    test_maps_are_cached_and_persisted()
+    test_uncalibrated_ground_is_rejected()
+    print("✅ Kamerakalibrierungs-Tests bestanden")
@@ -0,0 +1,53 @@
+# tests/test_camera_detection.py
+"""
+Teste den Kamera-Erkennungs-Cache (TTL und Geräte-Schlüssel)
+"""
+import os
+import sys
+import json
+import tempfile
+
+# Python-Pfad anpassen
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+import hardware.camera as camera_module
+from hardware.camera import CameraManager
+
+def _mock_manager():
+    """Eigene Kamera-Instanz im Mock-Modus (ohne Hardware-Probes)"""
+    manager = CameraManager()
+    manager.wait_for_detection(10)
+    manager.camera_type = 'mock'
+    return manager
+
+def test_detection_cache_ttl_and_device_key():
+    """Cache gilt nur für denselben Geräte-Schlüssel und innerhalb der TTL"""
+    original_file = camera_module.DETECTION_CACHE_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        camera_module.DETECTION_CACHE_FILE = os.path.join(tmp, 'camera_detect.json')
+        try:
+            manager = _mock_manager()
+            manager.camera_type = 'usb'
+            manager.camera_device = 1
+            manager._save_detection_cache('key-a')
+
+            other = _mock_manager()
+            assert other._load_detection_cache('key-b') is False
+            assert other._load_detection_cache('key-a') is True
+            assert other.camera_type == 'usb' and other.camera_device == 1
+
+            # Abgelaufener Eintrag wird ignoriert
+            with open(camera_module.DETECTION_CACHE_FILE) as f:
+                cache = json.load(f)
+            cache['timestamp'] -= camera_module.DETECTION_CACHE_TTL + 1
+            with open(camera_module.DETECTION_CACHE_FILE, 'w') as f:
+                json.dump(cache, f)
+            assert other._load_detection_cache('key-a') is False
+        finally:
+            camera_module.DETECTION_CACHE_FILE = original_file
+
+if __name__ == '__main__':
+    test_detection_cache_ttl_and_device_key()
+    print("✅ Kamera-Erkennungs-Tests bestanden")
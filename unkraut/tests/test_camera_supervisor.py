@@ -0,0 +1,65 @@
+# tests/test_camera_supervisor.py
+"""
+Teste den Stream-Supervisor: Stall-Erkennung, Neustart, Ausfallzeit (Mock-Kamera)
+"""
+import os
+import sys
+import time
+
+# Python-Pfad anpassen
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from hardware.camera import CameraManager
+
+def _mock_manager():
+    """Eigene Kamera-Instanz im Mock-Modus (ohne Hardware-Probes)"""
+    manager = CameraManager()
+    manager.wait_for_detection(10)
+    manager.camera_type = 'mock'
+    manager._storage_allows_capture = lambda: True
+    return manager
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+def test_stall_restart_and_downtime():
+    """Stall wird erkannt, neu gestartet und die Ausfallzeit gezählt"""
+    manager = _mock_manager()
+    try:
+        assert manager.start_stream()
+        assert _wait_for(lambda: manager.current_frame is not None)
+        grace_until = manager._grace_until
+
+        # Worker beenden ohne is_streaming zurückzusetzen -> Stall
+        restart_worker = manager._restart_worker
+        manager._restart_worker = lambda redetect=False: None
+        manager._stream_generation += 1
+
+        # Laufender Ausfall wird schon vor der Erholung gemeldet
+        assert _wait_for(lambda: manager.supervisor_stats['stall_count'] >= 1)
+        time.sleep(0.3)
+        stats = manager.get_supervisor_stats()
+        assert stats['current_outage'] > 0.5
+        assert stats['total_downtime'] >= stats['current_outage']
+
+        # Echter Neustart: Frames kommen wieder, keine neue Startphase
+        manager._restart_worker = restart_worker
+        manager._restart_worker()
+        first_restart = manager._stream_started_at
+        assert manager._grace_until == grace_until
+        assert _wait_for(lambda: manager.last_frame_time is not None and manager.last_frame_time > first_restart)
+        assert _wait_for(lambda: manager.get_supervisor_stats()['current_outage'] == 0)
+        assert manager.supervisor_stats['total_downtime'] > 0.5
+    finally:
+        manager.stop_stream()
+
+if __name__ == '__main__':
+    test_stall_restart_and_downtime()
+    print("✅ Kamera-Supervisor-Tests bestanden")
@@ -0,0 +1,99 @@
+# tests/test_coordinates.py
+"""
+Teste die inverse Kinematik: Vorwärtskinematik trifft den Zielpunkt, Tabelle und
+analytischer Solver stimmen überein, Gelenkgrenzen werden eingehalten, Solve-Zeit
+und die Unkraut-Entfernungssequenz des Arms
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+# Python-Pfad anpassen
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from hardware.coordinates import ArmKinematics
+from hardware.robot_arm import RobotArmController
+
+def test_solution_reaches_target():
+    """Vorwärtskinematik der Lösung landet auf dem Bodenpunkt, Werkzeug senkrecht"""
+    kinematics = ArmKinematics()
+    for x, y in [(20, 0), (25, 10), (15, -12), (30, 5), (12, 0)]:
+        for height in (0.0, 5.0):
+            angles = kinematics.solve(x, y, height)
+            assert angles is not None, (x, y, height)
+            tx, ty, tz = kinematics.forward(angles)
+            assert abs(tx - x) < 0.05 and abs(ty - y) < 0.05 and abs(tz - height) < 0.05, (x, y, tx, ty, tz)
+
+def test_table_matches_analytic():
+    """Interpolierte Tabelle weicht höchstens 0,1° vom analytischen Solver ab"""
+    kinematics = ArmKinematics()
+    for r in np.linspace(12, 30, 37):
+        table = kinematics._lookup(r, 2.5)
+        analytic = kinematics._solve_analytic(r, 2.5)
+        assert table is not None and analytic is not None
+        assert max(abs(a - b) for a, b in zip(table, analytic)) < 0.1
+
+def test_unreachable_and_joint_limits():
+    """Punkte außerhalb der Reichweite oder der Gelenkgrenzen liefern None"""
+    kinematics = ArmKinematics()
+    assert kinematics.solve(0, 0) is None
+    assert kinematics.solve(80, 0) is None
+
+    # Fuß darf nur nach links drehen -> Punkte rechts sind unerreichbar
+    limited = ArmKinematics({'base': (90, 180)})
+    assert limited.solve(20, -10) is None
+    assert limited.solve(20, 10)['base'] > 90
+
+    # Engere Ellbogengrenze -> alle Lösungen innerhalb
+    limited = ArmKinematics({'elbow': (60, 110)})
+    for r in np.linspace(5, 40, 71):
+        angles = limited.solve(r, 0)
+        if angles is not None:
+            assert 60 - 0.01 <= angles['elbow'] <= 110 + 0.01
+
+def test_solve_many_matches_solve():
+    """Vektorisierte Variante für Detektions-Arrays liefert dieselben Winkel"""
+    kinematics = ArmKinematics()
+    points = [(20, 0), (25, 10), (80, 0), (15, -12)]
+    result = kinematics.solve_many(points)
+    assert np.isnan(result[2]).all()
+    for row, (x, y) in zip(result, points):
+        angles = kinematics.solve(x, y)
+        if angles is not None:
+            assert np.allclose(row, [angles[j] for j in ('base', 'shoulder', 'elbow', 'wrist')], atol=0.01)
+
+def test_solve_is_fast():
+    """Ein Solve dauert Mikrosekunden - Nachführen bei jedem Kamerabild möglich"""
+    kinematics = ArmKinematics()
+    count = 2000
+    started = time.perf_counter()
+    for i in range(count):
+        kinematics.solve(15 + i % 15, -5 + i % 10)
+    per_solve = (time.perf_counter() - started) / count
+    assert per_solve < 100e-6, per_solve
+
+def test_weed_removal_sequence():
+    """Die Sequenz fährt zum Punkt, senkt ab, schaltet das Werkzeug und kehrt zurück"""
+    arm = RobotArmController()
+    try:
+        assert arm.weed_removal_sequence(0, 0) is False
+        assert arm.weed_removal_sequence(22, 6) is True
+        position = arm.get_current_position()
+        for joint, angle in arm.presets['weed_detect'].items():
+            assert abs(position[joint] - angle) < 0.2, (joint, position[joint])
+        assert arm.kinematics.stats['table'] > 0
+    finally:
+        arm.cleanup()
+
+if __name__ == '__main__':
+    test_solution_reaches_target()
+    test_table_matches_analytic()
+    test_unreachable_and_joint_limits()
+    test_solve_many_matches_solve()
+    test_solve_is_fast()
+    test_weed_removal_sequence()
+    print("✅ Koordinaten-Tests bestanden")
@@ -0,0 +1,75 @@
+# tests/test_import_time.py
+"""
+Import-Zeit-Budget für den Server-Start
+Misst mit 'python -X importtime', wie lange 'import app.main' dauert, und
+prüft, dass beim Import keine Hardware-Instanz erzeugt wird
+"""
+import os
+import sys
+import json
+import subprocess
+
+# Python-Pfad anpassen
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+
+# Budget für 'import app.main' (Mikrosekunden) - run.py soll nach < 1s bedienen
+IMPORT_BUDGET_US = 1000000
+
+def _run_python(args):
+    """Python-Subprozess im Projektverzeichnis, ohne Hardware-Warm-up"""
+    env = dict(os.environ, UNKRAUT_HARDWARE_WARMUP='0')
+    return subprocess.run([sys.executable] + args, cwd=project_root, env=env,
+                          capture_output=True, text=True, timeout=60)
+
+def _parse_importtime(stderr):
+    """'import time: self | cumulative | modul' Zeilen -> {modul: (self, kumulativ)}"""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        try:
+            self_us, cumulative_us, module = line[len('import time:'):].split('|')
+            timings[module.strip()] = (int(self_us), int(cumulative_us))
+        except ValueError:
+            continue
+    return timings
+
+def test_app_import_budget():
+    """'import app.main' muss innerhalb des Budgets bleiben"""
+    result = _run_python(['-X', 'importtime', '-c', 'import app.main'])
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    timings = _parse_importtime(result.stderr)
+    assert 'app.main' in timings
+
+    # Langsamste Module anzeigen
+    print("⏱️  Langsamste Imports (kumulativ):")
+    for module, (_, cumulative) in sorted(timings.items(), key=lambda item: -item[1][1])[:10]:
+        print(f"   {cumulative / 1000:8.1f} ms  {module}")
+
+    total = timings['app.main'][1]
+    print(f"📦 app.main: {total / 1000:.1f} ms (Budget {IMPORT_BUDGET_US / 1000:.0f} ms)")
+    assert total < IMPORT_BUDGET_US
+
+def test_hardware_import_is_lazy():
+    """Import der Hardware-Module darf keine Hardware initialisieren"""
+    code = (
+        "import json, sys\n"
+        "import hardware, hardware.camera, hardware.robot_arm, hardware.motors\n"
+        "import hardware.sensors, hardware.servo_controller\n"
+        "from hardware.registry import hardware_registry\n"
+        "created = [n for n, s in hardware_registry.get_status().items() if s['created']]\n"
+        "print(json.dumps({'created': created, 'adafruit': 'adafruit_pca9685' in sys.modules}))\n"
+    )
+    result = _run_python(['-c', code])
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    status = json.loads(result.stdout.strip().splitlines()[-1])
+    assert status['created'] == []
+    assert status['adafruit'] is False
+
+if __name__ == '__main__':
+    test_app_import_budget()
+    test_hardware_import_is_lazy()
+    print("✅ Import-Zeit-Test bestanden")
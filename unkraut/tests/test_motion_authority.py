@@ -0,0 +1,141 @@
+# tests/test_motion_authority.py
+"""
+Teste die zentrale Bewegungsfreigabe: Notaus hält Arm, Servos und Motoren innerhalb
+eines Regeltakts an (Worst-Case über viele Durchläufe gemessen), verwirft laufende
+Sequenzen und Jobs und bleibt bis zum ausdrücklichen Reset verriegelt
+"""
+import os
+import sys
+import time
+import threading
+
+# Python-Pfad anpassen
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from hardware.motion_authority import MotionAuthority
+from hardware.robot_arm import RobotArmController
+from hardware.motors import MotorController
+from hardware.servo_controller import ServoController
+from hardware.coordinates import arm_to_world
+
+ARM_TICK_S = 0.02       # 50 Hz Trajektorien-Takt
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.005)
+    return False
+
+def _transfers(arm):
+    return arm.pca.get_status()['stats']['transactions']
+
+def test_worst_case_stop_latency():
+    """Über 20 Notaus-Auslösungen mitten in der Fahrt: alles steht innerhalb eines Arm-Takts"""
+    authority = MotionAuthority()
+    arm = RobotArmController(authority=authority)
+    motors = MotorController(authority=authority)
+    latencies = []
+    try:
+        for trial in range(20):
+            handle = arm.move_joint('base', 0 if trial % 2 else 180, 2.0)
+            motors.move('forward', 60, 1.0)
+            assert _wait_for(lambda: handle.status == 'running' and motors.is_moving)
+            time.sleep(0.005 * (trial % 4))      # Auslösen an verschiedenen Stellen im Takt
+
+            started = time.monotonic()
+            authority.emergency_stop('test')
+            latencies.append(time.monotonic() - started)
+
+            # Nach der Rückkehr ist alles verworfen und es wird nichts mehr geschrieben
+            assert handle.status == 'cancelled'
+            assert motors.is_moving is False
+            assert all(v == 0 for v in motors.velocity.values())
+            transfers = _transfers(arm)
+            time.sleep(2 * ARM_TICK_S)
+            assert _transfers(arm) == transfers
+            assert arm.executor.is_busy() is False
+            authority.reset()
+    finally:
+        arm.cleanup()
+        motors.stop()
+
+    worst = max(latencies)
+    assert worst < ARM_TICK_S, f"Worst-Case Stopp {worst * 1000:.1f}ms"
+    assert authority.get_status()['stop_latency_ms']['max'] < ARM_TICK_S * 1000
+
+def test_servo_interpolation_is_cut_short():
+    """set_multiple_servos bricht beim nächsten Schritt ab und schreibt danach nichts mehr"""
+    authority = MotionAuthority()
+    servos = ServoController(authority=authority)
+    servos.add_servo('test_servo', 7, default_angle=0)
+    result = {}
+    mover = threading.Thread(target=lambda: result.update(ok=servos.set_multiple_servos({'test_servo': 180}, 1.0)))
+    mover.start()
+    time.sleep(0.2)
+    authority.emergency_stop('test')
+    angle = servos.get_servo_angle('test_servo')
+    mover.join(timeout=1.0)
+
+    assert result['ok'] is False
+    assert 0 < angle < 180
+    assert servos.get_servo_angle('test_servo') == angle
+    assert servos.set_servo_angle('test_servo', 90) is False
+
+def test_sequence_and_jobs_are_discarded():
+    """Eine laufende Unkraut-Sequenz endet beim Notaus, wartende Jobs sind weg, nichts fährt nach dem Reset weiter"""
+    authority = MotionAuthority()
+    arm = RobotArmController(authority=authority)
+    try:
+        pose = {'x': 0.0, 'y': 0.0, 'heading': 0.0}
+        for job_id, point in enumerate([(20, 8), (24, -6), (18, 0)], 1):
+            arm.jobs.submit(job_id, *arm_to_world(pose, *point))
+
+        result = {}
+        sequence = threading.Thread(target=lambda: result.update(ok=arm.weed_removal_sequence(20, 8)))
+        sequence.start()
+        assert _wait_for(arm.executor.is_busy)
+        arm.emergency_stop()
+        sequence.join(timeout=2.0)
+
+        assert result['ok'] is False
+        assert arm.jobs.get_status()['pending'] == 0
+        assert arm.move_to_preset('home', 0.5) is False
+
+        arm.reset_emergency()
+        time.sleep(0.1)
+        assert arm.executor.is_busy() is False
+        assert arm.move_to_preset('home', 0.3, wait=True) is True
+    finally:
+        arm.cleanup()
+
+def test_no_automatic_reset():
+    """Der Notaus bleibt über die früheren Auto-Reset-Zeiten (2 s Motoren, 3 s Arm) hinaus aktiv"""
+    authority = MotionAuthority()
+    arm = RobotArmController(authority=authority)
+    motors = MotorController(authority=authority)
+    try:
+        motors.emergency_stop()
+        time.sleep(3.2)
+        assert arm.emergency_stopped and motors.emergency_stopped
+        assert 'error' in motors.move('forward', 50, 0.1)
+        assert arm.move_joint('base', 45) is False
+
+        status = authority.get_status()
+        assert status['reason'] == 'motor_controller'
+        assert sorted(status['actuators']) == ['motor_controller', 'robot_arm']
+        assert authority.reset() == {'status': 'emergency_reset'}
+        assert arm.emergency_stopped is False
+    finally:
+        arm.cleanup()
+        motors.stop()
+
+if __name__ == '__main__':
+    test_worst_case_stop_latency()
+    test_servo_interpolation_is_cut_short()
+    test_sequence_and_jobs_are_discarded()
+    test_no_automatic_reset()
+    print("✅ Notaus-Tests bestanden")
@@ -0,0 +1,186 @@
+# tests/test_motor_control.py
+"""
+Teste die Motor-Regelschleife: Deadman-Watchdog, Coalescing, Rampen, Kalibrierung, Jitter
+"""
+import os
+import sys
+import time
+import threading
+
+# Python-Pfad anpassen
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from hardware.motors import MotorController
+from hardware.motion_authority import MotionAuthority
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.005)
+    return False
+
+def test_watchdog_stops_without_commands():
+    """Bleiben Befehle aus, stoppt der Watchdog nach der Deadline"""
+    motors = MotorController()
+    motors.deadman_timeout = 0.2
+    motors.move('forward', 60, 0.1)
+    assert _wait_for(lambda: motors.is_moving)
+
+    started = time.monotonic()
+    assert _wait_for(lambda: not motors.is_moving)
+    elapsed = time.monotonic() - started
+    assert 0.1 < elapsed < 0.5
+    assert motors.control_stats['watchdog_stops'] == 1
+
+def test_commands_refresh_deadline_with_one_thread():
+    """Befehle alle 100ms halten die Fahrt, ohne pro Befehl einen Thread zu starten"""
+    motors = MotorController()
+    threads_before = threading.active_count()
+
+    for _ in range(10):
+        motors.move('left', 40, 0.1)
+        time.sleep(0.1)
+        assert motors.is_moving
+
+    assert threading.active_count() <= threads_before + 1
+    assert motors.control_stats['watchdog_stops'] == 0
+    # Gleicher Befehl wird nur einmal auf die Motoren geschrieben
+    assert motors.control_stats['applied'] == 1
+    motors.stop()
+    assert motors.is_moving is False
+
+def test_burst_is_coalesced():
+    """Ein Befehlsschwall wird zum neuesten Befehl zusammengefasst"""
+    motors = MotorController()
+    for speed in range(0, 100, 2):
+        motors.move('forward', speed, 1.0)
+    assert _wait_for(lambda: motors.current_speed == 98)
+    stats = motors.control_stats
+    assert stats['commands'] == 50
+    assert stats['applied'] < 50
+    motors.stop()
+
+def test_emergency_stop_blocks_commands():
+    """Nach dem Notaus werden Fahrbefehle abgelehnt - bis zum ausdrücklichen Reset"""
+    motors = MotorController(authority=MotionAuthority())
+    motors.move('forward', 50, 1.0)
+    assert _wait_for(lambda: motors.is_moving)
+    motors.emergency_stop()
+    assert motors.is_moving is False
+    assert 'error' in motors.move('forward', 50, 1.0)
+
+    assert motors.reset_emergency() == {'status': 'emergency_reset'}
+    assert motors.move('forward', 50, 0.1)['status'] == 'success'
+    motors.stop()
+
+class _StopBeforeOutput:
+    """Ersetzt _io_lock: beim ersten Betreten läuft stop() in einem anderen Thread durch"""
+
+    def __init__(self, motors):
+        self.motors = motors
+        self.lock = motors._io_lock
+        self.fired = False
+
+    def __enter__(self):
+        if not self.fired:
+            self.fired = True
+            stopper = threading.Thread(target=self.motors.stop)
+            stopper.start()
+            stopper.join()
+        self.lock.acquire()
+
+    def __exit__(self, *exc):
+        self.lock.release()
+
+def test_stop_during_tick_discards_command():
+    """stop() zwischen Übernahme und Ausgabe eines Ziels - das Ziel fährt nicht ohne Watchdog weiter"""
+    motors = MotorController(authority=MotionAuthority())
+    now = time.monotonic()
+    motors._pending = ('forward', 60, 60, 0, now)
+    motors._deadline = now + 0.3
+    motors._io_lock = _StopBeforeOutput(motors)
+
+    motors._tick(0.01, now)
+    assert motors._io_lock.fired
+    assert motors.target == {'left_motor': 0.0, 'right_motor': 0.0}
+    assert all(v == 0 for v in motors.velocity.values())
+    assert motors.is_moving is False
+    assert motors._is_idle()
+
+def _run_ticks(motors, linear, angular, ticks, dt=0.01):
+    """Regelschritte ohne Thread ausführen - Geschwindigkeit je Tick zurückgeben"""
+    motors._pending = ('drive', 0, linear, angular, time.monotonic())
+    history = []
+    for _ in range(ticks):
+        motors._tick(dt, time.monotonic())
+        history.append(dict(motors.velocity))
+    return history
+
+def test_ramp_respects_accel_and_jerk():
+    """Rampe hält Beschleunigungs- und Ruck-Grenze ein und schwingt nicht über"""
+    motors = MotorController()
+    dt = 0.01
+    history = _run_ticks(motors, 80, 0, 150, dt)
+
+    left = [0.0] + [v['left_motor'] for v in history]
+    assert max(left) <= 80
+    assert left[-1] == 80
+
+    # Bis zum Einrasten: Beschleunigung und Ruck innerhalb der Grenzen
+    settled = left.index(80)
+    accels = [(b - a) / dt for a, b in zip(left[:settled], left[1:settled])]
+    assert max(accels) <= motors.max_accel + 1e-6
+    assert max(abs(b - a) for a, b in zip(accels, accels[1:])) <= motors.max_jerk * dt + 1e-6
+    # Der Einrast-Schritt selbst bleibt unter 1% Tastverhältnis
+    assert 80 - left[settled - 1] < 1.0
+    # Bei 300 %/s braucht die Rampe mindestens 80/300 s
+    assert left[int(0.25 / dt)] < 80
+
+def test_differential_drive_and_calibration():
+    """Kurvenfahrt mischt linear/angular, Kalibrierfaktoren wirken auf die PWM"""
+    motors = MotorController()
+    assert motors._mix(50, 20) == (30, 70)
+    assert motors._mix(100, 100) == (0, 100)
+    assert motors._mix(-100, 50) == (-150 / 1.5, -50 / 1.5)
+
+    motors.set_motor_calibration(left_factor=0.9, right_factor=1.0)
+    _run_ticks(motors, 50, 0, 100)
+    assert motors._outputs['left_motor'] == ('forward', 45.0)
+    assert motors._outputs['right_motor'] == ('forward', 50.0)
+
+def test_only_changed_outputs_written():
+    """Bei konstanter Geschwindigkeit werden keine GPIO-Werte neu geschrieben"""
+    motors = MotorController()
+    _run_ticks(motors, -40, 0, 100)
+    assert motors._outputs['left_motor'] == ('backward', 40.0)
+    writes = motors.control_stats['gpio_writes']
+    for _ in range(50):
+        motors._tick(0.01, time.monotonic())
+    assert motors.control_stats['gpio_writes'] == writes
+
+def test_loop_jitter_stats():
+    """Regel-Thread läuft mit fester Rate und meldet seinen Jitter"""
+    motors = MotorController()
+    motors.drive(30, 10, 1.0)
+    time.sleep(0.5)
+    stats = motors.get_loop_stats()
+    motors.stop()
+    assert stats['samples'] > 30
+    assert 8.0 < stats['mean_period_ms'] < 13.0
+    assert stats['jitter_max_ms'] >= stats['jitter_p99_ms'] >= 0
+
+if __name__ == '__main__':
+    test_watchdog_stops_without_commands()
+    test_commands_refresh_deadline_with_one_thread()
+    test_burst_is_coalesced()
+    test_emergency_stop_blocks_commands()
+    test_stop_during_tick_discards_command()
+    test_ramp_respects_accel_and_jerk()
+    test_differential_drive_and_calibration()
+    test_only_changed_outputs_written()
+    test_loop_jitter_stats()
+    print("✅ Motor-Steuerungs-Tests bestanden")
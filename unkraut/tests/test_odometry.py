@@ -0,0 +1,106 @@
+# tests/test_odometry.py
+"""
+Teste die Rad-Odometrie: Integration, Motormodell, GPS-Fusion, Pose-Historie
+"""
+import os
+import sys
+import math
+import time
+
+# Python-Pfad anpassen
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from hardware.odometry import OdometryEstimator, WHEEL_BASE_M, MODEL_MAX_SPEED_MPS
+from hardware import gpio_config
+
+def _estimator():
+    """Schätzer ohne laufende Schleife - Schritte kommen aus dem Test"""
+    odometry = OdometryEstimator()
+    odometry.running = False
+    odometry.thread.join(timeout=1)
+    odometry.reset()
+    return odometry
+
+def test_straight_and_turn():
+    """Geradeaus 1 m, dann 90° auf der Stelle drehen, dann 1 m weiter"""
+    odometry = _estimator()
+    for _ in range(100):
+        odometry.integrate(0.01, 0.01, 0.02)
+    quarter = math.pi / 2 * WHEEL_BASE_M / 2
+    for _ in range(10):
+        odometry.integrate(-quarter / 10, quarter / 10, 0.02)
+    for _ in range(100):
+        odometry.integrate(0.01, 0.01, 0.02)
+
+    pose = odometry.get_pose()
+    assert abs(pose['x'] - 1.0) < 1e-3
+    assert abs(pose['y'] - 1.0) < 1e-3
+    assert abs(pose['heading_deg'] - 90) < 0.01
+    assert abs(pose['distance'] - 2.0) < 1e-3
+
+def test_motor_model_follows_pwm():
+    """Ohne Encoder folgt die Radgeschwindigkeit der PWM mit Verzögerung"""
+    odometry = _estimator()
+    odometry._commanded_duty = lambda: {'left_motor': 50.0, 'right_motor': 50.0}
+    for _ in range(100):  # 2 Sekunden
+        left, right = odometry._wheel_distances(0.02)
+        odometry.integrate(left, right, 0.02)
+
+    pose = odometry.get_pose()
+    expected = 0.5 * MODEL_MAX_SPEED_MPS * 2.0
+    assert 0.8 * expected < pose['x'] < expected
+    assert abs(pose['velocity'] - 0.5 * MODEL_MAX_SPEED_MPS) < 0.01
+    assert abs(pose['y']) < 1e-9
+
+def test_gps_fusion_pulls_position():
+    """GPS-Fixes ziehen die Pose sanft zur GPS-Position"""
+    odometry = _estimator()
+    odometry.update_gps(53.5511, 9.9937, accuracy=1.0)
+    assert odometry.to_geo(0, 0) == (53.5511, 9.9937)
+
+    # 10 m nördlich = +y im lokalen Rahmen (Start nach Osten ausgerichtet)
+    north = 53.5511 + math.degrees(10 / 6371000.0)
+    for _ in range(30):
+        odometry.update_gps(north, 9.9937, accuracy=1.0)
+    pose = odometry.get_pose()
+    assert 9.0 < pose['y'] < 10.0
+    assert abs(pose['x']) < 0.01
+
+    # Ungenauere Fixes korrigieren weniger
+    coarse = _estimator()
+    coarse.update_gps(53.5511, 9.9937, accuracy=1.0)
+    coarse.update_gps(north, 9.9937, accuracy=10.0)
+    assert coarse.get_pose()['y'] < odometry.gps_gain * 10 / 5
+
+def test_pose_at_interpolates():
+    """Pose zu einem Zeitpunkt zwischen zwei Takten wird interpoliert"""
+    odometry = _estimator()
+    t0 = time.time()
+    odometry.integrate(0.0, 0.0, 0.02, timestamp=t0)
+    odometry.integrate(1.0, 1.0, 0.02, timestamp=t0 + 1.0)
+
+    pose = odometry.pose_at(t0 + 0.25)
+    assert abs(pose['x'] - 0.25) < 1e-6
+    assert len(odometry.get_history(since=t0 - 1)) == 3
+    assert len(odometry.get_history(since=t0)) == 1
+
+def test_encoder_pins_are_free():
+    """Encoder-Eingänge teilen sich keinen Pin mit Motoren, Sensoren oder LEDs"""
+    pins = [value for name, value in vars(gpio_config).items()
+            if name.isupper() and isinstance(value, int) and not name.startswith(('ENCODER_', 'CAMERA_'))]
+    pins += [pin for sensor in gpio_config.ULTRASONIC_SENSORS.values() for pin in sensor.values()
+             if pin not in (gpio_config.ULTRASONIC_TRIGGER, gpio_config.ULTRASONIC_ECHO)]
+    encoder = [pin for channels in gpio_config.ENCODER_PINS.values() for pin in channels.values()]
+    assert len(set(pins)) == len(pins)
+    assert len(set(encoder)) == len(encoder)
+    assert not set(encoder) & set(pins)
+
+if __name__ == '__main__':
+    test_straight_and_turn()
+    test_motor_model_follows_pwm()
+    test_gps_fusion_pulls_position()
+    test_pose_at_interpolates()
+    test_encoder_pins_are_free()
+    print("✅ Odometrie-Tests bestanden")
@@ -0,0 +1,95 @@
+# tests/test_pca9685.py
+"""
+Teste die PCA9685-Schattenregister: nur geänderte Kanäle, ein Auto-Increment-Transfer
+pro Takt, Registerinhalt am Mock-Bus und die Transferzahl bei Arm-Bewegungen
+"""
+import os
+import sys
+
+# Python-Pfad anpassen
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from hardware.pca9685 import PCA9685Output, MockI2CBus, FULL_ON, duty_to_counts
+from hardware.servo_controller import ServoController
+from hardware.robot_arm import RobotArmController
+
+def _output():
+    bus = MockI2CBus()
+    output = PCA9685Output(bus)
+    bus.stats.update(transactions=0, bytes=0)
+    return output, bus
+
+def test_changed_channels_in_one_block_write():
+    """Drei geänderte Kanäle -> ein Transfer mit Registeradresse + 4 Bytes pro Kanal"""
+    output, bus = _output()
+    output.set_all(0)
+    output.flush()
+    bus.stats.update(transactions=0, bytes=0)
+
+    output.set_duty(1, 0x1800)
+    output.set_duty(2, 0x1400)
+    output.set_duty(3, 0x1c00)
+    assert output.flush() == 3
+    assert bus.stats == {'transactions': 1, 'bytes': 1 + 3 * 4}
+
+    # Unverändert -> kein Transfer
+    output.set_duty(2, 0x1400)
+    assert output.flush() == 0
+    assert bus.stats['transactions'] == 1
+
+    assert bus.read_channel(0x40, 1) == duty_to_counts(0x1800)
+    assert bus.read_channel(0x40, 3) == (0, (0x1c00 + 1) >> 4)
+
+def test_full_on_and_off_encoding():
+    """0xFFFF setzt das FULL_ON-Bit, 0 schaltet aus - wie adafruit_pca9685"""
+    assert duty_to_counts(0xFFFF) == (FULL_ON, 0)
+    assert duty_to_counts(0) == (0, 0)
+    assert duty_to_counts(0x8000) == (0, 0x800)
+
+def test_channel_proxy_is_compatible():
+    """pca.channels[n].duty_cycle funktioniert weiter und schreibt sofort"""
+    output, bus = _output()
+    output.channels[5].duty_cycle = 0x2000
+    assert output.channels[5].duty_cycle == 0x2000
+    assert bus.read_channel(0x40, 5) == duty_to_counts(0x2000)
+
+def test_servo_controller_interpolation_one_transaction_per_step():
+    """set_multiple_servos: ein Transfer pro Interpolationsschritt statt einem pro Servo"""
+    controller = ServoController()
+    for channel, name in enumerate(['base', 'shoulder', 'elbow', 'wrist', 'gripper', 'tool']):
+        controller.add_servo(name, channel, default_angle=90)
+
+    bus = controller.pca.bus
+    bus.stats.update(transactions=0, bytes=0)
+    controller.set_multiple_servos({name: 45 for name in controller.servos}, duration=0.5)
+
+    steps = max(10, int(0.5 * 20)) + 1
+    assert bus.stats['transactions'] <= steps
+    # Einzelschreibzugriffe bräuchten 6 Transfers à 5 Bytes pro Schritt
+    assert bus.stats['bytes'] < steps * 6 * 5
+    assert controller.get_servo_angle('elbow') == 45
+
+def test_arm_trajectory_tick_costs_one_transaction():
+    """Jeder Trajektorien-Takt des Arms ist genau ein I2C-Transfer"""
+    arm = RobotArmController()
+    try:
+        bus = arm.pca.bus
+        ticks_before = arm.executor.stats['ticks']
+        bus.stats.update(transactions=0, bytes=0)
+
+        assert arm.move_to_preset('weed_remove', 0.3, wait=True)
+        ticks = arm.executor.stats['ticks'] - ticks_before
+        assert 0 < bus.stats['transactions'] <= ticks
+        assert bus.read_channel(0x40, 5) == duty_to_counts(arm._angle_to_duty_cycle('tool', 180))
+    finally:
+        arm.cleanup()
+
+if __name__ == '__main__':
+    test_changed_channels_in_one_block_write()
+    test_full_on_and_off_encoding()
+    test_channel_proxy_is_compatible()
+    test_servo_controller_interpolation_one_transaction_per_step()
+    test_arm_trajectory_tick_costs_one_transaction()
+    print("✅ PCA9685-Tests bestanden")
@@ -0,0 +1,209 @@
+# tests/test_pipeline.py
+"""
+Teste die Erkennungs-Pipeline mit Fake-Detektor, -Odometrie und -Arm (mit echter
+Job-Warteschlange): Zeitstempel und Latenz-Perzentile, Bewegungskompensation,
+veraltete Ziele und begrenzte Queues
+"""
+import os
+import sys
+import time
+import queue
+import tempfile
+
+import numpy as np
+
+# Python-Pfad anpassen
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from ai.pipeline import WeedPipeline
+from hardware.arm_jobs import WeedJobScheduler
+from hardware.camera_calibration import CameraCalibration
+from hardware.coordinates import ArmKinematics, arm_to_world, world_to_arm
+
+FRAME = np.zeros((480, 640, 3), np.uint8)
+
+class FakeCamera:
+    """Keine echten Frames - die Tests reichen Bilder über submit_frame() ein"""
+
+    def add_frame_listener(self, callback):
+        pass
+
+    def remove_frame_listener(self, callback):
+        pass
+
+class FakeDetector:
+    def __init__(self, centers, method='opencv_selective'):
+        self.centers = centers
+        self.method = method
+
+    def detect_in_image(self, image):
+        detections = [{'center': {'x': x, 'y': y}, 'confidence': 0.8} for x, y in self.centers]
+        return {'detections': detections, 'method': self.method}
+
+class FakeOdometry:
+    def __init__(self, captured_x=0.0, current_x=0.0):
+        self.captured_x = captured_x
+        self.current_x = current_x
+
+    def pose_at(self, timestamp):
+        return {'x': self.captured_x, 'y': 0.0, 'heading': 0.0}
+
+    def get_pose(self):
+        return {'x': self.current_x, 'y': 0.0, 'heading': 0.0}
+
+class FakeArm:
+    approach_height = 5.0
+    emergency_stopped = False
+
+    def __init__(self, duration=0.02):
+        self.kinematics = ArmKinematics()
+        self.duration = duration
+        self.calls = []
+        self.position = {'base': 90, 'shoulder': 75, 'elbow': 105, 'wrist': 90}
+        self.jobs = WeedJobScheduler(self)
+
+    def get_current_position(self):
+        return dict(self.position)
+
+    def move_to_preset(self, preset_name, duration=2.0):
+        return True
+
+    def solve_xy(self, x, y, height=0.0):
+        return self.kinematics.solve(x, y, height)
+
+    def weed_removal_sequence(self, x, y, on_step=None, return_to_detect=True):
+        self.calls.append((x, y))
+        time.sleep(self.duration)
+        on_step('tool_on')
+        self.position.update(self.solve_xy(x, y, self.approach_height))
+        return True
+
+def _calibration(ground=True):
+    calibration = CameraCalibration(os.path.join(tempfile.mkdtemp(), 'camera_calibration.json'))
+    if ground:
+        # Bildmitte (320, 240) -> 22 cm vor dem Arm, 20 Pixel pro cm
+        pixels = np.array([(u, v) for u in (0, 320, 640) for v in (0, 240, 480)], dtype=float)
+        ground_points = np.column_stack([22 + (240 - pixels[:, 1]) / 20.0, (320 - pixels[:, 0]) / 20.0])
+        calibration._fit_ground(pixels, ground_points, (640, 480))
+    return calibration
+
+def _pipeline(centers=((320, 240),), arm=None, odometry=None, ground=True, method='opencv_selective', **kwargs):
+    return WeedPipeline(camera=FakeCamera(), detector=FakeDetector(list(centers), method),
+                        calibration=_calibration(ground), odometry=odometry or FakeOdometry(),
+                        arm=arm or FakeArm(), **kwargs)
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_frame_to_actuation_latency():
+    """Zwei Bilder bestätigen das Unkraut, der Arm fährt es einmal an - alle Stufen haben Zeitstempel"""
+    arm = FakeArm()
+    pipeline = _pipeline(arm=arm)
+    pipeline.start()
+    try:
+        for _ in range(4):
+            pipeline.submit_frame(FRAME)
+            time.sleep(0.03)
+        assert _wait_for(lambda: pipeline.counters['removed'] == 1)
+        time.sleep(0.1)
+    finally:
+        pipeline.stop()
+
+    # Bestätigtes Unkraut wird nur einmal angefahren
+    assert len(arm.calls) == 1
+    x, y = arm.calls[0]
+    assert abs(x - 22) < 0.1 and abs(y) < 0.1
+
+    latency = pipeline.get_latency_stats()
+    assert latency['detect']['count'] == 4
+    assert latency['end_to_end']['count'] == 1
+    assert latency['end_to_end']['p50_ms'] >= latency['actuation']['p50_ms'] >= 20
+    status = pipeline.get_status()
+    assert status['tracking']['states'] == {'removed': 1}
+    assert status['jobs']['stats']['removed'] == 1
+
+def test_vehicle_motion_is_compensated():
+    """Zwischen Aufnahme und Anfahren 5 cm gefahren -> Ziel liegt 5 cm näher am Arm"""
+    arm = FakeArm()
+    pipeline = _pipeline(arm=arm, odometry=FakeOdometry(captured_x=0.0, current_x=0.05))
+    pipeline.start()
+    try:
+        pipeline.submit_frame(FRAME)
+        time.sleep(0.03)
+        pipeline.submit_frame(FRAME)
+        assert _wait_for(lambda: arm.calls)
+    finally:
+        pipeline.stop()
+    x, y = arm.calls[0]
+    assert abs(x - 17) < 0.1 and abs(y) < 0.1
+
+def test_stale_targets_are_dropped_and_retried():
+    """Nicht mehr beobachtete Ziele überschreiten beim busy Arm das Budget und kommen mit frischen Bildern wieder"""
+    arm = FakeArm(duration=0.4)
+    pipeline = _pipeline(centers=[(320, 240), (320, 100)], arm=arm, latency_budget=0.2)
+    pipeline.start()
+    try:
+        for _ in range(3):
+            pipeline.submit_frame(FRAME)
+            time.sleep(0.05)
+        # Keine Bilder, während der Arm das erste Unkraut entfernt
+        assert _wait_for(lambda: pipeline.drops['stale'] >= 1)
+        deadline = time.time() + 3.0
+        while pipeline.counters['removed'] < 2 and time.time() < deadline:
+            pipeline.submit_frame(FRAME)
+            time.sleep(0.05)
+    finally:
+        pipeline.stop()
+
+    assert pipeline.counters['removed'] == 2
+    assert pipeline.drops['stale'] >= 1
+    assert len(arm.calls) == 2
+
+def test_unusable_detections_are_dropped():
+    """Mock-Erkennungen, fehlende Bodenkalibrierung und unerreichbare Punkte lösen keine Bewegung aus"""
+    for kwargs, reason in (({'method': 'opencv_mock'}, 'mock'),
+                           ({'ground': False}, 'uncalibrated'),
+                           ({'centers': [(320, 0)]}, 'unreachable')):
+        arm = FakeArm()
+        pipeline = _pipeline(arm=arm, **kwargs)
+        pipeline.start()
+        try:
+            for _ in range(3):
+                pipeline.submit_frame(FRAME)
+                time.sleep(0.03)
+            assert _wait_for(lambda: pipeline.drops[reason] > 0), reason
+        finally:
+            pipeline.stop()
+        assert arm.calls == []
+
+def test_bounded_queue_keeps_newest():
+    """Volle Queue verwirft das älteste Element"""
+    pipeline = _pipeline()
+    stage_queue = queue.Queue(maxsize=2)
+    assert pipeline._offer(stage_queue, 'a') is None
+    assert pipeline._offer(stage_queue, 'b') is None
+    assert pipeline._offer(stage_queue, 'c') == 'a'
+    assert [stage_queue.get_nowait(), stage_queue.get_nowait()] == ['b', 'c']
+
+def test_frame_transforms_roundtrip():
+    """Arm-Rahmen -> Welt -> Arm bei gedrehtem Fahrzeug"""
+    pose = {'x': 1.5, 'y': -0.4, 'heading': 0.7}
+    wx, wy = arm_to_world(pose, 22.0, -6.0)
+    x, y = world_to_arm(pose, wx, wy)
+    assert abs(x - 22.0) < 1e-9 and abs(y + 6.0) < 1e-9
+
+if __name__ == '__main__':
+    test_frame_to_actuation_latency()
+    test_vehicle_motion_is_compensated()
+    test_stale_targets_are_dropped_and_retried()
+    test_unusable_detections_are_dropped()
+    test_bounded_queue_keeps_newest()
+    test_frame_transforms_roundtrip()
+    print("✅ Pipeline-Tests bestanden")
@@ -0,0 +1,138 @@
+# tests/test_recorder.py
+"""
+Teste MJPEG-AVI-Writer und Segment-Rotation der Video-Aufzeichnung
+"""
+import os
+import sys
+import json
+import tempfile
+import threading
+
+import cv2
+import numpy as np
+
+# Python-Pfad anpassen
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from hardware.recorder import MjpegAviWriter, VideoRecorder
+
+def _jpeg(value, width=64, height=48):
+    """Einfarbiges Test-JPEG"""
+    image = np.full((height, width, 3), value, np.uint8)
+    return cv2.imencode('.jpg', image)[1].tobytes()
+
+class FakeCamera:
+    """Minimale Kamera für den Recorder - nur Einstellungen und Listener"""
+
+    def __init__(self):
+        self.settings = {'resolution': (64, 48), 'framerate': 10}
+        self.listeners = []
+
+    def add_frame_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_frame_listener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+def _start_writer(recorder, recording_dir, storage_result=(True, None)):
+    """Recorder ohne echte Kamera im MJPEG-Modus starten"""
+    recorder.camera = FakeCamera()
+    recorder._storage_allows_recording = lambda: storage_result
+    recorder.recording_dir = recording_dir
+    recorder.mode = 'mjpeg'
+    recorder.is_recording = True
+    recorder.writer_thread = threading.Thread(target=recorder._writer_worker, daemon=True)
+    recorder.writer_thread.start()
+    recorder.camera.add_frame_listener(recorder._on_frame)
+
+def test_avi_writer_readable():
+    """AVI lässt sich mit OpenCV öffnen und hat die richtige Frame-Anzahl"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'test.avi')
+        writer = MjpegAviWriter(path, 64, 48, 10)
+        for i in range(12):
+            writer.write_frame(_jpeg(i * 20))
+        writer.close(actual_fps=10)
+
+        capture = cv2.VideoCapture(path)
+        assert capture.isOpened()
+        frames = 0
+        while capture.read()[0]:
+            frames += 1
+        capture.release()
+        assert frames == 12
+
+def test_rotation_past_max_segments():
+    """Rollierende Segmente überschreiben nie ein vorhandenes Segment"""
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder = VideoRecorder(videos_dir=tmp)
+        recorder.segment_seconds = 1
+        recorder.max_segments = 2
+        _start_writer(recorder, tmp)
+
+        # 4,5 Sekunden Material -> 5 Segmente, die 2 neuesten bleiben
+        for i in range(45):
+            recorder._on_frame(i, _jpeg(i), 1000.0 + i * 0.1)
+        recorder.stop()
+
+        with open(os.path.join(tmp, 'index.json')) as f:
+            index = json.load(f)
+        files = [segment['file'] for segment in index['segments']]
+        assert files == ['seg_00004.avi', 'seg_00005.avi']
+
+        on_disk = sorted(f for f in os.listdir(tmp) if f.endswith('.avi'))
+        assert on_disk == files
+
+        capture = cv2.VideoCapture(os.path.join(tmp, files[0]))
+        assert capture.get(cv2.CAP_PROP_FRAME_COUNT) == 10
+        capture.release()
+
+def test_low_disk_stops_recording():
+    """Voller Speicher beendet die Aufzeichnung und meldet den Listener ab"""
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder = VideoRecorder(videos_dir=tmp)
+        _start_writer(recorder, tmp, storage_result=(False, 'Speicher fast voll'))
+
+        recorder._on_frame(1, _jpeg(0), 1000.0)
+        recorder.writer_thread.join(timeout=5)
+
+        assert recorder.is_recording is False
+        assert recorder.camera.listeners == []
+        assert recorder.last_error == 'Speicher fast voll'
+
+        # Spätere Frames werden nicht mehr eingereiht
+        recorder._on_frame(2, _jpeg(0), 1000.1)
+        assert recorder.frame_queue.qsize() == 0
+
+def test_start_route_rejects_non_numeric_settings():
+    """segment_seconds/max_segments als Text, true oder NaN -> 400 statt 500, nichts gestartet"""
+    from flask import Flask
+    from app.routes import api_routes
+
+    app = Flask(__name__)
+    app.register_blueprint(api_routes.bp)
+    client = app.test_client()
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder = VideoRecorder(videos_dir=tmp)
+        api_routes._hardware_cache['recorder'] = recorder
+        try:
+            for body in ({'segment_seconds': 'abc'}, {'max_segments': True}, {'max_segments': '3'}, [1]):
+                response = client.post('/api/camera/record/start', json=body)
+                assert response.status_code == 400, body
+            response = client.post('/api/camera/record/start', data='{"segment_seconds": NaN}',
+                                   content_type='application/json')
+            assert response.status_code == 400
+            assert recorder.is_recording is False
+            assert os.listdir(tmp) == []
+        finally:
+            api_routes._hardware_cache.pop('recorder', None)
+
+if __name__ == '__main__':
+    test_avi_writer_readable()
+    test_rotation_past_max_segments()
+    test_low_disk_stops_recording()
+    test_start_route_rejects_non_numeric_settings()
+    print("✅ Recorder-Tests bestanden")
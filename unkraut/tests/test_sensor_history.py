@@ -0,0 +1,106 @@
+# tests/test_sensor_history.py
+"""
+Teste den Sensor-Verlauf: Rollups mit min/max/mittel, Abfragen über Zeiträume
+und das binäre Speichern nach data/sessions
+"""
+import os
+import sys
+import tempfile
+
+# Python-Pfad anpassen
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from hardware.sensor_history import SensorHistory, RAW_CAPACITY, RECORD_DTYPE, flatten_reading, read_session
+
+T0 = 1700000000.0
+
+def test_flatten_reading():
+    """Verschachtelte Messwerte werden zu numerischen Kanälen, Zeitstempel und Flags fallen weg"""
+    channels = flatten_reading('battery', {'voltage': 12.3, 'percentage': 80, 'charging': False, 'timestamp': 1})
+    assert channels == {'battery.voltage': 12.3, 'battery.percentage': 80.0}
+    assert flatten_reading('temperature', 21.5) == {'temperature': 21.5}
+
+def test_rollup_min_max_mean():
+    """1-s-Buckets und zusammengefasste Schritte liefern min/max/mittel"""
+    history = SensorHistory(sessions_dir=tempfile.mkdtemp())
+    # 10 Werte pro Sekunde über 20 Sekunden: Wert = Sekunde + Zehntel
+    for i in range(200):
+        history.record('temperature', i // 10 + (i % 10) / 10.0, timestamp=T0 + i / 10.0)
+
+    result = history.query('temperature', start=T0, end=T0 + 19.9, step=1)
+    assert result['resolution'] == 1
+    assert len(result['t']) == 20
+    assert result['min'][3] == 3.0 and result['max'][3] == 3.9
+    assert abs(result['mean'][3] - 3.45) < 1e-6
+
+    coarse = history.query('temperature', start=T0, end=T0 + 19.9, step=5)
+    assert coarse['step'] == 5
+    assert coarse['min'][0] == 0.0 and coarse['max'][0] == 4.9
+    assert len(coarse['t']) == 4
+
+def test_query_picks_coarse_rollup_for_long_ranges():
+    """Lange Zeiträume werden aus den 1-min-Rollups beantwortet"""
+    history = SensorHistory(sessions_dir=tempfile.mkdtemp())
+    for minute in range(120):
+        history.record('battery', {'voltage': 12.0 - minute * 0.01}, timestamp=T0 + minute * 60)
+
+    result = history.query('battery.voltage', start=T0, end=T0 + 120 * 60, step=600)
+    assert result['resolution'] == 60
+    assert result['step'] == 600
+    assert len(result['t']) <= 13
+
+def test_unknown_channel_and_invalid_range():
+    history = SensorHistory(sessions_dir=tempfile.mkdtemp())
+    history.record('temperature', 20.0, timestamp=T0)
+    try:
+        history.query('luftdruck')
+        assert False, "KeyError erwartet"
+    except KeyError:
+        pass
+    try:
+        history.query('temperature', start=T0 + 10, end=T0)
+        assert False, "ValueError erwartet"
+    except ValueError:
+        pass
+
+def test_flush_writes_compact_binary():
+    """Nur neue Rohwerte werden angehängt, 14 Bytes pro Wert"""
+    sessions_dir = tempfile.mkdtemp()
+    history = SensorHistory(sessions_dir=sessions_dir)
+    for i in range(50):
+        history.record('distances', {'front': 40.0 + i, 'back': 25.0}, timestamp=T0 + i * 0.05)
+
+    assert history.flush() == 100
+    assert history.flush() == 0
+    history.record('distances', {'front': 99.0, 'back': 25.0}, timestamp=T0 + 10)
+    assert history.flush() == 2
+
+    data_file = os.path.join(history.session_dir(), 'sensors.bin')
+    assert os.path.getsize(data_file) == 102 * RECORD_DTYPE.itemsize == 102 * 14
+
+    times, values = read_session(history.session_dir())['distances.front']
+    assert len(values) == 51
+    assert values[0] == 40.0 and values[-1] == 99.0
+    assert times[-1] == T0 + 10
+
+def test_raw_ring_is_bounded():
+    """Der Rohwert-Ring hat eine feste Größe"""
+    history = SensorHistory(sessions_dir=tempfile.mkdtemp())
+    for i in range(RAW_CAPACITY + 100):
+        history.record('temperature', float(i), timestamp=T0 + i * 0.01)
+    channel = history.channels['temperature']
+    assert len(channel.values) == RAW_CAPACITY
+    times, values = channel.unflushed()
+    assert len(values) == RAW_CAPACITY
+    assert values[0] == 100.0
+
+if __name__ == '__main__':
+    test_flatten_reading()
+    test_rollup_min_max_mean()
+    test_query_picks_coarse_rollup_for_long_ranges()
+    test_unknown_channel_and_invalid_range()
+    test_flush_writes_compact_binary()
+    test_raw_ring_is_bounded()
+    print("✅ Sensor-Verlauf-Tests bestanden")
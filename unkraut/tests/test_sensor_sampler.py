@@ -0,0 +1,77 @@
+# tests/test_sensor_sampler.py
+"""
+Teste den Sensor-Sampler: Snapshot-Lesen ohne Wartezeit, eigene Raten pro Sensor,
+langsame Sensoren bremsen die schnellen nicht aus
+"""
+import os
+import sys
+import time
+import tempfile
+
+# Python-Pfad anpassen
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from hardware.sensors import SensorManager, SENSOR_READERS
+
+def test_snapshot_read_is_instant():
+    """Lesen aus dem Snapshot wartet weder auf psutil noch auf Sensoren"""
+    manager = SensorManager(start_sampler=False, sessions_dir=tempfile.mkdtemp())
+
+    started = time.perf_counter()
+    for _ in range(100):
+        data = manager.get_sensor_data()
+        stats = manager.get_system_stats()
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.05, f"100 Snapshot-Lesezugriffe dauerten {elapsed:.3f}s"
+    assert set(SENSOR_READERS) <= set(data)
+    assert set(data['distances']) == {'front', 'left', 'right', 'back'}
+    assert 'cpu_usage' in stats and 'timestamp' in stats
+
+def test_per_sensor_rates():
+    """Jeder Sensor wird in seiner eigenen Rate gelesen"""
+    manager = SensorManager(rates={'distances': 50.0, 'battery': 5.0}, start_sampler=False,
+                            sessions_dir=tempfile.mkdtemp())
+    manager.start_sampler()
+    try:
+        time.sleep(1.0)
+    finally:
+        manager.stop_sampler()
+
+    status = manager.get_sampler_status()['sensors']
+    # Erste Messung kommt synchron aus dem Konstruktor
+    assert 35 <= status['distances']['count'] <= 60, status['distances']
+    assert 4 <= status['battery']['count'] <= 7, status['battery']
+    assert status['system']['count'] <= 3
+
+def test_slow_sensor_does_not_block_fast_ones():
+    """Eine 1-Wire-Wandlung von 750 ms hält den Ultraschall nicht auf"""
+    manager = SensorManager(rates={'temperature': 10.0, 'distances': 20.0}, start_sampler=False,
+                            sessions_dir=tempfile.mkdtemp())
+
+    def slow_temperature():
+        time.sleep(0.75)
+        return 21.5
+
+    manager.get_temperature = slow_temperature
+    manager.start_sampler()
+    try:
+        time.sleep(1.0)
+        started = time.perf_counter()
+        assert manager.get_sensor_data()['distances']
+        assert time.perf_counter() - started < 0.01
+    finally:
+        manager.stop_sampler()
+
+    status = manager.get_sampler_status()['sensors']
+    assert status['distances']['count'] >= 15, status['distances']
+    assert status['temperature']['count'] <= 3
+    assert manager.get_latest('temperature') == 21.5
+
+if __name__ == '__main__':
+    test_snapshot_read_is_instant()
+    test_per_sensor_rates()
+    test_slow_sensor_does_not_block_fast_ones()
+    print("✅ Sensor-Sampler-Tests bestanden")
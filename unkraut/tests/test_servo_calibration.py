@@ -0,0 +1,147 @@
+# tests/test_servo_calibration.py
+"""
+Teste die Servo-Kalibrierung: kompilierte 0.1°-Tabellen gegen die Gleitkomma-Rechnung,
+Spline ohne Überschwingen, Speichern/Laden und die geführte Kalibrierung am Arm
+"""
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Python-Pfad anpassen
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from hardware.servo_calibration import PulseTable, ServoCalibration, pulse_to_duty
+from hardware.robot_arm import RobotArmController
+from hardware.pca9685 import duty_to_counts
+
+MEASURED = [(0, 610), (45, 1040), (90, 1490), (135, 1960), (180, 2390)]
+
+def _temp_path():
+    return os.path.join(tempfile.mkdtemp(), 'servo_calibration.json')
+
+def test_lookup_matches_float_mapping():
+    """Unkalibriert wie bisher 0x1000-0x2000, jeder 0.1°-Schritt höchstens 1 Zählschritt neben der Rechnung"""
+    table = PulseTable.linear(1250, 2500)
+    assert table.duty_at(0) == 0x1000
+    assert table.duty_at(180) == 0x2000
+    assert table.duty_at(-5) == 0x1000 and table.duty_at(200) == 0x2000
+
+    table = PulseTable(MEASURED)
+    for angle in np.arange(0, 1801) / 10.0:
+        expected = pulse_to_duty(np.interp(angle, *zip(*MEASURED)))
+        assert abs(table.duty_at(angle) - expected) <= 1
+    assert isinstance(table.duty_at(33.3), int)
+
+def test_spline_is_monotone_through_points():
+    """Spline trifft die Messpunkte und steigt überall - kein Überschwingen zwischen den Punkten"""
+    table = PulseTable(MEASURED, 'spline')
+    for angle, pulse in MEASURED:
+        assert table.pulse_at(angle) == pulse
+    assert all(np.diff(table.pulse_us) >= 0)
+
+    # Verkehrt herum eingebautes Servo: Puls fällt mit dem Winkel
+    reversed_table = PulseTable([(0, 2400), (90, 1500), (180, 600)], 'spline')
+    assert all(np.diff(reversed_table.pulse_us) <= 0)
+
+    for points in ([(0, 1000), (90, 1500), (180, 1400)], [(0, 300), (180, 2000)], [(90, 1500)]):
+        try:
+            PulseTable(points)
+            assert False, f"{points} hätte abgelehnt werden müssen"
+        except ValueError:
+            pass
+
+def test_store_roundtrip():
+    """Gespeicherte Tabellen werden beim nächsten Start geladen, reset stellt linear zurück"""
+    path = _temp_path()
+    store = ServoCalibration({'base': (1250, 2500), 'wrist': (1250, 2500)}, path=path)
+    store.set_table('base', MEASURED, 'spline')
+
+    reloaded = ServoCalibration({'base': (1250, 2500), 'wrist': (1250, 2500)}, path=path)
+    assert reloaded.tables['base'].points == [list(map(float, point)) for point in MEASURED]
+    assert reloaded.get_status()['base']['calibrated'] is True
+    assert reloaded.get_status()['wrist']['calibrated'] is False
+    assert reloaded.duty('base', 90) == pulse_to_duty(1490)
+
+    reloaded.reset('base')
+    assert ServoCalibration({'base': (1250, 2500)}, path=path).duty('base', 180) == 0x2000
+
+def test_guided_calibration_on_arm():
+    """Referenzwinkel anfahren, Puls nachstellen, übernehmen - die neue Tabelle gilt sofort"""
+    arm = RobotArmController()
+    arm.calibration = ServoCalibration({joint: (servo['min_pulse'], servo['max_pulse'])
+                                        for joint, servo in arm.servos.items()}, path=_temp_path())
+    try:
+        session = arm.start_calibration('base', [0, 90, 180])
+        assert session['target'] == 0 and session['pulse_us'] == 1250
+        # Andere Bewegungen warten, bis die Kalibrierung vorbei ist
+        assert arm.move_joint('elbow', 100) is False
+
+        assert arm.set_calibration_pulse(delta_us=-50)['pulse_us'] == 1200
+        assert arm.pca.bus.read_channel(0x40, 0) == duty_to_counts(pulse_to_duty(1200))
+        assert arm.record_calibration_point()['target'] == 90
+        # Jog-Grenze: höchstens 300µs neben dem bisherigen Puls
+        assert arm.set_calibration_pulse(pulse_us=2400)['pulse_us'] == 1875 + 300
+        assert arm.set_calibration_pulse(pulse_us=1830)['pulse_us'] == 1830
+        arm.record_calibration_point()
+        arm.set_calibration_pulse(pulse_us=2460)
+        assert arm.record_calibration_point()['complete'] is True
+
+        result = arm.finish_calibration()
+        assert result['table']['points'] == [[0.0, 1200.0], [90.0, 1830.0], [180.0, 2460.0]]
+        assert arm.calibration_session is None
+        assert arm._angle_to_duty_cycle('base', 90) == pulse_to_duty(1830)
+        # Gelenk steht noch am letzten Referenzwinkel - mit der neuen Tabelle geschrieben
+        assert arm.pca.bus.read_channel(0x40, 0) == duty_to_counts(pulse_to_duty(2460))
+
+        # Der Notaus verwirft eine laufende Kalibrierung
+        arm.start_calibration('wrist', [45, 135])
+        arm.emergency_stop('test')
+        assert arm.calibration_session is None
+        arm.reset_emergency()
+        assert arm.move_joint('base', 90, 0.5, wait=True) is True
+    finally:
+        arm.reset_emergency()
+        arm.cleanup()
+
+def _channel_duty(arm, joint):
+    return arm.pca.bus.read_channel(0x40, arm.servos[joint]['channel'])
+
+def test_finish_and_abort_replace_jogged_pulse():
+    """Nach finish/abort steht am Kanal der Tabellenwert der Sollstellung, nicht der zuletzt gejoggte Puls"""
+    arm = RobotArmController()
+    arm.calibration = ServoCalibration({joint: (servo['min_pulse'], servo['max_pulse'])
+                                        for joint, servo in arm.servos.items()}, path=_temp_path())
+    try:
+        # Zwei Punkte gemessen, am dritten Referenzwinkel gejoggt und ohne Übernahme beendet
+        arm.start_calibration('base', [0, 90, 180])
+        arm.set_calibration_pulse(pulse_us=1200)
+        arm.record_calibration_point()
+        arm.set_calibration_pulse(pulse_us=1830)
+        arm.record_calibration_point()
+        arm.set_calibration_pulse(pulse_us=2300)
+        arm.finish_calibration()
+        # 180° liegt außerhalb der Messpunkte - Steigung des Randstücks: 1830 + 630
+        assert _channel_duty(arm, 'base') == duty_to_counts(pulse_to_duty(2460))
+
+        arm.start_calibration('wrist', [45, 135])
+        arm.set_calibration_pulse(delta_us=250)
+        assert _channel_duty(arm, 'wrist') == duty_to_counts(pulse_to_duty(1250 + 1250 * 45 / 180 + 250))
+        arm.abort_calibration()
+        assert _channel_duty(arm, 'wrist') == duty_to_counts(arm._angle_to_duty_cycle('wrist', 45))
+
+        for joint, angle in arm.get_commanded_position().items():
+            assert _channel_duty(arm, joint) == duty_to_counts(arm._angle_to_duty_cycle(joint, angle))
+    finally:
+        arm.cleanup()
+
+if __name__ == '__main__':
+    test_lookup_matches_float_mapping()
+    test_spline_is_monotone_through_points()
+    test_store_roundtrip()
+    test_guided_calibration_on_arm()
+    test_finish_and_abort_replace_jogged_pulse()
+    print("✅ Servo-Kalibrierungs-Tests bestanden")
@@ -0,0 +1,98 @@
+# tests/test_servo_model.py
+"""
+Teste das Servo-Modell: vorhergesagte Fahrzeit gegen Simulation, Nachlauf hinter dem
+Sollwert, Kalibrierung aus einer Sprungantwort und Warten bis zur echten Ankunft
+"""
+import os
+import sys
+import time
+import tempfile
+
+# Python-Pfad anpassen
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from hardware.servo_model import ServoModel, ArmStateEstimator, fit_step_response, rest_to_rest_time
+from hardware.robot_arm import RobotArmController
+
+def _simulate(model, dt=0.001):
+    elapsed = 0.0
+    while not model.settled():
+        model.advance(dt)
+        elapsed += dt
+    return elapsed
+
+def test_settle_time_matches_simulation():
+    """Vorhersage aus dem Stand und aus voller Fahrt stimmt auf wenige ms"""
+    for distance in (1, 10, 45, 180):
+        model = ServoModel(0, 150, 800)
+        model.command = distance
+        predicted = model.time_to_settle()
+        assert abs(predicted - rest_to_rest_time(distance, 150, 800)) < 1e-9
+        assert abs(_simulate(model) - predicted) < 0.02
+
+    # Unterwegs umkehren: erst bremsen, dann zurück
+    model = ServoModel(0, 150, 800)
+    model.command = 90
+    model.advance(0.2)
+    assert model.velocity > 0
+    model.command = 0
+    predicted = model.time_to_settle()
+    assert abs(_simulate(model) - predicted) < 0.02
+
+def test_estimate_lags_behind_command():
+    """Sprung im Sollwert: die Schätzung läuft hinterher, die Ankunft liegt nach dem Sollwert-Ende"""
+    estimator = ArmStateEstimator({'shoulder': 90.0}, path=os.path.join(tempfile.mkdtemp(), 'dynamics.json'))
+    now = time.monotonic()
+    estimator.command({'shoulder': 0.0}, now)
+    arrival = estimator.predict_arrival({'shoulder': 0.0}, now, now)
+    assert abs(arrival - now - rest_to_rest_time(90, 150, 800)) < 0.02
+    assert estimator.estimate(now + 0.1)['shoulder'] > 80
+    assert estimator.settled(arrival + 0.02)
+    assert estimator.estimate(arrival + 0.02)['shoulder'] == 0.0
+
+def test_calibration_from_step_response():
+    """Geschwindigkeit und Beschleunigung aus gemessenen Punkten, gespeichert und wieder geladen"""
+    truth = ServoModel(0, 240, 1500)
+    truth.command = 120
+    samples = [(0.0, 0.0)]
+    for step in range(1, 40):
+        truth.advance(0.02)
+        samples.append((step * 0.02, truth.position))
+    fitted = fit_step_response(samples)
+    assert abs(fitted['speed'] - 240) < 10
+    assert 1000 < fitted['accel'] < 2200
+
+    path = os.path.join(tempfile.mkdtemp(), 'servo_dynamics.json')
+    estimator = ArmStateEstimator({'wrist': 90.0}, path=path)
+    estimator.calibrate('wrist', samples)
+    reloaded = ArmStateEstimator({'wrist': 90.0}, path=path)
+    assert reloaded.dynamics['wrist'] == fitted
+    assert reloaded.get_status()['wrist']['calibrated'] is True
+
+def test_sequence_step_waits_for_arrival():
+    """wait=True kehrt zurück, wenn das Modell angekommen ist - nicht früher, ohne feste Reserve"""
+    arm = RobotArmController()
+    try:
+        handle = arm.move_joint('base', 0, 0.2)
+        predicted = handle.expected_arrival - time.monotonic()
+        # 90° Basis brauchen laut Modell länger als die angeforderten 0.2 s
+        assert predicted > 0.5
+        assert arm.move_joint('base', 0, 0.2, wait=True) is True
+
+        started = time.monotonic()
+        assert arm.move_joint('base', 90, 0.2, wait=True) is True
+        elapsed = time.monotonic() - started
+        assert arm.get_current_position()['base'] == 90
+        assert abs(elapsed - rest_to_rest_time(90, 200, 1200)) < 0.1
+        assert arm.is_moving is False
+    finally:
+        arm.cleanup()
+
+if __name__ == '__main__':
+    test_settle_time_matches_simulation()
+    test_estimate_lags_behind_command()
+    test_calibration_from_step_response()
+    test_sequence_step_waits_for_arrival()
+    print("✅ Servo-Modell-Tests bestanden")
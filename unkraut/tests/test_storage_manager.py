@@ -0,0 +1,134 @@
+# tests/test_storage_manager.py
+"""
+Teste die Aufräum-Planung des Speicher-Managers auf einem Temp-Verzeichnis
+"""
+import os
+import sys
+import time
+import tempfile
+
+# Python-Pfad anpassen
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from app.utils.storage_manager import StorageManager, MB, DAY
+
+def _make_file(directory, name, size, age_s, now):
+    """Datei mit Größe und Alter anlegen"""
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(b'\0' * size)
+    os.utime(path, (now - age_s, now - age_s))
+    return path
+
+def _deleted(operations):
+    return sorted(os.path.basename(path) for action, path, _ in operations if action == 'delete')
+
+def test_age_limit():
+    """Dateien über max_age_days werden gelöscht"""
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, 'logs'))
+        manager = StorageManager(base_dir=tmp, policies={'logs': {'max_age_days': 14}})
+        now = time.time()
+        _make_file(os.path.join(tmp, 'logs'), 'old.log', 10, 20 * DAY, now)
+        _make_file(os.path.join(tmp, 'logs'), 'new.log', 10, 1 * DAY, now)
+
+        operations = manager._plan_directory('logs', manager.policies['logs'], now, urgent=False)
+        assert _deleted(operations) == ['old.log']
+
+def test_thinning_keeps_detections_and_unanalysed():
+    """Ausgedünnt werden nur analysierte Bilder ohne Erkennung"""
+    with tempfile.TemporaryDirectory() as tmp:
+        images = os.path.join(tmp, 'data', 'images')
+        os.makedirs(images)
+        policy = {'thin_after_days': 1, 'thin_interval_s': 600}
+        manager = StorageManager(base_dir=tmp, policies={'data/images': policy})
+        now = time.time()
+
+        # Fünf Bilder im Minutenabstand, alle älter als ein Tag
+        for i in range(5):
+            _make_file(images, f'img_{i}.jpg', 10, 2 * DAY - i * 60, now)
+        manager.mark_detections({'img_0.jpg': 0, 'img_1.jpg': 0, 'img_2.jpg': 3, 'img_3.jpg': 0})
+
+        operations = manager._plan_directory('data/images', policy, now, urgent=False)
+        # img_0 bleibt als Intervall-Bild, img_2 hat Erkennungen, img_4 wurde nie analysiert
+        assert _deleted(operations) == ['img_1.jpg', 'img_3.jpg']
+
+def test_quota_deletes_empty_before_detections():
+    """Quota löscht erst leere, dann nicht analysierte, zuletzt Bilder mit Erkennung"""
+    with tempfile.TemporaryDirectory() as tmp:
+        images = os.path.join(tmp, 'data', 'images')
+        os.makedirs(images)
+        policy = {'quota_mb': 2}
+        manager = StorageManager(base_dir=tmp, policies={'data/images': policy})
+        now = time.time()
+
+        _make_file(images, 'a_detect.jpg', MB, 400, now)
+        _make_file(images, 'b_unknown.jpg', MB, 300, now)
+        _make_file(images, 'c_empty.jpg', MB, 200, now)
+        _make_file(images, 'd_empty.jpg', MB, 100, now)
+        manager.mark_detections({'a_detect.jpg': 2, 'c_empty.jpg': 0, 'd_empty.jpg': 0})
+
+        operations = manager._plan_directory('data/images', policy, now, urgent=False)
+        assert _deleted(operations) == ['c_empty.jpg', 'd_empty.jpg']
+
+def test_nested_segments_counted_and_pruned():
+    """Aufnahme-Segmente in rec_*/ und Session-Ordner zählen mit, leere Ordner verschwinden"""
+    with tempfile.TemporaryDirectory() as tmp:
+        videos = os.path.join(tmp, 'data', 'videos')
+        old_recording = os.path.join(videos, 'rec_1')
+        new_recording = os.path.join(videos, 'rec_2')
+        sessions = os.path.join(tmp, 'data', 'sessions', 'session_1')
+        for directory in (old_recording, new_recording, sessions):
+            os.makedirs(directory)
+        now = time.time()
+        _make_file(old_recording, 'seg_0000.avi', 3 * MB, 30 * DAY, now)
+        _make_file(new_recording, 'seg_0000.avi', 10, 1 * DAY, now)
+        _make_file(sessions, 'sensors.bin', 2 * MB, 1 * DAY, now)
+
+        manager = StorageManager(base_dir=tmp, policies={
+            'data/videos': {'quota_mb': 1, 'max_age_days': 14},
+            'data/sessions': {'quota_mb': 1, 'max_age_days': 90},
+            'data': {'quota_mb': 100}
+        })
+        usage = manager.get_directory_usage()
+        assert usage['data/videos']['files'] == 2
+        assert usage['data/videos']['size_mb'] == 3.0
+        # Unterordner mit eigener Regel zählen nicht doppelt im Eltern-Verzeichnis
+        assert usage['data']['files'] == 0
+
+        manager.plan()
+        assert sorted(path for _, path, _ in manager.pending) == [
+            os.path.join(sessions, 'sensors.bin'), os.path.join(old_recording, 'seg_0000.avi')]
+        while manager.pending:
+            manager.step()
+
+        assert not os.path.exists(old_recording)
+        assert not os.path.exists(sessions)
+        assert os.path.exists(os.path.join(new_recording, 'seg_0000.avi'))
+        assert os.path.isdir(os.path.join(tmp, 'data', 'sessions'))
+        assert manager.stats['removed_dirs'] == 2
+
+def test_index_saved_once_per_batch():
+    """mark_detections schreibt den Index einmal und überlebt einen Neustart"""
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = StorageManager(base_dir=tmp, policies={})
+        saves = []
+        original_save = manager._save_index
+        manager._save_index = lambda: (saves.append(1), original_save())
+
+        manager.mark_detections({f'img_{i}.jpg': i for i in range(10)})
+        assert len(saves) == 1
+
+        reloaded = StorageManager(base_dir=tmp, policies={})
+        assert reloaded.has_detection('img_3.jpg')
+        assert reloaded.is_known_empty('img_0.jpg')
+
+if __name__ == '__main__':
+    test_age_limit()
+    test_thinning_keeps_detections_and_unanalysed()
+    test_quota_deletes_empty_before_detections()
+    test_nested_segments_counted_and_pruned()
+    test_index_saved_once_per_batch()
+    print("✅ Speicher-Manager-Tests bestanden")
@@ -0,0 +1,116 @@
+# tests/test_stream_quality.py
+"""
+Teste die adaptive Stream-Qualität: Stufenwechsel nach Schreibzeit
+"""
+import os
+import sys
+
+import cv2
+import numpy as np
+
+# Python-Pfad anpassen
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from app.utils.stream_quality import ClientStream, VariantCache, StreamQualityManager, LEVEL_NAMES
+
+def _send(client, count, utilization, now):
+    """count Frames mit gegebener Auslastung (Schreibzeit / Frame-Intervall) verbuchen"""
+    for _ in range(count):
+        now += client.frame_interval
+        client.record_write(50000, utilization * client.frame_interval, now)
+    return now
+
+def test_slow_client_degrades_and_recovers():
+    """Langsamer Client fällt Stufe für Stufe, erholt sich nach stabiler Phase"""
+    client = ClientStream(1, '10.0.0.2')
+    now = _send(client, 10, 1.5, 1000.0)
+    assert client.level >= 1
+
+    now = _send(client, 40, 1.5, now)
+    assert LEVEL_NAMES[client.level] == 'minimal'
+
+    # Schnelle Verbindung: erst nach upgrade_after Sekunden wieder hoch
+    level = client.level
+    now = _send(client, 5, 0.05, now)
+    assert client.level == level
+    now = _send(client, 200, 0.05, now)
+    assert client.level < level
+
+def test_pinned_level_never_changes():
+    """?quality=low bleibt fest"""
+    client = ClientStream(1, '10.0.0.2', pinned_level=StreamQualityManager.parse_level('low'))
+    _send(client, 50, 2.0, 1000.0)
+    assert LEVEL_NAMES[client.level] == 'low'
+
+def test_variant_cache_encodes_once_per_frame():
+    """Gleiche Stufe und gleiches Frame -> eine Kodierung"""
+    image = np.random.randint(0, 255, (480, 640, 3), np.uint8)
+    jpeg = cv2.imencode('.jpg', image)[1].tobytes()
+    cache = VariantCache()
+
+    first = cache.get(1, jpeg, 2)
+    assert cache.get(1, jpeg, 2) is first
+    assert cache.encode_count == 1 and cache.hit_count == 1
+    assert cv2.imdecode(np.frombuffer(first, np.uint8), cv2.IMREAD_COLOR).shape[:2] == (240, 320)
+    assert cache.get(1, jpeg, 0) is jpeg
+
+def test_stream_limit():
+    """Über max_clients hinaus wird kein Client angemeldet"""
+    manager = StreamQualityManager()
+    manager.max_clients = 2
+    first = manager.register_client('10.0.0.2')
+    assert manager.register_client('10.0.0.3') is not None
+    assert manager.register_client('10.0.0.4') is None
+    assert manager.get_status()['rejected'] == 1
+
+    manager.unregister_client(first)
+    assert manager.register_client('10.0.0.4') is not None
+
+class _StalledCamera:
+    """Liefert ein Frame und danach nur noch dasselbe (Kamera hängt)"""
+
+    def __init__(self):
+        self.jpeg = cv2.imencode('.jpg', np.zeros((48, 64, 3), np.uint8))[1].tobytes()
+
+    def get_frame_with_id(self):
+        return 1, self.jpeg
+
+def test_stalled_camera_keeps_writing_and_times_out():
+    """Ohne neue Frames wird das letzte wiederholt (getrennte Clients fallen auf), nach idle_timeout ist der Platz frei"""
+    manager = StreamQualityManager()
+    manager.keepalive_interval = 0.05
+    manager.idle_timeout = 0.4
+    stream = manager.open_stream(_StalledCamera(), '10.0.0.2')
+    # Nie gelesen: kein Platz belegt
+    assert manager.get_status()['clients'] == []
+
+    chunks = []
+    for chunk in stream:
+        chunks.append(chunk)
+        assert len(manager.clients) == 1
+    assert len(chunks) > 3 and len(set(chunks)) == 1
+    assert manager.keepalive_count == len(chunks) - 1
+    assert manager.clients == {}
+
+def test_disconnect_during_outage_frees_slot():
+    """Client trennt während die Kamera hängt - der nächste Keepalive-Schreibversuch gibt den Platz frei"""
+    manager = StreamQualityManager()
+    manager.max_clients = 1
+    manager.keepalive_interval = 0.05
+    stream = manager.open_stream(_StalledCamera(), '10.0.0.2')
+    next(stream)
+    next(stream)                  # Keepalive trotz hängender Kamera
+    assert not manager.has_capacity()
+    stream.close()                # So beendet der WSGI-Server den Generator nach einem Schreibfehler
+    assert manager.has_capacity()
+
+if __name__ == '__main__':
+    test_slow_client_degrades_and_recovers()
+    test_pinned_level_never_changes()
+    test_variant_cache_encodes_once_per_frame()
+    test_stream_limit()
+    test_stalled_camera_keeps_writing_and_times_out()
+    test_disconnect_during_outage_frees_slot()
+    print("✅ Stream-Qualitäts-Tests bestanden")
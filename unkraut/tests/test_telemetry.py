@@ -0,0 +1,80 @@
+# tests/test_telemetry.py
+"""
+Teste den WebSocket-Telemetriekanal: Abo mit Vollzustand, Deltas und Steuerbefehle
+"""
+import os
+import sys
+import time
+
+from flask import Flask
+
+# Python-Pfad anpassen
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from app.utils.telemetry import TelemetryHub, _diff
+from hardware.registry import hardware_registry
+
+def _client(rates=None):
+    """Eigener Hub an einer leeren Flask-App"""
+    app = Flask(__name__)
+    app.config['TELEMETRY_RATES'] = rates or {}
+    hub = TelemetryHub()
+    hub.init_app(app)
+    return hub, hub.socketio.test_client(app)
+
+def _telemetry_events(client, channel):
+    return [event['args'][0] for event in client.get_received()
+            if event['name'] == 'telemetry' and event['args'][0]['channel'] == channel]
+
+def test_diff_only_changed_fields():
+    """Delta enthält nur geänderte Felder, ohne Vorzustand alles"""
+    assert _diff(None, {'a': 1}) == {'a': 1}
+    assert _diff({'a': 1, 'b': [1, 2]}, {'a': 1, 'b': [1, 3]}) == {'b': [1, 3]}
+    assert _diff({'a': 1}, {'a': 1}) == {}
+
+def test_subscribe_snapshot_and_deltas():
+    """Abo liefert den Vollzustand, danach kommen nur Änderungen"""
+    hardware_registry.get('motor_controller')
+    hub, client = _client({'motors': 50.0})
+    try:
+        ack = client.emit('subscribe', ['motors', 'unbekannt'], callback=True)
+        assert ack['channels'] == ['motors']
+        assert ack['snapshot']['motors']['is_moving'] is False
+
+        # Ohne Änderung kein Delta
+        time.sleep(0.2)
+        assert _telemetry_events(client, 'motors') == []
+
+        result = client.emit('control', {'command': 'move', 'direction': 'left', 'speed': 30, 'duration': 1.0},
+                             callback=True)
+        assert result['status'] == 'success'
+        time.sleep(0.2)
+        merged = {}
+        for event in _telemetry_events(client, 'motors'):
+            merged.update(event['delta'])
+        assert merged['is_moving'] is True
+        assert (merged['direction'], merged['speed']) == ('left', 30)
+        assert 'hardware_available' not in merged
+
+        client.emit('control', {'command': 'stop'}, callback=True)
+    finally:
+        client.disconnect()
+
+def test_invalid_commands_rejected():
+    """Ungültige Befehle werden mit Fehler beantwortet, ohne Hardware zu bewegen"""
+    hub, client = _client()
+    try:
+        assert client.emit('control', 'forward', callback=True)['status'] == 'error'
+        assert client.emit('control', {'command': 'fly'}, callback=True)['status'] == 'error'
+        result = client.emit('control', {'command': 'move', 'direction': 'up'}, callback=True)
+        assert result['status'] == 'error'
+    finally:
+        client.disconnect()
+
+if __name__ == '__main__':
+    test_diff_only_changed_fields()
+    test_subscribe_snapshot_and_deltas()
+    test_invalid_commands_rejected()
+    print("✅ Telemetrie-Tests bestanden")
@@ -0,0 +1,123 @@
+# tests/test_ultrasonic.py
+"""
+Teste die HC-SR04-Messung mit dem Mock-Echo-Generator: Laufzeitmessung über Flanken,
+Round-Robin ohne Übersprechen, Median-Filter und Notaus mit begrenzter Latenz
+"""
+import os
+import sys
+import time
+
+# Python-Pfad anpassen
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from hardware.ultrasonic import UltrasonicArray, MockEchoBackend
+from hardware.motors import MotorController
+from hardware.motion_authority import MotionAuthority
+
+SENSORS = {
+    'front': {'trigger': 23, 'echo': 24},
+    'left': {'trigger': 22, 'echo': 10},
+    'back': {'trigger': 8, 'echo': 7}
+}
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.002)
+    return False
+
+def _array(distances, motors=None):
+    backend = MockEchoBackend(distances, noise_cm=0)
+    array = UltrasonicArray(sensors=SENSORS, backend=backend, motors=motors)
+    return array, backend
+
+def test_echo_timing_gives_distance():
+    """Laufzeit zwischen den Flanken ergibt den Abstand, ohne Echo gilt der Weg als frei"""
+    array, backend = _array({'front': 80.0, 'left': 35.0, 'back': None})
+    array.start()
+    try:
+        assert _wait_for(lambda: None not in array.get_distances().values())
+        time.sleep(0.2)
+        distances = array.get_distances()
+    finally:
+        array.cleanup()
+
+    assert abs(distances['front'] - 80.0) < 3.0, distances
+    assert abs(distances['left'] - 35.0) < 3.0, distances
+    assert distances['back'] == 400.0
+    assert array.stats['timeouts'] > 0
+
+def test_round_robin_without_crosstalk():
+    """Nie zwei Echos gleichzeitig unterwegs, der Frontsensor misst zwischen allen anderen"""
+    array, backend = _array({'front': 300.0, 'left': 300.0, 'back': 300.0})
+    assert array.schedule == ['front', 'left', 'front', 'back']
+    array.start()
+    time.sleep(0.5)
+    array.cleanup()
+
+    assert backend.stats['triggers'] >= 12
+    assert backend.stats['overlaps'] == 0
+    assert array.stats['ignored_edges'] == 0
+
+def test_median_rejects_single_spike():
+    """Ein einzelner Ausreißer löst keinen Notaus aus"""
+    motors = MotorController(authority=MotionAuthority())
+    motors.move('forward', 50, 0)
+    array, backend = _array({'front': 80.0, 'left': 80.0, 'back': 80.0}, motors=motors)
+    array.start()
+    try:
+        assert _wait_for(lambda: array.stats['measurements'] >= 6)
+        backend.spike('front', 5.0)
+        time.sleep(0.3)
+        assert motors.emergency_stopped is False
+        assert array.get_distance('front') > 70
+    finally:
+        array.cleanup()
+        motors.stop()
+
+def test_obstacle_triggers_emergency_stop_within_bound():
+    """Hindernis in Fahrtrichtung stoppt innerhalb der berechneten Worst-Case-Latenz"""
+    motors = MotorController(authority=MotionAuthority())
+    motors.move('forward', 50, 0)
+    array, backend = _array({'front': 80.0, 'left': 80.0, 'back': 80.0}, motors=motors)
+    bound = array.worst_case_stop_latency()['front']
+    assert bound == 2 * 0.06 + 0.03
+
+    array.start()
+    try:
+        assert _wait_for(lambda: array.stats['measurements'] >= 6)
+        started = time.monotonic()
+        backend.distances['front'] = 10.0
+        assert _wait_for(lambda: motors.emergency_stopped, timeout=1.0)
+        latency = time.monotonic() - started
+    finally:
+        array.cleanup()
+
+    assert latency <= bound + 0.02, f"Notaus nach {latency * 1000:.0f}ms (Grenze {bound * 1000:.0f}ms)"
+    assert motors.is_moving is False
+    assert array.stats['emergency_stops'] == 1
+
+def test_obstacle_behind_ignored_when_driving_forward():
+    """Nur Sensoren in Fahrtrichtung lösen aus"""
+    motors = MotorController(authority=MotionAuthority())
+    motors.move('forward', 50, 0)
+    array, backend = _array({'front': 80.0, 'left': 80.0, 'back': 8.0}, motors=motors)
+    array.start()
+    time.sleep(0.4)
+    array.cleanup()
+    motors.stop()
+
+    assert array.get_distance('back') < 15
+    assert array.stats['emergency_stops'] == 0
+
+if __name__ == '__main__':
+    test_echo_timing_gives_distance()
+    test_round_robin_without_crosstalk()
+    test_median_rejects_single_spike()
+    test_obstacle_triggers_emergency_stop_within_bound()
+    test_obstacle_behind_ignored_when_driving_forward()
+    print("✅ Ultraschall-Tests bestanden")
@@ -0,0 +1,66 @@
+# tests/test_zip_export.py
+"""
+Teste den Streaming-ZIP-Export (ohne Temp-Datei)
+"""
+import io
+import os
+import sys
+import time
+import zipfile
+import tempfile
+
+# Python-Pfad anpassen
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from app.utils.zip_export import stream_zip, select_images, select_session, parse_date_param
+
+def test_stream_zip_valid_and_stored():
+    """Gestreamtes ZIP ist gültig, JPEGs sind unkomprimiert gespeichert"""
+    with tempfile.TemporaryDirectory() as tmp:
+        jpeg_path = os.path.join(tmp, 'bild.jpg')
+        text_path = os.path.join(tmp, 'log.txt')
+        with open(jpeg_path, 'wb') as f:
+            f.write(os.urandom(200 * 1024))
+        with open(text_path, 'w') as f:
+            f.write('unkraut ' * 10000)
+
+        chunks = list(stream_zip([('bild.jpg', jpeg_path), ('log.txt', text_path)], chunk_size=16 * 1024))
+        assert len(chunks) > 1
+
+        with zipfile.ZipFile(io.BytesIO(b''.join(chunks))) as zipf:
+            assert zipf.testzip() is None
+            assert zipf.getinfo('bild.jpg').compress_type == zipfile.ZIP_STORED
+            assert zipf.getinfo('log.txt').compress_type == zipfile.ZIP_DEFLATED
+            with open(jpeg_path, 'rb') as f:
+                assert zipf.read('bild.jpg') == f.read()
+
+def test_select_images_date_range():
+    """Datumsfilter arbeitet auf der Änderungszeit, Ende exklusiv"""
+    with tempfile.TemporaryDirectory() as tmp:
+        day = parse_date_param('2025-06-01')
+        for name, mtime in (('alt.jpg', day - 60), ('heute.jpg', day + 3600), ('morgen.jpg', day + 86400)):
+            path = os.path.join(tmp, name)
+            open(path, 'wb').close()
+            os.utime(path, (mtime, mtime))
+
+        selected = select_images(tmp, parse_date_param('2025-06-01'), parse_date_param('2025-06-01', end_of_day=True))
+        assert [name for name, _ in selected] == ['heute.jpg']
+
+def test_select_session_rejects_traversal():
+    """Session-Namen außerhalb von data/sessions liefern nichts"""
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, 'sessions', 's1'))
+        open(os.path.join(tmp, 'sessions', 's1', 'a.json'), 'w').close()
+
+        sessions = os.path.join(tmp, 'sessions')
+        assert select_session(sessions, 's1') == [(os.path.join('s1', 'a.json'), os.path.join(sessions, 's1', 'a.json'))]
+        assert select_session(sessions, '..') == []
+        assert select_session(sessions, '../sessions') == []
+
+if __name__ == '__main__':
+    test_stream_zip_valid_and_stored()
+    test_select_images_date_range()
+    test_select_session_rejects_traversal()
+    print("✅ ZIP-Export-Tests bestanden")